@@ -3,8 +3,19 @@
 // 参照: docs/design/LOG_TRANSFER_DESIGN.md
 
 import Foundation
+import Compression
 import Domain
 
+// MARK: - LogContentEncoding
+
+/// アップロードされたログデータのエンコーディング
+public enum LogContentEncoding: String {
+    /// 非圧縮
+    case identity
+    /// raw deflate（RFC 1951）
+    case deflate
+}
+
 // MARK: - LogUploadError
 
 /// ログアップロードエラー
@@ -15,6 +26,8 @@ public enum LogUploadError: Error, LocalizedError {
     case fileTooLarge(maxMB: Int, actualMB: Double)
     case fileWriteFailed(Error)
     case executionLogNotFound
+    case decompressionFailed
+    case offsetMismatch(expected: Int, actual: Int)
 
     public var errorDescription: String? {
         switch self {
@@ -30,6 +43,10 @@ public enum LogUploadError: Error, LocalizedError {
             return "Failed to write log file: \(error.localizedDescription)"
         case .executionLogNotFound:
             return "Execution log not found"
+        case .decompressionFailed:
+            return "Failed to decompress log data"
+        case let .offsetMismatch(expected, actual):
+            return "Chunk offset \(expected) does not match stored size \(actual)"
         }
     }
 }
@@ -65,25 +82,39 @@ public struct LogUploadService {
         public let success: Bool
         public let logFilePath: String?
         public let fileSize: Int
+        /// ログを登録した実行ログID（見つからない場合はnil）
+        public let executionLogId: String?
 
-        public init(success: Bool, logFilePath: String?, fileSize: Int) {
+        public init(success: Bool, logFilePath: String?, fileSize: Int, executionLogId: String? = nil) {
             self.success = success
             self.logFilePath = logFilePath
             self.fileSize = fileSize
+            self.executionLogId = executionLogId
         }
     }
 
     // MARK: - Public Methods
 
     /// ログファイルをアップロード
+    ///
+    /// 大きなログはチャンクに分けて送られる。offsetが0のチャンクはファイルを作り直し、
+    /// それ以降のチャンクは保存済みサイズがoffsetと一致する場合のみ追記する。
+    /// サイズ上限は1チャンク（展開後）あたりに適用される。
+    ///
+    /// 実行中のログを送るCoordinatorは実行ログIDをまだ知らないため、executionLogIdが
+    /// 空の場合はstartedAfter以降に開始されたエージェント・タスクの最新の実行ログを使う。
     /// - Parameters:
-    ///   - executionLogId: 実行ログID
+    ///   - executionLogId: 実行ログID（空の場合はagentId/taskIdから解決）
     ///   - agentId: エージェントID
     ///   - taskId: タスクID
     ///   - projectId: プロジェクトID
-    ///   - logData: ログファイルのバイナリデータ
+    ///   - logData: ログファイル（チャンク）のバイナリデータ
     ///   - originalFilename: 元のファイル名
-    /// - Returns: アップロード結果
+    ///   - offset: チャンクの書き込み位置（非チャンク転送では0）
+    ///   - encoding: logDataのエンコーディング
+    ///   - rawSize: 展開後のサイズ（deflate時は必須）
+    ///   - startedAfter: 実行ログ解決時に、これより前に開始された実行ログを除外
+    /// - Returns: アップロード結果（fileSizeは保存後のファイル全体のサイズ）
     /// - Throws: LogUploadError
     public func uploadLog(
         executionLogId: String,
@@ -91,14 +122,19 @@ public struct LogUploadService {
         taskId: String,
         projectId: String,
         logData: Data,
-        originalFilename: String
+        originalFilename: String,
+        offset: Int = 0,
+        encoding: LogContentEncoding = .identity,
+        rawSize: Int? = nil,
+        startedAfter: Date? = nil
     ) throws -> UploadResult {
-        // 1. ファイルサイズチェック
-        let fileSizeBytes = logData.count
-        let fileSizeMB = Double(fileSizeBytes) / (1024 * 1024)
+        // 1. ファイルサイズチェック（展開前に申告サイズで確認）
+        let chunkSizeBytes = encoding == .identity ? logData.count : (rawSize ?? logData.count)
+        let fileSizeMB = Double(chunkSizeBytes) / (1024 * 1024)
         if fileSizeMB > Double(maxFileSizeMB) {
             throw LogUploadError.fileTooLarge(maxMB: maxFileSizeMB, actualMB: fileSizeMB)
         }
+        let chunkData = try decode(logData, encoding: encoding, rawSize: rawSize)
 
         // 2. プロジェクト取得
         let projectID = ProjectID(value: projectId)
@@ -118,17 +154,36 @@ public struct LogUploadService {
             agentId: agentID
         )
 
-        // 5. ログファイル保存
+        // 5. 実行ログ特定（ID未指定で見つからない場合は、まだ作成されていない）
+        let executionLog: ExecutionLog?
+        if executionLogId.isEmpty {
+            guard let latest = try executionLogRepository.findLatestByAgentAndTask(
+                agentId: agentID,
+                taskId: TaskID(value: taskId)
+            ), startedAfter.map({ latest.startedAt >= $0 }) ?? true else {
+                throw LogUploadError.executionLogNotFound
+            }
+            executionLog = latest
+        } else {
+            executionLog = try executionLogRepository.findById(ExecutionLogID(value: executionLogId))
+        }
+
+        // 6. ログファイル保存（offset > 0 は追記）
         let logFileURL = logDirURL.appendingPathComponent(originalFilename)
-        do {
-            try logData.write(to: logFileURL)
-        } catch {
-            throw LogUploadError.fileWriteFailed(error)
+        let storedSize: Int
+        if offset > 0 {
+            storedSize = try append(chunkData, to: logFileURL, at: offset)
+        } else {
+            do {
+                try chunkData.write(to: logFileURL)
+            } catch {
+                throw LogUploadError.fileWriteFailed(error)
+            }
+            storedSize = chunkData.count
         }
 
-        // 6. ExecutionLog更新
-        let execLogID = ExecutionLogID(value: executionLogId)
-        if var executionLog = try executionLogRepository.findById(execLogID) {
+        // 7. ExecutionLog更新（チャンクごとに呼ばれるため変更時のみ保存）
+        if var executionLog = executionLog, executionLog.logFilePath != logFileURL.path {
             executionLog.setLogFilePath(logFileURL.path)
             try executionLogRepository.save(executionLog)
         }
@@ -136,7 +191,55 @@ public struct LogUploadService {
         return UploadResult(
             success: true,
             logFilePath: logFileURL.path,
-            fileSize: fileSizeBytes
+            fileSize: storedSize,
+            executionLogId: executionLog?.id.value
         )
     }
+
+    // MARK: - Private Methods
+
+    /// 保存済みサイズがoffsetと一致する場合のみ追記し、追記後のサイズを返す
+    private func append(_ data: Data, to fileURL: URL, at offset: Int) throws -> Int {
+        let attributes = try? fileManager.attributesOfItem(atPath: fileURL.path)
+        let currentSize = (attributes?[.size] as? NSNumber)?.intValue ?? 0
+        guard currentSize == offset else {
+            throw LogUploadError.offsetMismatch(expected: offset, actual: currentSize)
+        }
+        do {
+            let handle = try FileHandle(forWritingTo: fileURL)
+            defer { try? handle.close() }
+            try handle.seekToEnd()
+            try handle.write(contentsOf: data)
+        } catch {
+            throw LogUploadError.fileWriteFailed(error)
+        }
+        return offset + data.count
+    }
+
+    /// チャンクを展開（rawSizeちょうどに展開できない場合はエラー）
+    private func decode(_ data: Data, encoding: LogContentEncoding, rawSize: Int?) throws -> Data {
+        guard encoding == .deflate else { return data }
+        guard let rawSize = rawSize, rawSize >= 0 else {
+            throw LogUploadError.decompressionFailed
+        }
+        guard rawSize > 0 else { return Data() }
+
+        // COMPRESSION_ZLIB は raw deflate を扱う
+        var destinationBuffer = [UInt8](repeating: 0, count: rawSize)
+        let decodedSize = data.withUnsafeBytes { sourcePointer -> Int in
+            guard let sourceBaseAddress = sourcePointer.baseAddress else { return 0 }
+            return compression_decode_buffer(
+                &destinationBuffer,
+                rawSize,
+                sourceBaseAddress.assumingMemoryBound(to: UInt8.self),
+                data.count,
+                nil,
+                COMPRESSION_ZLIB
+            )
+        }
+        guard decodedSize == rawSize else {
+            throw LogUploadError.decompressionFailed
+        }
+        return Data(destinationBuffer)
+    }
 }
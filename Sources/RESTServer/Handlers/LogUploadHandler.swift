@@ -62,18 +62,31 @@ extension RESTServer {
         let formData = parseMultipartFormData(data: data, boundary: String(boundary))
 
         // 4. 必須フィールドを取得
-        guard let executionLogId = formData.fields["execution_log_id"],
-              let agentId = formData.fields["agent_id"],
+        // execution_log_idは実行中ログの送信時は省略される（agent_id/task_idから解決）
+        guard let agentId = formData.fields["agent_id"],
               let taskId = formData.fields["task_id"],
               let projectId = formData.fields["project_id"],
               let logFileData = formData.files["log_file"] else {
             debugLog("[Log Upload] Missing required fields")
-            return errorResponse(status: .badRequest, message: "Missing required fields: execution_log_id, agent_id, task_id, project_id, log_file")
+            return errorResponse(status: .badRequest, message: "Missing required fields: agent_id, task_id, project_id, log_file")
         }
+        let executionLogId = formData.fields["execution_log_id"] ?? ""
+        let startedAfter = formData.fields["started_after"]
+            .flatMap { Double($0) }
+            .map { Date(timeIntervalSince1970: $0) }
 
         let originalFilename = formData.fields["original_filename"] ?? formData.filenames["log_file"] ?? "execution.log"
 
-        debugLog("[Log Upload] Received: exec=\(executionLogId), agent=\(agentId), project=\(projectId), file=\(originalFilename)")
+        // チャンク転送・圧縮（任意フィールド。旧Coordinatorは送らない）
+        guard let chunkOffset = Int(formData.fields["chunk_offset"] ?? "0"), chunkOffset >= 0 else {
+            return errorResponse(status: .badRequest, message: "Invalid chunk_offset")
+        }
+        guard let encoding = LogContentEncoding(rawValue: formData.fields["content_encoding"] ?? "identity") else {
+            return errorResponse(status: HTTPResponse.Status(code: 415), message: "Unsupported content_encoding")
+        }
+        let rawSize = formData.fields["raw_size"].flatMap { Int($0) }
+
+        debugLog("[Log Upload] Received: exec=\(executionLogId), agent=\(agentId), project=\(projectId), file=\(originalFilename), offset=\(chunkOffset), encoding=\(encoding.rawValue)")
 
         // 5. LogUploadServiceを使用してアップロード処理
         let service = LogUploadService(
@@ -89,14 +102,18 @@ extension RESTServer {
                 taskId: taskId,
                 projectId: projectId,
                 logData: logFileData,
-                originalFilename: originalFilename
+                originalFilename: originalFilename,
+                offset: chunkOffset,
+                encoding: encoding,
+                rawSize: rawSize,
+                startedAfter: startedAfter
             )
 
             debugLog("[Log Upload] Success: \(result.logFilePath ?? "unknown")")
 
             let response = LogUploadResponse(
                 success: true,
-                executionLogId: executionLogId,
+                executionLogId: result.executionLogId ?? executionLogId,
                 logFilePath: result.logFilePath ?? "",
                 fileSize: result.fileSize
             )
@@ -114,6 +131,16 @@ extension RESTServer {
                 return errorResponse(status: .internalServerError, message: "Failed to save log file")
             case .executionLogNotFound:
                 return errorResponse(status: .notFound, message: "Execution log not found")
+            case .decompressionFailed:
+                return errorResponse(status: .badRequest, message: "Failed to decompress log data")
+            case .offsetMismatch(_, let actual):
+                // 保存済みサイズを返し、Coordinatorはそこから再開する
+                let json = "{\"message\":\"Chunk offset does not match stored size\",\"file_size\":\(actual)}"
+                return Response(
+                    status: .conflict,
+                    headers: [.contentType: "application/json"],
+                    body: .init(byteBuffer: .init(string: json))
+                )
             case .notImplemented:
                 return errorResponse(status: .internalServerError, message: "Not implemented")
             }
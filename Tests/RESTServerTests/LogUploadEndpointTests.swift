@@ -4,6 +4,7 @@
 
 import XCTest
 import GRDB
+import Compression
 @testable import Infrastructure
 @testable import Domain
 
@@ -340,4 +341,163 @@ final class LogUploadEndpointTests: XCTestCase {
         XCTAssertTrue(result1.logFilePath!.contains("agt_001"))
         XCTAssertTrue(result2.logFilePath!.contains("agt_002"))
     }
+
+    /// TEST 8: チャンクはoffsetが保存済みサイズと一致する場合に追記される
+    func testLogUploadService_AppendsChunks() throws {
+        let service = LogUploadService(
+            directoryManager: directoryManager,
+            projectRepository: projectRepository,
+            executionLogRepository: executionLogRepository
+        )
+
+        let first = try service.uploadLog(
+            executionLogId: testExecutionLogId.value,
+            agentId: testAgentId.value,
+            taskId: testTaskId.value,
+            projectId: testProjectId.value,
+            logData: Data("first chunk\n".utf8),
+            originalFilename: "chunked.log"
+        )
+        let second = try service.uploadLog(
+            executionLogId: testExecutionLogId.value,
+            agentId: testAgentId.value,
+            taskId: testTaskId.value,
+            projectId: testProjectId.value,
+            logData: Data("second chunk\n".utf8),
+            originalFilename: "chunked.log",
+            offset: first.fileSize
+        )
+
+        XCTAssertEqual(second.fileSize, 25)
+        let savedContent = try String(contentsOfFile: second.logFilePath!, encoding: .utf8)
+        XCTAssertEqual(savedContent, "first chunk\nsecond chunk\n")
+    }
+
+    /// TEST 9: offsetが保存済みサイズと異なる場合は保存済みサイズを返すエラー
+    func testLogUploadService_OffsetMismatch_ThrowsError() throws {
+        let service = LogUploadService(
+            directoryManager: directoryManager,
+            projectRepository: projectRepository,
+            executionLogRepository: executionLogRepository
+        )
+
+        _ = try service.uploadLog(
+            executionLogId: testExecutionLogId.value,
+            agentId: testAgentId.value,
+            taskId: testTaskId.value,
+            projectId: testProjectId.value,
+            logData: Data("0123456789".utf8),
+            originalFilename: "chunked.log"
+        )
+
+        XCTAssertThrowsError(
+            try service.uploadLog(
+                executionLogId: testExecutionLogId.value,
+                agentId: testAgentId.value,
+                taskId: testTaskId.value,
+                projectId: testProjectId.value,
+                logData: Data("retry".utf8),
+                originalFilename: "chunked.log",
+                offset: 5
+            )
+        ) { error in
+            if case LogUploadError.offsetMismatch(let expected, let actual) = error {
+                XCTAssertEqual(expected, 5)
+                XCTAssertEqual(actual, 10)
+            } else {
+                XCTFail("Expected offsetMismatch error, got: \(error)")
+            }
+        }
+    }
+
+    /// TEST 10: deflate圧縮されたチャンクは展開して保存される
+    func testLogUploadService_DecompressesDeflate() throws {
+        let service = LogUploadService(
+            directoryManager: directoryManager,
+            projectRepository: projectRepository,
+            executionLogRepository: executionLogRepository
+        )
+
+        let logContent = String(repeating: "compressed log line\n", count: 200)
+        let raw = Data(logContent.utf8)
+        var compressed = [UInt8](repeating: 0, count: raw.count)
+        let compressedSize = raw.withUnsafeBytes { sourcePointer -> Int in
+            compression_encode_buffer(
+                &compressed,
+                compressed.count,
+                sourcePointer.baseAddress!.assumingMemoryBound(to: UInt8.self),
+                raw.count,
+                nil,
+                COMPRESSION_ZLIB
+            )
+        }
+        XCTAssertGreaterThan(compressedSize, 0)
+
+        let result = try service.uploadLog(
+            executionLogId: testExecutionLogId.value,
+            agentId: testAgentId.value,
+            taskId: testTaskId.value,
+            projectId: testProjectId.value,
+            logData: Data(compressed.prefix(compressedSize)),
+            originalFilename: "compressed.log",
+            encoding: .deflate,
+            rawSize: raw.count
+        )
+
+        XCTAssertEqual(result.fileSize, raw.count)
+        let savedContent = try String(contentsOfFile: result.logFilePath!, encoding: .utf8)
+        XCTAssertEqual(savedContent, logContent)
+    }
+
+    /// TEST 11: 実行ログID省略時はエージェント・タスクの最新の実行ログに登録される
+    func testLogUploadService_ResolvesExecutionLogWhenIdOmitted() throws {
+        let service = LogUploadService(
+            directoryManager: directoryManager,
+            projectRepository: projectRepository,
+            executionLogRepository: executionLogRepository
+        )
+
+        let result = try service.uploadLog(
+            executionLogId: "",
+            agentId: testAgentId.value,
+            taskId: testTaskId.value,
+            projectId: testProjectId.value,
+            logData: Data("live chunk\n".utf8),
+            originalFilename: "live.log",
+            startedAfter: Date(timeIntervalSinceNow: -60)
+        )
+
+        XCTAssertEqual(result.executionLogId, testExecutionLogId.value)
+        let updatedLog = try executionLogRepository.findById(testExecutionLogId)
+        XCTAssertEqual(updatedLog?.logFilePath, result.logFilePath)
+    }
+
+    /// TEST 12: startedAfterより前の実行ログには登録しない
+    func testLogUploadService_IgnoresExecutionLogStartedBefore() throws {
+        let service = LogUploadService(
+            directoryManager: directoryManager,
+            projectRepository: projectRepository,
+            executionLogRepository: executionLogRepository
+        )
+
+        XCTAssertThrowsError(
+            try service.uploadLog(
+                executionLogId: "",
+                agentId: testAgentId.value,
+                taskId: testTaskId.value,
+                projectId: testProjectId.value,
+                logData: Data("live chunk\n".utf8),
+                originalFilename: "live.log",
+                startedAfter: Date(timeIntervalSinceNow: 60)
+            )
+        ) { error in
+            if case LogUploadError.executionLogNotFound = error {
+                // 期待通り（まだ作成されていない）
+            } else {
+                XCTFail("Expected executionLogNotFound error, got: \(error)")
+            }
+        }
+        let log = try executionLogRepository.findById(testExecutionLogId)
+        XCTAssertNil(log?.logFilePath)
+    }
 }
@@ -0,0 +1,75 @@
+# benchmarks/bench_quota_detector.py
+# Micro-benchmark: single-scan QuotaMatcher vs. one re.search per pattern
+#
+# Usage: PYTHONPATH=src python benchmarks/bench_quota_detector.py [--size-mb 10]
+
+import argparse
+import re
+import time
+
+from aiagent_runner.quota_detector import QUOTA_RULES, QuotaErrorDetector
+
+# The patterns as they were searched before QuotaMatcher (one pass each)
+LEGACY_PATTERNS = [
+    r"quota will reset after (\d+)m(\d+)s",
+    r"retry after (\d+)\s*(?:seconds?)?",
+    r"TerminalQuotaError",
+    r"RateLimitError",
+    r"quota.*exhausted",
+    r"rate\s*limit",
+]
+
+LINE = '{"type":"assistant","message":{"content":[{"type":"text","text":"Checking the quota of step %d"}]}}\n'
+
+
+def legacy_detect(text: str) -> bool:
+    for pattern in LEGACY_PATTERNS:
+        if re.search(pattern, text, re.IGNORECASE):
+            return True
+    return False
+
+
+def build_log(size: int, tail: str) -> str:
+    lines = []
+    total = 0
+    step = 0
+    while total < size:
+        line = LINE % step
+        lines.append(line)
+        total += len(line)
+        step += 1
+    return "".join(lines) + tail
+
+
+def timed(fn, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=float, default=10.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    detector = QuotaErrorDetector()
+    size = int(args.size_mb * 1024 * 1024)
+    cases = {
+        "no quota error": build_log(size, "Done\n"),
+        "rate limit at end": build_log(size, "API Error: rate limit reached\n"),
+        "reset time at end": build_log(size, "Your quota will reset after 3m20s.\n"),
+    }
+    print(f"{len(QUOTA_RULES)} rules, {args.size_mb:g} MB logs, best of {args.repeat}")
+    for name, text in cases.items():
+        legacy = timed(legacy_detect, text, args.repeat)
+        matcher = timed(detector.detect, text, args.repeat)
+        print(f"{name:>20}: legacy {legacy * 1000:8.1f} ms  matcher {matcher * 1000:8.1f} ms  "
+              f"({legacy / matcher:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
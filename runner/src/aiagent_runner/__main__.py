@@ -5,13 +5,16 @@
 
 import argparse
 import asyncio
+import json
 import logging
 import sys
 from pathlib import Path
 
 from aiagent_runner.config import RunnerConfig
+from aiagent_runner.control import CONTROL_COMMANDS, ControlError, send_control_command
 from aiagent_runner.coordinator import run_coordinator
 from aiagent_runner.coordinator_config import CoordinatorConfig
+from aiagent_runner.lock import CoordinatorLock
 from aiagent_runner.runner import run
 
 
@@ -47,6 +50,12 @@ def parse_args() -> argparse.Namespace:
         help="Run in Coordinator mode (Phase 4: single orchestrator for all agents)"
     )
 
+    parser.add_argument(
+        "--control",
+        choices=CONTROL_COMMANDS,
+        help="Send a command to the running Coordinator for the same config and exit"
+    )
+
     # Common arguments
     parser.add_argument(
         "-c", "--config",
@@ -240,6 +249,47 @@ def load_coordinator_config(args: argparse.Namespace) -> CoordinatorConfig:
     return config
 
 
+def get_coordinator_lock_identifier(args: argparse.Namespace) -> str:
+    """Get the identifier the Coordinator started with these args locks on.
+
+    Mirrors load_coordinator_config: server-provided config has no path and
+    uses "default"; otherwise the given or default config file path.
+
+    Args:
+        args: Parsed CLI arguments
+
+    Returns:
+        Identifier passed to CoordinatorLock
+    """
+    if args.server:
+        return "default"
+    if args.config and args.config.exists():
+        return str(args.config)
+    default_config_path = get_default_config_path()
+    if default_config_path.exists():
+        return str(default_config_path)
+    return "default"
+
+
+def run_control_command(args: argparse.Namespace) -> int:
+    """Send --control command to the running Coordinator and print the response.
+
+    Args:
+        args: Parsed CLI arguments
+
+    Returns:
+        Exit code (0 for success)
+    """
+    lock = CoordinatorLock(config_path=get_coordinator_lock_identifier(args))
+    try:
+        response = asyncio.run(send_control_command(lock.control_socket_path, args.control))
+    except ControlError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(response, indent=2, ensure_ascii=False))
+    return 0
+
+
 def main() -> int:
     """Main entry point.
 
@@ -251,6 +301,9 @@ def main() -> int:
 
     logger = logging.getLogger(__name__)
 
+    if args.control:
+        return run_control_command(args)
+
     if args.coordinator:
         # Phase 4: Coordinator mode
         logger.info("Running in Coordinator mode (Phase 4)")
@@ -0,0 +1,155 @@
+# src/aiagent_runner/context_writer.py
+# Idempotent, atomic writes for agent context directories
+# Reference: docs/design/AGENT_CONTEXT_DIRECTORY.md
+
+import hashlib
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def atomic_write_text(path: Path, content: str) -> None:
+    """Replace path with content so readers see either the old or the new file.
+
+    The content is written to a temporary file in the same directory and
+    renamed over the target.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+@dataclass
+class _FileState:
+    digest: str
+    mtime_ns: int
+    size: int
+
+
+@dataclass
+class ContextWriterStats:
+    """Counters for logs and tests."""
+    written: int = 0     # Files (re)written
+    unchanged: int = 0   # Writes skipped because the file already had the content
+
+
+class ContextWriter:
+    """Writes generated context files only when their content changes.
+
+    The digest of every file written (or found up to date) is remembered
+    together with its mtime and size. A later write of the same content
+    costs one stat() call; the file is only read when the stat no longer
+    matches (e.g. someone edited it) and only written when the content
+    actually differs. Writes are atomic so an agent starting concurrently
+    never reads a half-written settings file.
+    """
+
+    def __init__(self):
+        self._states: dict[Path, _FileState] = {}
+        self.stats = ContextWriterStats()
+
+    def write(self, path: Path, content: str) -> bool:
+        """Make path contain content.
+
+        Returns:
+            True if the file was written, False if it was already up to date
+        """
+        path = Path(path)
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        if self._is_current(path, digest) or self._matches_on_disk(path, content, digest):
+            self.stats.unchanged += 1
+            return False
+
+        atomic_write_text(path, content)
+        self._remember(path, digest)
+        self.stats.written += 1
+        logger.debug(f"Wrote {path}")
+        return True
+
+    def ensure_lines(self, path: Path, entries: list[str], header: Optional[str] = None) -> bool:
+        """Append the entries missing from a line-oriented file (e.g. .gitignore).
+
+        Lines added by users are kept. Once the file is known to contain the
+        entries it is not read again until its mtime or size changes.
+
+        Returns:
+            True if the file was written
+        """
+        path = Path(path)
+        state = self._states.get(path)
+        if state is not None and self._stat_matches(path, state):
+            return False
+
+        existing = ""
+        try:
+            existing = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            pass
+
+        missing = [entry for entry in entries if entry not in existing]
+        if not missing:
+            self._remember(path, hashlib.sha256(existing.encode("utf-8")).hexdigest())
+            return False
+
+        content = existing
+        if content and not content.endswith("\n"):
+            content += "\n"
+        if header:
+            content += f"{header}\n"
+        content += "".join(f"{entry}\n" for entry in missing)
+        atomic_write_text(path, content)
+        self._remember(path, hashlib.sha256(content.encode("utf-8")).hexdigest())
+        self.stats.written += 1
+        logger.debug(f"Added {missing} to {path}")
+        return True
+
+    def forget(self, path: Optional[Path] = None) -> None:
+        """Drop remembered state for path (or everything), forcing a re-check."""
+        if path is None:
+            self._states.clear()
+        else:
+            self._states.pop(Path(path), None)
+
+    def _is_current(self, path: Path, digest: str) -> bool:
+        state = self._states.get(path)
+        return state is not None and state.digest == digest and self._stat_matches(path, state)
+
+    def _matches_on_disk(self, path: Path, content: str, digest: str) -> bool:
+        # First write in this process (or the file changed): compare contents once
+        try:
+            if path.read_text(encoding="utf-8") != content:
+                return False
+        except (OSError, UnicodeDecodeError):
+            return False
+        self._remember(path, digest)
+        return True
+
+    def _remember(self, path: Path, digest: str) -> None:
+        try:
+            st = path.stat()
+        except OSError:
+            self._states.pop(path, None)
+            return
+        self._states[path] = _FileState(digest, st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def _stat_matches(path: Path, state: _FileState) -> bool:
+        try:
+            st = path.stat()
+        except OSError:
+            return False
+        return st.st_mtime_ns == state.mtime_ns and st.st_size == state.size
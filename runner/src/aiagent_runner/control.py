@@ -0,0 +1,154 @@
+# src/aiagent_runner/control.py
+# Local control socket for a running Coordinator (wake, drain, resume, status)
+# Reference: docs/plan/PHASE4_COORDINATOR_ARCHITECTURE.md
+
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Union
+
+if TYPE_CHECKING:
+    from aiagent_runner.coordinator import Coordinator
+
+logger = logging.getLogger(__name__)
+
+# Commands accepted by the control socket
+CONTROL_COMMANDS = ("wake", "drain", "resume", "status")
+
+
+class ControlError(Exception):
+    """Raised when a control command cannot be delivered or is rejected."""
+    pass
+
+
+class ControlServer:
+    """Unix socket endpoint for controlling a running Coordinator.
+
+    Protocol: one JSON object per line, e.g. {"command": "wake"}, answered
+    with one JSON line {"ok": true, ...} or {"ok": false, "error": "..."}.
+
+    - wake: run a tick now (e.g. right after the app created a task)
+    - drain: stop spawning; running instances are left to finish
+    - resume: undo drain
+    - status: running instances, cooldowns and last tick timings
+
+    The socket file is created with owner-only permissions.
+    """
+
+    def __init__(self, coordinator: "Coordinator", socket_path: Union[str, Path]):
+        """Initialize the server (not listening until start()).
+
+        Args:
+            coordinator: Coordinator to control
+            socket_path: Path of the Unix socket to create
+        """
+        self._coordinator = coordinator
+        self._socket_path = str(socket_path)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def socket_path(self) -> str:
+        return self._socket_path
+
+    async def start(self) -> None:
+        """Start listening, replacing a stale socket file if present."""
+        path = Path(self._socket_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            # The coordinator lock is held, so any existing socket is stale
+            path.unlink()
+        self._server = await asyncio.start_unix_server(self._handle, path=self._socket_path)
+        os.chmod(self._socket_path, 0o600)
+        logger.info(f"Control socket listening at {self._socket_path}")
+
+    async def close(self) -> None:
+        """Stop listening and remove the socket file."""
+        if self._server is None:
+            return
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+        try:
+            os.unlink(self._socket_path)
+        except OSError:
+            pass
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = self._dispatch(line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    def _dispatch(self, line: bytes) -> dict:
+        try:
+            request = json.loads(line)
+            command = request.get("command")
+        except (json.JSONDecodeError, AttributeError):
+            return {"ok": False, "error": "Invalid request"}
+
+        coordinator = self._coordinator
+        logger.debug(f"Control command: {command}")
+        if command == "wake":
+            coordinator.wake()
+            return {"ok": True}
+        if command == "drain":
+            coordinator.drain()
+            return {"ok": True, "draining": True}
+        if command == "resume":
+            coordinator.resume()
+            return {"ok": True, "draining": False}
+        if command == "status":
+            return {"ok": True, "status": coordinator.status()}
+        return {"ok": False, "error": f"Unknown command: {command}"}
+
+
+async def send_control_command(
+    socket_path: Union[str, Path],
+    command: str,
+    timeout: float = 5.0
+) -> dict:
+    """Send one command to a running Coordinator's control socket.
+
+    Args:
+        socket_path: Control socket path (CoordinatorLock.control_socket_path)
+        command: One of CONTROL_COMMANDS
+        timeout: Seconds to wait for the response
+
+    Returns:
+        Response payload (without the "ok" flag)
+
+    Raises:
+        ControlError: If the Coordinator is not reachable or rejects the command
+    """
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_unix_connection(str(socket_path)), timeout
+        )
+    except (OSError, asyncio.TimeoutError) as e:
+        raise ControlError(f"Coordinator not reachable at {socket_path}: {e}") from e
+
+    try:
+        writer.write(json.dumps({"command": command}).encode() + b"\n")
+        await writer.drain()
+        line = await asyncio.wait_for(reader.readline(), timeout)
+    except (OSError, asyncio.TimeoutError) as e:
+        raise ControlError(f"No response from coordinator: {e}") from e
+    finally:
+        writer.close()
+
+    if not line:
+        raise ControlError("Coordinator closed the control connection")
+    response = json.loads(line)
+    if not response.pop("ok", False):
+        raise ControlError(response.get("error", "Command failed"))
+    return response
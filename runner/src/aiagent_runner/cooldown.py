@@ -16,6 +16,8 @@ class CooldownEntry:
     reason: str              # クールダウン理由（"error", "quota"）
     error_message: str       # エラーメッセージ（ログ用）
     consecutive_errors: int  # 連続エラー回数
+    rule: Optional[str] = None    # クォータエラーを検出したルール
+    offset: Optional[int] = None  # 検出箇所のログ内バイト位置
 
     def is_expired(self) -> bool:
         """クールダウンが期限切れかどうか"""
@@ -96,7 +98,9 @@ class CooldownManager:
         self,
         key: AgentInstanceKey,
         cooldown_seconds: int,
-        error_message: str
+        error_message: str,
+        rule: Optional[str] = None,
+        offset: Optional[int] = None
     ) -> None:
         """クォータエラー時のクールダウンを設定
 
@@ -104,6 +108,8 @@ class CooldownManager:
             key: エージェント/プロジェクトキー
             cooldown_seconds: クールダウン時間（秒）
             error_message: エラーメッセージ
+            rule: 検出したルールのパターン
+            offset: 検出箇所のログ内バイト位置
         """
         seconds = min(cooldown_seconds, self._max_seconds)  # 最大値でキャップ
 
@@ -116,7 +122,9 @@ class CooldownManager:
             until=datetime.now() + timedelta(seconds=seconds),
             reason="quota",
             error_message=error_message,
-            consecutive_errors=consecutive
+            consecutive_errors=consecutive,
+            rule=rule,
+            offset=offset
         )
 
     def clear(self, key: AgentInstanceKey) -> None:
@@ -3,56 +3,94 @@
 # Reference: docs/plan/PHASE4_COORDINATOR_ARCHITECTURE.md
 
 import asyncio
-import base64
-import io
 import json
 import logging
 import os
-import shutil
 import subprocess
 import tempfile
-import zipfile
+import time
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, TextIO
+from typing import Iterable, Optional, TextIO, Union
 
+from aiagent_runner.context_writer import ContextWriter
+from aiagent_runner.control import ControlServer
 from aiagent_runner.cooldown import CooldownManager
 from aiagent_runner.coordinator_config import CoordinatorConfig
+from aiagent_runner.events import (
+    EVENT_PAIR_WORK,
+    EVENT_PROFILE_CHANGED,
+    EVENT_TOPOLOGY_CHANGED,
+    CoordinatorEvent,
+    EventSubscriber,
+)
+from aiagent_runner.http_session import HAS_AIOHTTP, SharedHTTPSession
+from aiagent_runner.log_analysis import LogAnalysis, analyze_log
+from aiagent_runner.log_collector import CollectedLog, LogCollector
+from aiagent_runner.log_follower import LogFollower
+from aiagent_runner.log_retention import LogRetention
+from aiagent_runner.log_shipper import LogShipper, LogShipState
 from aiagent_runner.log_uploader import LogUploader, LogUploadConfig
-from aiagent_runner.mcp_client import MCPClient, MCPError, SkillDefinition, AppSettingsResult
+from aiagent_runner.mcp_proxy import MCPProxy
+from aiagent_runner.mcp_client import (
+    AgentActionResult,
+    AppSettingsResult,
+    MCPClient,
+    MCPError,
+    ProjectWithAgents,
+    SkillDefinition,
+)
 from aiagent_runner.platform import get_data_directory, is_windows
-from aiagent_runner.quota_detector import QuotaErrorDetector
+from aiagent_runner.polling import AdaptivePollingScheduler
+from aiagent_runner.process_watcher import ProcessExitWatcher
+from aiagent_runner.profile_cache import ProfileCache
+from aiagent_runner.quota_detector import QuotaDetection, QuotaErrorDetector, StreamingQuotaDetector
+from aiagent_runner.skill_cache import SkillCache
+from aiagent_runner.spawner import RemoteProcess, SpawnerClient, SpawnerError
+from aiagent_runner.spawn_executor import STAGE_CONTEXT, STAGE_PROFILE, STAGE_SPAWN, SpawnExecutor
+from aiagent_runner.upload_spool import UploadJob, UploadSpool, UploadWorkerPool
 from aiagent_runner.models import AgentInstanceKey
 
 logger = logging.getLogger(__name__)
 
+# Cached skill archives unused for this long are removed on start
+SKILL_CACHE_MAX_AGE_SECONDS = 30 * 24 * 3600
+
+# Seconds an instance gets to exit after SIGTERM before it is killed
+TERMINATE_TIMEOUT_SECONDS = 5.0
+
+# Clock skew allowed when the server matches a running log to its execution log
+LIVE_SHIP_CLOCK_TOLERANCE_SECONDS = 5.0
+
+
+def _instance_log_paths(log_file_path: str) -> tuple[str, str]:
+    """An instance's log and the debug log written next to it in debug_mode."""
+    return log_file_path, str(Path(log_file_path).with_suffix(".debug.log"))
+
 
 @dataclass
 class AgentInstanceInfo:
     """Information about a running Agent Instance."""
     key: AgentInstanceKey
-    process: subprocess.Popen
+    process: Union[subprocess.Popen, RemoteProcess]  # RemoteProcess when started by the spawner helper
     working_directory: str
     provider: str                              # "claude", "gemini", "openai", "other"
     model: Optional[str]                       # "claude-sonnet-4-5", "gemini-2.0-flash", etc.
     started_at: datetime
     log_file_handle: Optional["TextIO"] = None  # Keep file handle open during process lifetime
+    log_sink: Optional[CollectedLog] = None     # Output pipes read by the log collector
     task_id: Optional[str] = None              # Phase 4: ログファイルパス登録用
     log_file_path: Optional[str] = None        # Phase 4: ログファイルパス
     mcp_config_file: Optional[str] = None      # Temp file for MCP config (Claude CLI)
     execution_log_id: Optional[str] = None     # ログアップロード用実行ログID
     prompt_file: Optional[str] = None          # Temp file for prompt (Windows + Gemini)
-
-
-@dataclass
-class _LogUploadInfo:
-    """Internal info for async log upload task."""
-    log_file_path: str
-    execution_log_id: str
-    agent_id: str
-    task_id: str
-    project_id: str
+    stopping: bool = False                     # Being terminated; not reaped by _cleanup_finished
+    log_follower: Optional[LogFollower] = None           # Tails log_file_path while running
+    quota_stream: Optional[StreamingQuotaDetector] = None  # Early quota detection on the tailed log
+    log_analysis: Optional[LogAnalysis] = None           # Cached by _analyze_log after exit
+    log_ship: Optional[LogShipState] = None              # Live upload progress of the log
 
 
 class Coordinator:
@@ -63,12 +101,15 @@ class Coordinator:
     2. list_active_projects_with_agents() - Get all projects and their agents
     3. For each (agent_id, project_id) pair:
        - Check if we have a passkey configured
-       - get_agent_action(agent_id, project_id) - Check what action to take
+       - get_agent_actions(pairs) - Check what action to take (one round trip)
        - Spawn Agent Instance if needed
-    4. Clean up finished processes
-    5. Wait for polling interval
+    4. Report finished processes (queued while the server was unreachable)
+    5. Wait for polling interval (or until an instance exits)
     6. Repeat
 
+    Finished processes are reaped by a separate loop (_reap_loop) that keeps
+    running while the MCP server is down.
+
     Key differences from the old Runner:
     - Single instance manages ALL (agent_id, project_id) combinations
     - Does NOT authenticate - spawned Agent Instances do that
@@ -82,36 +123,130 @@ class Coordinator:
             config: Coordinator configuration with agents and ai_providers
         """
         self.config = config
+
+        # One pooled HTTP session for all server traffic, closed in stop()
+        self._http_session: Optional[SharedHTTPSession] = None
+        if HAS_AIOHTTP:
+            self._http_session = SharedHTTPSession(config.http_pool)
+
         # Phase 5: Pass coordinator_token for Coordinator-only API authorization
         logger.debug(f"Initializing MCPClient with coordinator_token: {'set' if config.coordinator_token else 'NOT SET'}")
         self.mcp_client = MCPClient(
             config.mcp_socket_path,
-            coordinator_token=config.coordinator_token
+            coordinator_token=config.coordinator_token,
+            max_connections=config.mcp_max_connections,
+            http_session=self._http_session
         )
 
         self._running = False
         self._shutdown_event: Optional[asyncio.Event] = None
+        # Set when a child exits (or on stop) to run the next tick immediately
+        self._wake_event: Optional[asyncio.Event] = None
+        # Set by the process watcher to run _reap_loop immediately
+        self._exit_event: Optional[asyncio.Event] = None
+        self._exit_watcher = ProcessExitWatcher()
+        self._reaper_task: Optional[asyncio.Task] = None
+        # Follows running instances' logs for quota errors (started in start())
+        self._quota_watch_task: Optional[asyncio.Task] = None
+        self._quota_aborts: set[asyncio.Task] = set()
+        # Spawns in flight; they register their instance even if the tick
+        # awaiting them is cancelled, so stop() can terminate it
+        self._spawn_tasks: set[asyncio.Task] = set()
+        self._log_ship_task: Optional[asyncio.Task] = None
+        self._log_retention_task: Optional[asyncio.Task] = None
+
+        # Adaptive polling: set whenever something happened since the last tick
+        # (the scheduler is created in start())
+        self._polling: Optional[AdaptivePollingScheduler] = None
+        self._tick_activity = False
+
+        # Server-push subscription (see events.py)
+        self._event_subscriber: Optional[EventSubscriber] = None
+        self._event_task: Optional[asyncio.Task] = None
+        self._event_pairs: set[AgentInstanceKey] = set()
+        self._projects_cache: list[ProjectWithAgents] = []
+        self._full_tick_needed = True
+        self._last_full_tick = 0.0
+        if hasattr(config, 'events') and config.events and config.events.enabled:
+            if self._http_session and config.events.endpoint:
+                self._event_subscriber = EventSubscriber(
+                    config.events.endpoint,
+                    config.coordinator_token,
+                    self._http_session,
+                    on_event=self._on_server_event,
+                    on_state_change=self._on_event_stream_state,
+                    reconnect_max_delay=config.events.reconnect_max_delay
+                )
+            else:
+                logger.warning("Event subscription requires aiohttp and an endpoint, using polling")
+
+        # Control socket state (see control.py)
+        self._draining = False
+        self._ticks = 0
+        self._last_tick_started_at: Optional[datetime] = None
+        self._last_tick_duration: Optional[float] = None
+        # Reaped instances whose MCP reports have not been sent yet
+        self._pending_exit_reports: deque[tuple[AgentInstanceKey, AgentInstanceInfo, int]] = deque()
+        # id() of queued instances whose error was already reported to chat
+        self._reported_exit_errors: set[int] = set()
         self._instances: dict[AgentInstanceKey, list[AgentInstanceInfo]] = {}
+        # Slots claimed by starts still preparing their context (see _reserve_slot)
+        self._reserved_slots = 0
 
         # Phase 6: Log upload configuration
         # 参照: docs/design/LOG_TRANSFER_DESIGN.md
-        self._pending_uploads: dict[str, asyncio.Task] = {}  # execution_log_id -> Task
+        # Uploads are spooled to disk and drained by a fixed worker pool
+        self._pending_uploads: dict[str, UploadJob] = {}  # execution_log_id -> job
+        self._upload_pool: Optional[UploadWorkerPool] = None
+        self._log_shipper: Optional[LogShipper] = None
         self.log_uploader: Optional[LogUploader] = None
         if hasattr(config, 'log_upload') and config.log_upload and config.log_upload.enabled:
             upload_config = LogUploadConfig(
                 enabled=config.log_upload.enabled,
                 endpoint=config.log_upload.endpoint,
-                max_file_size_mb=getattr(config.log_upload, 'max_file_size_mb', 10),
+                max_file_size_mb=getattr(config.log_upload, 'max_file_size_mb', 100),
                 retry_count=getattr(config.log_upload, 'retry_count', 3),
-                retry_delay_seconds=getattr(config.log_upload, 'retry_delay_seconds', 1.0)
+                retry_delay_seconds=getattr(config.log_upload, 'retry_delay_seconds', 1.0),
+                chunk_size_kb=getattr(config.log_upload, 'chunk_size_kb', 4096),
+                compression=getattr(config.log_upload, 'compression', 'deflate'),
+                workers=getattr(config.log_upload, 'workers', 2),
+                max_attempts=getattr(config.log_upload, 'max_attempts', 5),
+                backoff_base_seconds=getattr(config.log_upload, 'backoff_base_seconds', 5.0),
+                backoff_max_seconds=getattr(config.log_upload, 'backoff_max_seconds', 300.0),
+                drain_timeout_seconds=getattr(config.log_upload, 'drain_timeout_seconds', 10.0),
+                spool_directory=getattr(config.log_upload, 'spool_directory', None),
+                live_enabled=getattr(config.log_upload, 'live_enabled', True),
+                live_flush_interval_seconds=getattr(config.log_upload, 'live_flush_interval_seconds', 5.0),
+                live_batch_kb=getattr(config.log_upload, 'live_batch_kb', 1024)
+            )
+            self.log_uploader = LogUploader(
+                upload_config,
+                config.coordinator_token or "",
+                http_session=self._http_session
             )
-            self.log_uploader = LogUploader(upload_config, config.coordinator_token or "")
+            self._upload_pool = UploadWorkerPool(
+                self._run_upload_job,
+                workers=upload_config.workers,
+                max_attempts=upload_config.max_attempts,
+                backoff_base=upload_config.backoff_base_seconds,
+                backoff_max=upload_config.backoff_max_seconds
+            )
+            self._pending_uploads = self._upload_pool.pending
+            if upload_config.live_enabled:
+                self._log_shipper = LogShipper(self.log_uploader)
             logger.info("LogUploader initialized with endpoint: %s", upload_config.endpoint)
 
+        # Retention of the instance logs (closed logs are tracked, pruned in the background)
+        self._log_retention: Optional[LogRetention] = None
+        if config.log_retention.enabled:
+            self._log_retention = LogRetention(config.log_retention)
+
         # Error protection: Cooldown manager and quota detector
         # Reference: docs/design/SPAWN_ERROR_PROTECTION.md
         self._cooldown_manager: Optional[CooldownManager] = None
         self._quota_detector: Optional[QuotaErrorDetector] = None
+        # Providers with their own rule set (error_protection.quota_rules)
+        self._provider_quota_detectors: dict[str, QuotaErrorDetector] = {}
         if config.error_protection.enabled:
             self._cooldown_manager = CooldownManager(
                 default_seconds=config.error_protection.default_cooldown_seconds,
@@ -122,6 +257,12 @@ class Coordinator:
                     max_seconds=config.error_protection.max_cooldown_seconds,
                     margin_percent=config.error_protection.quota_margin_percent
                 )
+                for provider, rules in config.error_protection.quota_rules.items():
+                    self._provider_quota_detectors[provider] = QuotaErrorDetector(
+                        max_seconds=config.error_protection.max_cooldown_seconds,
+                        margin_percent=config.error_protection.quota_margin_percent,
+                        rules=rules
+                    )
             logger.info(
                 "Error protection enabled: cooldown=%ds (max %ds), quota_detection=%s",
                 config.error_protection.default_cooldown_seconds,
@@ -129,6 +270,24 @@ class Coordinator:
                 "enabled" if self._quota_detector else "disabled"
             )
 
+        # Extracted skill archives shared by all agents (keyed by content hash)
+        self._skill_cache = SkillCache(get_data_directory() / "skill_cache")
+        # Local MCP proxy for Agent Instances (see mcp_proxy.py), started in start()
+        self._mcp_proxy: Optional[MCPProxy] = None
+        # Optional spawner helper process (see spawner.py), started in start()
+        self._spawner: Optional[SpawnerClient] = None
+        # Optional pipe-based output collection (see log_collector.py), started in start()
+        self._log_collector: Optional[LogCollector] = None
+        # Blocking spawn stages (context writes, Popen) run off the event loop
+        self._spawn_executor = SpawnExecutor(config.spawn_workers)
+        # Context files are only rewritten when their content changes
+        self._context_writer = ContextWriter()
+        # Agent profiles reused across spawns (invalidated by profile_changed events)
+        self._profile_cache = ProfileCache(
+            self.mcp_client.get_subordinate_profile,
+            ttl=config.profile_cache_ttl
+        )
+
         # Cache for app settings (fetched from MCP server)
         self._app_settings_cache: Optional[AppSettingsResult] = None
 
@@ -169,16 +328,19 @@ class Coordinator:
         Returns:
             Path to log directory
         """
-        if working_dir:
-            # プロジェクトのワーキングディレクトリ基準
-            log_dir = Path(working_dir) / ".aiagent" / "logs" / agent_id
-        else:
-            # フォールバック: プラットフォーム固有のデータディレクトリ
-            log_dir = get_data_directory() / "agent_logs" / agent_id
-
+        log_dir = self._log_directory_path(working_dir, agent_id)
         log_dir.mkdir(parents=True, exist_ok=True)
         return log_dir
 
+    @staticmethod
+    def _log_directory_path(working_dir: Optional[str], agent_id: str) -> Path:
+        """Log directory of an agent (not created)."""
+        if working_dir:
+            # プロジェクトのワーキングディレクトリ基準
+            return Path(working_dir) / ".aiagent" / "logs" / agent_id
+        # フォールバック: プラットフォーム固有のデータディレクトリ
+        return get_data_directory() / "agent_logs" / agent_id
+
     async def start(self) -> None:
         """Start the Coordinator loop.
 
@@ -196,27 +358,149 @@ class Coordinator:
 
         self._running = True
         self._shutdown_event = asyncio.Event()
+        try:
+            self._skill_cache.prune(SKILL_CACHE_MAX_AGE_SECONDS)
+        except OSError as e:
+            logger.debug(f"Skill cache prune failed: {e}")
+        self._wake_event = asyncio.Event()
+        self._exit_event = asyncio.Event()
+        self._polling = AdaptivePollingScheduler(
+            self.config.polling_interval, self.config.adaptive_polling
+        )
+        if self.config.adaptive_polling.enabled:
+            logger.info(
+                f"Adaptive polling: {self.config.adaptive_polling.min_interval}s - "
+                f"{self.config.adaptive_polling.max_interval}s"
+            )
+        if self._exit_watcher.supported:
+            logger.info("Watching instance exits via pidfd")
+        if self.config.use_spawner:
+            self._start_spawner()
+        if self.config.log_collector.enabled:
+            self._start_log_collector()
+        if self.config.mcp_proxy.enabled:
+            await self._start_mcp_proxy()
+        if self._upload_pool:
+            # Resume uploads left over by the previous run
+            self._upload_pool.start(UploadSpool(self._upload_spool_directory()))
+        self._reaper_task = asyncio.create_task(self._reap_loop())
+        if self._quota_detector and self.config.error_protection.early_quota_abort:
+            self._quota_watch_task = asyncio.create_task(self._quota_watch_loop())
+        if self._log_shipper:
+            self._log_ship_task = asyncio.create_task(self._log_ship_loop())
+        if self._log_retention:
+            self._log_retention_task = asyncio.create_task(self._log_retention_loop())
+        if self._event_subscriber:
+            logger.info(f"Subscribing to server events: {self._event_subscriber.endpoint}")
+            self._event_task = asyncio.create_task(self._event_subscriber.run())
 
         while self._running:
+            self._last_tick_started_at = datetime.now()
+            tick_started = time.monotonic()
             try:
                 await self._run_once()
             except MCPError as e:
                 logger.error(f"MCP error: {e}")
             except Exception as e:
                 logger.exception(f"Unexpected error: {e}")
+            self._ticks += 1
+            self._last_tick_duration = time.monotonic() - tick_started
 
             if self._running:
-                # Use wait_for with timeout to allow interruption via shutdown_event
+                self._polling.record_tick(self._tick_activity)
+                self._tick_activity = False
+                delay = self._polling.next_delay()
+                if self._event_subscriber and self._event_subscriber.connected:
+                    # Events wake the loop; only the safety poll is scheduled
+                    delay = max(self._safety_poll_remaining(), 0)
+                logger.debug(f"Next tick in {delay:.1f}s")
+
+                # Sleep until the polling interval elapses, an instance exits
+                # (freeing a slot) or stop() is called
                 try:
                     await asyncio.wait_for(
-                        self._shutdown_event.wait(),
-                        timeout=self.config.polling_interval
+                        self._wake_event.wait(),
+                        timeout=delay
                     )
-                    # Event was set, exit loop
-                    break
                 except asyncio.TimeoutError:
                     # Normal timeout, continue polling
                     pass
+                if self._shutdown_event.is_set():
+                    break
+                self._wake_event.clear()
+
+    def wake(self) -> None:
+        """Run the next tick now instead of waiting for the polling interval.
+
+        In server-push mode the tick is a full one, so every pair is evaluated.
+        """
+        self._tick_activity = True
+        self._full_tick_needed = True
+        if self._wake_event:
+            self._wake_event.set()
+
+    def drain(self) -> None:
+        """Stop spawning new instances; running ones are left to finish."""
+        if not self._draining:
+            logger.info("Draining: no new instances will be started")
+        self._draining = True
+
+    def resume(self) -> None:
+        """Resume spawning after drain()."""
+        if self._draining:
+            logger.info("Resuming: new instances may be started")
+        self._draining = False
+        self.wake()
+
+    def status(self) -> dict:
+        """Snapshot of the Coordinator state as JSON-serializable data."""
+        instances = [
+            {
+                "agent_id": key.agent_id,
+                "project_id": key.project_id,
+                "pid": info.process.pid,
+                "provider": info.provider,
+                "model": info.model,
+                "task_id": info.task_id,
+                "started_at": info.started_at.isoformat(),
+                "stopping": info.stopping,
+            }
+            for key, info_list in self._instances.items()
+            for info in info_list
+        ]
+        cooldowns = []
+        if self._cooldown_manager:
+            for key, entry in self._cooldown_manager.get_all().items():
+                cooldowns.append({
+                    "agent_id": key.agent_id,
+                    "project_id": key.project_id,
+                    "reason": entry.reason,
+                    "until": entry.until.isoformat(),
+                    "consecutive_errors": entry.consecutive_errors,
+                    "rule": entry.rule,
+                    "offset": entry.offset,
+                })
+        polling = None
+        if self._polling:
+            stats = self._polling.stats
+            polling = {"interval": stats.interval, "last_delay": stats.last_delay,
+                       "idle_streak": stats.idle_streak}
+        return {
+            "running": self._running,
+            "draining": self._draining,
+            "max_concurrent": self.config.max_concurrent,
+            "instances": instances,
+            "cooldowns": cooldowns,
+            "pending_exit_reports": len(self._pending_exit_reports),
+            "ticks": self._ticks,
+            "last_tick_started_at": (
+                self._last_tick_started_at.isoformat() if self._last_tick_started_at else None
+            ),
+            "last_tick_duration": self._last_tick_duration,
+            "polling": polling,
+            "spawn_stages": self._spawn_executor.timings(),
+            "mcp_proxy": self._mcp_proxy.stats() if self._mcp_proxy else None,
+        }
 
     async def stop(self) -> None:
         """Stop the Coordinator loop and clean up sessions."""
@@ -226,22 +510,65 @@ class Coordinator:
         # Set shutdown event to interrupt sleep
         if self._shutdown_event:
             self._shutdown_event.set()
-
-        # Terminate all running instances and report process exit
-        for key, info_list in list(self._instances.items()):
-            for info in info_list:
-                logger.info(f"Terminating {key.agent_id}/{key.project_id}")
-                try:
-                    info.process.terminate()
-                    # Wait for process to finish
-                    try:
-                        info.process.wait(timeout=5)
-                    except subprocess.TimeoutExpired:
-                        logger.warning(f"Instance {key.agent_id}/{key.project_id} did not terminate, killing")
-                        info.process.kill()
-                except Exception as e:
-                    logger.warning(f"Failed to terminate {key}: {e}")
-
+        if self._wake_event:
+            self._wake_event.set()
+        if self._reaper_task:
+            self._reaper_task.cancel()
+            try:
+                await self._reaper_task
+            except asyncio.CancelledError:
+                pass
+            self._reaper_task = None
+        if self._quota_watch_task:
+            self._quota_watch_task.cancel()
+            try:
+                await self._quota_watch_task
+            except asyncio.CancelledError:
+                pass
+            self._quota_watch_task = None
+        if self._log_ship_task:
+            # Whatever was not shipped yet goes with the exit upload
+            self._log_ship_task.cancel()
+            try:
+                await self._log_ship_task
+            except asyncio.CancelledError:
+                pass
+            self._log_ship_task = None
+        if self._log_retention_task:
+            self._log_retention_task.cancel()
+            try:
+                await self._log_retention_task
+            except asyncio.CancelledError:
+                pass
+            self._log_retention_task = None
+        if self._quota_aborts:
+            # Let instances already being aborted finish terminating and get reported
+            await asyncio.gather(*self._quota_aborts, return_exceptions=True)
+        if self._spawn_tasks:
+            # Processes being spawned are registered before everything is terminated
+            await asyncio.gather(*self._spawn_tasks, return_exceptions=True)
+        if self._event_task:
+            self._event_task.cancel()
+            try:
+                await self._event_task
+            except asyncio.CancelledError:
+                pass
+            self._event_task = None
+
+        # Send reports still queued from before shutdown
+        self._reap()
+        await self._flush_exit_reports()
+
+        # Terminate all running instances at once and report process exit
+        all_infos = [info for info_list in self._instances.values() for info in info_list]
+        if all_infos:
+            logger.info(f"Terminating {len(all_infos)} instance(s)")
+            await self._terminate_instances(all_infos)
+            for info in all_infos:
+                # Spools their logs, so they are uploaded now or on the next start
+                self._release_instance_resources(info)
+
+        for key in list(self._instances):
             # Report process exit with remaining_processes=0 (all terminated)
             try:
                 success = await self.mcp_client.report_process_exit(
@@ -256,21 +583,159 @@ class Coordinator:
             except MCPError as e:
                 logger.error(f"Error reporting process exit for {key.agent_id}/{key.project_id}: {e}")
 
+        self._exit_watcher.close()
+        self._spawn_executor.shutdown()
+        if self._spawner:
+            self._spawner.close()
+            self._spawner = None
+        if self._log_collector:
+            self._log_collector.close_all()
+            self._log_collector = None
+        if self._mcp_proxy:
+            await self._mcp_proxy.close()
+            self._mcp_proxy = None
+
+        # Drain log uploads (they need the MCP client for the local path fallback)
+        if self._upload_pool:
+            await self._upload_pool.close(self.log_uploader.config.drain_timeout_seconds)
+
+        # Close persistent MCP connections and the shared HTTP session
+        await self.mcp_client.close()
+        if self._http_session:
+            await self._http_session.close()
+
     async def _run_once(self) -> None:
         """Run one iteration of the polling loop."""
+        # Server-push mode: between safety polls only the pairs named by events
+        # are evaluated, against the project list of the last full tick
+        event_pairs = self._take_event_pairs()
+        if event_pairs is None:
+            # Steps 1-2: Health check and project list (full tick)
+            projects = await self._fetch_projects()
+            if projects is None:
+                return
+        else:
+            projects = self._projects_cache
+
+        # Step 3: Report instances reaped since the last tick, including those
+        # reaped by _reap_loop while the server was unreachable. Event ticks
+        # without pairs (instance exits) only do this.
+        self._reap()
+        await self._flush_exit_reports()
+
+        if event_pairs is not None:
+            if not event_pairs:
+                return
+            logger.debug(f"Event tick for {len(event_pairs)} pair(s)")
+
+        # Draining: let running instances finish, but start nothing new.
+        # Pairs are not evaluated at all so the server never marks a spawn
+        # as started for a start we would ignore.
+        if self._draining:
+            logger.debug("Draining, skipping agent action evaluation")
+            if event_pairs:
+                self._keep_event_pairs(event_pairs)
+            return
+
+        # Step 3.5: Get app settings (cached)
+        app_settings = await self._get_app_settings()
+        base_prompt = app_settings.agent_base_prompt if app_settings else None
+
+        # Step 4: Collect (agent_id, project_id) pairs we can act on
+        candidates: list[tuple[AgentInstanceKey, str, str]] = []  # (key, passkey, working_dir)
+        for project in projects:
+            logger.debug(f"Processing project {project.project_id}, agents: {project.agents}")
+
+            for agent_id in project.agents:
+                if event_pairs is not None:
+                    key = AgentInstanceKey(agent_id, project.project_id)
+                    if key not in event_pairs:
+                        continue
+                    event_pairs.discard(key)
+                # Skip if we don't have passkey configured
+                passkey = self.config.get_agent_passkey(agent_id)
+                logger.debug(f"Passkey for {agent_id}: {'configured' if passkey else 'NOT FOUND'}")
+                if not passkey:
+                    logger.debug(f"No passkey configured for {agent_id}, skipping")
+                    continue
+                candidates.append((
+                    AgentInstanceKey(agent_id, project.project_id),
+                    passkey,
+                    project.working_directory
+                ))
+
+        if event_pairs:
+            # Pairs unknown to the cached project list: topology changed
+            logger.debug(f"Unknown pairs in events, scheduling full tick: {event_pairs}")
+            self._request_full_tick()
+
+        if not candidates:
+            return
+
+        # Skip if at max concurrent
+        free_slots = self.config.max_concurrent - self._running_count() - self._reserved_slots
+        if free_slots <= 0:
+            # Capacity-blocked ticks count as idle: a freed slot wakes the
+            # loop through _reap, so there is no need to poll tightly here
+            logger.debug(f"At max concurrent ({self.config.max_concurrent}), skipping")
+            self._keep_event_pairs(key for key, _, _ in candidates)
+            return
+
+        # Step 5: Resolve every pair's action in one round trip
+        # MCPServer manages spawn deduplication via spawn_started_at, so we never
+        # ask for more "start" actions than we have free slots
+        pairs = [(key.agent_id, key.project_id) for key, _, _ in candidates]
+        logger.debug(f"Calling get_agent_actions for {len(pairs)} pairs (free slots: {free_slots})")
+        try:
+            results = await self.mcp_client.get_agent_actions(
+                pairs,
+                max_starts=free_slots,
+                concurrency=self.config.decision_concurrency
+            )
+        except MCPError:
+            self._keep_event_pairs(key for key, _, _ in candidates)
+            raise
+
+        # Step 6: Act on the results concurrently, so one slow context preparation
+        # does not hold up the other pairs
+        semaphore = asyncio.Semaphore(self.config.decision_concurrency)
+
+        async def apply(key, passkey, working_dir, result) -> None:
+            async with semaphore:
+                try:
+                    await self._apply_agent_action(key, passkey, working_dir, result, base_prompt)
+                except Exception as e:
+                    logger.exception(f"Failed to apply action for {key.agent_id}/{key.project_id}: {e}")
+
+        tasks = []
+        for (key, passkey, working_dir), result in zip(candidates, results):
+            if result is None:
+                # Not evaluated: no start slots left. In server-push mode the
+                # event is not repeated, so keep the pair for the next tick.
+                self._keep_event_pairs([key])
+                continue
+            if isinstance(result, MCPError):
+                logger.error(f"Failed to get_agent_action for {key.agent_id}/{key.project_id}: {result}")
+                continue
+            tasks.append(apply(key, passkey, working_dir, result))
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def _fetch_projects(self) -> Optional[list[ProjectWithAgents]]:
+        """Check server health and get active projects with their agents.
+
+        Returns:
+            Project list, or None if the server is unavailable
+        """
         # Step 1: Health check
         try:
             health = await self.mcp_client.health_check()
             if health.status != "ok":
                 logger.warning(f"MCP server unhealthy: {health.status}")
-                return
+                return None
         except MCPError as e:
             logger.error(f"MCP server not available: {e}")
-            return
-
-        # Step 1.5: Get app settings (cached)
-        app_settings = await self._get_app_settings()
-        base_prompt = app_settings.agent_base_prompt if app_settings else None
+            return None
 
         # Step 2: Get active projects with agents
         # Multi-device: Pass root_agent_id for working directory resolution
@@ -280,7 +745,7 @@ class Coordinator:
             )
         except MCPError as e:
             logger.error(f"Failed to get project list: {e}")
-            return
+            return None
 
         logger.debug(f"Found {len(projects)} active projects")
 
@@ -291,157 +756,505 @@ class Coordinator:
                 f"working_dir={project.working_directory}"
             )
 
-        # Step 3: Clean up finished processes, register log file paths, and invalidate sessions
-        finished_instances = self._cleanup_finished()
-        for key, info, exit_code in finished_instances:
-            # Register log file path (if available)
-            if info.task_id and info.log_file_path:
-                try:
-                    success = await self.mcp_client.register_execution_log_file(
-                        agent_id=key.agent_id,
+        self._projects_cache = projects
+        self._full_tick_needed = False
+        self._last_full_tick = time.monotonic()
+        return projects
+
+    def _take_event_pairs(self) -> Optional[set[AgentInstanceKey]]:
+        """Decide between a full tick and an event tick.
+
+        Returns:
+            None for a full tick (no subscription, stream down, topology
+            changed or safety poll due); otherwise the pairs named by events
+            since the last tick (cleared)
+        """
+        subscriber = self._event_subscriber
+        if (subscriber is None or not subscriber.connected or self._full_tick_needed
+                or self._safety_poll_remaining() <= 0):
+            self._event_pairs.clear()
+            return None
+        pairs, self._event_pairs = self._event_pairs, set()
+        return pairs
+
+    def _keep_event_pairs(self, keys: Iterable[AgentInstanceKey]) -> None:
+        """Keep pairs that could not be evaluated for the next tick.
+
+        In server-push mode an event is not repeated, so pairs skipped for
+        lack of slots (or while draining) would otherwise wait for the next
+        safety poll. Freed slots wake the loop through _reap().
+        """
+        if self._event_subscriber:
+            self._event_pairs.update(keys)
+
+    def _safety_poll_remaining(self) -> float:
+        """Seconds until the next full tick is due in server-push mode."""
+        elapsed = time.monotonic() - self._last_full_tick
+        return self.config.events.safety_poll_interval - elapsed
+
+    def _request_full_tick(self) -> None:
+        """Make the next tick a full one and run it now."""
+        self._full_tick_needed = True
+        if self._wake_event:
+            self._wake_event.set()
+
+    def _on_server_event(self, event: CoordinatorEvent) -> None:
+        """Handle an event pushed by the server."""
+        logger.debug(f"Server event: {event}")
+        if event.type == EVENT_PAIR_WORK and event.agent_id and event.project_id:
+            self._event_pairs.add(AgentInstanceKey(event.agent_id, event.project_id))
+            if self._wake_event:
+                self._wake_event.set()
+        elif event.type == EVENT_PROFILE_CHANGED:
+            self._profile_cache.invalidate(event.agent_id)
+        elif event.type in (EVENT_PAIR_WORK, EVENT_TOPOLOGY_CHANGED):
+            if event.type == EVENT_TOPOLOGY_CHANGED:
+                self._profile_cache.invalidate()
+            self._request_full_tick()
+        else:
+            logger.debug(f"Ignoring unknown server event type: {event.type}")
+
+    def _on_event_stream_state(self, connected: bool) -> None:
+        """Catch up with a full tick whenever the event stream (re)connects or drops."""
+        logger.info(f"Event stream {'connected' if connected else 'disconnected'}")
+        self._request_full_tick()
+
+    def _reap(self) -> int:
+        """Reap finished instances and queue their server reports.
+
+        Local cleanup (file handles, temp files, cooldowns, log upload) happens
+        in _cleanup_finished right away; only the MCP reports wait in
+        _pending_exit_reports until the server is reachable. Wakes the polling
+        loop when a slot was freed.
+
+        Returns:
+            Number of instances reaped
+        """
+        finished = self._cleanup_finished()
+        self._pending_exit_reports.extend(finished)
+        if finished:
+            self._tick_activity = True
+        if finished and self._wake_event:
+            self._wake_event.set()
+        return len(finished)
+
+    async def _reap_loop(self) -> None:
+        """Reap finished instances independently of the MCP server's health.
+
+        Runs alongside the polling loop so a server outage never leaves
+        zombies, open log handles, temp files or missing cooldowns behind.
+        Wakes on pidfd exit notifications, otherwise every reap_interval.
+        """
+        while self._running:
+            try:
+                self._reap()
+            except Exception as e:
+                logger.exception(f"Error reaping instances: {e}")
+            try:
+                await asyncio.wait_for(
+                    self._exit_event.wait(),
+                    timeout=self.config.reap_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._exit_event.clear()
+
+    async def _quota_watch_loop(self) -> None:
+        """Terminate running instances as soon as their log shows a quota error.
+
+        Without this an instance that hit RateLimitError or TerminalQuotaError
+        keeps its slot until the CLI gives up. Each running instance's log is
+        tailed from the last offset (off the event loop) and the new text is
+        fed to a StreamingQuotaDetector.
+        """
+        interval = self.config.error_protection.quota_watch_interval
+        while self._running:
+            await asyncio.sleep(interval)
+            try:
+                await self._check_quota_logs()
+            except Exception as e:
+                logger.exception(f"Error checking instance logs for quota errors: {e}")
+
+    async def _check_quota_logs(self) -> int:
+        """Scan running instances' logs once and abort those that hit a quota error.
+
+        Returns:
+            Number of instances aborted
+        """
+        # Collected output is fed to the detector as it arrives (_on_instance_output);
+        # a verdict still waiting for the lines after the error is settled here
+        # once no more output came
+        aborted = 0
+        for info in [info for info_list in self._instances.values() for info in info_list]:
+            if info.stopping or info.log_sink is None or info.quota_stream is None:
+                continue
+            if info.quota_stream.pending:
+                self._on_instance_output(info, "")
+                if info.stopping:
+                    aborted += 1
+
+        infos = [
+            info
+            for info_list in self._instances.values()
+            for info in info_list
+            if not info.stopping and info.log_file_path and info.log_sink is None
+        ]
+        if not infos:
+            return aborted
+        loop = asyncio.get_running_loop()
+        hits = await loop.run_in_executor(None, self._scan_quota_logs, infos)
+
+        for info, detection in hits:
+            # Exited meanwhile (the reaper sets the cooldown) or already being stopped
+            if info.stopping or info not in self._instances.get(info.key, []):
+                continue
+            if info.process.poll() is not None:
+                continue
+            self._abort_for_quota(info, detection)
+            aborted += 1
+        return aborted
+
+    def _scan_quota_logs(
+        self, infos: list[AgentInstanceInfo]
+    ) -> list[tuple[AgentInstanceInfo, QuotaDetection]]:
+        """Feed the text appended to each log to its detector (runs in a worker thread)."""
+        hits: list[tuple[AgentInstanceInfo, QuotaDetection]] = []
+        for info in infos:
+            if info.log_follower is None:
+                info.log_follower = LogFollower(info.log_file_path)
+                info.quota_stream = StreamingQuotaDetector(self._quota_detector_for(info.provider))
+            if info.quota_stream.detected:
+                continue
+            info.quota_stream.feed(info.log_follower.read_new())
+            if info.quota_stream.detection is not None:
+                hits.append((info, info.quota_stream.detection))
+        return hits
+
+    def _on_instance_output(self, info: AgentInstanceInfo, text: str, offset: Optional[int] = None) -> None:
+        """Feed collected output to the quota detector; abort the instance on a hit.
+
+        Args:
+            info: Instance that wrote the output
+            text: Complete output lines ("" settles a pending verdict)
+            offset: Position of text in the log file (None if not known yet)
+        """
+        stream = info.quota_stream
+        if stream is None or stream.detected:
+            return
+        if text:
+            stream.seek(offset)
+        stream.feed(text)
+        if stream.detection is None:
+            return
+        if info.stopping or info not in self._instances.get(info.key, []):
+            return
+        if info.process.poll() is not None:
+            return  # Exited meanwhile: the reaper sets the cooldown
+        self._abort_for_quota(info, stream.detection)
+
+    async def _log_ship_loop(self) -> None:
+        """Send the logs of running instances to the server while they run."""
+        interval = self.log_uploader.config.live_flush_interval_seconds
+        while self._running:
+            await asyncio.sleep(interval)
+            try:
+                await self._ship_running_logs()
+            except Exception as e:
+                logger.exception(f"Error shipping running instance logs: {e}")
+
+    async def _ship_running_logs(self) -> int:
+        """Flush the new lines of every running instance's log once.
+
+        Returns:
+            Number of bytes the server acknowledged
+        """
+        states = []
+        for info_list in self._instances.values():
+            for info in info_list:
+                if info.stopping or not info.log_file_path or not info.task_id:
+                    continue
+                if info.log_ship is None:
+                    info.log_ship = LogShipState(
+                        log_file_path=info.log_file_path,
+                        agent_id=info.key.agent_id,
                         task_id=info.task_id,
-                        log_file_path=info.log_file_path
-                    )
-                    if success:
-                        logger.info(
-                            f"Registered log file for {key.agent_id}/{key.project_id}: "
-                            f"{info.log_file_path}"
-                        )
-                    else:
-                        logger.warning(
-                            f"Failed to register log file for {key.agent_id}/{key.project_id}"
-                        )
-                except MCPError as e:
-                    logger.error(
-                        f"Error registering log file for {key.agent_id}/{key.project_id}: {e}"
+                        project_id=info.key.project_id,
+                        started_after=info.started_at.timestamp() - LIVE_SHIP_CLOCK_TOLERANCE_SECONDS,
+                        execution_log_id=info.execution_log_id
                     )
+                if not info.log_ship.stopped:
+                    states.append(info.log_ship)
+        if not states:
+            return 0
+        for state in states:
+            # Kept so the exit upload can wait for a chunk still in flight
+            state.flushing = asyncio.ensure_future(self._log_shipper.flush(state))
+        shipped = await asyncio.gather(*(state.flushing for state in states))
+        return sum(shipped)
+
+    def _abort_for_quota(self, info: AgentInstanceInfo, detection: QuotaDetection) -> None:
+        """Set the quota cooldown, free the slot and terminate the instance.
+
+        The instance leaves _instances right away, so the slot is reusable on
+        the next tick (the cooldown keeps the same pair from being restarted).
+        Termination, local cleanup and the exit report continue in a task.
+        """
+        key = info.key
+        logger.warning(
+            f"Quota error in running instance {key.agent_id}/{key.project_id} "
+            f"(PID: {info.process.pid}), terminating: cooldown {detection.seconds}s"
+        )
+        if self._cooldown_manager:
+            self._cooldown_manager.set_quota(
+                key=key,
+                cooldown_seconds=detection.seconds,
+                error_message=detection.line or "Quota error detected while running",
+                rule=detection.rule,
+                offset=detection.offset
+            )
 
-            # If process exited with error, report to chat
-            if exit_code != 0 and info.log_file_path:
-                error_msg = self._extract_error_from_log(info.log_file_path)
-                if error_msg:
-                    try:
-                        success = await self.mcp_client.report_agent_error(
-                            agent_id=key.agent_id,
-                            project_id=key.project_id,
-                            error_message=error_msg
-                        )
-                        if success:
-                            logger.info(
-                                f"Reported error for {key.agent_id}/{key.project_id}: {error_msg[:50]}..."
-                            )
-                        else:
-                            logger.warning(
-                                f"Failed to report error for {key.agent_id}/{key.project_id}"
-                            )
-                    except MCPError as e:
-                        logger.error(
-                            f"Error reporting error for {key.agent_id}/{key.project_id}: {e}"
-                        )
+        info.stopping = True
+        self._exit_watcher.unwatch(info.process.pid)
+        info_list = self._instances.get(key, [])
+        if info in info_list:
+            info_list.remove(info)
+        if not info_list and key in self._instances:
+            del self._instances[key]
+        self._tick_activity = True
+        if self._wake_event:
+            self._wake_event.set()
+
+        task = asyncio.create_task(self._finish_quota_abort(info))
+        self._quota_aborts.add(task)
+        task.add_done_callback(self._quota_aborts.discard)
+
+    async def _finish_quota_abort(self, info: AgentInstanceInfo) -> None:
+        """Terminate an aborted instance, release its resources and queue its exit report."""
+        await self._terminate_instances([info])
+        self._release_instance_resources(info)
+        retcode = info.process.poll()
+        self._pending_exit_reports.append((info.key, info, retcode if retcode is not None else -1))
+        self._tick_activity = True
+        if self._wake_event:
+            self._wake_event.set()
+
+    async def _flush_exit_reports(self) -> None:
+        """Send queued exit reports to the MCP server, oldest first.
+
+        A report leaves the queue only once its process exit was reported;
+        if that fails, it and the reports behind it wait for the next tick.
+        """
+        while self._pending_exit_reports:
+            key, info, exit_code = self._pending_exit_reports[0]
+            try:
+                await self._report_instance_exit(key, info, exit_code)
+            except MCPError as e:
+                logger.warning(
+                    f"Keeping {len(self._pending_exit_reports)} exit report(s) queued: {e}"
+                )
+                return
+            self._pending_exit_reports.popleft()
+            self._reported_exit_errors.discard(id(info))
+
+    async def _report_instance_exit(
+        self, key: AgentInstanceKey, info: AgentInstanceInfo, exit_code: int
+    ) -> None:
+        """Register the log file, report errors and report the exit of one instance.
 
-            # Report process exit with remaining process count
-            # _cleanup_finished removes finished processes from _instances before returning,
-            # so _instances.get(key, []) contains only surviving processes
-            remaining = len(self._instances.get(key, []))
+        Raises:
+            MCPError: If the process exit could not be reported (the report is retried)
+        """
+        # Register log file path (if available)
+        if info.task_id and info.log_file_path:
             try:
-                success = await self.mcp_client.report_process_exit(
+                success = await self.mcp_client.register_execution_log_file(
                     agent_id=key.agent_id,
-                    project_id=key.project_id,
-                    remaining_processes=remaining
+                    task_id=info.task_id,
+                    log_file_path=info.log_file_path
                 )
                 if success:
                     logger.info(
-                        f"Reported process exit for {key.agent_id}/{key.project_id} "
-                        f"(remaining={remaining})"
+                        f"Registered log file for {key.agent_id}/{key.project_id}: "
+                        f"{info.log_file_path}"
                     )
                 else:
                     logger.warning(
-                        f"Failed to report process exit for {key.agent_id}/{key.project_id}"
+                        f"Failed to register log file for {key.agent_id}/{key.project_id}"
                     )
             except MCPError as e:
                 logger.error(
-                    f"Error reporting process exit for {key.agent_id}/{key.project_id}: {e}"
+                    f"Error registering log file for {key.agent_id}/{key.project_id}: {e}"
                 )
 
-        # Step 4: For each (agent_id, project_id), check if should start
-        for project in projects:
-            project_id = project.project_id
-            working_dir = project.working_directory
+        # If process exited with error, report to chat
+        if exit_code != 0 and info.log_file_path and id(info) not in self._reported_exit_errors:
+            analysis = self._analyze_log(info)
+            error_msg = analysis.error_message if analysis else None
+            if error_msg:
+                try:
+                    success = await self.mcp_client.report_agent_error(
+                        agent_id=key.agent_id,
+                        project_id=key.project_id,
+                        error_message=error_msg
+                    )
+                    if success:
+                        # Not repeated if the exit report below has to be retried
+                        self._reported_exit_errors.add(id(info))
+                        logger.info(
+                            f"Reported error for {key.agent_id}/{key.project_id}: {error_msg[:50]}..."
+                        )
+                    else:
+                        logger.warning(
+                            f"Failed to report error for {key.agent_id}/{key.project_id}"
+                        )
+                except MCPError as e:
+                    logger.error(
+                        f"Error reporting error for {key.agent_id}/{key.project_id}: {e}"
+                    )
 
-            logger.debug(f"Processing project {project_id}, agents: {project.agents}")
+        # Report process exit with remaining process count
+        # _cleanup_finished removed finished processes from _instances,
+        # so _instances.get(key, []) contains only surviving processes
+        remaining = len(self._instances.get(key, []))
+        success = await self.mcp_client.report_process_exit(
+            agent_id=key.agent_id,
+            project_id=key.project_id,
+            remaining_processes=remaining
+        )
+        if success:
+            logger.info(
+                f"Reported process exit for {key.agent_id}/{key.project_id} "
+                f"(remaining={remaining})"
+            )
+        else:
+            logger.warning(
+                f"Failed to report process exit for {key.agent_id}/{key.project_id}"
+            )
 
-            for agent_id in project.agents:
-                key = AgentInstanceKey(agent_id, project_id)
-                logger.debug(f"Checking agent {agent_id} for project {project_id}")
+    def _running_count(self) -> int:
+        """Number of running Agent Instance processes."""
+        return sum(len(v) for v in self._instances.values())
 
-                # Skip if we don't have passkey configured
-                passkey = self.config.get_agent_passkey(agent_id)
-                logger.debug(f"Passkey for {agent_id}: {'configured' if passkey else 'NOT FOUND'}")
-                if not passkey:
-                    logger.debug(f"No passkey configured for {agent_id}, skipping")
-                    continue
+    def _reserve_slot(self) -> bool:
+        """Claim a concurrency slot for a start that is about to be prepared.
 
-                # Skip if at max concurrent
-                if sum(len(v) for v in self._instances.values()) >= self.config.max_concurrent:
-                    logger.debug(f"At max concurrent ({self.config.max_concurrent}), skipping")
-                    break
+        Check and increment happen without an await in between, so concurrent
+        decisions in the same tick can never claim more than max_concurrent
+        slots. Release with _release_slot() once the process is spawned (it is
+        then counted in _instances) or the start is abandoned.
 
-                # Check what action to take
-                # MCPServer manages spawn deduplication via spawn_started_at
-                # Coordinator simply follows MCPServer's instructions
-                logger.debug(f"Calling get_agent_action({agent_id}, {project_id})")
-                try:
-                    result = await self.mcp_client.get_agent_action(agent_id, project_id)
+        Returns:
+            True if a slot was reserved
+        """
+        if self._running_count() + self._reserved_slots >= self.config.max_concurrent:
+            return False
+        self._reserved_slots += 1
+        return True
+
+    def _release_slot(self) -> None:
+        """Release a slot claimed by _reserve_slot()."""
+        self._reserved_slots -= 1
+
+    async def _apply_agent_action(
+        self,
+        key: AgentInstanceKey,
+        passkey: str,
+        working_dir: str,
+        result: AgentActionResult,
+        base_prompt: Optional[str]
+    ) -> None:
+        """Act on the get_agent_action result for one (agent_id, project_id) pair.
+
+        Coordinator simply follows MCPServer's instructions.
+
+        Args:
+            key: Agent/project pair
+            passkey: Agent passkey
+            working_dir: Project working directory
+            result: Action returned by the server
+            base_prompt: Agent base prompt from app settings
+        """
+        agent_id, project_id = key.agent_id, key.project_id
+        logger.debug(
+            f"get_agent_action result for {agent_id}/{project_id}: action={result.action}, "
+            f"reason={result.reason}, provider: {result.provider}, model: {result.model}, "
+            f"kick_command: {result.kick_command}, task_id: {result.task_id}"
+        )
+
+        if result.action in ("start", "stop"):
+            self._tick_activity = True
+
+        if result.action == "stop":
+            # UC008: Stop running instance
+            if self._instances.get(key):
+                logger.info(f"Stopping instance {agent_id}/{project_id} due to {result.reason}")
+                await self._stop_instance(key)
+        elif result.action == "start":
+            # Error protection: Check cooldown before spawning
+            # Reference: docs/design/SPAWN_ERROR_PROTECTION.md
+            if self._cooldown_manager:
+                cooldown_entry = self._cooldown_manager.check(key)
+                if cooldown_entry:
+                    remaining = self._cooldown_manager.get_remaining_seconds(key)
                     logger.debug(
-                        f"get_agent_action result: action={result.action}, reason={result.reason}, "
-                        f"provider: {result.provider}, model: {result.model}, "
-                        f"kick_command: {result.kick_command}, task_id: {result.task_id}"
+                        f"Skipping {agent_id}/{project_id}: in cooldown "
+                        f"({cooldown_entry.reason}, {remaining:.0f}s remaining)"
                     )
+                    return
 
-                    if result.action == "stop":
-                        # UC008: Stop running instance
-                        if self._instances.get(key):
-                            logger.info(f"Stopping instance {agent_id}/{project_id} due to {result.reason}")
-                            await self._stop_instance(key)
-                    elif result.action == "start":
-                        # Error protection: Check cooldown before spawning
-                        # Reference: docs/design/SPAWN_ERROR_PROTECTION.md
-                        if self._cooldown_manager:
-                            cooldown_entry = self._cooldown_manager.check(key)
-                            if cooldown_entry:
-                                remaining = self._cooldown_manager.get_remaining_seconds(key)
-                                logger.debug(
-                                    f"Skipping {agent_id}/{project_id}: in cooldown "
-                                    f"({cooldown_entry.reason}, {remaining:.0f}s remaining)"
-                                )
-                                continue
+            # Capacity may have been claimed by another pair in this tick
+            if not self._reserve_slot():
+                logger.info(
+                    f"Cannot start {agent_id}/{project_id}: at max concurrent "
+                    f"({self.config.max_concurrent})"
+                )
+                return
 
-                        provider = result.provider or "claude"
+            try:
+                provider = result.provider or "claude"
+
+                # Prepare agent context directory
+                # Reference: docs/design/AGENT_CONTEXT_DIRECTORY.md
+                context_dir = await self._prepare_agent_context(
+                    agent_id=agent_id,
+                    working_dir=working_dir,
+                    provider=provider,
+                    project_id=project_id
+                )
 
-                        # Prepare agent context directory
-                        # Reference: docs/design/AGENT_CONTEXT_DIRECTORY.md
-                        context_dir = await self._prepare_agent_context(
-                            agent_id=agent_id,
-                            working_dir=working_dir,
-                            provider=provider
-                        )
+                task = asyncio.create_task(self._spawn_and_register(
+                    agent_id=agent_id,
+                    project_id=project_id,
+                    passkey=passkey,
+                    working_dir=working_dir,
+                    context_dir=context_dir,
+                    provider=provider,
+                    model=result.model,
+                    kick_command=result.kick_command,
+                    task_id=result.task_id,
+                    base_prompt=base_prompt
+                ))
+                self._spawn_tasks.add(task)
+                task.add_done_callback(self._spawn_tasks.discard)
+                # Shielded: cancelling the tick must not orphan the process
+                await asyncio.shield(task)
+            finally:
+                self._release_slot()
+        else:
+            logger.debug(f"get_agent_action returned action='{result.action}' (reason: {result.reason}) for {agent_id}/{project_id}")
 
-                        self._spawn_instance(
-                            agent_id=agent_id,
-                            project_id=project_id,
-                            passkey=passkey,
-                            working_dir=working_dir,
-                            context_dir=context_dir,
-                            provider=provider,
-                            model=result.model,
-                            kick_command=result.kick_command,
-                            task_id=result.task_id,
-                            base_prompt=base_prompt
-                        )
-                    else:
-                        logger.debug(f"get_agent_action returned action='{result.action}' (reason: {result.reason}) for {agent_id}/{project_id}")
-                except MCPError as e:
-                    logger.error(f"Failed to get_agent_action for {agent_id}/{project_id}: {e}")
+    async def _spawn_and_register(self, **kwargs) -> AgentInstanceInfo:
+        """Spawn an instance on the spawn executor and register it on the loop.
+
+        Args:
+            **kwargs: Arguments for _spawn_instance
+
+        Returns:
+            The registered instance
+        """
+        info = await self._spawn_executor.run(STAGE_SPAWN, self._spawn_instance, **kwargs)
+        self._register_instance(info)
+        return info
 
     async def _stop_instance(self, key: AgentInstanceKey) -> None:
         """Stop a running Agent Instance.
@@ -456,40 +1269,86 @@ class Coordinator:
             logger.warning(f"Instance {key.agent_id}/{key.project_id} not found in _instances")
             return
 
-        info = info_list[0]
+        info = next((i for i in info_list if not i.stopping), None)
+        if info is None:
+            logger.debug(f"Instance {key.agent_id}/{key.project_id} is already stopping")
+            return
         logger.info(f"Terminating instance {key.agent_id}/{key.project_id} (PID: {info.process.pid})")
+        self._exit_watcher.unwatch(info.process.pid)
 
-        try:
-            info.process.terminate()
-            # Wait a short time for graceful shutdown
-            try:
-                info.process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                logger.warning(f"Instance {key.agent_id}/{key.project_id} did not terminate, killing")
-                info.process.kill()
-        except Exception as e:
-            logger.error(f"Error terminating process: {e}")
+        await self._terminate_instances([info])
+        self._release_instance_resources(info)
 
-        # Close log file handle
-        if info.log_file_handle:
+        # Remove from instances list
+        if info in info_list:
+            info_list.remove(info)
+        if not info_list and self._instances.get(key) is info_list:
+            del self._instances[key]
+        logger.info(f"Instance {key.agent_id}/{key.project_id} stopped and removed")
+
+    async def _terminate_instances(
+        self,
+        infos: list[AgentInstanceInfo],
+        timeout: Optional[float] = None
+    ) -> None:
+        """Terminate processes concurrently without blocking the event loop.
+
+        Sends SIGTERM to every process at once, waits for all of them against a
+        single deadline, then kills the ones still running. The instances are
+        marked as stopping so _cleanup_finished leaves them to the caller.
+
+        Args:
+            infos: Instances to terminate
+            timeout: Seconds to wait after SIGTERM before SIGKILL
+                     (default: TERMINATE_TIMEOUT_SECONDS)
+        """
+        if timeout is None:
+            timeout = TERMINATE_TIMEOUT_SECONDS
+        for info in infos:
+            info.stopping = True
             try:
-                info.log_file_handle.close()
-            except Exception:
-                pass
+                if info.process.poll() is None:
+                    info.process.terminate()
+            except Exception as e:
+                logger.warning(f"Failed to terminate {info.key.agent_id}/{info.key.project_id}: {e}")
 
-        # Clean up MCP config temp file
-        if info.mcp_config_file:
+        exited = await asyncio.gather(
+            *(self._wait_for_exit(info.process, timeout) for info in infos)
+        )
+
+        stragglers = [info for info, done in zip(infos, exited) if not done]
+        for info in stragglers:
+            logger.warning(
+                f"Instance {info.key.agent_id}/{info.key.project_id} did not terminate, killing"
+            )
             try:
-                os.unlink(info.mcp_config_file)
-                logger.debug(f"Removed temp MCP config: {info.mcp_config_file}")
-            except Exception:
-                pass
+                info.process.kill()
+            except Exception as e:
+                logger.warning(f"Failed to kill {info.key.agent_id}/{info.key.project_id}: {e}")
+        if stragglers:
+            # SIGKILL cannot be ignored; wait briefly so the processes get reaped
+            await asyncio.gather(
+                *(self._wait_for_exit(info.process, 1.0) for info in stragglers)
+            )
 
-        # Remove from instances list
-        info_list.pop(0)
-        if not info_list:
-            del self._instances[key]
-        logger.info(f"Instance {key.agent_id}/{key.project_id} stopped and removed")
+    @staticmethod
+    async def _wait_for_exit(process: subprocess.Popen, timeout: float) -> bool:
+        """Wait for a process to exit without blocking the event loop.
+
+        Returns:
+            True if the process exited within timeout
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = 0.01
+        while True:
+            if process.poll() is not None:
+                return True
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.1)
 
     def _cleanup_finished(self) -> list[tuple[AgentInstanceKey, AgentInstanceInfo, int]]:
         """Clean up finished Agent Instance processes.
@@ -502,46 +1361,16 @@ class Coordinator:
         for key, info_list in list(self._instances.items()):
             finished_in_list: list[AgentInstanceInfo] = []
             for info in info_list:
+                if info.stopping:
+                    # _stop_instance/stop() handle instances they terminate
+                    continue
                 retcode = info.process.poll()
                 if retcode is not None:
                     logger.info(
                         f"Instance {key.agent_id}/{key.project_id} finished with code {retcode}"
                     )
-                    # Close log file handle
-                    if info.log_file_handle:
-                        try:
-                            info.log_file_handle.close()
-                        except Exception:
-                            pass
-                    # Clean up MCP config temp file
-                    if info.mcp_config_file:
-                        try:
-                            os.unlink(info.mcp_config_file)
-                            logger.debug(f"Removed temp MCP config: {info.mcp_config_file}")
-                        except Exception:
-                            pass
-                    # Clean up prompt temp file (Windows + Gemini)
-                    if info.prompt_file:
-                        try:
-                            os.unlink(info.prompt_file)
-                            logger.debug(f"Removed temp prompt file: {info.prompt_file}")
-                        except Exception:
-                            pass
-
-                    # Phase 6: Start async log upload (non-blocking)
-                    # 参照: docs/design/LOG_TRANSFER_DESIGN.md
-                    if (self.log_uploader and info.execution_log_id and
-                        info.log_file_path and info.task_id):
-                        upload_info = _LogUploadInfo(
-                            log_file_path=info.log_file_path,
-                            execution_log_id=info.execution_log_id,
-                            agent_id=key.agent_id,
-                            task_id=info.task_id,
-                            project_id=key.project_id
-                        )
-                        task = asyncio.create_task(self._upload_log_async(upload_info))
-                        self._pending_uploads[info.execution_log_id] = task
-                        logger.debug(f"Started async log upload for {info.execution_log_id}")
+                    self._exit_watcher.unwatch(info.process.pid)
+                    self._release_instance_resources(info)
 
                     # Error protection: Set cooldown on error exit, clear on success
                     # Reference: docs/design/SPAWN_ERROR_PROTECTION.md
@@ -552,25 +1381,33 @@ class Coordinator:
                             logger.debug(f"Cleared cooldown for {key.agent_id}/{key.project_id} (successful exit)")
 
                     if retcode != 0 and self._cooldown_manager:
-                        error_msg = self._extract_error_from_log(info.log_file_path) if info.log_file_path else None
-                        cooldown_seconds: Optional[int] = None
+                        analysis = self._analyze_log(info)
+                        error_msg = analysis.error_message if analysis else None
+                        detection: Optional[QuotaDetection] = None
 
                         # Check for quota error if detection is enabled
-                        if self._quota_detector and info.log_file_path:
-                            cooldown_seconds = self._quota_detector.detect_from_file(info.log_file_path)
-                            if cooldown_seconds:
+                        # (already known if the log follower saw it while running)
+                        if self._quota_detector:
+                            if info.quota_stream and info.quota_stream.detected:
+                                detection = info.quota_stream.detection
+                            elif analysis:
+                                detection = analysis.quota
+                            if detection:
                                 self._cooldown_manager.set_quota(
                                     key=key,
-                                    cooldown_seconds=cooldown_seconds,
-                                    error_message=error_msg or f"Quota error (exit code {retcode})"
+                                    cooldown_seconds=detection.seconds,
+                                    error_message=error_msg or f"Quota error (exit code {retcode})",
+                                    rule=detection.rule,
+                                    offset=detection.offset
                                 )
                                 logger.warning(
                                     f"Quota error detected for {key.agent_id}/{key.project_id}: "
-                                    f"cooldown {cooldown_seconds}s"
+                                    f"cooldown {detection.seconds}s (rule '{detection.rule}' "
+                                    f"at byte {detection.offset})"
                                 )
 
                         # If not a quota error, set regular error cooldown
-                        if cooldown_seconds is None:
+                        if detection is None:
                             self._cooldown_manager.set_error(
                                 key=key,
                                 error_message=error_msg or f"Process exited with code {retcode}"
@@ -592,7 +1429,128 @@ class Coordinator:
 
         return finished
 
-    async def _upload_log_async(self, upload_info: _LogUploadInfo) -> None:
+    def _release_instance_resources(self, info: AgentInstanceInfo) -> None:
+        """Close the log handle, remove temp files and start the log upload of an exited instance."""
+        # Close log file handle (or finish the collected log)
+        self._close_instance_log(info)
+        # Clean up MCP config temp file
+        if info.mcp_config_file:
+            try:
+                os.unlink(info.mcp_config_file)
+                logger.debug(f"Removed temp MCP config: {info.mcp_config_file}")
+            except Exception:
+                pass
+        # Clean up prompt temp file (Windows + Gemini)
+        if info.prompt_file:
+            try:
+                os.unlink(info.prompt_file)
+                logger.debug(f"Removed temp prompt file: {info.prompt_file}")
+            except Exception:
+                pass
+
+        # Phase 6: Queue the log upload (non-blocking, persisted in the spool)
+        # 参照: docs/design/LOG_TRANSFER_DESIGN.md
+        ship = info.log_ship
+        if ship is not None and ship.flushing is not None and not ship.flushing.done():
+            # A live chunk is still being appended on the server: start the
+            # upload from the offset it acknowledges, not the stale one
+            ship.flushing.add_done_callback(lambda _future: self._queue_log_upload(info))
+            return
+        self._queue_log_upload(info)
+
+    def _queue_log_upload(self, info: AgentInstanceInfo) -> None:
+        """Queue the upload of an exited instance's log (from the live-shipped offset)."""
+        ship = info.log_ship
+        execution_log_id = info.execution_log_id or (ship.execution_log_id if ship else None)
+        if (self._upload_pool and execution_log_id and
+            info.log_file_path and info.task_id):
+            self._upload_pool.submit(UploadJob(
+                log_file_path=info.log_file_path,
+                execution_log_id=execution_log_id,
+                agent_id=info.key.agent_id,
+                task_id=info.task_id,
+                project_id=info.key.project_id,
+                uploaded_offset=ship.acked if ship else 0
+            ))
+            logger.debug(f"Queued log upload for {execution_log_id}")
+
+    def _close_instance_log(self, info: AgentInstanceInfo) -> None:
+        if info.log_file_handle:
+            try:
+                info.log_file_handle.close()
+            except Exception:
+                pass
+        if info.log_sink:
+            if self._log_collector:
+                self._log_collector.close(info.log_sink)
+            else:
+                info.log_sink.close()
+        if self._log_retention and info.log_file_path:
+            for path in _instance_log_paths(info.log_file_path):
+                self._log_retention.track(path, info.key.agent_id)
+
+    async def _log_retention_loop(self) -> None:
+        """Apply the log retention policies in the background."""
+        loop = asyncio.get_running_loop()
+        while self._running:
+            await asyncio.sleep(self._log_retention.config.interval_seconds)
+            try:
+                self._watch_log_directories()
+                await loop.run_in_executor(None, self._log_retention.sweep, self._logs_in_use())
+            except Exception as e:
+                logger.exception(f"Error applying log retention: {e}")
+
+    def _watch_log_directories(self) -> None:
+        """Add the log directories of the configured agents to the retention passes.
+
+        Logs written before a restart are not tracked, so the directories
+        of every active project (and the fallback directory) are swept too.
+        """
+        for agent_id in self.config.agents:
+            self._log_retention.watch(str(self._log_directory_path(None, agent_id)), agent_id)
+            for project in self._projects_cache:
+                if agent_id in project.agents and project.working_directory:
+                    directory = self._log_directory_path(project.working_directory, agent_id)
+                    self._log_retention.watch(str(directory), agent_id)
+
+    def _logs_in_use(self) -> set[str]:
+        """Logs retention must not touch: running instances' and those waiting for upload."""
+        paths = {
+            path
+            for info_list in self._instances.values()
+            for info in info_list
+            if info.log_file_path
+            for path in _instance_log_paths(info.log_file_path)
+        }
+        paths.update(job.log_file_path for job in self._pending_uploads.values())
+        return paths
+
+    def _upload_spool_directory(self) -> Path:
+        from aiagent_runner.lock import config_hash
+
+        directory = self.log_uploader.config.spool_directory
+        if directory:
+            return Path(directory).expanduser()
+        # One spool per configuration (keyed like the coordinator lock), so
+        # Coordinators on the same host never upload each other's jobs
+        return get_data_directory() / "upload_spool" / config_hash(self.config.config_path or "default")
+
+    async def _run_upload_job(self, job: UploadJob) -> bool:
+        """Upload worker handler: one attempt for a spooled job.
+
+        The local path is registered as a fallback on the first failure (so
+        the log is reachable while retries back off) and when giving up.
+
+        Returns:
+            True when the job is done (uploaded, or its log no longer exists)
+        """
+        if not Path(job.log_file_path).exists():
+            logger.warning(f"Log file for {job.execution_log_id} is gone, dropping upload")
+            return True
+        final = job.attempts >= self._upload_pool.max_attempts
+        return await self._upload_log_async(job, register_fallback=job.attempts == 1 or final)
+
+    async def _upload_log_async(self, upload_info: UploadJob, register_fallback: bool = True) -> bool:
         """Upload log file asynchronously.
 
         On success: deletes local temp file
@@ -600,6 +1558,10 @@ class Coordinator:
 
         Args:
             upload_info: Log upload information
+            register_fallback: Register the local path if the upload fails
+
+        Returns:
+            True if the log was uploaded
         """
         try:
             result = await self.log_uploader.upload(
@@ -607,85 +1569,61 @@ class Coordinator:
                 execution_log_id=upload_info.execution_log_id,
                 agent_id=upload_info.agent_id,
                 task_id=upload_info.task_id,
-                project_id=upload_info.project_id
+                project_id=upload_info.project_id,
+                offset=upload_info.uploaded_offset
             )
-
-            if result:
-                # Upload succeeded - delete local temp file
-                try:
-                    Path(upload_info.log_file_path).unlink()
-                    logger.info(f"Log uploaded and temp file deleted: {upload_info.execution_log_id}")
-                except Exception as e:
-                    logger.warning(f"Failed to delete temp log file: {e}")
-            else:
-                # Upload failed - register local path as fallback
-                logger.warning(f"Log upload failed for {upload_info.execution_log_id}, registering local path")
-                try:
-                    await self.mcp_client.register_execution_log_file(
-                        execution_log_id=upload_info.execution_log_id,
-                        log_file_path=upload_info.log_file_path
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to register local log path: {e}")
-
         except Exception as e:
             logger.error(f"Async log upload error for {upload_info.execution_log_id}: {e}")
-            # Try to register local path as fallback
+            result = None
+
+        if result:
+            # Upload succeeded - delete local temp file
+            try:
+                Path(upload_info.log_file_path).unlink()
+                if self._log_retention:
+                    self._log_retention.forget(upload_info.log_file_path, upload_info.agent_id)
+                logger.info(f"Log uploaded and temp file deleted: {upload_info.execution_log_id}")
+            except Exception as e:
+                logger.warning(f"Failed to delete temp log file: {e}")
+            return True
+
+        if register_fallback:
+            # Upload failed - register local path as fallback
+            logger.warning(f"Log upload failed for {upload_info.execution_log_id}, registering local path")
             try:
                 await self.mcp_client.register_execution_log_file(
-                    execution_log_id=upload_info.execution_log_id,
+                    agent_id=upload_info.agent_id,
+                    task_id=upload_info.task_id,
                     log_file_path=upload_info.log_file_path
                 )
-            except Exception as e2:
-                logger.error(f"Failed to register local log path as fallback: {e2}")
-
-        finally:
-            # Remove from pending uploads
-            if upload_info.execution_log_id in self._pending_uploads:
-                del self._pending_uploads[upload_info.execution_log_id]
-
-    def _extract_error_from_log(self, log_file_path: str) -> Optional[str]:
-        """Extract error message from log file.
+            except Exception as e:
+                logger.error(f"Failed to register local log path: {e}")
+        return False
 
-        Looks for common error patterns in the last 50 lines of the log.
+    def _analyze_log(self, info: AgentInstanceInfo) -> Optional[LogAnalysis]:
+        """Analyze an exited instance's log, reading only its tail.
 
-        Args:
-            log_file_path: Path to the log file
+        The result (error line, quota verdict, size) is cached on the
+        instance, so the cooldown decision and the later error report share
+        a single read of the log.
 
         Returns:
-            Error message if found, None otherwise
+            The analysis, or None if the instance has no readable log
         """
-        try:
-            with open(log_file_path, "r") as f:
-                lines = f.readlines()
-
-            # Check last 50 lines for errors
-            last_lines = lines[-50:] if len(lines) > 50 else lines
-
-            error_patterns = [
-                "[API Error:",
-                "Error:",
-                "ERROR:",
-                "error:",
-                "quota",
-                "rate limit",
-                "exhausted",
-                "unauthorized",
-                "authentication failed",
-            ]
-
-            for line in reversed(last_lines):
-                line_lower = line.lower()
-                for pattern in error_patterns:
-                    if pattern.lower() in line_lower:
-                        # Found an error line, return it (cleaned up)
-                        return line.strip()
-
-            # If no specific error found but process failed, return generic message
-            return None
-        except Exception as e:
-            logger.warning(f"Failed to read log file {log_file_path}: {e}")
-            return None
+        if info.log_analysis is None and info.log_sink:
+            # Collected output: analyzed from memory, the file is not read
+            info.log_analysis = info.log_sink.analyze(self._quota_detector_for(info.provider))
+        elif info.log_analysis is None and info.log_file_path:
+            info.log_analysis = analyze_log(
+                info.log_file_path,
+                self._quota_detector_for(info.provider),
+                tail_bytes=self.config.error_protection.quota_scan_kb * 1024
+            )
+        return info.log_analysis
+
+    def _quota_detector_for(self, provider: str) -> Optional[QuotaErrorDetector]:
+        """Quota detector using the provider's rule set (or the built-in rules)."""
+        return self._provider_quota_detectors.get(provider, self._quota_detector)
 
     # ==========================================================================
     # Agent Context Directory
@@ -696,81 +1634,96 @@ class Coordinator:
         self,
         agent_id: str,
         working_dir: str,
-        provider: str
+        provider: str,
+        project_id: Optional[str] = None
     ) -> str:
         """Prepare agent-specific context directory.
 
         Creates a context directory with provider-specific configuration files
         (CLAUDE.md/GEMINI.md, settings.json) that contain the agent's system_prompt.
+        The profile is fetched on the event loop; the files are written on the
+        spawn executor.
 
         Args:
             agent_id: Agent ID
             working_dir: Manager's working directory (実作業ディレクトリ)
             provider: AI provider ("claude", "gemini", etc.)
+            project_id: Project ID (selects the instance's MCP proxy endpoint)
 
         Returns:
             Path to context directory (to be used as cwd for spawn)
             Falls back to working_dir on error.
         """
-        try:
-            aiagent_dir = Path(working_dir) / ".aiagent"
-            context_dir = aiagent_dir / "agents" / agent_id
+        # Get system_prompt and skills from MCP server
+        system_prompt = ""
+        skills: list[SkillDefinition] = []
+        if provider in ("claude", "gemini"):
+            started = time.monotonic()
+            try:
+                profile = await self._profile_cache.get(agent_id)
+                system_prompt = profile.system_prompt
+                skills = profile.skills
+                logger.debug(f"Got system_prompt for {agent_id}: {len(system_prompt)} chars")
+                logger.debug(f"Got {len(skills)} skills for {agent_id}")
+            except Exception as e:
+                logger.warning(f"Failed to get subordinate profile for {agent_id}: {e}")
+            self._spawn_executor.record(STAGE_PROFILE, time.monotonic() - started)
 
-            # Ensure .gitignore includes agents/ directory
-            self._update_aiagent_gitignore(aiagent_dir)
+        try:
+            return await self._spawn_executor.run(
+                STAGE_CONTEXT,
+                self._write_agent_context,
+                agent_id, working_dir, provider, system_prompt, skills,
+                self._optional_mcp_connection_path(agent_id, project_id)
+            )
+        except Exception as e:
+            logger.error(f"Failed to prepare agent context for {agent_id}: {e}")
+            return working_dir  # Fallback
 
-            if provider == "claude":
-                config_dir = context_dir / ".claude"
-                config_dir.mkdir(parents=True, exist_ok=True)
+    def _write_agent_context(
+        self,
+        agent_id: str,
+        working_dir: str,
+        provider: str,
+        system_prompt: str,
+        skills: list[SkillDefinition],
+        connection_path: Optional[str] = None
+    ) -> str:
+        """Write the context directory files (blocking; runs on the spawn executor).
 
-                # Get system_prompt and skills from MCP server
-                system_prompt = ""
-                skills: list[SkillDefinition] = []
-                try:
-                    profile = await self.mcp_client.get_subordinate_profile(agent_id)
-                    system_prompt = profile.system_prompt
-                    skills = profile.skills
-                    logger.debug(f"Got system_prompt for {agent_id}: {len(system_prompt)} chars")
-                    logger.debug(f"Got {len(skills)} skills for {agent_id}")
-                except Exception as e:
-                    logger.warning(f"Failed to get subordinate profile for {agent_id}: {e}")
+        Returns:
+            Path to context directory, or working_dir for other providers
+        """
+        aiagent_dir = Path(working_dir) / ".aiagent"
+        context_dir = aiagent_dir / "agents" / agent_id
 
-                self._write_claude_md(config_dir, system_prompt, working_dir)
-                self._write_claude_settings(config_dir, working_dir)
-                self._write_skills(config_dir, skills)
+        # Ensure .gitignore includes agents/ directory
+        self._update_aiagent_gitignore(aiagent_dir)
 
-                logger.info(f"Prepared Claude context directory: {context_dir}")
-                return str(context_dir)
+        if provider == "claude":
+            config_dir = context_dir / ".claude"
+            config_dir.mkdir(parents=True, exist_ok=True)
 
-            elif provider == "gemini":
-                config_dir = context_dir / ".gemini"
-                config_dir.mkdir(parents=True, exist_ok=True)
+            self._write_claude_md(config_dir, system_prompt, working_dir)
+            self._write_claude_settings(config_dir, working_dir, connection_path)
+            self._write_skills(config_dir, skills)
 
-                # Get system_prompt and skills from MCP server
-                system_prompt = ""
-                skills: list[SkillDefinition] = []
-                try:
-                    profile = await self.mcp_client.get_subordinate_profile(agent_id)
-                    system_prompt = profile.system_prompt
-                    skills = profile.skills
-                    logger.debug(f"Got system_prompt for {agent_id}: {len(system_prompt)} chars")
-                    logger.debug(f"Got {len(skills)} skills for {agent_id}")
-                except Exception as e:
-                    logger.warning(f"Failed to get subordinate profile for {agent_id}: {e}")
+            logger.info(f"Prepared Claude context directory: {context_dir}")
+            return str(context_dir)
 
-                self._write_gemini_md(config_dir, system_prompt, working_dir)
-                self._write_skills(config_dir, skills)
+        elif provider == "gemini":
+            config_dir = context_dir / ".gemini"
+            config_dir.mkdir(parents=True, exist_ok=True)
 
-                logger.info(f"Prepared Gemini context directory: {context_dir}")
-                return str(context_dir)
+            self._write_gemini_md(config_dir, system_prompt, working_dir)
+            self._write_skills(config_dir, skills)
 
-            else:
-                # Other providers: use working_dir as-is
-                return working_dir
+            logger.info(f"Prepared Gemini context directory: {context_dir}")
+            return str(context_dir)
 
-        except Exception as e:
-            logger.error(f"Failed to prepare agent context for {agent_id}: {e}")
-            return working_dir  # Fallback
+        else:
+            # Other providers: use working_dir as-is
+            return working_dir
 
     def _write_claude_md(self, config_dir: Path, system_prompt: str, working_dir: str) -> None:
         """Write CLAUDE.md file with system_prompt and restrictions.
@@ -797,68 +1750,52 @@ All file operations should be performed in this directory, NOT in the current co
 
 **DO NOT** modify any files within `.aiagent/`. This directory is managed by AI Agent PM.
 """
-        claude_md.write_text(content)
-        logger.debug(f"Wrote CLAUDE.md: {claude_md}")
+        if self._context_writer.write(claude_md, content):
+            logger.debug(f"Wrote CLAUDE.md: {claude_md}")
 
-    def _write_claude_settings(self, config_dir: Path, working_dir: str) -> None:
-        """Write Claude CLI settings.json with additionalDirectories.
+    def _write_claude_settings(
+        self,
+        config_dir: Path,
+        working_dir: str,
+        connection_path: Optional[str] = None
+    ) -> None:
+        """Write Claude CLI settings.json with additionalDirectories and MCP config.
 
         Args:
             config_dir: Path to .claude/ directory
             working_dir: Manager's working directory to add as additional directory
+            connection_path: Unix socket path or HTTP URL for MCP connection
+                             (mcpServers is omitted when None)
         """
         settings_file = config_dir / "settings.json"
-        settings = {
+        settings: dict = {
             "permissions": {
                 "additionalDirectories": [working_dir]
             }
         }
-        settings_file.write_text(json.dumps(settings, indent=2))
-        logger.debug(f"Wrote settings.json: {settings_file}")
-
-    def _update_claude_settings_with_mcp(self, context_dir: str, connection_path: str) -> None:
-        """Update Claude settings.json with MCP server configuration.
-
-        Reads existing settings.json and adds mcpServers configuration.
-
-        Args:
-            context_dir: Agent context directory (contains .claude/)
-            connection_path: Unix socket path or HTTP URL for MCP connection
-        """
-        settings_file = Path(context_dir) / ".claude" / "settings.json"
-        if not settings_file.exists():
-            logger.warning(f"Claude settings.json not found: {settings_file}")
-            return
 
-        # Read existing settings
-        try:
-            settings = json.loads(settings_file.read_text())
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse settings.json: {e}")
-            return
-
-        # Build MCP server config
-        if connection_path.startswith("http://") or connection_path.startswith("https://"):
-            mcp_server_config: dict = {
-                "url": connection_path,
-            }
-            if self.config.coordinator_token:
-                mcp_server_config["headers"] = {
-                    "Authorization": f"Bearer {self.config.coordinator_token}"
+        if connection_path:
+            # Build MCP server config
+            if connection_path.startswith("http://") or connection_path.startswith("https://"):
+                mcp_server_config: dict = {
+                    "url": connection_path,
                 }
-        else:
-            mcp_server_config = {
-                "command": "nc",
-                "args": ["-U", connection_path],
+                bearer_token = self._mcp_bearer_token(connection_path)
+                if bearer_token:
+                    mcp_server_config["headers"] = {
+                        "Authorization": f"Bearer {bearer_token}"
+                    }
+            else:
+                mcp_server_config = {
+                    "command": "nc",
+                    "args": ["-U", connection_path],
+                }
+            settings["mcpServers"] = {
+                "agent-pm": mcp_server_config
             }
 
-        # Add mcpServers to settings
-        settings["mcpServers"] = {
-            "agent-pm": mcp_server_config
-        }
-
-        settings_file.write_text(json.dumps(settings, indent=2))
-        logger.debug(f"Updated settings.json with MCP config: {settings_file}")
+        if self._context_writer.write(settings_file, json.dumps(settings, indent=2)):
+            logger.debug(f"Wrote settings.json: {settings_file}")
 
     def _write_gemini_md(self, config_dir: Path, system_prompt: str, working_dir: str) -> None:
         """Write GEMINI.md file with system_prompt and restrictions.
@@ -896,60 +1833,23 @@ Always prefix your file paths with `{real_working_dir}/`.
 
 **DO NOT** modify any files within `.aiagent/`. This directory is managed by AI Agent PM.
 """
-        gemini_md.write_text(content)
-        logger.debug(f"Wrote GEMINI.md: {gemini_md}")
+        if self._context_writer.write(gemini_md, content):
+            logger.debug(f"Wrote GEMINI.md: {gemini_md}")
 
     def _write_skills(self, config_dir: Path, skills: list[SkillDefinition]) -> None:
-        """Extract skill archives to agent context directory.
+        """Install skills into the agent context directory.
 
-        Creates a skills/ directory under the config dir and extracts each skill's
-        ZIP archive into a subdirectory named after the skill's directory_name.
+        Each skill appears as skills/<directory_name> under the config dir.
+        Archives are extracted once into the shared SkillCache and linked in;
+        skills whose archive is unchanged since the last spawn are left alone.
 
         Reference: docs/design/AGENT_SKILLS.md
 
         Args:
             config_dir: Path to .claude/ or .gemini/ directory
-            skills: List of skill definitions to extract
+            skills: List of skill definitions to install
         """
-        skills_dir = config_dir / "skills"
-
-        # Clear existing skills directory (full regeneration each time)
-        if skills_dir.exists():
-            shutil.rmtree(skills_dir)
-
-        if not skills:
-            logger.debug("No skills to write")
-            return
-
-        # Create skills directory and extract each skill's archive
-        # Note: ZIP files already contain the root directory (e.g., webapp-testing/),
-        # so we extract directly to skills_dir, not to a subdirectory.
-        for skill in skills:
-            try:
-                # Base64 decode -> ZIP extraction
-                archive_bytes = base64.b64decode(skill.archive_base64)
-                with zipfile.ZipFile(io.BytesIO(archive_bytes)) as zf:
-                    # Security: Validate paths to prevent directory traversal
-                    safe_members = []
-                    for member in zf.namelist():
-                        if member.startswith('/') or '..' in member:
-                            logger.warning(f"Skipping unsafe path in skill archive: {member}")
-                            continue
-                        safe_members.append(member)
-                    # Extract directly to skills_dir - ZIP already contains the directory structure
-                    zf.extractall(skills_dir, members=safe_members)
-
-                skill_path = skills_dir / skill.directory_name
-                logger.debug(f"Extracted skill: {skill_path}")
-            except Exception as e:
-                logger.error(f"Failed to extract skill {skill.directory_name}: {e}")
-                # Create fallback directory with error info
-                skill_path = skills_dir / skill.directory_name
-                skill_path.mkdir(parents=True, exist_ok=True)
-                error_file = skill_path / "EXTRACTION_ERROR.txt"
-                error_file.write_text(f"Failed to extract skill archive: {e}")
-
-        logger.info(f"Wrote {len(skills)} skills to {skills_dir}")
+        self._skill_cache.install(config_dir / "skills", skills)
 
     def _update_aiagent_gitignore(self, aiagent_dir: Path) -> None:
         """Ensure .aiagent/.gitignore includes agents/ directory.
@@ -961,28 +1861,10 @@ Always prefix your file paths with `{real_working_dir}/`.
         """
         gitignore_path = aiagent_dir / ".gitignore"
         required_entries = ["logs/", "agents/"]
-
-        # Read existing content if file exists
-        existing_content = ""
-        if gitignore_path.exists():
-            existing_content = gitignore_path.read_text()
-
-        # Check which entries are missing
-        missing_entries = []
-        for entry in required_entries:
-            if entry not in existing_content:
-                missing_entries.append(entry)
-
-        # Add missing entries
-        if missing_entries:
-            aiagent_dir.mkdir(parents=True, exist_ok=True)
-            with open(gitignore_path, "a") as f:
-                if existing_content and not existing_content.endswith("\n"):
-                    f.write("\n")
-                f.write("# AI Agent PM - auto-generated\n")
-                for entry in missing_entries:
-                    f.write(f"{entry}\n")
-            logger.debug(f"Updated .gitignore with: {missing_entries}")
+        if self._context_writer.ensure_lines(
+            gitignore_path, required_entries, header="# AI Agent PM - auto-generated"
+        ):
+            logger.debug(f"Updated .gitignore: {gitignore_path}")
 
     def _spawn_instance(
         self,
@@ -996,9 +1878,13 @@ Always prefix your file paths with `{real_working_dir}/`.
         kick_command: Optional[str] = None,
         task_id: Optional[str] = None,
         base_prompt: Optional[str] = None
-    ) -> None:
+    ) -> AgentInstanceInfo:
         """Spawn an Agent Instance process.
 
+        Blocking (file creation and Popen): runs on the spawn executor and
+        does not touch Coordinator state. The caller registers the returned
+        instance with _register_instance() on the event loop.
+
         The Agent Instance (Claude Code) will:
         1. authenticate(agent_id, passkey, project_id)
         2. get_my_task()
@@ -1016,6 +1902,9 @@ Always prefix your file paths with `{real_working_dir}/`.
             model: Specific model (claude-sonnet-4-5, gemini-2.0-flash, etc.)
             kick_command: Custom CLI command (takes priority if set)
             task_id: Task ID (for log file path registration)
+
+        Returns:
+            The spawned instance (not yet registered)
         """
         # kick_command takes priority over provider-based selection
         if kick_command:
@@ -1041,25 +1930,8 @@ Always prefix your file paths with `{real_working_dir}/`.
         # Build MCP config for Agent Instance
         # Agent Instance connects to the SAME MCP server that the app started
         # This ensures all components share the same database and state
-        # Supports both Unix Socket and HTTP transport
-        connection_path = self.config.mcp_socket_path
-        if connection_path:
-            # Always expand tilde in socket path (for Unix socket)
-            if not connection_path.startswith("http"):
-                connection_path = os.path.expanduser(connection_path)
-        else:
-            # Use platform-specific default socket path
-            from aiagent_runner.platform import get_default_socket_path
-            connection_path = get_default_socket_path()
-
-        # Validate connection_path (empty on Windows without explicit config)
-        if not connection_path:
-            raise ValueError(
-                "MCP connection path is required. "
-                "On Windows, Unix sockets are not supported. "
-                "Please set 'mcp_socket_path' to an HTTP URL (e.g., http://hostname:8081/mcp) "
-                "in your coordinator.yaml configuration."
-            )
+        # Supports both Unix Socket and HTTP transport (and the local MCP proxy)
+        connection_path = self._agent_connection_path(agent_id, project_id)
 
         # Determine transport type based on connection path
         if connection_path.startswith("http://") or connection_path.startswith("https://"):
@@ -1071,9 +1943,11 @@ Always prefix your file paths with `{real_working_dir}/`.
                 "url": connection_path
             }
             # Add Authorization header if coordinator_token is configured
-            if self.config.coordinator_token:
+            # (or the local MCP proxy's token)
+            bearer_token = self._mcp_bearer_token(connection_path)
+            if bearer_token:
                 mcp_server_config["headers"] = {
-                    "Authorization": f"Bearer {self.config.coordinator_token}"
+                    "Authorization": f"Bearer {bearer_token}"
                 }
             mcp_config_dict = {
                 "mcpServers": {
@@ -1119,10 +1993,8 @@ Always prefix your file paths with `{real_working_dir}/`.
                 mcp_config_file_path = f.name
             logger.debug(f"Wrote MCP config to temp file: {mcp_config_file_path}")
 
-            # Also add MCP config to Claude's settings.json in context_dir
-            if provider == "claude":
-                self._update_claude_settings_with_mcp(context_dir, connection_path)
-                logger.debug("Updated Claude settings.json with MCP config")
+            # Claude's settings.json in context_dir already carries the same MCP
+            # server (written by _prepare_agent_context)
 
         # Build command
         cmd = [
@@ -1224,19 +2096,76 @@ Always prefix your file paths with `{real_working_dir}/`.
         Path(working_dir).mkdir(parents=True, exist_ok=True)
         Path(spawn_cwd).mkdir(parents=True, exist_ok=True)
 
-        # Open log file (keep handle open during process lifetime)
-        log_f = open(log_file, "w")
+        # Output goes to pipes read by the log collector, or straight to the
+        # log file (keep handle open during process lifetime)
+        log_f: Optional[TextIO] = None
+        log_sink: Optional[CollectedLog] = None
+        if self._log_collector and not prompt_file_path:
+            log_sink = self._log_collector.open(
+                str(log_file), analysis_bytes=self.config.error_protection.quota_scan_kb * 1024
+            )
+            stdout_fd, stderr_fd = log_sink.write_fds()
+        else:
+            log_f = open(log_file, "w")
+            stdout_fd, stderr_fd = log_f.fileno(), None
 
         # Prepare environment
-        spawn_env = {
-            **os.environ,
+        env_overrides = {
             "AGENT_ID": agent_id,
             "PROJECT_ID": project_id,
             "AGENT_PASSKEY": passkey,
             "WORKING_DIRECTORY": working_dir,
         }
 
-        # Spawn process
+        # Spawn process, preferably through the spawner helper (see spawner.py)
+        try:
+            process = self._start_process(
+                cmd, spawn_cwd, env_overrides, stdout_fd, stderr_fd, provider, prompt_file_path
+            )
+        except BaseException:
+            if log_sink:
+                log_sink.close()
+            raise
+
+        key = AgentInstanceKey(agent_id, project_id)
+        info = AgentInstanceInfo(
+            key=key,
+            process=process,
+            working_directory=working_dir,
+            provider=provider,
+            model=model,
+            started_at=datetime.now(),
+            log_file_handle=log_f,
+            log_sink=log_sink,
+            task_id=task_id,
+            log_file_path=str(log_file),
+            mcp_config_file=mcp_config_file_path,
+            prompt_file=prompt_file_path
+        )
+
+        logger.info(f"Spawned instance {agent_id}/{project_id} (PID: {process.pid})")
+        return info
+
+    def _start_process(
+        self,
+        cmd: list[str],
+        spawn_cwd: str,
+        env_overrides: dict[str, str],
+        stdout_fd: int,
+        stderr_fd: Optional[int],
+        provider: str,
+        prompt_file_path: Optional[str]
+    ) -> Union[subprocess.Popen, RemoteProcess]:
+        """Start the instance process (stderr goes to stdout_fd unless stderr_fd is given)."""
+        if self._spawner and self._spawner.alive and not prompt_file_path:
+            try:
+                return self._spawner.spawn(cmd, spawn_cwd, env_overrides, stdout_fd, stderr_fd=stderr_fd)
+            except SpawnerError as e:
+                logger.warning(f"Spawner helper failed ({e}), spawning directly")
+
+        spawn_env = {**os.environ, **env_overrides}
+        stderr = subprocess.STDOUT if stderr_fd is None else stderr_fd
+
         # On Windows, shell=True is required to find commands in PATH
         # This is safe since cmd is constructed from configuration, not user input
         if prompt_file_path:
@@ -1246,40 +2175,145 @@ Always prefix your file paths with `{real_working_dir}/`.
             cmd_str = ' '.join(cmd)  # cmd doesn't include prompt yet
             shell_cmd = f'type "{prompt_file_path}" | {cmd_str}'
             logger.debug(f"Windows {provider} shell command: type ... | {cmd_str}")
-            process = subprocess.Popen(
+            return subprocess.Popen(
                 shell_cmd,
                 cwd=spawn_cwd,
-                stdout=log_f,
-                stderr=subprocess.STDOUT,
+                stdout=stdout_fd,
+                stderr=stderr,
                 shell=True,
                 env=spawn_env
             )
+        return subprocess.Popen(
+            cmd,
+            cwd=spawn_cwd,
+            stdout=stdout_fd,
+            stderr=stderr,
+            shell=is_windows(),
+            env=spawn_env
+        )
+
+    def _start_log_collector(self) -> None:
+        """Collect instance output through pipes; instances write their logs if unavailable."""
+        if is_windows():
+            logger.warning("log_collector is not supported on Windows, instances write their logs directly")
+            return
+        self._log_collector = LogCollector(self.config.log_collector, asyncio.get_running_loop())
+        logger.info("Collecting instance output through pipes")
+
+    def _start_spawner(self) -> None:
+        """Start the spawner helper; spawning stays direct if it is unavailable."""
+        if is_windows():
+            logger.warning("use_spawner is not supported on Windows, spawning directly")
+            return
+        loop = asyncio.get_running_loop()
+        spawner = SpawnerClient(
+            on_exit=lambda pid: loop.call_soon_threadsafe(self._on_instance_exit, pid)
+        )
+        try:
+            spawner.start()
+        except OSError as e:
+            logger.warning(f"Failed to start spawner helper ({e}), spawning directly")
+            return
+        self._spawner = spawner
+
+    def _register_instance(self, info: AgentInstanceInfo) -> None:
+        """Track a spawned instance (must run on the event loop)."""
+        self._instances.setdefault(info.key, []).append(info)
+
+        if info.log_sink and self._log_collector:
+            # Early quota detection runs on the collected output as it arrives
+            if self._quota_detector and self.config.error_protection.early_quota_abort:
+                info.quota_stream = StreamingQuotaDetector(
+                    self._quota_detector_for(info.provider), prefix_bytes=info.log_sink.prefix_bytes
+                )
+            info.log_sink.on_output = lambda text, offset: self._on_instance_output(info, text, offset)
+            self._log_collector.attach(info.log_sink)
+
+        # Wake the loop as soon as the process exits (falls back to polling)
+        self._exit_watcher.watch(info.process.pid, self._on_instance_exit)
+
+    def _on_instance_exit(self, pid: int) -> None:
+        """Handle an exit notification from the process watcher.
+
+        Reaping stays in _reap_loop; this only cuts its wait short so the
+        instance is cleaned up now and the freed slot is reused right away.
+        """
+        logger.debug(f"Process {pid} exited, waking reaper")
+        if self._exit_event:
+            self._exit_event.set()
+
+    def _mcp_connection_path(self) -> str:
+        """Return the MCP socket path or URL that Agent Instances connect to.
+
+        Raises:
+            ValueError: If no connection path is configured or available
+        """
+        connection_path = self.config.mcp_socket_path
+        if connection_path:
+            # Always expand tilde in socket path (for Unix socket)
+            if not connection_path.startswith("http"):
+                connection_path = os.path.expanduser(connection_path)
         else:
-            process = subprocess.Popen(
-                cmd,
-                cwd=spawn_cwd,
-                stdout=log_f,
-                stderr=subprocess.STDOUT,
-                shell=is_windows(),
-                env=spawn_env
+            # Use platform-specific default socket path
+            from aiagent_runner.platform import get_default_socket_path
+            connection_path = get_default_socket_path()
+
+        # Validate connection_path (empty on Windows without explicit config)
+        if not connection_path:
+            raise ValueError(
+                "MCP connection path is required. "
+                "On Windows, Unix sockets are not supported. "
+                "Please set 'mcp_socket_path' to an HTTP URL (e.g., http://hostname:8081/mcp) "
+                "in your coordinator.yaml configuration."
             )
+        return connection_path
 
-        key = AgentInstanceKey(agent_id, project_id)
-        self._instances.setdefault(key, []).append(AgentInstanceInfo(
-            key=key,
-            process=process,
-            working_directory=working_dir,
-            provider=provider,
-            model=model,
-            started_at=datetime.now(),
-            log_file_handle=log_f,
-            task_id=task_id,
-            log_file_path=str(log_file),
-            mcp_config_file=mcp_config_file_path,
-            prompt_file=prompt_file_path
-        ))
+    def _agent_connection_path(self, agent_id: str, project_id: Optional[str]) -> str:
+        """Return the MCP endpoint handed to an Agent Instance.
 
-        logger.info(f"Spawned instance {agent_id}/{project_id} (PID: {process.pid})")
+        This is the instance's URL on the local MCP proxy when it is running,
+        otherwise _mcp_connection_path().
+        """
+        connection_path = self._mcp_connection_path()
+        if self._mcp_proxy and self._mcp_proxy.running and project_id:
+            return self._mcp_proxy.endpoint_for(agent_id, project_id)
+        return connection_path
+
+    def _optional_mcp_connection_path(
+        self, agent_id: str, project_id: Optional[str]
+    ) -> Optional[str]:
+        """Like _agent_connection_path(), but None instead of raising."""
+        try:
+            return self._agent_connection_path(agent_id, project_id)
+        except ValueError:
+            return None
+
+    def _mcp_bearer_token(self, connection_path: str) -> Optional[str]:
+        """Token for the Authorization header of an HTTP MCP connection."""
+        if self._mcp_proxy and self._mcp_proxy.owns(connection_path):
+            return self._mcp_proxy.token
+        return self.config.coordinator_token
+
+    async def _start_mcp_proxy(self) -> None:
+        """Start the local MCP proxy; instances keep using `nc` if it cannot run."""
+        if not HAS_AIOHTTP:
+            logger.warning("mcp_proxy requires aiohttp, instances will connect directly")
+            return
+        try:
+            upstream = self._mcp_connection_path()
+        except ValueError:
+            return
+        if upstream.startswith("http://") or upstream.startswith("https://"):
+            logger.info("mcp_proxy is only used with Unix socket connections")
+            return
+        proxy = MCPProxy(upstream, self.config.mcp_proxy)
+        try:
+            await proxy.start()
+        except OSError as e:
+            logger.warning(f"Failed to start MCP proxy ({e}), instances will connect directly")
+            await proxy.close()
+            return
+        self._mcp_proxy = proxy
 
     def _prepare_gemini_mcp_config(
         self, context_dir: str, connection_path: str, actual_working_dir: str
@@ -1311,9 +2345,11 @@ Always prefix your file paths with `{real_working_dir}/`.
                 "trust": True  # Auto-approve tool calls
             }
             # Add Authorization header if coordinator_token is configured
-            if self.config.coordinator_token:
+            # (or the local MCP proxy's token)
+            bearer_token = self._mcp_bearer_token(connection_path)
+            if bearer_token:
                 mcp_server_config["headers"] = {
-                    "Authorization": f"Bearer {self.config.coordinator_token}"
+                    "Authorization": f"Bearer {bearer_token}"
                 }
             config = {
                 "mcpServers": {
@@ -1347,11 +2383,9 @@ Always prefix your file paths with `{real_working_dir}/`.
             }
 
         config_file = gemini_dir / "settings.json"
-        with open(config_file, "w") as f:
-            json.dump(config, f, indent=2)
-
-        logger.debug(f"Created Gemini MCP config at {config_file}")
-        logger.debug(f"Added includeDirectories: {real_working_dir}")
+        if self._context_writer.write(config_file, json.dumps(config, indent=2)):
+            logger.debug(f"Created Gemini MCP config at {config_file}")
+            logger.debug(f"Added includeDirectories: {real_working_dir}")
 
     def _build_agent_prompt(
         self,
@@ -1465,13 +2499,24 @@ async def run_coordinator_async(config: CoordinatorConfig) -> None:
         raise SystemExit(1)
 
     coordinator: Optional[Coordinator] = None
+    control_server: Optional[ControlServer] = None
 
     try:
         coordinator = Coordinator(config)
+        # Control socket (wake/drain/resume/status); Unix sockets only
+        if not is_windows():
+            control_server = ControlServer(coordinator, lock.control_socket_path)
+            try:
+                await control_server.start()
+            except OSError as e:
+                logger.warning(f"Control socket unavailable: {e}")
+                control_server = None
         await coordinator.start()
     except asyncio.CancelledError:
         logger.info("Coordinator cancelled")
     finally:
+        if control_server:
+            await control_server.close()
         if coordinator:
             await coordinator.stop()
         lock.release()
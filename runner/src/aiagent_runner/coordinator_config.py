@@ -9,8 +9,15 @@ from typing import Optional
 
 import yaml
 
+from aiagent_runner.events import EventSubscriptionConfig
+from aiagent_runner.http_session import HTTPPoolConfig, SharedHTTPSession
 from aiagent_runner.log_uploader import LogUploadConfig
+from aiagent_runner.log_collector import LogCollectorConfig
+from aiagent_runner.log_retention import LogRetentionConfig, LogRetentionPolicy
+from aiagent_runner.mcp_proxy import MCPProxyConfig
 from aiagent_runner.platform import get_default_socket_path, get_log_directory
+from aiagent_runner.polling import AdaptivePollingConfig
+from aiagent_runner.quota_detector import DEFAULT_QUOTA_SECONDS, QuotaRule
 
 
 @dataclass
@@ -47,6 +54,21 @@ class ErrorProtectionConfig:
     # Safety margin for quota-based cooldowns (percent)
     quota_margin_percent: int = 10
 
+    # Follow running instances' logs and terminate an instance as soon as
+    # a quota error shows up (instead of waiting for the CLI to give up)
+    early_quota_abort: bool = True
+
+    # Seconds between scans of running instances' logs
+    quota_watch_interval: float = 2.0
+
+    # Only the last N KB of an exited instance's log are analyzed
+    # (quota detection additionally skips the echoed prompt and normal output)
+    quota_scan_kb: int = 64
+
+    # Quota detection rules per provider ("claude", "gemini", ...), in
+    # priority order. Providers not listed use the built-in QUOTA_RULES.
+    quota_rules: dict[str, list[QuotaRule]] = field(default_factory=dict)
+
 
 @dataclass
 class CoordinatorConfig:
@@ -69,6 +91,26 @@ class CoordinatorConfig:
     polling_interval: int = 10
     max_concurrent: int = 3
 
+    # Maximum number of (agent_id, project_id) pairs evaluated in parallel per tick
+    # (get_agent_action calls, context preparation and spawning)
+    decision_concurrency: int = 4
+
+    # Worker threads for blocking spawn stages (context files, skill
+    # extraction, Popen) so slow working directories don't stall the loop
+    spawn_workers: int = 4
+
+    # Start Agent Instances from a small helper process started at boot
+    # instead of forking the Coordinator itself (POSIX only)
+    use_spawner: bool = False
+
+    # Seconds between checks for finished instances (independent of polling_interval
+    # and of server health; exits are noticed immediately where pidfd is available)
+    reap_interval: float = 2.0
+
+    # Seconds an agent profile (system prompt and skills) is reused across
+    # spawns before it is fetched again (0 = fetch on every spawn)
+    profile_cache_ttl: float = 60.0
+
     # Server URL (HTTP base URL for both MCP and REST API)
     # When specified, MCP endpoint is {server_url}/mcp, REST API is {server_url}/api/v1/...
     # For local Unix socket operation, leave this None and set mcp_socket_path instead
@@ -79,6 +121,10 @@ class CoordinatorConfig:
     # When server_url is None, this specifies the Unix socket path
     mcp_socket_path: Optional[str] = None
 
+    # Persistent Unix socket connections kept open to the MCP server
+    # Requests are multiplexed by JSON-RPC id, so a small pool is enough
+    mcp_max_connections: int = 2
+
     # Phase 5: Coordinator token for Coordinator-only API authorization
     # Reference: Sources/MCPServer/Authorization/ToolAuthorization.swift
     coordinator_token: Optional[str] = None
@@ -96,15 +142,33 @@ class CoordinatorConfig:
     # Logging
     log_directory: Optional[str] = None
 
+    # Pipe-based collection of instance output (disabled: instances write their log files)
+    log_collector: LogCollectorConfig = field(default_factory=LogCollectorConfig)
+
+    # Retention of the instance logs under .aiagent/logs (disabled: logs are kept forever)
+    log_retention: LogRetentionConfig = field(default_factory=LogRetentionConfig)
+
     # Log upload configuration
     log_upload: Optional[LogUploadConfig] = None
 
+    # Shared HTTP session pool (MCP over HTTP, log upload)
+    http_pool: HTTPPoolConfig = field(default_factory=HTTPPoolConfig)
+
     # Debug mode (adds --verbose to CLI commands)
     debug_mode: bool = True
 
     # Error protection configuration
     error_protection: ErrorProtectionConfig = field(default_factory=ErrorProtectionConfig)
 
+    # Adaptive polling (disabled: wait polling_interval between ticks)
+    adaptive_polling: AdaptivePollingConfig = field(default_factory=AdaptivePollingConfig)
+
+    # Server-push event subscription (disabled: poll every pair each tick)
+    events: EventSubscriptionConfig = field(default_factory=EventSubscriptionConfig)
+
+    # Local MCP proxy for Agent Instances (disabled: each instance runs `nc -U`)
+    mcp_proxy: MCPProxyConfig = field(default_factory=MCPProxyConfig)
+
     # Path to config file (set automatically by from_yaml)
     config_path: Optional[str] = None
 
@@ -114,6 +178,16 @@ class CoordinatorConfig:
             raise ValueError("polling_interval must be positive")
         if self.max_concurrent <= 0:
             raise ValueError("max_concurrent must be positive")
+        if self.decision_concurrency <= 0:
+            raise ValueError("decision_concurrency must be positive")
+        if self.spawn_workers <= 0:
+            raise ValueError("spawn_workers must be positive")
+        if self.reap_interval <= 0:
+            raise ValueError("reap_interval must be positive")
+        if self.profile_cache_ttl < 0:
+            raise ValueError("profile_cache_ttl must not be negative")
+        if self.mcp_max_connections <= 0:
+            raise ValueError("mcp_max_connections must be positive")
 
         # Set default MCP socket path if not specified and no server_url
         # Uses platform-specific default (empty on Windows - requires HTTP)
@@ -131,6 +205,16 @@ class CoordinatorConfig:
                 cli_args=["--dangerously-skip-permissions"]
             )
 
+        if self.events.safety_poll_interval <= 0:
+            raise ValueError("events.safety_poll_interval must be positive")
+
+        # Set events endpoint from REST API base URL (left unset if unknown;
+        # the Coordinator then stays on polling)
+        if self.events.enabled and not self.events.endpoint:
+            base_url = self.get_rest_api_base_url()
+            if base_url:
+                self.events.endpoint = f"{base_url}/api/v1/coordinator/events"
+
         # Set log_upload endpoint from REST API base URL
         if self.log_upload and self.log_upload.enabled and not self.log_upload.endpoint:
             base_url = self.get_rest_api_base_url()
@@ -252,12 +336,34 @@ class CoordinatorConfig:
         if log_upload_data and log_upload_data.get("enabled"):
             log_upload = LogUploadConfig(
                 enabled=True,
-                max_file_size_mb=log_upload_data.get("max_file_size_mb", 10),
+                max_file_size_mb=log_upload_data.get("max_file_size_mb", 100),
                 retry_count=log_upload_data.get("retry_count", 3),
                 retry_delay_seconds=log_upload_data.get("retry_delay_seconds", 1.0),
+                chunk_size_kb=log_upload_data.get("chunk_size_kb", 4096),
+                compression=log_upload_data.get("compression", "deflate"),
+                live_enabled=log_upload_data.get("live_enabled", True),
+                live_flush_interval_seconds=log_upload_data.get("live_flush_interval_seconds", 5.0),
+                live_batch_kb=log_upload_data.get("live_batch_kb", 1024),
+                workers=log_upload_data.get("workers", 2),
+                max_attempts=log_upload_data.get("max_attempts", 5),
+                backoff_base_seconds=log_upload_data.get("backoff_base_seconds", 5.0),
+                backoff_max_seconds=log_upload_data.get("backoff_max_seconds", 300.0),
+                drain_timeout_seconds=log_upload_data.get("drain_timeout_seconds", 10.0),
+                spool_directory=log_upload_data.get("spool_directory"),
             )
             # Note: endpoint is set in __post_init__ via get_rest_api_base_url()
 
+        # Parse http_pool configuration
+        http_pool = HTTPPoolConfig()
+        http_pool_data = data.get("http_pool")
+        if http_pool_data:
+            http_pool = HTTPPoolConfig(
+                limit=http_pool_data.get("limit", 20),
+                limit_per_host=http_pool_data.get("limit_per_host", 8),
+                keepalive_timeout=http_pool_data.get("keepalive_timeout", 30.0),
+                dns_cache_ttl=http_pool_data.get("dns_cache_ttl", 300),
+            )
+
         # Parse error_protection configuration
         error_protection = ErrorProtectionConfig()
         error_protection_data = data.get("error_protection")
@@ -268,21 +374,113 @@ class CoordinatorConfig:
                 max_cooldown_seconds=error_protection_data.get("max_cooldown_seconds", 3600),
                 quota_detection_enabled=error_protection_data.get("quota_detection_enabled", True),
                 quota_margin_percent=error_protection_data.get("quota_margin_percent", 10),
+                early_quota_abort=error_protection_data.get("early_quota_abort", True),
+                quota_watch_interval=error_protection_data.get("quota_watch_interval", 2.0),
+                quota_scan_kb=error_protection_data.get("quota_scan_kb", 64),
+                quota_rules={
+                    provider: [
+                        QuotaRule(
+                            pattern=rule["pattern"],
+                            default_seconds=rule.get("default_seconds", DEFAULT_QUOTA_SECONDS)
+                        )
+                        for rule in rules or []
+                    ]
+                    for provider, rules in (error_protection_data.get("quota_rules") or {}).items()
+                },
+            )
+
+        # Parse adaptive_polling configuration
+        adaptive_polling = AdaptivePollingConfig()
+        adaptive_polling_data = data.get("adaptive_polling")
+        if adaptive_polling_data:
+            adaptive_polling = AdaptivePollingConfig(
+                enabled=adaptive_polling_data.get("enabled", False),
+                min_interval=adaptive_polling_data.get("min_interval", 2.0),
+                max_interval=adaptive_polling_data.get("max_interval", 60.0),
+                backoff_factor=adaptive_polling_data.get("backoff_factor", 2.0),
+                jitter=adaptive_polling_data.get("jitter", 0.1),
+            )
+
+        # Parse events configuration
+        events = EventSubscriptionConfig()
+        events_data = data.get("events")
+        if events_data:
+            events = EventSubscriptionConfig(
+                enabled=events_data.get("enabled", False),
+                endpoint=events_data.get("endpoint"),
+                safety_poll_interval=events_data.get("safety_poll_interval", 60),
+                reconnect_max_delay=events_data.get("reconnect_max_delay", 60.0),
+            )
+
+        # Parse mcp_proxy configuration
+        mcp_proxy = MCPProxyConfig()
+        mcp_proxy_data = data.get("mcp_proxy")
+        if mcp_proxy_data:
+            mcp_proxy = MCPProxyConfig(
+                enabled=mcp_proxy_data.get("enabled", False),
+                max_upstream_connections=mcp_proxy_data.get("max_upstream_connections", 4),
+                upstream_timeout=mcp_proxy_data.get("upstream_timeout", 300.0),
+                cache_ttl=mcp_proxy_data.get("cache_ttl", 300.0),
+                cacheable_tools=mcp_proxy_data.get(
+                    "cacheable_tools", MCPProxyConfig().cacheable_tools
+                ),
+                tool_cache_ttl=mcp_proxy_data.get("tool_cache_ttl", 30.0),
+            )
+
+        # Parse log_collector configuration
+        log_collector = LogCollectorConfig()
+        log_collector_data = data.get("log_collector")
+        if log_collector_data:
+            log_collector = LogCollectorConfig(
+                enabled=log_collector_data.get("enabled", False),
+                timestamps=log_collector_data.get("timestamps", True),
+                stream_tags=log_collector_data.get("stream_tags", True),
+                head_kb=log_collector_data.get("head_kb", 40960),
+                tail_kb=log_collector_data.get("tail_kb", 10240),
+                buffer_kb=log_collector_data.get("buffer_kb", 64),
+                flush_interval=log_collector_data.get("flush_interval", 1.0),
+            )
+
+        # Parse log_retention configuration (agents override the default policy)
+        log_retention = LogRetentionConfig()
+        log_retention_data = data.get("log_retention")
+        if log_retention_data:
+            default_policy = cls._parse_retention_policy(log_retention_data, LogRetentionPolicy())
+            log_retention = LogRetentionConfig(
+                enabled=log_retention_data.get("enabled", False),
+                interval_seconds=log_retention_data.get("interval_seconds", 3600.0),
+                default=default_policy,
+                agents={
+                    agent_id: cls._parse_retention_policy(policy_data or {}, default_policy)
+                    for agent_id, policy_data in (log_retention_data.get("agents") or {}).items()
+                },
             )
 
         return cls(
             polling_interval=data.get("polling_interval", 10),
             max_concurrent=data.get("max_concurrent", 3),
+            decision_concurrency=data.get("decision_concurrency", 4),
+            spawn_workers=data.get("spawn_workers", 4),
+            use_spawner=data.get("use_spawner", False),
+            reap_interval=data.get("reap_interval", 2.0),
+            profile_cache_ttl=data.get("profile_cache_ttl", 60.0),
             server_url=data.get("server_url"),
             mcp_socket_path=data.get("mcp_socket_path"),
+            mcp_max_connections=data.get("mcp_max_connections", 2),
             coordinator_token=coordinator_token,
             root_agent_id=data.get("root_agent_id"),
             ai_providers=ai_providers,
             agents=agents,
             log_directory=data.get("log_directory"),
+            log_collector=log_collector,
+            log_retention=log_retention,
             log_upload=log_upload,
+            http_pool=http_pool,
             debug_mode=data.get("debug_mode", True),
             error_protection=error_protection,
+            adaptive_polling=adaptive_polling,
+            events=events,
+            mcp_proxy=mcp_proxy,
             config_path=str(path),
         )
 
@@ -292,6 +490,7 @@ class CoordinatorConfig:
         server_url: str,
         token: str,
         root_agent_id: Optional[str] = None,
+        http_session: Optional[SharedHTTPSession] = None,
     ) -> "CoordinatorConfig":
         """Fetch configuration dynamically from the server.
 
@@ -299,6 +498,9 @@ class CoordinatorConfig:
             server_url: Base URL of the AI Agent PM server
             token: Coordinator token for authentication
             root_agent_id: Optional root agent ID for scoped configuration
+            http_session: Shared HTTP session to reuse. The boot-time fetch
+                          runs before any Coordinator exists, so it normally
+                          uses a short-lived session.
 
         Returns:
             CoordinatorConfig instance
@@ -321,19 +523,46 @@ class CoordinatorConfig:
             params["root_agent_id"] = root_agent_id
         headers = {"Authorization": f"Bearer {token}"}
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, params=params) as resp:
-                if resp.status == 401:
-                    raise ValueError("Invalid coordinator token")
-                if resp.status != 200:
-                    text = await resp.text()
-                    raise ConnectionError(
-                        f"Failed to fetch config: HTTP {resp.status} - {text}"
-                    )
-                data = await resp.json()
+        if http_session is not None:
+            session = await http_session.get()
+            data = await cls._fetch_server_config(session, url, headers, params)
+        else:
+            async with aiohttp.ClientSession() as session:
+                data = await cls._fetch_server_config(session, url, headers, params)
 
         return cls._from_server_response(data, token)
 
+    @staticmethod
+    def _parse_retention_policy(data: dict, base: LogRetentionPolicy) -> LogRetentionPolicy:
+        """Log retention policy from YAML; unset limits are taken from base."""
+        return LogRetentionPolicy(
+            max_age_days=data.get("max_age_days", base.max_age_days),
+            max_files=data.get("max_files", base.max_files),
+            max_total_mb=data.get("max_total_mb", base.max_total_mb),
+            compress=data.get("compress", base.compress),
+            compress_after_hours=data.get("compress_after_hours", base.compress_after_hours),
+        )
+
+    @staticmethod
+    async def _fetch_server_config(
+        session, url: str, headers: dict, params: dict
+    ) -> dict:
+        """GET /api/coordinator/config on the given session.
+
+        Raises:
+            ValueError: If authentication fails
+            ConnectionError: If the server returns an error status
+        """
+        async with session.get(url, headers=headers, params=params) as resp:
+            if resp.status == 401:
+                raise ValueError("Invalid coordinator token")
+            if resp.status != 200:
+                text = await resp.text()
+                raise ConnectionError(
+                    f"Failed to fetch config: HTTP {resp.status} - {text}"
+                )
+            return await resp.json()
+
     @classmethod
     def _from_server_response(cls, data: dict, token: str) -> "CoordinatorConfig":
         """Build CoordinatorConfig from server API response.
@@ -0,0 +1,183 @@
+# src/aiagent_runner/events.py
+# Server-push event subscription (Server-Sent Events) for the Coordinator
+# Reference: docs/plan/PHASE4_COORDINATOR_ARCHITECTURE.md
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from aiagent_runner.http_session import HAS_AIOHTTP, SharedHTTPSession
+
+if HAS_AIOHTTP:
+    import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Event types pushed by the server
+EVENT_PAIR_WORK = "pair_work"                # An (agent_id, project_id) pair may have work
+EVENT_TOPOLOGY_CHANGED = "topology_changed"  # Projects or agent assignments changed
+EVENT_PROFILE_CHANGED = "profile_changed"    # An agent's system prompt or skills changed
+
+
+class _UnsupportedEndpoint(Exception):
+    """The server has no event endpoint (HTTP 404/405)."""
+    pass
+
+
+@dataclass
+class EventSubscriptionConfig:
+    """Server-push subscription configuration.
+
+    When enabled and connected, the Coordinator evaluates only the pairs
+    named by pushed events and falls back to a full tick every
+    safety_poll_interval seconds (or immediately while disconnected).
+    """
+    # Enable/disable the subscription
+    enabled: bool = False
+
+    # SSE endpoint; derived from the REST API base URL when not set
+    endpoint: Optional[str] = None
+
+    # Seconds between full ticks while the subscription is connected
+    safety_poll_interval: int = 60
+
+    # Upper bound for the reconnect backoff (seconds)
+    reconnect_max_delay: float = 60.0
+
+
+@dataclass
+class CoordinatorEvent:
+    """An event pushed by the server."""
+    type: str
+    agent_id: Optional[str] = None
+    project_id: Optional[str] = None
+
+
+class EventSubscriber:
+    """Keeps an SSE stream open and hands parsed events to a callback.
+
+    Reconnects with exponential backoff. If the server answers 404/405 the
+    endpoint is considered unsupported and the subscriber stops for good,
+    leaving the Coordinator on plain polling.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        coordinator_token: Optional[str],
+        http_session: SharedHTTPSession,
+        on_event: Callable[[CoordinatorEvent], None],
+        on_state_change: Optional[Callable[[bool], None]] = None,
+        reconnect_max_delay: float = 60.0
+    ):
+        """Initialize the subscriber (nothing is opened until run()).
+
+        Args:
+            endpoint: SSE endpoint URL
+            coordinator_token: Sent as Bearer token
+            http_session: Shared HTTP session
+            on_event: Called for every event received
+            on_state_change: Called with True on connect and False on disconnect
+            reconnect_max_delay: Upper bound for the reconnect backoff (seconds)
+        """
+        self.endpoint = endpoint
+        self._coordinator_token = coordinator_token
+        self._http_session = http_session
+        self._on_event = on_event
+        self._on_state_change = on_state_change
+        self._reconnect_max_delay = reconnect_max_delay
+        self._connected = False
+        self._unsupported = False
+
+    @property
+    def connected(self) -> bool:
+        """True while the event stream is open."""
+        return self._connected
+
+    @property
+    def unsupported(self) -> bool:
+        """True once the server reported that it has no event endpoint."""
+        return self._unsupported
+
+    async def run(self) -> None:
+        """Subscribe until cancelled or the endpoint turns out unsupported."""
+        delay = 1.0
+        while True:
+            try:
+                await self._stream()
+                delay = 1.0
+            except asyncio.CancelledError:
+                self._set_connected(False)
+                raise
+            except _UnsupportedEndpoint as e:
+                self._set_connected(False)
+                self._unsupported = True
+                logger.info(f"Event subscription not supported by server ({e}), using polling")
+                return
+            except Exception as e:
+                logger.debug(f"Event stream error: {e}")
+            self._set_connected(False)
+            logger.debug(f"Reconnecting event stream in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self._reconnect_max_delay)
+
+    async def _stream(self) -> None:
+        headers = {"Accept": "text/event-stream"}
+        if self._coordinator_token:
+            headers["Authorization"] = f"Bearer {self._coordinator_token}"
+        session = await self._http_session.get()
+        # No total timeout: the stream stays open indefinitely
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=10)
+        async with session.get(self.endpoint, headers=headers, timeout=timeout) as response:
+            if response.status in (404, 405):
+                raise _UnsupportedEndpoint(f"HTTP {response.status}")
+            if response.status != 200:
+                raise ConnectionError(f"HTTP {response.status}")
+            logger.info(f"Event stream connected: {self.endpoint}")
+            self._set_connected(True)
+
+            event_type: Optional[str] = None
+            data_lines: list[str] = []
+            async for raw in response.content:
+                line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+                if not line:
+                    # Blank line terminates an event
+                    if data_lines or event_type:
+                        self._dispatch(event_type, "\n".join(data_lines))
+                    event_type, data_lines = None, []
+                elif line.startswith(":"):
+                    continue  # Comment / keep-alive
+                elif line.startswith("event:"):
+                    event_type = line[6:].strip()
+                elif line.startswith("data:"):
+                    data_lines.append(line[5:].lstrip())
+        logger.info("Event stream closed by server")
+
+    def _dispatch(self, event_type: Optional[str], data: str) -> None:
+        payload: dict = {}
+        if data:
+            try:
+                payload = json.loads(data)
+            except json.JSONDecodeError:
+                logger.debug(f"Ignoring malformed event data: {data[:100]}")
+                return
+        event = CoordinatorEvent(
+            type=event_type or payload.get("type", ""),
+            agent_id=payload.get("agent_id"),
+            project_id=payload.get("project_id"),
+        )
+        if not event.type:
+            return
+        try:
+            self._on_event(event)
+        except Exception:
+            logger.exception(f"Event handler failed for {event}")
+
+    def _set_connected(self, connected: bool) -> None:
+        if connected == self._connected:
+            return
+        self._connected = connected
+        if self._on_state_change:
+            self._on_state_change(connected)
@@ -0,0 +1,95 @@
+# src/aiagent_runner/http_session.py
+# Shared, pooled aiohttp ClientSession for HTTP traffic to the server
+# Reference: docs/design/MULTI_DEVICE_IMPLEMENTATION_PLAN.md
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+# HTTP transport support (optional dependency)
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HTTPPoolConfig:
+    """Connection pool settings for the shared HTTP session."""
+    # Total simultaneous connections across all hosts
+    limit: int = 20
+
+    # Simultaneous connections to a single host (0 = unlimited)
+    limit_per_host: int = 8
+
+    # Seconds an idle keep-alive connection stays open
+    keepalive_timeout: float = 30.0
+
+    # Seconds resolved DNS entries are cached
+    dns_cache_ttl: int = 300
+
+
+class SharedHTTPSession:
+    """Lazily created aiohttp.ClientSession shared by every HTTP client.
+
+    Reusing one session keeps connections alive and caches DNS lookups and
+    TLS sessions across MCP calls, log uploads and config fetches. The
+    session is created on first use (it must be bound to the running event
+    loop) and closed by its owner, normally the Coordinator.
+    """
+
+    def __init__(self, config: Optional[HTTPPoolConfig] = None):
+        """Initialize without opening any connection.
+
+        Args:
+            config: Pool settings (defaults to HTTPPoolConfig())
+        """
+        self.config = config or HTTPPoolConfig()
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def closed(self) -> bool:
+        """True if no session is open."""
+        return self._session is None or self._session.closed
+
+    async def get(self) -> "aiohttp.ClientSession":
+        """Return the shared session, creating it on first use.
+
+        Raises:
+            ImportError: If aiohttp is not installed
+        """
+        if not HAS_AIOHTTP:
+            raise ImportError(
+                "HTTP transport requires aiohttp. Install with: pip install aiohttp"
+            )
+        if not self.closed:
+            return self._session
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=self.config.limit,
+                    limit_per_host=self.config.limit_per_host,
+                    keepalive_timeout=self.config.keepalive_timeout,
+                    ttl_dns_cache=self.config.dns_cache_ttl,
+                )
+                self._session = aiohttp.ClientSession(connector=connector)
+                logger.debug(
+                    f"Created shared HTTP session (limit={self.config.limit}, "
+                    f"per_host={self.config.limit_per_host})"
+                )
+        return self._session
+
+    async def close(self) -> None:
+        """Close the session and its pooled connections. Safe to call twice."""
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
+            logger.debug("Closed shared HTTP session")
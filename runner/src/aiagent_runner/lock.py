@@ -41,6 +41,16 @@ def get_runtime_dir() -> Path:
         return Path(f"/tmp/aiagent-runner-{os.getuid()}")
 
 
+def config_hash(config_path: str) -> str:
+    """Short deterministic hash of a config path.
+
+    Names the per-configuration files (lock, control socket, upload spool),
+    so Coordinators with different configurations never share them.
+    """
+    abs_path = os.path.abspath(config_path)
+    return hashlib.sha256(abs_path.encode()).hexdigest()[:12]
+
+
 class CoordinatorLockError(Exception):
     """Base exception for coordinator lock errors."""
     pass
@@ -97,9 +107,16 @@ class CoordinatorLock:
         Uses SHA-256 hash of the absolute config path to generate
         a unique but deterministic lock file name.
         """
-        abs_path = os.path.abspath(self._config_path)
-        config_hash = hashlib.sha256(abs_path.encode()).hexdigest()[:12]
-        return self._lock_dir / f"coordinator-{config_hash}.lock"
+        return self._lock_dir / f"coordinator-{config_hash(self._config_path)}.lock"
+
+    @property
+    def control_socket_path(self) -> Path:
+        """Path of the control socket for the Coordinator using this config.
+
+        Lives next to the lock file and shares its hash, so a client that
+        knows the config path can find the running Coordinator.
+        """
+        return self._lock_dir / f"coordinator-{config_hash(self._config_path)}.sock"
 
     def acquire(self, timeout: float = 0) -> None:
         """Acquire the coordinator lock.
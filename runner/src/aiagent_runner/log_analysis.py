@@ -0,0 +1,141 @@
+# src/aiagent_runner/log_analysis.py
+# Single-pass analysis of an exited Agent Instance's log
+# Reference: docs/design/SPAWN_ERROR_PROTECTION.md
+
+import logging
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from aiagent_runner.quota_detector import OUTPUT_MARKER, QuotaDetection, QuotaErrorDetector
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the end of the log; CLIs print the fatal error last
+DEFAULT_TAIL_BYTES = 64 * 1024
+
+# Number of trailing lines searched for the error message
+ERROR_SEARCH_LINES = 50
+
+# Substrings (case-insensitive) marking an error line
+ERROR_PATTERNS = [
+    "[api error:",
+    "error:",
+    "quota",
+    "rate limit",
+    "exhausted",
+    "unauthorized",
+    "authentication failed",
+]
+
+
+@dataclass
+class LogAnalysis:
+    """Everything the Coordinator needs from a log after the process exits."""
+    error_message: Optional[str]            # Last error line, if any
+    quota: Optional[QuotaDetection]         # Set if the error output shows a quota error
+    size: int                               # Log size in bytes
+    lines: int                              # Lines in the part that was read
+    truncated: bool                         # Only the tail of the log was read
+
+    @property
+    def quota_cooldown_seconds(self) -> Optional[int]:
+        return self.quota.seconds if self.quota else None
+
+
+def read_tail(path: str, max_bytes: int = DEFAULT_TAIL_BYTES) -> tuple[str, int, int]:
+    """Read the last max_bytes of a file.
+
+    When the file is larger, the partial first line is dropped.
+
+    Returns:
+        (text, file size in bytes, byte offset of text in the file)
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        start = max(0, size - max_bytes)
+        f.seek(start)
+        data = f.read(size - start)
+    if start > 0:
+        newline = data.find(b"\n")
+        start = size if newline < 0 else start + newline + 1
+        data = data[newline + 1:] if newline >= 0 else b""
+    return data.decode("utf-8", errors="replace"), size, start
+
+
+def find_error_line(lines: list[str]) -> Optional[str]:
+    """Return the last line (of the final ERROR_SEARCH_LINES) that looks like an error."""
+    for line in reversed(lines[-ERROR_SEARCH_LINES:]):
+        line_lower = line.lower()
+        if any(pattern in line_lower for pattern in ERROR_PATTERNS):
+            return line.strip()
+    return None
+
+
+def analyze_log(
+    path: str,
+    quota_detector: Optional[QuotaErrorDetector] = None,
+    tail_bytes: int = DEFAULT_TAIL_BYTES
+) -> Optional[LogAnalysis]:
+    """Read the tail of a log once and extract the error line and quota verdict.
+
+    Both only look at the CLI output: an echoed prompt (before the
+    "=== OUTPUT ===" marker) is skipped, and quota rules are only matched
+    against error lines and structured error events.
+
+    Args:
+        path: Log file
+        quota_detector: Detector for the quota verdict (None skips detection)
+        tail_bytes: Bytes read from the end of the file
+
+    Returns:
+        The analysis, or None if the log could not be read
+    """
+    try:
+        text, size, start = read_tail(path, tail_bytes)
+    except OSError as e:
+        logger.warning(f"Failed to read log file {path}: {e}")
+        return None
+    return analyze_text(text, size, start, quota_detector, source=path)
+
+
+def analyze_text(
+    text: str,
+    size: int,
+    start: int,
+    quota_detector: Optional[QuotaErrorDetector] = None,
+    source: str = "log"
+) -> LogAnalysis:
+    """Analyze the last part of a log that is already in memory.
+
+    Args:
+        text: Complete lines at the end of the log
+        size: Total log size in bytes
+        start: Byte offset of text in the log (0 if text is the whole log)
+        quota_detector: Detector for the quota verdict (None skips detection)
+        source: Name used in the debug log
+
+    Returns:
+        The analysis
+    """
+    lines = text.splitlines()
+    marker = next(
+        (index for index in range(len(lines) - 1, -1, -1) if lines[index].strip() == OUTPUT_MARKER),
+        None
+    )
+    output_lines = lines if marker is None else lines[marker + 1:]
+    analysis = LogAnalysis(
+        error_message=find_error_line(output_lines),
+        quota=quota_detector.detect_in_output(text, start) if quota_detector else None,
+        size=size,
+        lines=len(lines),
+        truncated=start > 0,
+    )
+    logger.debug(
+        f"Analyzed {source}: {size} bytes{' (tail only)' if analysis.truncated else ''}, "
+        f"{analysis.lines} lines, quota={analysis.quota}"
+    )
+    return analysis
@@ -0,0 +1,363 @@
+# src/aiagent_runner/log_collector.py
+# Central collection of Agent Instance output through pipes
+# Reference: docs/design/LOG_TRANSFER_DESIGN.md
+
+import asyncio
+import codecs
+import logging
+import os
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional
+
+from aiagent_runner.log_analysis import LogAnalysis, analyze_text
+from aiagent_runner.quota_detector import QuotaErrorDetector, select_error_lines
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from a pipe per readiness event
+READ_SIZE = 64 * 1024
+
+# A line without newline is written out once it grows this long
+MAX_LINE_BYTES = 64 * 1024
+
+STREAM_STDOUT = "out"
+STREAM_STDERR = "err"
+
+
+@dataclass
+class LogCollectorConfig:
+    """Pipe-based collection of instance output.
+
+    When enabled (POSIX only), instances write stdout and stderr to pipes
+    that the Coordinator reads in its event loop, instead of each instance
+    writing to a log file the Coordinator holds open. Lines can be
+    annotated, the size of each log is capped and the same stream feeds
+    quota detection, so logs are not re-read for it.
+    """
+    # Enable/disable the collector
+    enabled: bool = False
+
+    # Prefix every line with the time it was read
+    timestamps: bool = True
+
+    # Prefix every line with its stream ([out] / [err])
+    stream_tags: bool = True
+
+    # Bytes written from the start of the output (0: no cap)
+    head_kb: int = 40960
+
+    # Bytes kept from the end once the head is full; written when the
+    # instance exits, after a marker line with the number of dropped bytes
+    tail_kb: int = 10240
+
+    # Write buffer of each log file
+    buffer_kb: int = 64
+
+    # Seconds buffered output may wait before it is written to the file
+    flush_interval: float = 1.0
+
+
+class CollectedLog:
+    """Output of one instance: two pipes in, one buffered log file out.
+
+    Created (with its pipes and file) off the event loop by
+    LogCollector.open(); the write ends go to the child and are closed
+    here once it has been spawned. Everything else runs on the event loop.
+    """
+
+    def __init__(self, path: str, config: LogCollectorConfig, analysis_bytes: int):
+        self.path = path
+        self._config = config
+        self._file = open(path, "wb", buffering=max(1, config.buffer_kb) * 1024)
+        self._pipes: dict[int, tuple[str, int]] = {}  # read fd -> (stream, write fd)
+        try:
+            for stream in (STREAM_STDOUT, STREAM_STDERR):
+                read_fd, write_fd = os.pipe()
+                os.set_blocking(read_fd, False)
+                self._pipes[read_fd] = (stream, write_fd)
+        except OSError:
+            self._close_fds()
+            self._file.close()
+            raise
+        self._partial: dict[int, bytes] = {fd: b"" for fd in self._pipes}
+        self._decoders = {fd: codecs.getincrementaldecoder("utf-8")(errors="replace") for fd in self._pipes}
+
+        # Called with the text of complete output lines as they arrive and the
+        # offset of the first one in the log file (None while held for the tail)
+        self.on_output: Optional[Callable[[str, Optional[int]], None]] = None
+
+        # Bytes of the annotation in front of every line in the file
+        self.prefix_bytes = len(self._prefix(STREAM_STDOUT))
+
+        self.received = 0  # Bytes of output read from the pipes
+        self.written = 0   # Bytes in the log file
+        self.dropped = 0   # Bytes dropped between the head and the tail
+        self._head_full = False
+        self._tail: deque[bytes] = deque()
+        self._tail_bytes = 0
+        self._recent: deque[tuple[int, str, Optional[int]]] = deque()  # (bytes, text, file offset)
+        self._recent_bytes = 0
+        self._analysis_bytes = analysis_bytes
+        self.closed = False
+
+    def write_fds(self) -> tuple[int, int]:
+        """(stdout, stderr) file descriptors to hand to the child."""
+        return tuple(write_fd for _stream, write_fd in self._pipes.values())
+
+    def read_fds(self) -> list[int]:
+        return list(self._pipes)
+
+    def spawned(self) -> None:
+        """Close the parent's copies of the write ends (EOF once the child exits)."""
+        for fd, (stream, write_fd) in self._pipes.items():
+            if write_fd >= 0:
+                os.close(write_fd)
+                self._pipes[fd] = (stream, -1)
+
+    def analyze(self, quota_detector: Optional[QuotaErrorDetector] = None) -> LogAnalysis:
+        """Error line and quota verdict of the output received so far.
+
+        The quota offset points into the log file; it is None when the
+        matched output was held for the tail (its position is only fixed
+        when the file is finished).
+        """
+        text = "".join(text for _size, text, _offset in self._recent)
+        start = self.received - self._recent_bytes
+        analysis = analyze_text(text, self.received, start, source=self.path)
+        if quota_detector is not None:
+            offsets = [offset for _size, _text, offset in self._recent]
+            file_start = offsets[0] if offsets and None not in offsets else None
+            analysis.quota = quota_detector.detect_lines(
+                select_error_lines(text, file_start, self.prefix_bytes)
+            )
+        return analysis
+
+    def feed(self, fd: int, data: bytes) -> bool:
+        """Process bytes read from a pipe (data=b"" marks EOF).
+
+        Returns:
+            True if something was written to the file buffer
+        """
+        stream = self._pipes[fd][0]
+        buffer = self._partial[fd] + data
+        if data:
+            end = buffer.rfind(b"\n") + 1
+            if end == 0 and len(buffer) >= MAX_LINE_BYTES:
+                end = len(buffer)
+        else:
+            end = len(buffer)
+        self._partial[fd] = buffer[end:]
+        if not end:
+            return False
+        complete = buffer[:end]
+        if not complete.endswith(b"\n"):
+            # EOF, or a line longer than MAX_LINE_BYTES: end it here
+            complete += b"\n"
+
+        self.received += len(complete)
+        text = self._decoders[fd].decode(complete, final=not data)
+        offset = self.written
+        in_file = self._write_lines(stream, complete)
+        if in_file == complete.count(b"\n"):
+            chunks = [(len(complete), text, offset)]
+        elif in_file == 0:
+            chunks = [(len(complete), text, None)]
+        else:
+            # The head filled up within this chunk: the rest goes to the tail
+            head_size = sum(len(line) for line in _lines(complete)[:in_file])
+            head = "".join(line + "\n" for line in text.split("\n")[:in_file])
+            chunks = [(head_size, head, offset), (len(complete) - head_size, text[len(head):], None)]
+
+        for chunk in chunks:
+            self._recent.append(chunk)
+            self._recent_bytes += chunk[0]
+        while self._recent_bytes > self._analysis_bytes and len(self._recent) > 1:
+            self._recent_bytes -= self._recent.popleft()[0]
+
+        if self.on_output is not None:
+            for _size, chunk_text, chunk_offset in chunks:
+                try:
+                    self.on_output(chunk_text, chunk_offset)
+                except Exception:
+                    logger.exception(f"Output callback failed for {self.path}")
+        return True
+
+    def flush(self) -> None:
+        if not self.closed:
+            try:
+                self._file.flush()
+            except OSError as e:
+                logger.warning(f"Failed to write log file {self.path}: {e}")
+
+    def close(self) -> None:
+        """Write the pending partial lines and the kept tail, then close the file."""
+        if self.closed:
+            return
+        for fd in list(self._pipes):
+            self.feed(fd, b"")
+        try:
+            if self.dropped:
+                self._file.write(f"... {self.dropped} bytes omitted ...\n".encode())
+            for line in self._tail:
+                self._file.write(line)
+            self._file.close()
+        except OSError as e:
+            logger.warning(f"Failed to write log file {self.path}: {e}")
+        self._tail.clear()
+        self._close_fds()
+        self.closed = True
+
+    def _write_lines(self, stream: str, data: bytes) -> int:
+        """Write lines to the file, or to the kept tail once the head is full.
+
+        Returns:
+            Number of leading lines that went to the file
+        """
+        prefix = self._prefix(stream)
+        if prefix:
+            data = b"".join(prefix + line for line in _lines(data))
+        head_limit = self._config.head_kb * 1024
+        if not head_limit or (not self._head_full and self.written + len(data) <= head_limit):
+            self._write(data)
+            return data.count(b"\n")
+
+        in_file = 0
+        for line in _lines(data):
+            if not self._head_full and self.written + len(line) <= head_limit:
+                self._write(line)
+                in_file += 1
+                continue
+            self._head_full = True
+            self._tail.append(line)
+            self._tail_bytes += len(line)
+            while self._tail_bytes > self._config.tail_kb * 1024 and self._tail:
+                dropped = self._tail.popleft()
+                self._tail_bytes -= len(dropped)
+                self.dropped += len(dropped)
+        return in_file
+
+    def _write(self, data: bytes) -> None:
+        try:
+            self._file.write(data)
+        except OSError as e:
+            logger.warning(f"Failed to write log file {self.path}: {e}")
+            return
+        self.written += len(data)
+
+    def _prefix(self, stream: str) -> bytes:
+        parts = []
+        if self._config.timestamps:
+            parts.append(datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3])
+        if self._config.stream_tags:
+            parts.append(f"[{stream}]")
+        return f"{' '.join(parts)} ".encode() if parts else b""
+
+    def _close_fds(self) -> None:
+        for fd, (stream, write_fd) in list(self._pipes.items()):
+            for descriptor in (fd, write_fd):
+                if descriptor >= 0:
+                    try:
+                        os.close(descriptor)
+                    except OSError:
+                        pass
+            self._pipes[fd] = (stream, -1)
+
+
+def _lines(data: bytes) -> list[bytes]:
+    """Split newline-terminated data into lines (at newlines only, unlike splitlines)."""
+    return [line + b"\n" for line in data.split(b"\n")[:-1]]
+
+
+class LogCollector:
+    """Reads the output pipes of every instance in the Coordinator's event loop.
+
+    One selector (epoll/kqueue, via loop.add_reader) watches all pipes, so
+    the Coordinator holds no log file open per instance between writes and
+    output never blocks on disk. Each log is written through a buffered
+    writer that is flushed at most flush_interval after new output.
+    """
+
+    def __init__(self, config: LogCollectorConfig, loop: asyncio.AbstractEventLoop):
+        """Initialize the collector.
+
+        Args:
+            config: Collector settings
+            loop: Event loop reading the pipes (must support add_reader)
+        """
+        self.config = config
+        self._loop = loop
+        self._logs: set[CollectedLog] = set()
+        self._flush_timers: dict[CollectedLog, asyncio.TimerHandle] = {}
+
+    def open(self, path: str, analysis_bytes: int = 64 * 1024) -> CollectedLog:
+        """Create the log file and pipes of a new instance (thread-safe, blocking).
+
+        Args:
+            path: Log file (created or truncated)
+            analysis_bytes: Bytes of recent output kept for analyze()
+
+        Raises:
+            OSError: If the file or the pipes cannot be created
+        """
+        return CollectedLog(path, self.config, analysis_bytes)
+
+    def attach(self, log: CollectedLog) -> None:
+        """Start reading the pipes of a spawned instance (on the event loop)."""
+        log.spawned()
+        self._logs.add(log)
+        for fd in log.read_fds():
+            self._loop.add_reader(fd, self._on_readable, log, fd)
+
+    def close(self, log: CollectedLog) -> None:
+        """Read what is left in the pipes, stop watching them and finish the file."""
+        if log.closed:
+            return
+        for fd in log.read_fds():
+            self._drain(log, fd)
+        self._detach(log)
+        log.close()
+
+    def close_all(self) -> None:
+        for log in list(self._logs):
+            self.close(log)
+
+    def _on_readable(self, log: CollectedLog, fd: int) -> None:
+        try:
+            data = os.read(fd, READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            logger.debug(f"Failed to read output pipe of {log.path}: {e}")
+            data = b""
+        if not data:
+            self._loop.remove_reader(fd)
+        if log.feed(fd, data) and log not in self._flush_timers:
+            self._flush_timers[log] = self._loop.call_later(self.config.flush_interval, self._flush, log)
+
+    def _flush(self, log: CollectedLog) -> None:
+        self._flush_timers.pop(log, None)
+        log.flush()
+
+    def _drain(self, log: CollectedLog, fd: int) -> None:
+        # Output written just before the exit may not have been read yet
+        while True:
+            try:
+                data = os.read(fd, READ_SIZE)
+            except OSError:  # Includes BlockingIOError: nothing left for now
+                return
+            if not data:
+                return
+            log.feed(fd, data)
+
+    def _detach(self, log: CollectedLog) -> None:
+        self._logs.discard(log)
+        timer = self._flush_timers.pop(log, None)
+        if timer is not None:
+            timer.cancel()
+        for fd in log.read_fds():
+            try:
+                self._loop.remove_reader(fd)
+            except (ValueError, OSError):
+                pass
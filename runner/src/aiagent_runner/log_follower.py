@@ -0,0 +1,68 @@
+# src/aiagent_runner/log_follower.py
+# Offset-tracked tailing of Agent Instance log files
+# Reference: docs/design/SPAWN_ERROR_PROTECTION.md
+
+import codecs
+import logging
+import os
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Upper bound of bytes read per call, so one very chatty log cannot stall a scan
+DEFAULT_MAX_READ_BYTES = 1024 * 1024
+
+
+class LogFollower:
+    """Returns the text appended to a log file since the previous call.
+
+    The file is reopened on every read and only the bytes past the last
+    offset are read, so following many logs costs one stat() per idle file
+    and works on every platform and filesystem (inotify would be
+    Linux-only). Multi-byte UTF-8 sequences split across reads are decoded
+    correctly. A file that shrank (truncated or replaced) is read again
+    from the start.
+    """
+
+    def __init__(self, path: str, max_read_bytes: int = DEFAULT_MAX_READ_BYTES):
+        """Initialize the follower.
+
+        Args:
+            path: Log file to follow (may not exist yet)
+            max_read_bytes: Maximum number of bytes returned by one read_new()
+        """
+        self.path = path
+        self._max_read_bytes = max_read_bytes
+        self._offset = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    @property
+    def offset(self) -> int:
+        """Number of bytes consumed so far."""
+        return self._offset
+
+    def read_new(self) -> str:
+        """Read the text appended since the last call ("" if nothing new)."""
+        size = self._size()
+        if size is None or size == self._offset:
+            return ""
+        if size < self._offset:
+            logger.debug(f"Log file {self.path} shrank, following from the start")
+            self._offset = 0
+            self._decoder.reset()
+
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read(min(size - self._offset, self._max_read_bytes))
+        except OSError as e:
+            logger.debug(f"Failed to read log file {self.path}: {e}")
+            return ""
+        self._offset += len(data)
+        return self._decoder.decode(data)
+
+    def _size(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_size
+        except OSError:
+            return None
@@ -0,0 +1,343 @@
+# src/aiagent_runner/log_retention.py
+# Retention, compression and indexing of Agent Instance log directories
+# Reference: docs/design/LOG_TRANSFER_DESIGN.md
+
+import gzip
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from aiagent_runner.context_writer import atomic_write_text
+
+logger = logging.getLogger(__name__)
+
+# Per-directory index of the logs it holds
+INDEX_FILE = ".index.json"
+INDEX_VERSION = 1
+
+COMPRESSED_SUFFIX = ".gz"
+
+
+@dataclass
+class LogRetentionPolicy:
+    """Limits for one agent's log directory (0 disables a limit)."""
+    # Logs older than this are deleted
+    max_age_days: float = 30.0
+
+    # Only the newest max_files logs are kept (a .debug.log counts as a log)
+    max_files: int = 500
+
+    # Oldest logs are deleted while the directory holds more than this
+    max_total_mb: int = 1024
+
+    # Closed logs older than compress_after_hours are gzip-compressed
+    compress: bool = True
+    compress_after_hours: float = 24.0
+
+
+@dataclass
+class LogRetentionConfig:
+    """Background retention of the log directories under <working_dir>/.aiagent/logs.
+
+    Directories are indexed (INDEX_FILE) so a pass does not list or stat
+    the files; a directory without index is scanned once to build it.
+    """
+    # Enable/disable the retention engine
+    enabled: bool = False
+
+    # Seconds between retention passes
+    interval_seconds: float = 3600.0
+
+    # Policy for every agent
+    default: LogRetentionPolicy = field(default_factory=LogRetentionPolicy)
+
+    # Per-agent overrides (agent_id -> policy)
+    agents: dict[str, LogRetentionPolicy] = field(default_factory=dict)
+
+    def policy_for(self, agent_id: str) -> LogRetentionPolicy:
+        return self.agents.get(agent_id, self.default)
+
+
+@dataclass
+class LogIndexEntry:
+    """One log file in a directory index."""
+    name: str
+    size: int
+    mtime: float
+    compressed: bool = False
+
+
+@dataclass
+class RetentionStats:
+    """Result of one retention pass."""
+    directories: int = 0
+    deleted: int = 0
+    compressed: int = 0
+    freed_bytes: int = 0
+
+
+class LogIndex:
+    """The logs of one directory, oldest first, persisted in INDEX_FILE."""
+
+    def __init__(self, directory: Path, entries: list[LogIndexEntry]):
+        self.directory = directory
+        self.entries = entries
+
+    @classmethod
+    def load(cls, directory: Path, check_stale: bool = False) -> "LogIndex":
+        """Read the index, or build it from the directory if it is missing or unreadable.
+
+        Args:
+            directory: Log directory
+            check_stale: Also rebuild it if the directory changed after the
+                         index was saved (e.g. logs closed while the
+                         Coordinator was not running)
+        """
+        index_path = directory / INDEX_FILE
+        try:
+            # Equal times count as stale: the file system clock may be too
+            # coarse to order a later change after the save
+            if check_stale and directory.stat().st_mtime_ns >= index_path.stat().st_mtime_ns:
+                logger.debug(f"Log directory {directory} changed since it was indexed")
+                return cls.scan(directory)
+            data = json.loads(index_path.read_text(encoding="utf-8"))
+            if data.get("version") == INDEX_VERSION:
+                return cls(directory, [LogIndexEntry(**entry) for entry in data["entries"]])
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Rebuilding unreadable log index in {directory}: {e}")
+        return cls.scan(directory)
+
+    @classmethod
+    def scan(cls, directory: Path) -> "LogIndex":
+        entries = []
+        try:
+            with os.scandir(directory) as it:
+                for item in it:
+                    if not _is_log_name(item.name) or not item.is_file():
+                        continue
+                    stat = item.stat()
+                    entries.append(LogIndexEntry(
+                        item.name, stat.st_size, stat.st_mtime, item.name.endswith(COMPRESSED_SUFFIX)
+                    ))
+        except FileNotFoundError:
+            pass
+        entries.sort(key=lambda entry: (entry.mtime, entry.name))
+        logger.info(f"Indexed {len(entries)} log(s) in {directory}")
+        return cls(directory, entries)
+
+    def save(self) -> None:
+        data = {"version": INDEX_VERSION, "entries": [asdict(entry) for entry in self.entries]}
+        index_path = self.directory / INDEX_FILE
+        atomic_write_text(index_path, json.dumps(data))
+        # The rename above changed the directory; the index must not look stale
+        os.utime(index_path)
+
+    @property
+    def total_size(self) -> int:
+        return sum(entry.size for entry in self.entries)
+
+    def add(self, name: str, size: int, mtime: float) -> None:
+        self.remove(name)
+        self.entries.append(LogIndexEntry(name, size, mtime))
+        if len(self.entries) > 1 and self.entries[-2].mtime > mtime:
+            self.entries.sort(key=lambda entry: (entry.mtime, entry.name))
+
+    def remove(self, name: str) -> None:
+        self.entries = [entry for entry in self.entries if entry.name != name]
+
+
+class LogRetention:
+    """Keeps per-agent log directories within their retention policy.
+
+    The Coordinator reports every closed log with track() (and deleted
+    ones with forget()); these only queue the change, so they are cheap
+    to call from the event loop. Log directories written before a restart
+    are added with watch(). sweep() runs in a worker thread: it
+    applies the queued changes to the directory indexes, deletes the
+    oldest logs beyond the age, count and size limits and compresses the
+    remaining closed logs. Logs still in use (running instances, pending
+    uploads) are never touched. The first pass over a directory rebuilds
+    its index if the directory changed after the index was saved.
+    """
+
+    def __init__(self, config: LogRetentionConfig, clock: Callable[[], float] = time.time):
+        """Initialize the engine.
+
+        Args:
+            config: Retention settings
+            clock: Wall-clock time source
+        """
+        self.config = config
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._changes: list[tuple[Path, str, str, bool]] = []  # (directory, agent_id, name, added)
+        self._directories: dict[Path, str] = {}  # directory -> agent_id
+        # Directories whose index was checked against untracked changes;
+        # afterwards every change arrives through track() / forget()
+        self._verified: set[Path] = set()
+
+    def track(self, path: str, agent_id: str) -> None:
+        """Queue a closed log (missing files are ignored)."""
+        self._queue(path, agent_id, added=True)
+
+    def forget(self, path: str, agent_id: str) -> None:
+        """Queue the removal of a log that was deleted (e.g. after upload)."""
+        self._queue(path, agent_id, added=False)
+
+    def watch(self, directory: str, agent_id: str) -> None:
+        """Include an agent's log directory in the passes, even if no log was tracked in it.
+
+        Directories that do not exist are dropped again by the next pass.
+        """
+        with self._lock:
+            self._directories.setdefault(Path(os.path.abspath(directory)), agent_id)
+
+    def sweep(self, in_use: Iterable[str] = ()) -> RetentionStats:
+        """Apply queued changes and the policies to every known directory (blocking).
+
+        Args:
+            in_use: Paths of logs that must not be deleted or compressed
+        """
+        with self._lock:
+            changes, self._changes = self._changes, []
+            directories = dict(self._directories)
+        busy = {os.path.abspath(path) for path in in_use}
+
+        by_directory: dict[Path, list[tuple[str, bool]]] = {}
+        for directory, _agent_id, name, added in changes:
+            by_directory.setdefault(directory, []).append((name, added))
+
+        stats = RetentionStats()
+        for directory, agent_id in directories.items():
+            pending = by_directory.get(directory, [])
+            try:
+                self._sweep_directory(directory, self.config.policy_for(agent_id), pending, busy, stats)
+            except OSError as e:
+                logger.warning(f"Log retention failed for {directory}: {e}")
+                with self._lock:
+                    # Retried on the next pass
+                    self._changes[:0] = [(directory, agent_id, name, added) for name, added in pending]
+        stats.directories = len(directories)
+        if stats.deleted or stats.compressed:
+            logger.info(
+                f"Log retention: deleted {stats.deleted}, compressed {stats.compressed} log(s), "
+                f"freed {stats.freed_bytes // 1024} KB"
+            )
+        return stats
+
+    def _queue(self, path: str, agent_id: str, added: bool) -> None:
+        absolute = Path(os.path.abspath(path))
+        with self._lock:
+            self._directories[absolute.parent] = agent_id
+            self._changes.append((absolute.parent, agent_id, absolute.name, added))
+
+    def _sweep_directory(
+        self,
+        directory: Path,
+        policy: LogRetentionPolicy,
+        changes: list[tuple[str, bool]],
+        busy: set[str],
+        stats: RetentionStats
+    ) -> None:
+        if not directory.is_dir():
+            with self._lock:
+                self._directories.pop(directory, None)
+            return
+        index = LogIndex.load(directory, check_stale=directory not in self._verified)
+        self._verified.add(directory)
+        for name, added in changes:
+            if not added:
+                index.remove(name)
+                continue
+            try:
+                stat = (directory / name).stat()
+            except FileNotFoundError:
+                index.remove(name)
+                continue
+            index.add(name, stat.st_size, stat.st_mtime)
+
+        now = self._clock()
+        age_cutoff = now - policy.max_age_days * 86400 if policy.max_age_days > 0 else None
+        size_limit = policy.max_total_mb * 1024 * 1024 if policy.max_total_mb > 0 else None
+        count = len(index.entries)
+        total = index.total_size
+        kept: list[LogIndexEntry] = []
+        for entry in index.entries:  # Oldest first
+            path = str(directory / entry.name)
+            expired = (
+                (age_cutoff is not None and entry.mtime < age_cutoff)
+                or (policy.max_files > 0 and count > policy.max_files)
+                or (size_limit is not None and total > size_limit)
+            )
+            if expired and path not in busy and self._delete(path):
+                count -= 1
+                total -= entry.size
+                stats.deleted += 1
+                stats.freed_bytes += entry.size
+                continue
+            kept.append(entry)
+
+        if policy.compress:
+            compress_cutoff = now - policy.compress_after_hours * 3600
+            for entry in list(kept):
+                path = str(directory / entry.name)
+                if entry.compressed or entry.mtime >= compress_cutoff or path in busy:
+                    continue
+                if not os.path.exists(path):
+                    kept.remove(entry)  # Deleted behind our back (e.g. uploaded)
+                    continue
+                size = self._compress(path, entry.mtime)
+                if size is None:
+                    continue
+                stats.compressed += 1
+                stats.freed_bytes += max(0, entry.size - size)
+                entry.name += COMPRESSED_SUFFIX
+                entry.size = size
+                entry.compressed = True
+
+        index.entries = kept
+        index.save()
+
+    @staticmethod
+    def _delete(path: str) -> bool:
+        """Delete a log; True once it is gone."""
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            return True
+        except OSError as e:
+            logger.warning(f"Failed to delete log {path}: {e}")
+            return False
+        return True
+
+    @staticmethod
+    def _compress(path: str, mtime: float) -> Optional[int]:
+        """gzip path to path.gz (keeping its mtime) and delete it; returns the new size."""
+        target = path + COMPRESSED_SUFFIX
+        staging = target + ".tmp"
+        try:
+            with open(path, "rb") as source, gzip.open(staging, "wb", compresslevel=6) as output:
+                shutil.copyfileobj(source, output, 1024 * 1024)
+            os.utime(staging, (mtime, mtime))
+            os.replace(staging, target)
+            os.unlink(path)
+            return os.stat(target).st_size
+        except OSError as e:
+            logger.warning(f"Failed to compress log {path}: {e}")
+            try:
+                os.unlink(staging)
+            except OSError:
+                pass
+            return None
+
+
+def _is_log_name(name: str) -> bool:
+    return name.endswith(".log") or name.endswith(".log" + COMPRESSED_SUFFIX)
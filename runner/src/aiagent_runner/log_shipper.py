@@ -0,0 +1,119 @@
+# src/aiagent_runner/log_shipper.py
+# Ships the logs of running Agent Instances to the server while they run
+# Reference: docs/design/LOG_TRANSFER_DESIGN.md
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+from aiagent_runner.log_uploader import LogUploader
+
+logger = logging.getLogger(__name__)
+
+# Bytes searched backwards for the last complete line
+_LINE_SEARCH_BYTES = 64 * 1024
+
+# Consecutive failed flushes before live shipping of one log is given up
+MAX_SHIP_FAILURES = 5
+
+
+@dataclass
+class LogShipState:
+    """Progress of one running instance's log on the server."""
+    log_file_path: str
+    agent_id: str
+    task_id: str
+    project_id: str
+    started_after: float                    # Instance start (UNIX time), resolves the execution log
+    execution_log_id: Optional[str] = None  # Known once the server has resolved it
+    acked: int = 0                          # Bytes the server has stored
+    failures: int = 0
+    stopped: bool = False                   # Given up; the exit upload sends everything left
+    flushing: Optional[asyncio.Future] = field(default=None, repr=False, compare=False)  # Last flush()
+
+
+class LogShipper:
+    """Sends the bytes appended to running instances' logs in batches.
+
+    Every flush sends the complete lines written since the last
+    acknowledged offset (in requests of at most live_batch_kb) through the
+    chunked upload endpoint, so the web UI can follow long tasks. The final
+    upload after exit then only sends what is left. Logs that outgrow
+    max_file_size_mb are left to the exit upload, which keeps their tail.
+    """
+
+    def __init__(self, uploader: LogUploader):
+        """Initialize the shipper.
+
+        Args:
+            uploader: Uploader whose ship() sends the byte ranges
+        """
+        self._uploader = uploader
+
+    async def flush(self, state: LogShipState) -> int:
+        """Send the complete lines appended since the last acknowledged offset.
+
+        Returns:
+            Number of bytes the server acknowledged
+        """
+        if state.stopped:
+            return 0
+        config = self._uploader.config
+        loop = asyncio.get_running_loop()
+        end = await loop.run_in_executor(None, self._line_end, state.log_file_path, state.acked)
+        if end is None or end <= state.acked:
+            return 0
+        if end > config.max_file_size_mb * 1024 * 1024:
+            logger.info(f"Log {state.log_file_path} exceeds the upload limit, leaving it to the exit upload")
+            state.stopped = True
+            return 0
+
+        result = await self._uploader.ship(
+            state.log_file_path,
+            agent_id=state.agent_id,
+            task_id=state.task_id,
+            project_id=state.project_id,
+            offset=state.acked,
+            end=end,
+            execution_log_id=state.execution_log_id,
+            started_after=state.started_after
+        )
+        shipped = max(0, result.offset - state.acked)
+        state.acked = result.offset
+        if result.execution_log_id:
+            state.execution_log_id = result.execution_log_id
+
+        if result.log_file_path:
+            state.failures = 0
+        elif result.waiting:
+            logger.debug(f"Execution log for {state.log_file_path} not created yet")
+        else:
+            state.failures += 1
+            if state.failures >= MAX_SHIP_FAILURES:
+                logger.warning(
+                    f"Stopping live upload of {state.log_file_path} after {state.failures} failed flushes"
+                )
+                state.stopped = True
+        return shipped
+
+    @staticmethod
+    def _line_end(path: str, offset: int) -> Optional[int]:
+        """Offset just past the last newline after offset (None if the file is gone).
+
+        Lines longer than the search window are sent as they are.
+        """
+        try:
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size <= offset:
+                    return size
+                window = min(size - offset, _LINE_SEARCH_BYTES)
+                f.seek(size - window)
+                newline = f.read(window).rfind(b"\n")
+        except OSError:
+            return None
+        if newline >= 0:
+            return size - window + newline + 1
+        return size if window == _LINE_SEARCH_BYTES else offset
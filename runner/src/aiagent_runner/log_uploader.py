@@ -4,14 +4,27 @@
 
 import asyncio
 import logging
+import zlib
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
 
 import aiohttp
 
+from aiagent_runner.http_session import SharedHTTPSession
+
 logger = logging.getLogger(__name__)
 
+# 圧縮方式（content_encodingフィールドの値）
+ENCODING_IDENTITY = "identity"
+ENCODING_DEFLATE = "deflate"
+
+# 上限超過時に切り詰めた先頭部分の代わりに送る行
+TRUNCATION_MARKER = "[... {skipped} bytes of log truncated by coordinator ...]\n"
+
+# 末尾アップロード時に行頭を探す範囲
+_LINE_SEARCH_BYTES = 64 * 1024
+
 
 @dataclass
 class LogUploadConfig:
@@ -22,9 +35,43 @@ class LogUploadConfig:
     """
     enabled: bool = False
     endpoint: str = ""  # Set by CoordinatorConfig or directly
-    max_file_size_mb: int = 10
-    retry_count: int = 3
+    max_file_size_mb: int = 100  # これを超えるログは末尾のみアップロード
+    retry_count: int = 3  # チャンクごとのリトライ回数
     retry_delay_seconds: float = 1.0
+    chunk_size_kb: int = 4096  # 1リクエストで送る最大バイト数（サーバー上限10MB以下）
+    compression: str = ENCODING_DEFLATE  # "deflate" or "none"
+    live_enabled: bool = True  # 実行中のログを逐次サーバーへ送る
+    live_flush_interval_seconds: float = 5.0  # 実行中ログの送信間隔（秒）
+    live_batch_kb: int = 1024  # 実行中ログの1リクエストあたりの最大サイズ（KB）
+    workers: int = 2  # 同時に実行するアップロード数
+    max_attempts: int = 5  # アップロードを諦めるまでの試行回数（試行ごとにretry_count回リトライ）
+    backoff_base_seconds: float = 5.0  # 失敗後の再試行間隔（試行ごとに倍増、ジッター付き）
+    backoff_max_seconds: float = 300.0
+    drain_timeout_seconds: float = 10.0  # 停止時に残りのアップロードを待つ最大秒数
+    spool_directory: Optional[str] = None  # 未送信ログの記録先（未指定時はデータディレクトリ/upload_spool/<設定のハッシュ>）
+
+
+@dataclass
+class ShipResult:
+    """送信結果"""
+    offset: int  # サーバーが受け取り済みのバイト数（送信ストリーム上の位置）
+    log_file_path: Optional[str] = None  # 成功時: アップロード先のパス
+    execution_log_id: Optional[str] = None  # サーバーが解決した実行ログID
+    waiting: bool = False  # 実行ログがまだサーバーに無い（エージェントがタスク取得前）
+
+
+@dataclass
+class _ChunkResponse:
+    """チャンク送信に対するサーバーの応答"""
+    status: int
+    log_file_path: Optional[str] = None
+    file_size: Optional[int] = None  # サーバー上のファイルサイズ（不明時None）
+    execution_log_id: Optional[str] = None
+
+
+class _ServerMismatch(Exception):
+    """サーバーがチャンク転送・圧縮に対応していない"""
+    pass
 
 
 class LogUploader:
@@ -32,19 +79,35 @@ class LogUploader:
     ログファイルをRESTサーバーにアップロードするクラス
 
     非同期でログファイルをプロジェクトのworkingDirectory配下に転送する。
-    リトライ機能付きで、一時的なネットワーク障害に対応。
+    ファイルはchunk_size_kbずつディスクから読み出し、チャンクごとにdeflate圧縮して
+    chunk_offset付きで送信する（サーバー側で追記）。メモリ使用量はログの大きさに
+    依存しない。リトライはチャンク単位で、応答を受け取れなかったチャンクが
+    既に書き込まれていた場合はサーバーのファイルサイズから再開する。
+    max_file_size_mbを超えるログは末尾のみを送る。
+
+    実行中のログはship()で受け取り済みの位置から追記していき、終了後のupload()は
+    その位置から残りだけを送る。
     """
 
-    def __init__(self, config: LogUploadConfig, coordinator_token: str):
+    def __init__(
+        self,
+        config: LogUploadConfig,
+        coordinator_token: str,
+        http_session: Optional[SharedHTTPSession] = None
+    ):
         """
         LogUploaderを初期化
 
         Args:
             config: アップロード設定
             coordinator_token: 認証用トークン
+            http_session: 共有HTTPセッション（未指定時はリクエスト毎にセッションを作成）
         """
         self.config = config
         self.coordinator_token = coordinator_token
+        self.http_session = http_session
+        # サーバーが圧縮に対応していないと分かったらFalse（以降は非圧縮で送信）
+        self._compression_enabled = config.compression == ENCODING_DEFLATE
 
     async def upload(
         self,
@@ -52,7 +115,8 @@ class LogUploader:
         execution_log_id: str,
         agent_id: str,
         task_id: str,
-        project_id: str
+        project_id: str,
+        offset: int = 0
     ) -> Optional[str]:
         """
         ログファイルをアップロード
@@ -63,6 +127,7 @@ class LogUploader:
             agent_id: エージェントID
             task_id: タスクID
             project_id: プロジェクトID
+            offset: ship()でサーバーが受け取り済みのバイト数（そこから再開）
 
         Returns:
             成功時: アップロード先のパス
@@ -79,26 +144,170 @@ class LogUploader:
             logger.warning(f"Log file not found: {log_file_path}")
             return None
 
-        # ファイルサイズ確認
-        file_size_mb = path.stat().st_size / (1024 * 1024)
-        if file_size_mb > self.config.max_file_size_mb:
+        # 上限を超える場合は末尾のみ（切り詰めた旨の行を先頭に付ける）
+        file_size = path.stat().st_size
+        start = self._tail_start(path, file_size)
+        header = TRUNCATION_MARKER.format(skipped=start).encode("utf-8") if start else b""
+        if start:
             logger.warning(
-                f"Log file too large: {file_size_mb:.2f}MB > {self.config.max_file_size_mb}MB"
+                f"Log file too large: {file_size / (1024 * 1024):.2f}MB > "
+                f"{self.config.max_file_size_mb}MB, uploading the last {file_size - start} bytes"
             )
+
+        fields = self._fields(execution_log_id, agent_id, task_id, project_id)
+        # 末尾のみを送る場合は送信ストリームが変わるため最初から
+        offset = offset if not start and 0 < offset <= file_size else 0
+        try:
+            result = await self._upload_stream(path, fields, header, start, file_size, offset)
+        except _ServerMismatch as e:
+            logger.error(f"Log upload aborted: {e}")
             return None
+        if result.log_file_path:
+            logger.info(f"Log uploaded successfully: {result.log_file_path} ({file_size} bytes)")
+        return result.log_file_path
+
+    async def ship(
+        self,
+        log_file_path: str,
+        agent_id: str,
+        task_id: str,
+        project_id: str,
+        offset: int,
+        end: int,
+        execution_log_id: Optional[str] = None,
+        started_after: Optional[float] = None
+    ) -> ShipResult:
+        """
+        実行中のログの [offset, end) を追記送信
+
+        execution_log_idが未確定の場合は、started_after（UNIX時刻）以降に開始された
+        agent_id/task_idの最新の実行ログをサーバーが解決する。
+
+        Returns:
+            送信結果（失敗時はlog_file_pathがNoneで、offsetは受け取り済みの位置）
+        """
+        fields = self._fields(execution_log_id, agent_id, task_id, project_id)
+        if started_after is not None and not execution_log_id:
+            fields["started_after"] = f"{started_after:.3f}"
+        try:
+            return await self._upload_stream(
+                Path(log_file_path), fields, b"", 0, end, offset,
+                chunk_kb=self.config.live_batch_kb
+            )
+        except _ServerMismatch as e:
+            logger.warning(f"Live log upload stopped: {e}")
+            return ShipResult(offset)
+
+    @staticmethod
+    def _fields(
+        execution_log_id: Optional[str],
+        agent_id: str,
+        task_id: str,
+        project_id: str
+    ) -> dict:
+        fields = {
+            "agent_id": agent_id,
+            "task_id": task_id,
+            "project_id": project_id,
+        }
+        if execution_log_id:
+            fields["execution_log_id"] = execution_log_id
+        return fields
+
+    async def _upload_stream(
+        self,
+        path: Path,
+        fields: dict,
+        header: bytes,
+        start: int,
+        end: int,
+        offset: int = 0,
+        chunk_kb: Optional[int] = None
+    ) -> ShipResult:
+        """
+        header + path[start:end] のoffset以降をチャンクに分けて送信
+
+        Returns:
+            送信結果（失敗時はlog_file_pathがNone）
+        """
+        total = len(header) + end - start
+        chunk_size = max(1, (chunk_kb or self.config.chunk_size_kb) * 1024)
+        loop = asyncio.get_running_loop()
+        fields = dict(fields)
+        restarts = 0
+        log_file_path = None
+
+        # 空ファイルも1回は送信してサーバー側にファイルを作る
+        while offset < total or log_file_path is None:
+            raw = await loop.run_in_executor(
+                None, self._read_chunk, path, header, start, end, offset, chunk_size
+            )
+            compressed = self._compression_enabled
+            body, encoding = await loop.run_in_executor(None, self._encode, raw, compressed)
 
-        # リトライ付きでアップロード
+            response = await self._send_chunk(path, fields, offset, raw, body, encoding)
+            if response is None:
+                logger.error(
+                    f"All {self.config.retry_count} upload attempts failed at offset {offset}"
+                )
+                return ShipResult(offset, execution_log_id=fields.get("execution_log_id"))
+            if response.status == 404:
+                # 実行ログがまだ作られていない（エージェントがタスク取得前）等
+                logger.debug(f"Execution log for {path.name} not found on the server")
+                return ShipResult(offset, waiting=True)
+
+            expected = offset + len(raw)
+            if response.status == 200 and response.file_size in (None, expected):
+                log_file_path = response.log_file_path
+                if response.execution_log_id:
+                    # 以降のチャンクは同じ実行ログへ
+                    fields["execution_log_id"] = response.execution_log_id
+                offset = expected
+                continue
+
+            restarts += 1
+            if restarts > self.config.retry_count:
+                raise _ServerMismatch(f"Server size kept diverging at offset {offset}")
+
+            if response.status == 415 or (response.status == 200 and compressed):
+                # 圧縮非対応のサーバー（旧サーバーは圧縮データをそのまま保存する）
+                logger.warning("Server does not accept compressed logs, sending uncompressed")
+                self._compression_enabled = False
+                offset = 0
+            elif response.status == 409 and response.file_size is not None:
+                # 応答を受け取れなかったチャンクが既に書き込まれていた等: サーバー側のサイズから再開
+                offset = response.file_size if 0 <= response.file_size <= total else 0
+                logger.info(f"Resuming log upload at offset {offset}")
+            elif offset > 0:
+                raise _ServerMismatch(
+                    f"Server does not support chunked upload "
+                    f"(expected size {expected}, got {response.file_size})"
+                )
+            else:
+                offset = 0
+
+        return ShipResult(offset, log_file_path, fields.get("execution_log_id"))
+
+    async def _send_chunk(
+        self,
+        path: Path,
+        fields: dict,
+        offset: int,
+        raw: bytes,
+        body: bytes,
+        encoding: str
+    ) -> Optional[_ChunkResponse]:
+        """
+        1チャンクをリトライ付きで送信
+
+        Returns:
+            サーバーの応答（200/404/409/415）。全リトライ失敗時はNone
+        """
         for attempt in range(self.config.retry_count):
             try:
-                result = await self._do_upload(
-                    path,
-                    execution_log_id,
-                    agent_id,
-                    task_id,
-                    project_id
-                )
-                if result:
-                    return result
+                response = await self._do_upload(path, fields, offset, raw, body, encoding)
+                if response is not None:
+                    return response
             except Exception as e:
                 logger.warning(
                     f"Upload attempt {attempt + 1}/{self.config.retry_count} failed: {e}"
@@ -108,23 +317,22 @@ class LogUploader:
             if attempt < self.config.retry_count - 1:
                 await asyncio.sleep(self.config.retry_delay_seconds)
 
-        logger.error(f"All {self.config.retry_count} upload attempts failed")
         return None
 
     async def _do_upload(
         self,
         file_path: Path,
-        execution_log_id: str,
-        agent_id: str,
-        task_id: str,
-        project_id: str
-    ) -> Optional[str]:
+        fields: dict,
+        offset: int,
+        raw: bytes,
+        body: bytes,
+        encoding: str
+    ) -> Optional[_ChunkResponse]:
         """
         実際のアップロード処理
 
         Returns:
-            成功時: アップロード先のパス
-            失敗時: None
+            サーバーの応答（リトライすべき失敗時はNone）
         """
         headers = {
             "Authorization": f"Bearer {self.coordinator_token}"
@@ -132,37 +340,114 @@ class LogUploader:
 
         # multipart/form-dataを構築
         data = aiohttp.FormData()
-        data.add_field("execution_log_id", execution_log_id)
-        data.add_field("agent_id", agent_id)
-        data.add_field("task_id", task_id)
-        data.add_field("project_id", project_id)
+        for name, value in fields.items():
+            data.add_field(name, value)
+        data.add_field("chunk_offset", str(offset))
+        data.add_field("content_encoding", encoding)
+        data.add_field("raw_size", str(len(raw)))
         data.add_field(
             "log_file",
-            file_path.read_bytes(),
+            body,
             filename=file_path.name,
-            content_type="text/plain"
+            content_type="text/plain" if encoding == ENCODING_IDENTITY else "application/octet-stream"
         )
         data.add_field("original_filename", file_path.name)
 
+        # 共有セッションがあればKeep-Alive接続を再利用
+        if self.http_session is not None:
+            session = await self.http_session.get()
+            return await self._post_form(session, data, headers)
         async with aiohttp.ClientSession() as session:
-            async with session.post(
-                self.config.endpoint,
-                data=data,
-                headers=headers
-            ) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    if result.get("success"):
-                        logger.info(
-                            f"Log uploaded successfully: {result.get('log_file_path')}"
-                        )
-                        return result.get("log_file_path")
-                    else:
-                        logger.warning(f"Upload response indicates failure: {result}")
-                        return None
-                else:
-                    error_text = await response.text()
-                    logger.warning(
-                        f"Upload failed with status {response.status}: {error_text}"
+            return await self._post_form(session, data, headers)
+
+    async def _post_form(
+        self,
+        session: aiohttp.ClientSession,
+        data: aiohttp.FormData,
+        headers: dict
+    ) -> Optional[_ChunkResponse]:
+        """
+        multipart/form-dataをPOSTしてレスポンスを解釈
+
+        Returns:
+            成功・実行ログ未作成(404)・オフセット不一致(409)・圧縮非対応(415)時: サーバーの応答
+            それ以外の失敗時: None
+        """
+        async with session.post(
+            self.config.endpoint,
+            data=data,
+            headers=headers
+        ) as response:
+            if response.status == 200:
+                result = await response.json()
+                if result.get("success"):
+                    logger.debug(
+                        f"Log chunk uploaded: {result.get('log_file_path')} "
+                        f"({result.get('file_size')} bytes)"
+                    )
+                    return _ChunkResponse(
+                        200,
+                        result.get("log_file_path"),
+                        result.get("file_size"),
+                        result.get("execution_log_id")
                     )
+                else:
+                    logger.warning(f"Upload response indicates failure: {result}")
                     return None
+            elif response.status == 409:
+                result = await response.json()
+                return _ChunkResponse(409, file_size=result.get("file_size"))
+            elif response.status in (404, 415):
+                return _ChunkResponse(response.status)
+            else:
+                error_text = await response.text()
+                logger.warning(
+                    f"Upload failed with status {response.status}: {error_text}"
+                )
+                return None
+
+    def _tail_start(self, path: Path, file_size: int) -> int:
+        """
+        アップロードを開始するファイル位置（上限以内なら0、超過時は末尾側の行頭）
+        """
+        limit = self.config.max_file_size_mb * 1024 * 1024
+        if file_size <= limit:
+            return 0
+        start = file_size - limit
+        with open(path, "rb") as f:
+            f.seek(start)
+            newline = f.read(_LINE_SEARCH_BYTES).find(b"\n")
+        return start + newline + 1 if newline >= 0 else start
+
+    @staticmethod
+    def _read_chunk(
+        path: Path,
+        header: bytes,
+        start: int,
+        end: int,
+        offset: int,
+        size: int
+    ) -> bytes:
+        """
+        送信ストリーム（header + path[start:end]）のoffsetからsizeバイトを読む
+        """
+        chunk = header[offset:offset + size]
+        file_pos = start + max(0, offset - len(header))
+        remaining = min(size - len(chunk), end - file_pos)
+        if remaining <= 0:
+            return chunk
+        with open(path, "rb") as f:
+            f.seek(file_pos)
+            return chunk + f.read(remaining)
+
+    @staticmethod
+    def _encode(raw: bytes, compress: bool) -> tuple[bytes, str]:
+        """
+        チャンクを圧縮（raw deflate）。小さくならない場合は非圧縮のまま
+        """
+        if compress and raw:
+            compressor = zlib.compressobj(1, zlib.DEFLATED, -15)
+            body = compressor.compress(raw) + compressor.flush()
+            if len(body) < len(raw):
+                return body, ENCODING_DEFLATE
+        return raw, ENCODING_IDENTITY
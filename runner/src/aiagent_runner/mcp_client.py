@@ -10,7 +10,7 @@ import logging
 import os
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Union
 
 # HTTP transport support (optional dependency)
 try:
@@ -19,7 +19,9 @@ try:
 except ImportError:
     HAS_AIOHTTP = False
 
+from aiagent_runner.http_session import SharedHTTPSession
 from aiagent_runner.platform import get_default_socket_path
+from aiagent_runner.unix_transport import UnixSocketTransport
 
 logger = logging.getLogger(__name__)
 
@@ -144,6 +146,7 @@ class SubordinateProfile:
     kick_method: str = ""
     max_parallel_tasks: int = 1
     skills: list[SkillDefinition] = field(default_factory=list)
+    version: Optional[str] = None  # Server-provided revision, if any (see ProfileCache)
 
 
 class MCPClient:
@@ -163,7 +166,10 @@ class MCPClient:
     def __init__(
         self,
         socket_path: Optional[str] = None,
-        coordinator_token: Optional[str] = None
+        coordinator_token: Optional[str] = None,
+        max_connections: int = 2,
+        request_timeout: Optional[float] = 60.0,
+        http_session: Optional[SharedHTTPSession] = None
     ):
         """Initialize MCP client.
 
@@ -174,6 +180,10 @@ class MCPClient:
                         Defaults to platform-specific location.
             coordinator_token: Token for Coordinator-only API calls (Phase 5).
                               If not provided, reads from MCP_COORDINATOR_TOKEN env var.
+            max_connections: Maximum persistent Unix socket connections to keep open
+            request_timeout: Seconds to wait for a Unix socket response (None = no limit)
+            http_session: Shared pooled HTTP session for the HTTP transport.
+                         If not provided, a short-lived session is used per call.
         """
         # Determine transport type based on URL scheme
         if socket_path and socket_path.startswith(("http://", "https://")):
@@ -192,6 +202,19 @@ class MCPClient:
         # Backward compatibility
         self.socket_path = self._url if not self._use_http else None
 
+        # Unix socket: persistent, multiplexed connections (opened lazily)
+        self._unix_transport: Optional[UnixSocketTransport] = None
+        if not self._use_http:
+            self._unix_transport = UnixSocketTransport(
+                self._url,
+                max_connections=max_connections,
+                request_timeout=request_timeout
+            )
+        self._http_session = http_session
+
+        # None = not probed yet; False once the server rejects get_agent_actions
+        self._bulk_actions_supported: Optional[bool] = None
+
         self._session_token: Optional[str] = None
         # Phase 5: Coordinator token for Coordinator-only API calls
         self._coordinator_token = coordinator_token or os.environ.get("MCP_COORDINATOR_TOKEN")
@@ -200,6 +223,15 @@ class MCPClient:
         """Get default MCP socket path (platform-specific)."""
         return get_default_socket_path()
 
+    async def close(self) -> None:
+        """Close persistent connections to the MCP server.
+
+        Safe to call multiple times; the next tool call reconnects.
+        A shared HTTP session is owned (and closed) by its creator.
+        """
+        if self._unix_transport:
+            await self._unix_transport.close()
+
     async def _call_tool(self, tool_name: str, args: dict) -> dict:
         """Call an MCP tool via Unix socket or HTTP.
 
@@ -234,27 +266,15 @@ class MCPClient:
             MCPError: If communication fails
         """
         try:
-            reader, writer = await asyncio.open_unix_connection(self._url)
-        except (ConnectionRefusedError, FileNotFoundError) as e:
+            data = await self._unix_transport.request(
+                "tools/call", {"name": tool_name, "arguments": args}
+            )
+        except ConnectionError as e:
             raise MCPError(f"Cannot connect to MCP server at {self._url}: {e}")
+        except asyncio.TimeoutError:
+            raise MCPError(f"Timed out waiting for MCP server response to {tool_name}")
 
-        try:
-            request = json.dumps({
-                "jsonrpc": "2.0",
-                "method": "tools/call",
-                "params": {"name": tool_name, "arguments": args},
-                "id": 1
-            })
-            writer.write(request.encode() + b"\n")
-            await writer.drain()
-
-            response = await reader.readline()
-            data = json.loads(response)
-
-            return self._parse_response(data)
-        finally:
-            writer.close()
-            await writer.wait_closed()
+        return self._parse_response(data)
 
     async def _call_tool_http(self, tool_name: str, args: dict) -> dict:
         """Call an MCP tool via HTTP.
@@ -288,23 +308,32 @@ class MCPClient:
             headers["Authorization"] = f"Bearer {self._coordinator_token}"
 
         try:
+            if self._http_session is not None:
+                session = await self._http_session.get()
+                return await self._post_tool_call(session, request_body, headers)
             async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self._url,
-                    json=request_body,
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    if response.status != 200:
-                        text = await response.text()
-                        raise MCPError(f"HTTP {response.status}: {text}")
-
-                    data = await response.json()
-                    return self._parse_response(data)
+                return await self._post_tool_call(session, request_body, headers)
 
         except aiohttp.ClientError as e:
             raise MCPError(f"Cannot connect to MCP server at {self._url}: {e}")
 
+    async def _post_tool_call(
+        self, session: "aiohttp.ClientSession", request_body: dict, headers: dict
+    ) -> dict:
+        """POST a JSON-RPC request on the given session and parse the result."""
+        async with session.post(
+            self._url,
+            json=request_body,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=30)
+        ) as response:
+            if response.status != 200:
+                text = await response.text()
+                raise MCPError(f"HTTP {response.status}: {text}")
+
+            data = await response.json()
+            return self._parse_response(data)
+
     def _parse_response(self, data: dict) -> dict:
         """Parse MCP JSON-RPC response.
 
@@ -470,6 +499,132 @@ class MCPClient:
             args["coordinator_token"] = self._coordinator_token
         result = await self._call_tool("get_agent_action", args)
 
+        return self._parse_agent_action(result)
+
+    async def get_agent_actions(
+        self,
+        pairs: list[tuple[str, str]],
+        max_starts: Optional[int] = None,
+        concurrency: Optional[int] = None
+    ) -> list[Optional[Union[AgentActionResult, MCPError]]]:
+        """Get the actions for many (agent_id, project_id) pairs at once.
+
+        Tries the bulk get_agent_actions tool first, which resolves every pair
+        in one round trip. If the server does not provide it, falls back to
+        get_agent_action per pair; those calls are pipelined over the
+        multiplexed transport.
+
+        get_agent_action marks a spawn as started on the server whenever it
+        answers "start", so max_starts (the caller's free slots) limits how
+        many starts can be handed out. The bulk tool receives it as a hint;
+        the fallback resolves pairs in waves no larger than the starts still
+        available and leaves the rest unresolved once they run out.
+
+        Args:
+            pairs: (agent_id, project_id) pairs to resolve
+            max_starts: Maximum number of "start" actions the caller can act on
+                       (None = unlimited)
+            concurrency: Maximum number of per-pair calls in flight during the
+                         fallback (None = unlimited)
+
+        Returns:
+            One entry per pair, in order: AgentActionResult, the MCPError raised
+            for that pair, or None if the pair was not evaluated.
+        """
+        if not pairs:
+            return []
+
+        results: list[Optional[Union[AgentActionResult, MCPError]]] = [None] * len(pairs)
+        unresolved = list(range(len(pairs)))
+
+        if self._bulk_actions_supported is not False:
+            try:
+                bulk = await self._get_agent_actions_bulk(pairs, max_starts)
+                self._bulk_actions_supported = True
+            except MCPError as e:
+                if self._is_unknown_tool_error(e):
+                    logger.info("get_agent_actions not supported by server, using per-pair calls")
+                    self._bulk_actions_supported = False
+                else:
+                    logger.warning(f"get_agent_actions failed, falling back to per-pair calls: {e}")
+                bulk = {}
+            for index in list(unresolved):
+                if pairs[index] in bulk:
+                    results[index] = bulk[pairs[index]]
+                    unresolved.remove(index)
+
+        if not unresolved:
+            return results
+
+        remaining_starts = max_starts
+        if remaining_starts is not None:
+            remaining_starts -= sum(
+                1 for r in results if isinstance(r, AgentActionResult) and r.action == "start"
+            )
+        semaphore = asyncio.Semaphore(concurrency) if concurrency else None
+
+        async def resolve(index: int) -> Union[AgentActionResult, MCPError]:
+            if semaphore is None:
+                return await self._get_agent_action_or_error(*pairs[index])
+            async with semaphore:
+                return await self._get_agent_action_or_error(*pairs[index])
+
+        while unresolved:
+            if remaining_starts is not None and remaining_starts <= 0:
+                break
+            wave_size = len(unresolved) if remaining_starts is None else remaining_starts
+            wave, unresolved = unresolved[:wave_size], unresolved[wave_size:]
+            wave_results = await asyncio.gather(*(resolve(i) for i in wave))
+            for index, result in zip(wave, wave_results):
+                results[index] = result
+                if remaining_starts is not None and isinstance(result, AgentActionResult) \
+                        and result.action == "start":
+                    remaining_starts -= 1
+
+        return results
+
+    async def _get_agent_actions_bulk(
+        self, pairs: list[tuple[str, str]], max_starts: Optional[int]
+    ) -> dict[tuple[str, str], Union[AgentActionResult, MCPError]]:
+        """Call the bulk get_agent_actions tool.
+
+        Returns:
+            Results keyed by (agent_id, project_id); pairs missing from the
+            server response are omitted.
+        """
+        args: dict = {
+            "pairs": [{"agent_id": a, "project_id": p} for a, p in pairs]
+        }
+        if max_starts is not None:
+            args["max_starts"] = max_starts
+        if self._coordinator_token:
+            args["coordinator_token"] = self._coordinator_token
+        result = await self._call_tool("get_agent_actions", args)
+
+        if not result.get("success", True):
+            raise MCPError(result.get("error", "Failed to get agent actions"))
+
+        actions: dict[tuple[str, str], Union[AgentActionResult, MCPError]] = {}
+        for item in result.get("results", []):
+            pair = (item.get("agent_id", ""), item.get("project_id", ""))
+            if item.get("error"):
+                actions[pair] = MCPError(item["error"])
+            else:
+                actions[pair] = self._parse_agent_action(item)
+        return actions
+
+    async def _get_agent_action_or_error(
+        self, agent_id: str, project_id: str
+    ) -> Union[AgentActionResult, MCPError]:
+        """get_agent_action that returns MCPError instead of raising it."""
+        try:
+            return await self.get_agent_action(agent_id, project_id)
+        except MCPError as e:
+            return e
+
+    @staticmethod
+    def _parse_agent_action(result: dict) -> AgentActionResult:
+        """Build an AgentActionResult from a get_agent_action(s) result."""
         return AgentActionResult(
             action=result.get("action", "hold"),
             reason=result.get("reason"),
@@ -479,6 +634,12 @@ class MCPClient:
             task_id=result.get("task_id")  # Phase 4: Coordinatorがログファイルパス登録に使用
         )
 
+    @staticmethod
+    def _is_unknown_tool_error(error: MCPError) -> bool:
+        """Check whether an MCPError means the server lacks the tool."""
+        message = str(error)
+        return "Unknown tool" in message or "not registered" in message
+
     async def register_execution_log_file(
         self, agent_id: str, task_id: str, log_file_path: str
     ) -> bool:
@@ -571,7 +732,11 @@ class MCPClient:
 
         return result.get("success", False)
 
-    async def get_subordinate_profile(self, agent_id: str) -> SubordinateProfile:
+    async def get_subordinate_profile(
+        self,
+        agent_id: str,
+        known_version: Optional[str] = None
+    ) -> Optional[SubordinateProfile]:
         """Get profile of a subordinate agent.
 
         Called by Coordinator to get agent's system_prompt for context directory setup.
@@ -579,9 +744,12 @@ class MCPClient:
 
         Args:
             agent_id: Agent ID to get profile for
+            known_version: Version of a cached copy; servers that version profiles
+                           answer {"not_modified": true} instead of resending it
 
         Returns:
-            SubordinateProfile with agent details including system_prompt
+            SubordinateProfile with agent details including system_prompt,
+            or None if known_version was given and is still current
 
         Raises:
             MCPError: If request fails or agent not found
@@ -589,6 +757,8 @@ class MCPClient:
         args = {"agent_id": agent_id}
         if self._coordinator_token:
             args["coordinator_token"] = self._coordinator_token
+        if known_version:
+            args["known_version"] = known_version
 
         result = await self._call_tool("get_subordinate_profile", args)
 
@@ -596,6 +766,9 @@ class MCPClient:
         if isinstance(result, dict) and "error" in result:
             raise MCPError(result["error"])
 
+        if known_version and result.get("not_modified"):
+            return None
+
         # Parse skills if present (archive format with Base64 ZIP)
         skills_data = result.get("skills", [])
         skills = [
@@ -620,7 +793,8 @@ class MCPClient:
             ai_type=result.get("ai_type") if result.get("ai_type") else None,
             kick_method=result.get("kick_method", ""),
             max_parallel_tasks=result.get("max_parallel_tasks", 1),
-            skills=skills
+            skills=skills,
+            version=str(result["version"]) if result.get("version") is not None else None
         )
 
     # ==========================================================================
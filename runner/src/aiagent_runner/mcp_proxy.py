@@ -0,0 +1,249 @@
+# src/aiagent_runner/mcp_proxy.py
+# Local MCP proxy shared by all Agent Instances of a Coordinator
+# Reference: docs/design/MULTI_DEVICE_IMPLEMENTATION_PLAN.md
+
+import asyncio
+import json
+import logging
+import secrets
+import socket
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from urllib.parse import quote
+
+from aiagent_runner.http_session import HAS_AIOHTTP
+from aiagent_runner.unix_transport import UnixSocketTransport
+
+if HAS_AIOHTTP:
+    from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# Protocol methods whose results only change when the server is upgraded
+CACHEABLE_METHODS = ("initialize", "tools/list", "prompts/list", "resources/list")
+
+
+@dataclass
+class MCPProxyConfig:
+    """Local MCP proxy configuration.
+
+    When enabled (Unix socket connections only), Agent Instances talk to a
+    loopback HTTP endpoint hosted by the Coordinator instead of each running
+    `nc -U <socket>`. Requests share a small pool of upstream connections.
+    """
+    # Enable/disable the proxy
+    enabled: bool = False
+
+    # Upstream Unix socket connections shared by all instances
+    max_upstream_connections: int = 4
+
+    # Seconds to wait for the MCP server to answer a request
+    upstream_timeout: float = 300.0
+
+    # Seconds initialize / tools/list style responses are reused
+    cache_ttl: float = 300.0
+
+    # Read-only tools whose results are reused (per identical arguments).
+    # Authenticated calls (with a session_token) are never cached: the
+    # server adds the caller's notification / interrupt state to each result
+    cacheable_tools: list[str] = field(default_factory=list)
+
+    # Seconds a cached tool result is reused
+    tool_cache_ttl: float = 30.0
+
+
+@dataclass
+class InstanceCallStats:
+    """Per-instance request counters."""
+    calls: int = 0
+    errors: int = 0
+    cache_hits: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    tools: dict[str, int] = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "avg_latency": self.total_latency / self.calls if self.calls else 0.0,
+            "max_latency": self.max_latency,
+            "tools": dict(self.tools),
+        }
+
+
+class MCPProxy:
+    """Loopback HTTP endpoint forwarding JSON-RPC to the MCP Unix socket.
+
+    Speaks the same protocol as the server's POST /mcp endpoint, so agents
+    are configured exactly as in HTTP (multi-device) mode. MCPServer is
+    stateless per connection (tool calls carry their session_token), which
+    lets requests from every instance share the pooled upstream
+    connections. Each instance gets its own URL so calls and latency are
+    counted per (agent_id, project_id). Access requires a random bearer
+    token generated at start.
+    """
+
+    def __init__(
+        self,
+        upstream_socket_path: str,
+        config: Optional[MCPProxyConfig] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """Initialize the proxy (not listening until start()).
+
+        Args:
+            upstream_socket_path: MCP server Unix socket
+            config: Proxy settings
+            clock: Monotonic time source for cache expiry and latency
+        """
+        if not HAS_AIOHTTP:
+            raise RuntimeError("MCPProxy requires aiohttp")
+        self.config = config or MCPProxyConfig()
+        self._upstream = UnixSocketTransport(
+            upstream_socket_path,
+            max_connections=self.config.max_upstream_connections,
+            request_timeout=self.config.upstream_timeout
+        )
+        self._clock = clock
+        self._token = secrets.token_urlsafe(32)
+        self._runner: Optional["web.AppRunner"] = None
+        self._base_url: Optional[str] = None
+        self._cache: dict[str, tuple[float, dict]] = {}  # key -> (expires_at, response)
+        self._stats: dict[str, InstanceCallStats] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._runner is not None
+
+    @property
+    def token(self) -> str:
+        """Bearer token agents must send."""
+        return self._token
+
+    @property
+    def base_url(self) -> Optional[str]:
+        return self._base_url
+
+    def endpoint_for(self, agent_id: str, project_id: str) -> str:
+        """MCP URL for one (agent_id, project_id) pair."""
+        return f"{self._base_url}/mcp/{quote(agent_id, safe='')}/{quote(project_id, safe='')}"
+
+    def owns(self, url: str) -> bool:
+        """True if url points at this proxy."""
+        return bool(self._base_url) and url.startswith(f"{self._base_url}/")
+
+    def stats(self) -> dict[str, dict]:
+        """Per-instance statistics keyed by "agent_id/project_id"."""
+        return {instance: stats.as_dict() for instance, stats in self._stats.items()}
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Start listening (port 0 picks a free port)."""
+        app = web.Application(client_max_size=16 * 1024 * 1024)
+        app.router.add_post("/mcp/{agent_id}/{project_id}", self._handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        # Bind ourselves so the chosen port is known
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.bind((host, port))
+            await web.SockSite(runner, sock).start()
+        except BaseException:
+            sock.close()
+            await runner.cleanup()
+            raise
+        self._runner = runner
+        self._base_url = f"http://{host}:{sock.getsockname()[1]}"
+        logger.info(f"MCP proxy listening at {self._base_url}")
+
+    async def close(self) -> None:
+        """Stop listening and close the upstream connections."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        await self._upstream.close()
+
+    async def _handle(self, request: "web.Request") -> "web.Response":
+        if request.headers.get("Authorization") != f"Bearer {self._token}":
+            return web.json_response({"error": "Invalid proxy token"}, status=401)
+        instance = f"{request.match_info['agent_id']}/{request.match_info['project_id']}"
+
+        try:
+            message = json.loads(await request.read())
+            method = message["method"]
+        except (ValueError, KeyError, TypeError):
+            return web.json_response(
+                {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}}
+            )
+        params = message.get("params") or {}
+
+        if "id" not in message:
+            # Notification: the server sends nothing back; answer like POST /mcp does
+            try:
+                await self._upstream.notify(method, params)
+            except (ConnectionError, OSError) as e:
+                logger.debug(f"Failed to forward notification {method}: {e}")
+            return web.json_response({"jsonrpc": "2.0", "id": None, "result": {"acknowledged": True}})
+
+        stats = self._stats.setdefault(instance, InstanceCallStats())
+        tool = params.get("name") if method == "tools/call" else None
+        label = tool or method
+        stats.tools[label] = stats.tools.get(label, 0) + 1
+        started = self._clock()
+
+        cache_key, ttl = self._cache_key(method, params, tool)
+        response = self._cached(cache_key)
+        if response is not None:
+            stats.cache_hits += 1
+        else:
+            try:
+                response = await self._upstream.request(method, params)
+            except (ConnectionError, OSError, asyncio.TimeoutError) as e:
+                response = {
+                    "jsonrpc": "2.0",
+                    "error": {"code": -32603, "message": f"MCP server unavailable: {e}"},
+                }
+            if cache_key and self._cacheable(response):
+                self._cache[cache_key] = (self._clock() + ttl, response)
+
+        elapsed = self._clock() - started
+        stats.calls += 1
+        stats.total_latency += elapsed
+        stats.max_latency = max(stats.max_latency, elapsed)
+        if "error" in response or (response.get("result") or {}).get("isError"):
+            stats.errors += 1
+
+        return web.json_response({**response, "id": message["id"]})
+
+    def _cache_key(self, method: str, params: dict, tool: Optional[str]) -> tuple[Optional[str], float]:
+        if method in CACHEABLE_METHODS:
+            ttl = self.config.cache_ttl
+        elif (tool and tool in self.config.cacheable_tools
+              and "session_token" not in (params.get("arguments") or {})):
+            ttl = self.config.tool_cache_ttl
+        else:
+            return None, 0.0
+        if ttl <= 0:
+            return None, 0.0
+        return f"{method}:{json.dumps(params, sort_keys=True)}", ttl
+
+    def _cached(self, key: Optional[str]) -> Optional[dict]:
+        if key is None:
+            return None
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if self._clock() >= expires_at:
+            del self._cache[key]
+            return None
+        return response
+
+    @staticmethod
+    def _cacheable(response: dict) -> bool:
+        if "error" in response:
+            return False
+        result = response.get("result")
+        return isinstance(result, dict) and not result.get("isError") and "notification" not in result
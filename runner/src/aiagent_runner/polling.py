@@ -0,0 +1,145 @@
+# src/aiagent_runner/polling.py
+# Adaptive polling interval for the Coordinator loop
+# Reference: docs/plan/PHASE4_COORDINATOR_ARCHITECTURE.md
+
+import logging
+import random
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AdaptivePollingConfig:
+    """Adaptive polling configuration.
+
+    When enabled, the interval drops to min_interval after a tick with
+    activity and grows by backoff_factor after each idle tick, up to
+    max_interval. When disabled, polling_interval is used as is.
+    """
+    # Enable/disable adaptive polling
+    enabled: bool = False
+
+    # Interval right after activity (seconds)
+    min_interval: float = 2.0
+
+    # Upper bound while idle (seconds)
+    max_interval: float = 60.0
+
+    # Multiplier applied after each idle tick
+    backoff_factor: float = 2.0
+
+    # Random spread applied to each delay (fraction of the interval, 0.1 = ±10%)
+    jitter: float = 0.1
+
+    def __post_init__(self):
+        """Validate configuration after initialization."""
+        if self.min_interval <= 0:
+            raise ValueError("adaptive_polling.min_interval must be positive")
+        if self.max_interval < self.min_interval:
+            raise ValueError("adaptive_polling.max_interval must be >= min_interval")
+        if self.backoff_factor < 1:
+            raise ValueError("adaptive_polling.backoff_factor must be >= 1")
+        if not 0 <= self.jitter < 1:
+            raise ValueError("adaptive_polling.jitter must be in [0, 1)")
+
+
+@dataclass
+class PollingStats:
+    """Snapshot of the scheduler state (for logs and status output)."""
+    interval: float          # Current base interval (seconds, before jitter)
+    last_delay: float        # Delay actually chosen for the last wait (seconds)
+    ticks: int               # Ticks recorded so far
+    idle_streak: int         # Consecutive ticks without activity
+
+
+class AdaptivePollingScheduler:
+    """Chooses how long the Coordinator waits before its next tick.
+
+    Activity (spawns, exits, starts denied by capacity, stop actions) means
+    more work is likely soon, so the interval snaps to min_interval. Ticks
+    where every pair answered "hold" back off exponentially so idle periods
+    cost few server calls. Jitter keeps several coordinators sharing a
+    server from polling in lockstep.
+    """
+
+    def __init__(
+        self,
+        base_interval: float,
+        config: Optional[AdaptivePollingConfig] = None,
+        rng: Callable[[], float] = random.random
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            base_interval: Fixed polling interval (used when disabled and as
+                           the starting point when enabled)
+            config: Adaptive polling settings (defaults to disabled)
+            rng: Source of uniform random numbers in [0, 1) for jitter
+        """
+        self.config = config or AdaptivePollingConfig()
+        self._base_interval = float(base_interval)
+        self._rng = rng
+        self._interval = self._clamp(self._base_interval)
+        self._last_delay = self._interval
+        self._ticks = 0
+        self._idle_streak = 0
+
+    @property
+    def interval(self) -> float:
+        """Current base interval in seconds (before jitter)."""
+        return self._interval
+
+    @property
+    def stats(self) -> PollingStats:
+        """Current scheduler state."""
+        return PollingStats(
+            interval=self._interval,
+            last_delay=self._last_delay,
+            ticks=self._ticks,
+            idle_streak=self._idle_streak,
+        )
+
+    def record_tick(self, active: bool) -> float:
+        """Update the interval from the outcome of a tick.
+
+        Args:
+            active: True if the tick spawned, reaped, stopped or had to deny
+                    a start; False if every pair was on hold
+
+        Returns:
+            The new base interval in seconds
+        """
+        self._ticks += 1
+        if not self.config.enabled:
+            return self._interval
+
+        previous = self._interval
+        if active:
+            self._idle_streak = 0
+            self._interval = self.config.min_interval
+        else:
+            self._idle_streak += 1
+            self._interval = self._clamp(self._interval * self.config.backoff_factor)
+
+        if self._interval != previous:
+            logger.info(
+                f"Polling interval {previous:.1f}s -> {self._interval:.1f}s "
+                f"({'activity' if active else f'idle x{self._idle_streak}'})"
+            )
+        return self._interval
+
+    def next_delay(self) -> float:
+        """Return the delay before the next tick, with jitter applied."""
+        delay = self._interval
+        if self.config.enabled and self.config.jitter:
+            spread = self.config.jitter * (2 * self._rng() - 1)
+            delay = self._clamp(delay * (1 + spread))
+        self._last_delay = delay
+        return delay
+
+    def _clamp(self, interval: float) -> float:
+        if not self.config.enabled:
+            return interval
+        return max(self.config.min_interval, min(self.config.max_interval, interval))
@@ -0,0 +1,103 @@
+# src/aiagent_runner/process_watcher.py
+# Event-driven notification of Agent Instance process exits
+# Reference: docs/plan/PHASE4_COORDINATOR_ARCHITECTURE.md
+
+import asyncio
+import logging
+import os
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def pidfd_supported() -> bool:
+    """Check whether os.pidfd_open is usable (Linux 5.3+, Python 3.9+)."""
+    if not hasattr(os, "pidfd_open"):
+        return False
+    try:
+        fd = os.pidfd_open(os.getpid())
+    except OSError:
+        return False
+    os.close(fd)
+    return True
+
+
+class ProcessExitWatcher:
+    """Calls back as soon as a watched child process exits.
+
+    On Linux a pidfd becomes readable when its process terminates, so each
+    watched process gets a pidfd registered with loop.add_reader and no
+    polling is involved. The watcher only notifies: reaping (Popen.poll) is
+    left to the owner so the exit handling stays in one place.
+
+    Where pidfd is unavailable (macOS, Windows, old kernels) watch() returns
+    False and the owner keeps relying on its periodic poll.
+    """
+
+    def __init__(self):
+        self._supported = pidfd_supported()
+        self._fds: dict[int, int] = {}  # pid -> pidfd
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def supported(self) -> bool:
+        """True if exits can be watched without polling."""
+        return self._supported
+
+    @property
+    def watched_pids(self) -> list[int]:
+        """PIDs currently being watched."""
+        return list(self._fds)
+
+    def watch(self, pid: int, on_exit: Callable[[int], None]) -> bool:
+        """Start watching a process.
+
+        Must be called from within the running event loop.
+
+        Args:
+            pid: Process ID of a child process
+            on_exit: Called with the pid once the process has exited
+
+        Returns:
+            True if the process is watched, False if pidfd is unavailable
+        """
+        if not self._supported:
+            return False
+        if pid in self._fds:
+            return True
+        try:
+            fd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            # Already gone (and reaped): report the exit right away
+            asyncio.get_running_loop().call_soon(on_exit, pid)
+            return True
+        except OSError as e:
+            logger.debug(f"pidfd_open failed for PID {pid}: {e}")
+            return False
+
+        self._loop = asyncio.get_running_loop()
+        self._fds[pid] = fd
+        self._loop.add_reader(fd, self._on_readable, pid, on_exit)
+        return True
+
+    def unwatch(self, pid: int) -> None:
+        """Stop watching a process (no-op if not watched)."""
+        fd = self._fds.pop(pid, None)
+        if fd is None:
+            return
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.remove_reader(fd)
+        os.close(fd)
+
+    def close(self) -> None:
+        """Stop watching every process."""
+        for pid in list(self._fds):
+            self.unwatch(pid)
+
+    def _on_readable(self, pid: int, on_exit: Callable[[int], None]) -> None:
+        # The pidfd stays readable until closed, so drop it before calling back
+        self.unwatch(pid)
+        try:
+            on_exit(pid)
+        except Exception:
+            logger.exception(f"Process exit callback failed for PID {pid}")
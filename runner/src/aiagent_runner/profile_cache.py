@@ -0,0 +1,124 @@
+# src/aiagent_runner/profile_cache.py
+# Short-lived cache of agent profiles fetched for context preparation
+# Reference: docs/design/AGENT_CONTEXT_DIRECTORY.md
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from aiagent_runner.mcp_client import SubordinateProfile
+
+logger = logging.getLogger(__name__)
+
+# fetch(agent_id, known_version) -> profile, or None if known_version is current
+ProfileFetcher = Callable[[str, Optional[str]], Awaitable[Optional[SubordinateProfile]]]
+
+
+@dataclass
+class _CacheEntry:
+    profile: SubordinateProfile
+    fetched_at: float
+
+
+@dataclass
+class ProfileCacheStats:
+    """Counters for logs and status output."""
+    hits: int = 0            # Served from a fresh entry
+    fetches: int = 0         # Requests sent to the server
+    not_modified: int = 0    # Revalidations answered "unchanged"
+    shared: int = 0          # Callers that joined an in-flight request
+    stale_served: int = 0    # Expired entries served because the fetch failed
+
+
+class ProfileCache:
+    """Caches get_subordinate_profile results for a limited time.
+
+    Profiles carry the system prompt and every skill archive, so fetching
+    one per spawn is expensive. Entries are served for ttl seconds; after
+    that the next caller revalidates. If the server includes a version in
+    the profile it is sent back on revalidation and an "unchanged" answer
+    just refreshes the entry. Concurrent callers for the same agent share
+    one request. invalidate() drops entries when the server reports that a
+    profile changed. If a refresh fails, the expired entry is returned
+    rather than no profile at all.
+    """
+
+    def __init__(
+        self,
+        fetch: ProfileFetcher,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """Initialize the cache.
+
+        Args:
+            fetch: Coroutine function fetching a profile (MCPClient.get_subordinate_profile)
+            ttl: Seconds an entry is served without asking the server (0 disables caching)
+            clock: Monotonic time source
+        """
+        self._fetch = fetch
+        self._ttl = ttl
+        self._clock = clock
+        self._entries: dict[str, _CacheEntry] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+        # Bumped by invalidate() so results of requests already in flight are not stored
+        self._generation = 0
+        self.stats = ProfileCacheStats()
+
+    async def get(self, agent_id: str) -> SubordinateProfile:
+        """Return the profile for agent_id, fetching it if needed.
+
+        Raises:
+            Exception: Whatever fetch raised, if no cached entry is available
+        """
+        entry = self._entries.get(agent_id)
+        if entry is not None and self._clock() - entry.fetched_at < self._ttl:
+            self.stats.hits += 1
+            return entry.profile
+
+        future = self._inflight.get(agent_id)
+        if future is None:
+            future = asyncio.ensure_future(self._refresh(agent_id, entry, self._generation))
+            self._inflight[agent_id] = future
+        else:
+            self.stats.shared += 1
+        # Shielded so one cancelled caller does not cancel the request for the others
+        return await asyncio.shield(future)
+
+    def invalidate(self, agent_id: Optional[str] = None) -> None:
+        """Drop the cached profile of agent_id, or every profile if None."""
+        self._generation += 1
+        if agent_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(agent_id, None)
+
+    async def _refresh(
+        self,
+        agent_id: str,
+        entry: Optional[_CacheEntry],
+        generation: int
+    ) -> SubordinateProfile:
+        known_version = entry.profile.version if entry else None
+        self.stats.fetches += 1
+        try:
+            profile = await self._fetch(agent_id, known_version)
+        except Exception as e:
+            if entry is None or generation != self._generation:
+                raise
+            self.stats.stale_served += 1
+            logger.warning(f"Failed to refresh profile for {agent_id}, using cached copy: {e}")
+            return entry.profile
+        finally:
+            self._inflight.pop(agent_id, None)
+
+        if profile is None:
+            if entry is None:
+                raise ValueError(f"Server reported profile of {agent_id} unchanged but none is cached")
+            self.stats.not_modified += 1
+            profile = entry.profile
+        if generation == self._generation:
+            self._entries[agent_id] = _CacheEntry(profile, self._clock())
+        return profile
@@ -2,55 +2,305 @@
 # Quota error detector for spawn error protection
 # Reference: docs/design/SPAWN_ERROR_PROTECTION.md
 
+import bisect
+import json
 import logging
 import re
-from typing import Callable, Optional
+from dataclasses import dataclass
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
 
-# クォータエラー検出パターン
-# (pattern, extractor_function, default_seconds)
-# extractor_function: マッチオブジェクトから秒数を抽出、Noneならデフォルト値を使用
-QUOTA_PATTERNS: list[tuple[str, Optional[Callable[[re.Match], int]], int]] = [
+_TIME_UNITS = {"hours": 3600, "minutes": 60, "seconds": 1}
+
+# 待機時間を指定しないルールの待機秒数
+DEFAULT_QUOTA_SECONDS = 300
+
+
+@dataclass
+class QuotaRule:
+    """クォータエラー検出ルール
+
+    pattern が名前付きグループ hours / minutes / seconds を含む場合、
+    一致した値から待機時間を算出する。含まない場合は default_seconds を使用。
+    """
+    pattern: str
+    default_seconds: int = DEFAULT_QUOTA_SECONDS
+
+    def __post_init__(self):
+        try:
+            compiled = re.compile(self.pattern)
+        except re.error as e:
+            raise ValueError(f"Invalid quota rule pattern {self.pattern!r}: {e}") from e
+        # 待機時間0ではクールダウンなしで即座に再起動を繰り返すため拒否
+        if self.default_seconds <= 0 and not set(compiled.groupindex) & set(_TIME_UNITS):
+            raise ValueError(
+                f"Quota rule {self.pattern!r} has no hours/minutes/seconds group "
+                f"and needs a positive default_seconds"
+            )
+
+    def seconds_for(self, match: re.Match) -> int:
+        """一致から待機秒数を算出"""
+        groups = {
+            name: value for name, value in match.groupdict().items()
+            if name in _TIME_UNITS and value is not None
+        }
+        if not groups:
+            return self.default_seconds
+        try:
+            return sum(int(value) * _TIME_UNITS[name] for name, value in groups.items())
+        except ValueError as e:
+            logger.warning(f"Failed to extract time from pattern: {e}")
+            return self.default_seconds
+
+
+# クォータエラー検出ルール（優先順）
+# 設定ファイルの error_protection.quota_rules でプロバイダーごとに置き換え可能
+QUOTA_RULES: list[QuotaRule] = [
     # Gemini: quota will reset after XmYs (時間付き - 最優先)
-    (
-        r"quota will reset after (\d+)m(\d+)s",
-        lambda m: int(m.group(1)) * 60 + int(m.group(2)),
-        0  # デフォルト不使用（時間抽出）
-    ),
+    QuotaRule(r"quota will reset after (?P<minutes>\d+)m(?P<seconds>\d+)s"),
     # 汎用: retry after X seconds (時間付き)
-    (
-        r"retry after (\d+)\s*(?:seconds?)?",
-        lambda m: int(m.group(1)),
-        0  # デフォルト不使用（時間抽出）
-    ),
-    # Gemini: TerminalQuotaError (時間なし)
-    (
-        r"TerminalQuotaError",
-        None,
-        1800  # デフォルト30分
-    ),
-    # Claude: RateLimitError (時間なし)
-    (
-        r"RateLimitError",
-        None,
-        300  # デフォルト5分
-    ),
-    # 汎用: quota exhausted
-    (
-        r"quota.*exhausted",
-        None,
-        1800  # デフォルト30分
-    ),
-    # 汎用: rate limit
-    (
-        r"rate\s*limit",
-        None,
-        300  # デフォルト5分
-    ),
+    QuotaRule(r"retry after (?P<seconds>\d+)\s*(?:seconds?)?"),
+    # Gemini: TerminalQuotaError (時間なし、デフォルト30分)
+    QuotaRule(r"TerminalQuotaError", 1800),
+    # Claude: RateLimitError (時間なし、デフォルト5分)
+    QuotaRule(r"RateLimitError", 300),
+    # 汎用: quota exhausted（長い行で過剰にバックトラックしないよう距離を制限）
+    QuotaRule(r"quota.{0,500}?exhausted", 1800),
+    # 汎用: rate limit (デフォルト5分)
+    QuotaRule(r"rate\s*limit", 300),
 ]
 
+# 正規表現の特殊文字（先頭リテラルの抽出に使用）
+_REGEX_META = set(".^$*+?{}[]\\|()")
+_QUANTIFIERS = set("*+?{")
+
+# 先読みに使う先頭リテラルの最小長（短すぎると候補が多くなり逆効果）
+_MIN_LITERAL_LENGTH = 3
+
+
+def _leading_literal(pattern: str) -> Optional[str]:
+    """パターンが必ず先頭に持つリテラル文字列（小文字）を返す
+
+    例: "quota will reset after (?P<minutes>\\d+)..." -> "quota will reset after "
+    トップレベルの選択（|）を含むパターンや短すぎる場合はNone。
+    """
+    if "|" in pattern:
+        return None
+    literal = []
+    for index, char in enumerate(pattern):
+        if char in _REGEX_META:
+            # 直後が量指定子の文字は省略可能なため含めない
+            if char in _QUANTIFIERS and literal:
+                literal.pop()
+            break
+        literal.append(char)
+    if len(literal) < _MIN_LITERAL_LENGTH:
+        return None
+    return "".join(literal).lower()
+
+
+class QuotaMatcher:
+    """事前コンパイル済みのルールをリテラル先読みで照合するクラス
+
+    各ルールの先頭リテラル（例: "ratelimiterror"）を抽出しておき、
+    小文字化したテキストを1回作成して str.find で候補位置を探し、
+    候補位置でのみ正規表現を照合する。ログ全体を正規表現で走査するのは
+    先頭リテラルを持たないルールだけになる。ルールは優先順に評価するため、
+    結果はルールごとに検索した場合と同じになる。
+    """
+
+    def __init__(self, rules: list[QuotaRule]):
+        """初期化
+
+        Args:
+            rules: 優先順のルール
+        """
+        self.rules = list(rules)
+        self._compiled = [re.compile(rule.pattern, re.IGNORECASE) for rule in self.rules]
+        self._literals = [_leading_literal(rule.pattern) for rule in self.rules]
+
+    def search(self, text: str) -> Optional[tuple[QuotaRule, re.Match]]:
+        """最優先のルールとその一致を返す
+
+        Args:
+            text: 検索対象テキスト
+
+        Returns:
+            (ルール, 一致)、一致なしはNone
+        """
+        lowered: Optional[str] = None
+        if any(self._literals):
+            lowered = text.lower()
+            if len(lowered) != len(text):
+                # 小文字化で長さが変わる文字を含む場合は位置が対応しない
+                lowered = None
+
+        for rule, regex, literal in zip(self.rules, self._compiled, self._literals):
+            if literal is None or lowered is None:
+                match = regex.search(text)
+            else:
+                match = self._search_from_literal(regex, literal, text, lowered)
+            if match is not None:
+                return rule, match
+        return None
+
+    @staticmethod
+    def _search_from_literal(
+        regex: re.Pattern, literal: str, text: str, lowered: str
+    ) -> Optional[re.Match]:
+        pos = lowered.find(literal)
+        while pos >= 0:
+            match = regex.match(text, pos)
+            if match is not None:
+                return match
+            pos = lowered.find(literal, pos + 1)
+        return None
+
+
+@dataclass
+class QuotaDetection:
+    """クォータエラーの検出結果"""
+    seconds: int                  # 待機秒数（マージン・上限適用後）
+    rule: str                     # 一致したルールのパターン
+    offset: Optional[int] = None  # 一致箇所のログ内バイト位置
+    line: str = ""                # 一致した行
+    timed: bool = False           # 待機時間をログの記述から算出したか
+
+
+# CLIExecutor がログに書き込む区切り（プロンプトの後に出力が続く）
+PROMPT_MARKER = "=== PROMPT ==="
+OUTPUT_MARKER = "=== OUTPUT ==="
+
+# プロバイダーのエラー出力と見なす行の先頭
+# 例: "API Error: 429 ...", "TerminalQuotaError: ...", "Error when talking to Gemini API"
+_ERROR_LINE = re.compile(
+    r"^\s*\[?(?:API [Ee]rror\b|\w*(?:Error|Exception)\b|ERROR\b|error:|Traceback\b|FATAL\b|fatal:)"
+)
+
+# エラー行に続けて対象とする行数（"Your quota will reset after ..." 等）
+ERROR_CONTEXT_LINES = 5
+
+
+def _is_error_event(line: str) -> bool:
+    """構造化出力（stream-json 等）のエラーイベントかどうか"""
+    if not line.startswith("{"):
+        return False
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return False
+    if not isinstance(event, dict):
+        return False
+    return (
+        event.get("type") == "error"
+        or event.get("is_error") is True
+        or "error" in event
+        or str(event.get("subtype", "")).startswith("error")
+    )
+
+
+class ErrorScope:
+    """ログからクォータ検出の対象行を選ぶクラス
+
+    エコーされたプロンプト（=== PROMPT === から === OUTPUT === まで）と
+    エージェントの通常出力（タスク本文に "rate limit" 等を含みうる）を除外し、
+    エラー行・構造化エラーイベントとその直後の数行だけを対象にする。
+    追記されたテキストを順に feed() でき、各行のバイト位置を追跡する。
+    ログの各行に付与された接頭辞（時刻等、prefix_bytes）はテキストに含まれないが、
+    バイト位置には含める。
+    """
+
+    def __init__(self, start_offset: Optional[int] = 0, prefix_bytes: int = 0):
+        """初期化
+
+        Args:
+            start_offset: 最初に渡すテキストのログ内バイト位置（Noneで不明）
+            prefix_bytes: ログの各行の接頭辞のバイト数
+        """
+        self._offset = start_offset
+        self._prefix_bytes = prefix_bytes
+        self._partial = ""
+        self._in_prompt = False
+        self._context = 0
+
+    @property
+    def in_context(self) -> bool:
+        """直前のエラー行に続く行をまだ対象にするかどうか"""
+        return self._context > 0
+
+    def seek(self, offset: Optional[int]) -> None:
+        """次に渡す行のログ内バイト位置を設定（行の境界でのみ、Noneで不明）"""
+        self._offset = offset
+
+    def feed(self, text: str, final: bool = False) -> list[tuple[Optional[int], str]]:
+        """テキストを処理して対象行を返す
+
+        Args:
+            text: 追記されたテキスト
+            final: True なら末尾の改行なしの行も処理する
+
+        Returns:
+            (ログ内バイト位置, 行) のリスト（位置が不明な行はNone）
+        """
+        lines = (self._partial + text).split("\n")
+        self._partial = "" if final else lines.pop()
+        selected = []
+        for line in lines:
+            offset = None
+            if self._offset is not None:
+                offset = self._offset + self._prefix_bytes
+                self._offset = offset + len(line.encode("utf-8")) + 1
+            if self._select(line):
+                selected.append((offset, line))
+        return selected
+
+    def _select(self, line: str) -> bool:
+        stripped = line.strip()
+        if stripped == PROMPT_MARKER:
+            self._in_prompt = True
+            return False
+        if stripped == OUTPUT_MARKER:
+            self._in_prompt = False
+            self._context = 0
+            return False
+        if self._in_prompt or not stripped:
+            return False
+        if _is_error_event(stripped) or _ERROR_LINE.match(line):
+            self._context = ERROR_CONTEXT_LINES
+            return True
+        if self._context:
+            self._context -= 1
+            return True
+        return False
+
+
+def select_error_lines(
+    text: str, start_offset: Optional[int] = 0, prefix_bytes: int = 0
+) -> list[tuple[Optional[int], str]]:
+    """ログ（の末尾）からクォータ検出の対象行を選ぶ
+
+    テキストに OUTPUT_MARKER が含まれる場合はそれ以降だけを対象にする。
+
+    Args:
+        text: ログの内容
+        start_offset: text のログ内バイト位置（Noneで不明）
+        prefix_bytes: ログの各行の接頭辞のバイト数（text には含まれない）
+
+    Returns:
+        (ログ内バイト位置, 行) のリスト
+    """
+    marker = text.rfind(OUTPUT_MARKER)
+    if marker >= 0:
+        newline = text.find("\n", marker)
+        cut = len(text) if newline < 0 else newline + 1
+        if start_offset is not None:
+            skipped = text[:cut]
+            start_offset += len(skipped.encode("utf-8")) + prefix_bytes * skipped.count("\n")
+        text = text[cut:]
+    return ErrorScope(start_offset, prefix_bytes).feed(text, final=True)
+
 
 class QuotaErrorDetector:
     """クォータエラー検出クラス
@@ -62,20 +312,25 @@ class QuotaErrorDetector:
     def __init__(
         self,
         max_seconds: int = 7200,
-        margin_percent: int = 10
+        margin_percent: int = 10,
+        rules: Optional[list[QuotaRule]] = None
     ):
         """初期化
 
         Args:
             max_seconds: 最大待機時間（秒）
             margin_percent: 安全マージン（パーセント）
+            rules: 検出ルール（Noneで QUOTA_RULES）
         """
         self._max_seconds = max_seconds
         self._margin_percent = margin_percent
+        self._matcher = QuotaMatcher(QUOTA_RULES if rules is None else rules)
 
     def detect(self, log_content: str) -> Optional[int]:
         """ログ内容からクォータエラーを検出
 
+        内容全体を対象にする。実行ログには detect_in_output() を使用する。
+
         Args:
             log_content: ログの内容
 
@@ -85,32 +340,59 @@ class QuotaErrorDetector:
         if not log_content:
             return None
 
-        for pattern, extractor, default_seconds in QUOTA_PATTERNS:
-            match = re.search(pattern, log_content, re.IGNORECASE)
-            if match:
-                # 時間を抽出または固定値を使用
-                if extractor is not None:
-                    try:
-                        seconds = extractor(match)
-                    except (ValueError, IndexError) as e:
-                        logger.warning(f"Failed to extract time from pattern: {e}")
-                        seconds = default_seconds
-                else:
-                    seconds = default_seconds
-
-                # 安全マージンを追加
-                seconds = self._apply_margin(seconds)
-
-                # 最大値でキャップ
-                seconds = min(seconds, self._max_seconds)
-
-                logger.info(
-                    f"Quota error detected: pattern='{pattern}', "
-                    f"cooldown={seconds}s"
-                )
-                return seconds
+        found = self._matcher.search(log_content)
+        if found is None:
+            return None
+        rule, match = found
+        return self._cooldown_for(rule, match)
+
+    def detect_in_output(self, log_content: str, start_offset: int = 0) -> Optional[QuotaDetection]:
+        """ログのエラー出力部分からクォータエラーを検出
 
-        return None
+        プロンプトや通常出力は対象外（select_error_lines を参照）。
+
+        Args:
+            log_content: ログの内容（末尾のみでも可）
+            start_offset: log_content のログ内バイト位置
+
+        Returns:
+            検出結果、クォータエラーでなければNone
+        """
+        if not log_content:
+            return None
+        return self.detect_lines(select_error_lines(log_content, start_offset))
+
+    def detect_lines(self, lines: list[tuple[Optional[int], str]]) -> Optional[QuotaDetection]:
+        """選択済みの行からクォータエラーを検出
+
+        Args:
+            lines: (ログ内バイト位置（不明ならNone）, 行) のリスト
+
+        Returns:
+            検出結果、クォータエラーでなければNone
+        """
+        if not lines:
+            return None
+        starts = []
+        position = 0
+        for _offset, line in lines:
+            starts.append(position)
+            position += len(line) + 1
+        found = self._matcher.search("\n".join(line for _offset, line in lines))
+        if found is None:
+            return None
+        rule, match = found
+
+        index = bisect.bisect_right(starts, match.start()) - 1
+        line_offset, line = lines[index]
+        column = match.start() - starts[index]
+        return QuotaDetection(
+            seconds=self._cooldown_for(rule, match),
+            rule=rule.pattern,
+            offset=None if line_offset is None else line_offset + len(line[:column].encode("utf-8")),
+            line=line.strip(),
+            timed=any(match.groupdict().get(name) is not None for name in _TIME_UNITS)
+        )
 
     def detect_from_file(self, log_file_path: str) -> Optional[int]:
         """ファイルからクォータエラーを検出
@@ -124,7 +406,8 @@ class QuotaErrorDetector:
         try:
             with open(log_file_path, "r", encoding="utf-8", errors="ignore") as f:
                 content = f.read()
-            return self.detect(content)
+            detection = self.detect_in_output(content)
+            return detection.seconds if detection else None
         except FileNotFoundError:
             logger.warning(f"Log file not found: {log_file_path}")
             return None
@@ -132,6 +415,22 @@ class QuotaErrorDetector:
             logger.warning(f"Failed to read log file {log_file_path}: {e}")
             return None
 
+    def _cooldown_for(self, rule: QuotaRule, match: re.Match) -> int:
+        # 時間を抽出または固定値を使用
+        seconds = rule.seconds_for(match)
+
+        # 安全マージンを追加
+        seconds = self._apply_margin(seconds)
+
+        # 最大値でキャップ
+        seconds = min(seconds, self._max_seconds)
+
+        logger.info(
+            f"Quota error detected: pattern='{rule.pattern}', "
+            f"cooldown={seconds}s"
+        )
+        return seconds
+
     def _apply_margin(self, seconds: int) -> int:
         """安全マージンを適用
 
@@ -142,3 +441,104 @@ class QuotaErrorDetector:
             マージン適用後の秒数
         """
         return int(seconds * (1 + self._margin_percent / 100))
+
+
+# 実行中の早期中断に使う確定的なパターン
+# 「rate limit」等の緩いパターンはエージェントの通常出力にも現れるため含めない
+CONFIRMED_QUOTA_PATTERNS: list[str] = [
+    r"quota will reset after (\d+)m(\d+)s",
+    r"TerminalQuotaError",
+    r"RateLimitError",
+    r"quota.*exhausted",
+]
+
+
+class StreamingQuotaDetector:
+    """実行中ログ向けの逐次クォータエラー検出クラス
+
+    ログに追記されたテキストを feed() で順に受け取り、ErrorScope が選んだ
+    エラー出力の行で確定的なパターン（CONFIRMED_QUOTA_PATTERNS）を検出した
+    時点で待機時間を返す。行単位で処理するため、チャンク境界をまたぐ行も検出できる。
+
+    リセット時刻の行（"quota will reset after ..."）はエラー行より後の読み込みで
+    届くことがあるため、エラー行から待機時間が読み取れない場合は判定を保留し、
+    後続の行（最大 ERROR_CONTEXT_LINES 行）が揃うか、新しい出力がないまま
+    feed("") が呼ばれた時点で確定する。
+    """
+
+    def __init__(
+        self,
+        detector: QuotaErrorDetector,
+        patterns: Optional[list[str]] = None,
+        prefix_bytes: int = 0
+    ):
+        """初期化
+
+        Args:
+            detector: 待機時間の算出に使う検出器
+            patterns: 早期中断の対象パターン（Noneで CONFIRMED_QUOTA_PATTERNS）
+            prefix_bytes: ログの各行の接頭辞のバイト数（feed() するテキストには含まれない）
+        """
+        self._detector = detector
+        self._pattern = re.compile(
+            "|".join(f"(?:{p})" for p in (patterns or CONFIRMED_QUOTA_PATTERNS)),
+            re.IGNORECASE
+        )
+        self._scope = ErrorScope(prefix_bytes=prefix_bytes)
+        self._pending: Optional[list[tuple[Optional[int], str]]] = None  # 判定保留中の一致行以降の行
+        self.detection: Optional[QuotaDetection] = None  # 検出結果
+
+    @property
+    def detected(self) -> bool:
+        """クォータエラーを検出済みかどうか"""
+        return self.detection is not None
+
+    @property
+    def pending(self) -> bool:
+        """確定的なパターンに一致し、待機時間の判定を保留中かどうか"""
+        return self._pending is not None
+
+    def seek(self, offset: Optional[int]) -> None:
+        """次に feed() するテキストのログ内バイト位置を設定（Noneで不明）"""
+        self._scope.seek(offset)
+
+    def feed(self, text: str) -> Optional[int]:
+        """追記分のテキストを検査
+
+        Args:
+            text: 前回以降にログへ追記されたテキスト（空なら新しい出力なし）
+
+        Returns:
+            待機秒数（今回の追記で初めて検出した場合）、それ以外はNone
+        """
+        if self.detected:
+            return None
+        if not text:
+            return self._decide() if self._pending is not None else None
+
+        lines = self._scope.feed(text)
+        if self._pending is None:
+            for index, (_offset, line) in enumerate(lines):
+                if self._pattern.search(line):
+                    self._pending = []
+                    lines = lines[index:]
+                    break
+            else:
+                return None
+        # 一致行以降（リセット時刻の行を含む）から待機時間を算出
+        self._pending.extend(lines)
+        detection = self._detector.detect_lines(self._pending)
+        if detection is None:
+            self._pending = None
+            return None
+        context_complete = len(self._pending) > ERROR_CONTEXT_LINES or not self._scope.in_context
+        if detection.timed or context_complete:
+            return self._decide(detection)
+        return None
+
+    def _decide(self, detection: Optional[QuotaDetection] = None) -> Optional[int]:
+        if detection is None:
+            detection = self._detector.detect_lines(self._pending)
+        self._pending = None
+        self.detection = detection
+        return detection.seconds if detection else None
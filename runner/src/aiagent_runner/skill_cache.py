@@ -0,0 +1,209 @@
+# src/aiagent_runner/skill_cache.py
+# Content-addressed cache of extracted skill archives
+# Reference: docs/design/AGENT_SKILLS.md
+
+import base64
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from aiagent_runner.mcp_client import SkillDefinition
+
+logger = logging.getLogger(__name__)
+
+# Records which archive digest each installed skill directory came from
+MANIFEST_NAME = ".skills-manifest.json"
+
+
+def skill_digest(skill: SkillDefinition) -> str:
+    """Content hash identifying a skill archive."""
+    return hashlib.sha256(skill.archive_base64.encode()).hexdigest()
+
+
+class SkillCache:
+    """Extracts each distinct skill archive once and links it into agents.
+
+    Archives are stored under root/<sha256 of archive_base64>/, extracted
+    into a temporary directory and renamed into place so concurrent spawns
+    never see a partial extraction. install() then points
+    <skills_dir>/<directory_name> at the cached copy (symlink, or a copy
+    where symlinks are unavailable) and keeps a manifest so an unchanged
+    skill costs only a hash comparison on the next spawn.
+    """
+
+    def __init__(self, root: Path):
+        """Initialize the cache.
+
+        Args:
+            root: Directory holding extracted archives (created on demand)
+        """
+        self.root = Path(root)
+
+    def install(self, skills_dir: Path, skills: list[SkillDefinition]) -> None:
+        """Make skills_dir contain exactly the given skills.
+
+        Args:
+            skills_dir: .claude/skills or .gemini/skills directory
+            skills: Skills the agent should have (empty removes skills_dir)
+        """
+        if not skills:
+            if skills_dir.is_symlink() or skills_dir.is_file():
+                skills_dir.unlink()
+            elif skills_dir.exists():
+                shutil.rmtree(skills_dir)
+            logger.debug("No skills to write")
+            return
+
+        manifest = self._read_manifest(skills_dir)
+        desired = {skill.directory_name: skill for skill in skills}
+
+        # Remove skills that are no longer assigned (and unknown leftovers)
+        if skills_dir.exists():
+            for entry in skills_dir.iterdir():
+                if entry.name == MANIFEST_NAME or entry.name in desired:
+                    continue
+                self._remove(entry)
+                manifest.pop(entry.name, None)
+
+        skills_dir.mkdir(parents=True, exist_ok=True)
+        changed = 0
+        for name, skill in desired.items():
+            digest = skill_digest(skill)
+            target = skills_dir / name
+            # exists() follows the symlink, so links into pruned entries are repaired
+            if manifest.get(name) == digest and target.exists():
+                self._touch(digest)
+                continue
+            changed += 1
+            self._remove(target)
+            try:
+                source = self._ensure_extracted(digest, skill)
+                self._link(self._skill_root(source, name), target)
+                manifest[name] = digest
+                logger.debug(f"Installed skill {name} ({digest[:12]})")
+            except Exception as e:
+                logger.error(f"Failed to extract skill {name}: {e}")
+                # Create fallback directory with error info (retried next spawn)
+                self._remove(target)
+                target.mkdir(parents=True, exist_ok=True)
+                (target / "EXTRACTION_ERROR.txt").write_text(f"Failed to extract skill archive: {e}")
+                manifest.pop(name, None)
+
+        self._write_manifest(skills_dir, manifest)
+        if changed:
+            logger.info(f"Wrote {changed} of {len(skills)} skills to {skills_dir}")
+        else:
+            logger.debug(f"Skills unchanged in {skills_dir}")
+
+    def prune(self, max_age_seconds: float) -> int:
+        """Delete cached archives not used for max_age_seconds.
+
+        Returns:
+            Number of cache entries removed
+        """
+        if not self.root.exists():
+            return 0
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for entry in self.root.iterdir():
+            try:
+                if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                    shutil.rmtree(entry)
+                    removed += 1
+            except OSError as e:
+                logger.debug(f"Failed to prune skill cache entry {entry}: {e}")
+        if removed:
+            logger.info(f"Pruned {removed} unused skill cache entries")
+        return removed
+
+    def _ensure_extracted(self, digest: str, skill: SkillDefinition) -> Path:
+        """Return the extracted archive for digest, extracting it if needed."""
+        entry = self.root / digest
+        if entry.is_dir():
+            self._touch(digest)
+            return entry
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f".{digest[:12]}-", dir=self.root))
+        try:
+            archive_bytes = base64.b64decode(skill.archive_base64)
+            with zipfile.ZipFile(io.BytesIO(archive_bytes)) as zf:
+                # Security: Validate paths to prevent directory traversal
+                safe_members = []
+                for member in zf.namelist():
+                    if member.startswith('/') or '..' in member:
+                        logger.warning(f"Skipping unsafe path in skill archive: {member}")
+                        continue
+                    safe_members.append(member)
+                zf.extractall(staging, members=safe_members)
+            try:
+                os.rename(staging, entry)
+            except OSError:
+                # Another spawn finished extracting the same archive first
+                if not entry.is_dir():
+                    raise
+                shutil.rmtree(staging, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return entry
+
+    def _touch(self, digest: str) -> None:
+        """Mark a cache entry as recently used for prune()."""
+        try:
+            os.utime(self.root / digest)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _skill_root(extracted: Path, directory_name: str) -> Path:
+        """Locate the skill directory inside an extracted archive.
+
+        Archives normally contain the skill's root directory (e.g.
+        webapp-testing/SKILL.md); archives without it are used as is.
+        """
+        nested = extracted / directory_name
+        return nested if nested.is_dir() else extracted
+
+    @staticmethod
+    def _link(source: Path, target: Path) -> None:
+        try:
+            os.symlink(source, target, target_is_directory=True)
+        except (OSError, NotImplementedError):
+            # Windows without symlink privilege
+            shutil.copytree(source, target)
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        if path.is_symlink() or path.is_file():
+            path.unlink()
+        elif path.exists():
+            shutil.rmtree(path)
+
+    @staticmethod
+    def _read_manifest(skills_dir: Path) -> dict[str, str]:
+        try:
+            data = json.loads((skills_dir / MANIFEST_NAME).read_text())
+            return data if isinstance(data, dict) else {}
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    @staticmethod
+    def _write_manifest(skills_dir: Path, manifest: dict[str, str]) -> None:
+        path = skills_dir / MANIFEST_NAME
+        content = json.dumps(manifest, indent=2, sort_keys=True)
+        try:
+            if path.read_text() == content:
+                return
+        except OSError:
+            pass
+        tmp = path.with_name(f"{MANIFEST_NAME}.{os.getpid()}.tmp")
+        tmp.write_text(content)
+        os.replace(tmp, path)
@@ -0,0 +1,91 @@
+# src/aiagent_runner/spawn_executor.py
+# Bounded thread pool for the blocking stages of spawning an Agent Instance
+# Reference: docs/plan/PHASE4_COORDINATOR_ARCHITECTURE.md
+
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Stage names used by the Coordinator
+STAGE_PROFILE = "profile"   # Fetch system prompt and skills (async, on the loop)
+STAGE_CONTEXT = "context"   # Write the agent context directory
+STAGE_SPAWN = "spawn"       # Log directory, temp files and Popen
+
+
+@dataclass
+class StageTiming:
+    """Accumulated durations of one stage."""
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    last: float = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "last": self.last,
+        }
+
+
+class SpawnExecutor:
+    """Runs blocking spawn stages off the event loop and times them.
+
+    Context writes, skill extraction, mkdirs and Popen can block for a long
+    time on slow or network-mounted working directories. Running them on a
+    small dedicated pool keeps the event loop free to serve other pairs,
+    the reaper and log uploads. The pool is created on first use.
+    """
+
+    def __init__(self, max_workers: int):
+        """Initialize the executor.
+
+        Args:
+            max_workers: Maximum number of stages running at the same time
+        """
+        self._max_workers = max_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._timings: dict[str, StageTiming] = {}
+
+    async def run(self, stage: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run fn(*args, **kwargs) on the pool and record its duration under stage."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self._max_workers, thread_name_prefix="spawn"
+            )
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        try:
+            return await loop.run_in_executor(self._pool, functools.partial(fn, *args, **kwargs))
+        finally:
+            self.record(stage, time.monotonic() - started)
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Record the duration of a stage (also used for stages run on the loop)."""
+        self._timings.setdefault(stage, StageTiming()).add(seconds)
+        logger.debug(f"Spawn stage {stage} took {seconds * 1000:.0f}ms")
+
+    def timings(self) -> dict[str, dict]:
+        """Per-stage statistics as JSON-serializable data."""
+        return {stage: timing.as_dict() for stage, timing in self._timings.items()}
+
+    def shutdown(self) -> None:
+        """Release the worker threads; stages already running finish in the background."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
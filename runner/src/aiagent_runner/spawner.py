@@ -0,0 +1,370 @@
+# src/aiagent_runner/spawner.py
+# Spawner helper process: forks Agent Instances on behalf of the Coordinator
+# Reference: docs/plan/PHASE4_COORDINATOR_ARCHITECTURE.md
+#
+# This file is also executed directly as the helper's main script, so it
+# must only import the standard library.
+
+import json
+import logging
+import os
+import selectors
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Message framing: 4-byte big-endian length followed by a JSON object
+_HEADER = struct.Struct(">I")
+_MAX_FDS = 4
+
+
+class SpawnerError(Exception):
+    """The spawner helper is unavailable or did not answer."""
+    pass
+
+
+def _send(sock: socket.socket, message: dict, fds: tuple = ()) -> None:
+    payload = json.dumps(message).encode("utf-8")
+    frame = _HEADER.pack(len(payload)) + payload
+    # Ancillary data (the fds) travels with the first bytes of the frame
+    sent = socket.send_fds(sock, [frame], list(fds)) if fds else sock.send(frame)
+    if sent < len(frame):
+        sock.sendall(frame[sent:])
+
+
+def _recv_exact(sock: socket.socket, size: int, buffer: bytes = b"") -> Optional[bytes]:
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            return None
+        buffer += chunk
+    return buffer
+
+
+def _recv(sock: socket.socket) -> tuple[Optional[dict], list[int]]:
+    """Receive one message; returns (None, []) on EOF."""
+    data, fds, _flags, _addr = socket.recv_fds(sock, _HEADER.size, _MAX_FDS)
+    if not data:
+        return None, fds
+    header = _recv_exact(sock, _HEADER.size, data)
+    if header is None:
+        return None, fds
+    (length,) = _HEADER.unpack(header)
+    payload = _recv_exact(sock, length)
+    if payload is None:
+        return None, fds
+    return json.loads(payload), fds
+
+
+class RemoteProcess:
+    """Popen-like handle for a process started by the spawner helper.
+
+    The helper is the real parent and reaps the process; its exit status
+    arrives as a notification. If the helper itself is gone, liveness is
+    probed with signal 0 and the exit code is reported as -1.
+    """
+
+    def __init__(self, pid: int, client: "SpawnerClient"):
+        self.pid = pid
+        self.returncode: Optional[int] = None
+        self._client = client
+
+    def poll(self) -> Optional[int]:
+        if self.returncode is None and not self._client.alive:
+            try:
+                os.kill(self.pid, 0)
+            except ProcessLookupError:
+                self.returncode = -1
+            except PermissionError:
+                pass
+        return self.returncode
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(str(self.pid), timeout)
+            time.sleep(0.05)
+        return self.returncode
+
+    def send_signal(self, sig: int) -> None:
+        if self.poll() is not None:
+            return
+        try:
+            os.kill(self.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def terminate(self) -> None:
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self) -> None:
+        self.send_signal(signal.SIGKILL)
+
+
+class SpawnerClient:
+    """Coordinator-side handle of the spawner helper (POSIX only).
+
+    fork() has to copy the page tables of the forking process, so spawning
+    straight from a long-running Coordinator gets slower as it grows. The
+    helper is a fresh, small interpreter started once at boot; spawn
+    requests (argv, cwd, environment overrides and the log file descriptor
+    via SCM_RIGHTS) are sent to it over a Unix socket pair and it answers
+    with the PID. spawn() is thread-safe.
+    """
+
+    def __init__(self, on_exit: Optional[Callable[[int], None]] = None):
+        """Initialize the client (the helper is started by start()).
+
+        Args:
+            on_exit: Called with the pid when a spawned process exits
+                     (from the client's reader thread)
+        """
+        self._on_exit = on_exit
+        self._sock: Optional[socket.socket] = None
+        self._helper: Optional[subprocess.Popen] = None
+        self._reader: Optional[threading.Thread] = None
+        self._send_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._next_id = 0
+        self._pending: dict[int, list] = {}  # request id -> [Event, response, RemoteProcess]
+        self._processes: dict[int, RemoteProcess] = {}
+        self._alive = False
+
+    @property
+    def alive(self) -> bool:
+        """True while the helper is connected."""
+        return self._alive
+
+    @property
+    def helper_pid(self) -> Optional[int]:
+        return self._helper.pid if self._helper else None
+
+    def start(self) -> None:
+        """Start the helper process."""
+        parent_sock, child_sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._helper = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), str(child_sock.fileno())],
+                pass_fds=[child_sock.fileno()],
+                stdin=subprocess.DEVNULL,
+            )
+        except BaseException:
+            parent_sock.close()
+            raise
+        finally:
+            child_sock.close()
+        self._sock = parent_sock
+        self._alive = True
+        self._reader = threading.Thread(target=self._read_loop, name="spawner-reader", daemon=True)
+        self._reader.start()
+        logger.info(f"Spawner helper started (PID: {self._helper.pid})")
+
+    def spawn(
+        self,
+        argv: list[str],
+        cwd: str,
+        env: dict[str, str],
+        stdout_fd: int,
+        timeout: float = 30.0,
+        stderr_fd: Optional[int] = None
+    ) -> RemoteProcess:
+        """Start a process through the helper.
+
+        Args:
+            argv: Command line
+            cwd: Working directory
+            env: Variables added to the helper's environment
+            stdout_fd: File descriptor receiving stdout (and stderr unless stderr_fd is given)
+            timeout: Seconds to wait for the helper's answer
+            stderr_fd: File descriptor receiving stderr
+
+        Returns:
+            Handle of the started process
+
+        Raises:
+            OSError: If the helper could not start the process (e.g. not found)
+            SpawnerError: If the helper is unavailable or does not answer
+        """
+        if not self._alive or self._sock is None:
+            raise SpawnerError("Spawner helper is not running")
+        waiter = [threading.Event(), None, None]
+        with self._state_lock:
+            self._next_id += 1
+            request_id = self._next_id
+            self._pending[request_id] = waiter
+        request = {"id": request_id, "argv": argv, "cwd": cwd, "env": env}
+        try:
+            with self._send_lock:
+                fds = (stdout_fd,) if stderr_fd is None else (stdout_fd, stderr_fd)
+                _send(self._sock, request, fds)
+        except OSError as e:
+            with self._state_lock:
+                self._pending.pop(request_id, None)
+            raise SpawnerError(f"Failed to send spawn request: {e}") from e
+
+        if not waiter[0].wait(timeout):
+            with self._state_lock:
+                self._pending.pop(request_id, None)
+            raise SpawnerError(f"Spawner helper did not answer within {timeout}s")
+        response = waiter[1]
+        if response is None:
+            raise SpawnerError("Spawner helper exited")
+        if "error" in response:
+            if response.get("errno"):
+                raise OSError(response["errno"], response["error"])
+            raise SpawnerError(response["error"])
+        # Not looked up in _processes: a short-lived process may already
+        # have exited (and been dropped from it) by the time we wake up
+        return waiter[2]
+
+    def close(self) -> None:
+        """Stop the helper; processes it started keep running."""
+        self._alive = False
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+            self._sock = None
+        if self._helper is not None:
+            try:
+                self._helper.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._helper.kill()
+                self._helper.wait()
+            self._helper = None
+
+    def _read_loop(self) -> None:
+        sock = self._sock
+        try:
+            while True:
+                message, fds = _recv(sock)
+                for fd in fds:
+                    os.close(fd)
+                if message is None:
+                    break
+                self._handle(message)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Spawner connection error: {e}")
+        finally:
+            if self._alive:
+                logger.warning("Spawner helper exited, spawning directly from now on")
+            self._alive = False
+            with self._state_lock:
+                pending, self._pending = self._pending, {}
+            for waiter in pending.values():
+                waiter[0].set()
+
+    def _handle(self, message: dict) -> None:
+        if "exited" in message:
+            pid = message["exited"]
+            with self._state_lock:
+                process = self._processes.pop(pid, None)
+            if process is not None:
+                process.returncode = message.get("returncode", -1)
+            if self._on_exit:
+                try:
+                    self._on_exit(pid)
+                except Exception:
+                    logger.exception(f"Spawner exit callback failed for PID {pid}")
+            return
+
+        with self._state_lock:
+            waiter = self._pending.pop(message.get("id"), None)
+            process = None
+            if "pid" in message:
+                # Registered here, before any exit notification can be read;
+                # the exit handler sets the return code on this same object
+                process = RemoteProcess(message["pid"], self)
+                self._processes[message["pid"]] = process
+        if waiter is not None:
+            waiter[1] = message
+            waiter[2] = process
+            waiter[0].set()
+
+
+# ==========================================================================
+# Helper process
+# ==========================================================================
+
+def _serve(sock: socket.socket) -> None:
+    """Helper main loop: start requested processes and report their exits."""
+    children: dict[int, subprocess.Popen] = {}
+
+    # SIGCHLD wakes the selector so exits are reported right away
+    wakeup_r, wakeup_w = os.pipe()
+    os.set_blocking(wakeup_w, False)
+    signal.set_wakeup_fd(wakeup_w)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+    selector = selectors.DefaultSelector()
+    selector.register(sock, selectors.EVENT_READ)
+    selector.register(wakeup_r, selectors.EVENT_READ)
+
+    while True:
+        for key, _events in selector.select():
+            if key.fileobj is sock:
+                message, fds = _recv(sock)
+                if message is None:
+                    for fd in fds:
+                        os.close(fd)
+                    return  # Coordinator closed the connection
+                _send(sock, _spawn_child(message, fds, children))
+            else:
+                os.read(wakeup_r, 4096)
+        for pid, child in list(children.items()):
+            returncode = child.poll()
+            if returncode is not None:
+                del children[pid]
+                _send(sock, {"exited": pid, "returncode": returncode})
+
+
+def _spawn_child(request: dict, fds: list[int], children: dict[int, subprocess.Popen]) -> dict:
+    response: dict = {"id": request.get("id")}
+    stdout_fd = fds[0] if fds else None
+    if len(fds) > 1:
+        stderr = fds[1]
+    else:
+        stderr = subprocess.STDOUT if stdout_fd is not None else None
+    try:
+        child = subprocess.Popen(
+            request["argv"],
+            cwd=request.get("cwd") or None,
+            stdout=stdout_fd,
+            stderr=stderr,
+            stdin=subprocess.DEVNULL,
+            env={**os.environ, **request.get("env", {})},
+        )
+        children[child.pid] = child
+        response["pid"] = child.pid
+    except OSError as e:
+        response["error"] = str(e)
+        response["errno"] = e.errno
+    except Exception as e:
+        response["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        for fd in fds:
+            os.close(fd)
+    return response
+
+
+def main(argv: list[str]) -> int:
+    sock = socket.socket(fileno=int(argv[1]))
+    try:
+        _serve(sock)
+    finally:
+        sock.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
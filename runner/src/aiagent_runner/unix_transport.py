@@ -0,0 +1,234 @@
+# src/aiagent_runner/unix_transport.py
+# Persistent, multiplexed JSON-RPC transport over the MCP Unix socket
+# Reference: docs/plan/PHASE4_COORDINATOR_ARCHITECTURE.md
+
+import asyncio
+import itertools
+import json
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# MCPServer can return multi-megabyte responses (skill archives are Base64 ZIPs),
+# so the default 64KiB StreamReader line limit is far too small.
+DEFAULT_READ_LIMIT = 64 * 1024 * 1024
+
+
+class _Connection:
+    """A single long-lived socket with requests matched to responses by id."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._pending: dict[int, asyncio.Future] = {}
+        self._write_lock = asyncio.Lock()
+        self._closed = False
+        self._reader_task = asyncio.ensure_future(self._read_loop())
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    async def send(self, message: dict) -> None:
+        """Write one JSON-RPC message (request or notification)."""
+        data = json.dumps(message).encode() + b"\n"
+        async with self._write_lock:
+            if self._closed:
+                raise ConnectionError("Connection is closed")
+            try:
+                self._writer.write(data)
+                await self._writer.drain()
+            except OSError:
+                # Broken socket: make sure the pool stops handing it out
+                self._closed = True
+                raise
+
+    def expect(self, request_id: int) -> asyncio.Future:
+        """Register a future that resolves with the response for request_id."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        return future
+
+    def forget(self, request_id: int) -> None:
+        """Drop a pending request (e.g. after a timeout)."""
+        self._pending.pop(request_id, None)
+
+    async def _read_loop(self) -> None:
+        error: Exception = ConnectionError("MCP server closed the connection")
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError as e:
+                    logger.warning(f"Discarding malformed MCP response: {e}")
+                    continue
+                future = self._pending.pop(data.get("id"), None)
+                if future is None:
+                    logger.debug(f"Discarding MCP response for unknown id: {data.get('id')}")
+                    continue
+                if not future.done():
+                    future.set_result(data)
+        except asyncio.CancelledError:
+            error = ConnectionError("Connection closed by client")
+        except Exception as e:
+            error = ConnectionError(f"MCP connection lost: {e}")
+        finally:
+            self._closed = True
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+
+    async def close(self) -> None:
+        self._closed = True
+        self._reader_task.cancel()
+        try:
+            self._writer.close()
+            await self._writer.wait_closed()
+        except Exception:
+            pass
+        try:
+            await self._reader_task
+        except (asyncio.CancelledError, Exception):
+            pass
+
+
+class UnixSocketTransport:
+    """Pool of persistent Unix socket connections to the MCP server.
+
+    MCPServer keeps a socket open for as many JSON-RPC lines as the client
+    sends and echoes each request's id, so one connection can carry many
+    requests in flight. Requests get a unique id and are dispatched to the
+    least busy connection; a new connection is opened (up to max_connections)
+    only when every existing one already has requests in flight. Connections
+    closed by the server are dropped and transparently re-established on the
+    next call.
+
+    Raises ConnectionError on connection failures and asyncio.TimeoutError
+    when no response arrives within request_timeout; callers map these to
+    their own error types.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        max_connections: int = 2,
+        request_timeout: Optional[float] = 60.0,
+        read_limit: int = DEFAULT_READ_LIMIT
+    ):
+        """Initialize the transport. No connection is opened until first use.
+
+        Args:
+            socket_path: Path to the MCP Unix socket
+            max_connections: Maximum number of pooled connections
+            request_timeout: Seconds to wait for a response (None = no limit)
+            read_limit: Maximum size of a single response line in bytes
+        """
+        if max_connections <= 0:
+            raise ValueError("max_connections must be positive")
+        self._socket_path = socket_path
+        self._max_connections = max_connections
+        self._request_timeout = request_timeout
+        self._read_limit = read_limit
+        self._connections: list[_Connection] = []
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._ids = itertools.count(1)
+
+    @property
+    def connection_count(self) -> int:
+        """Number of open pooled connections."""
+        return sum(1 for c in self._connections if not c.closed)
+
+    async def request(self, method: str, params: dict) -> dict:
+        """Send a JSON-RPC request and return the raw response message.
+
+        A request is retried once on a fresh connection only when it could
+        not be written (the server never saw it); once written, failures are
+        surfaced to the caller because tool calls are not idempotent.
+        """
+        request_id = next(self._ids)
+        message = {"jsonrpc": "2.0", "method": method, "params": params, "id": request_id}
+
+        try:
+            connection, future = await self._send_request(message, request_id)
+        except (ConnectionError, OSError) as e:
+            logger.debug(f"MCP connection unusable, reconnecting: {e}")
+            try:
+                connection, future = await self._send_request(message, request_id)
+            except OSError as e2:
+                raise ConnectionError(str(e2)) from e2
+
+        try:
+            return await asyncio.wait_for(future, self._request_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            connection.forget(request_id)
+            raise
+
+    async def _send_request(
+        self, message: dict, request_id: int
+    ) -> tuple[_Connection, asyncio.Future]:
+        """Write a request on a pooled connection and return its response future."""
+        connection = await self._acquire()
+        future = connection.expect(request_id)
+        try:
+            await connection.send(message)
+        except BaseException:
+            connection.forget(request_id)
+            future.cancel()
+            raise
+        return connection, future
+
+    async def notify(self, method: str, params: dict) -> None:
+        """Send a JSON-RPC notification (no id, no response)."""
+        message = {"jsonrpc": "2.0", "method": method, "params": params}
+        connection = await self._acquire()
+        await connection.send(message)
+
+    async def close(self) -> None:
+        """Close every pooled connection, failing requests still in flight."""
+        connections, self._connections = self._connections, []
+        for connection in connections:
+            await connection.close()
+
+    async def _acquire(self) -> _Connection:
+        """Pick the least busy open connection, opening one if needed."""
+        self._connections = [c for c in self._connections if not c.closed]
+        idle = [c for c in self._connections if c.in_flight == 0]
+        if idle:
+            return idle[0]
+        if len(self._connections) >= self._max_connections:
+            return min(self._connections, key=lambda c: c.in_flight)
+
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            # Another caller may have connected while we waited
+            self._connections = [c for c in self._connections if not c.closed]
+            if self._connections and (
+                len(self._connections) >= self._max_connections
+                or any(c.in_flight == 0 for c in self._connections)
+            ):
+                return min(self._connections, key=lambda c: c.in_flight)
+            try:
+                reader, writer = await asyncio.open_unix_connection(
+                    self._socket_path, limit=self._read_limit
+                )
+            except (ConnectionRefusedError, FileNotFoundError, OSError) as e:
+                raise ConnectionError(
+                    f"Cannot connect to MCP server at {self._socket_path}: {e}"
+                ) from e
+            connection = _Connection(reader, writer)
+            self._connections.append(connection)
+            logger.debug(
+                f"Opened MCP connection {len(self._connections)}/{self._max_connections} "
+                f"to {self._socket_path}"
+            )
+            return connection
@@ -0,0 +1,258 @@
+# src/aiagent_runner/upload_spool.py
+# Durable queue of pending log uploads and the worker pool draining it
+# Reference: docs/design/LOG_TRANSFER_DESIGN.md
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from aiagent_runner.context_writer import atomic_write_text
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_SUFFIX = ".json"
+
+
+@dataclass
+class UploadJob:
+    """One log waiting to be uploaded (persisted as a spool manifest)."""
+    log_file_path: str
+    execution_log_id: str
+    agent_id: str
+    task_id: str
+    project_id: str
+    uploaded_offset: int = 0      # Bytes already shipped while the instance ran
+    attempts: int = 0
+    next_attempt_at: float = 0.0  # Wall-clock time, so it survives restarts
+
+
+class UploadSpool:
+    """Directory holding one JSON manifest per pending upload.
+
+    Manifests are written atomically when a job is queued or rescheduled
+    and deleted once it is done, so a Coordinator restart finds exactly the
+    uploads that had not finished. The directory is created on first write.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def save(self, job: UploadJob) -> None:
+        atomic_write_text(self._path(job.execution_log_id), json.dumps(asdict(job)))
+
+    def remove(self, execution_log_id: str) -> None:
+        try:
+            os.unlink(self._path(execution_log_id))
+        except FileNotFoundError:
+            pass
+
+    def load(self) -> list[UploadJob]:
+        """All manifests in the spool; unreadable ones are deleted."""
+        if not self.directory.is_dir():
+            return []
+        jobs = []
+        for path in sorted(self.directory.glob(f"*{MANIFEST_SUFFIX}")):
+            try:
+                jobs.append(UploadJob(**json.loads(path.read_text(encoding="utf-8"))))
+            except (OSError, ValueError, TypeError) as e:
+                logger.warning(f"Dropping unreadable upload manifest {path}: {e}")
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+        return jobs
+
+    def _path(self, execution_log_id: str) -> Path:
+        # IDs are server generated, but never let one escape the directory
+        name = execution_log_id.replace(os.sep, "_").replace("/", "_")
+        return self.directory / f"{name}{MANIFEST_SUFFIX}"
+
+
+class UploadWorkerPool:
+    """Fixed number of workers uploading spooled logs.
+
+    Failed jobs are retried with exponential backoff and jitter until
+    max_attempts is reached. Jobs are only persisted once start() has been
+    given the spool; jobs submitted earlier are written out at that point,
+    together with loading the manifests left by a previous run.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[UploadJob], Awaitable[bool]],
+        workers: int = 2,
+        max_attempts: int = 5,
+        backoff_base: float = 5.0,
+        backoff_max: float = 300.0,
+        clock: Callable[[], float] = time.time,
+        jitter: Callable[[], float] = random.random
+    ):
+        """Initialize the pool (no workers run until start()).
+
+        Args:
+            handler: Uploads one job; returns True when the job is done
+            workers: Number of uploads running at the same time
+            max_attempts: Attempts per job before it is given up
+            backoff_base: Delay after the first failure (seconds)
+            backoff_max: Upper bound of the delay (seconds)
+            clock: Wall-clock time source
+            jitter: Random source in [0, 1)
+        """
+        self._handler = handler
+        self._workers = workers
+        self.max_attempts = max_attempts
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        self._clock = clock
+        self._jitter = jitter
+        self.pending: dict[str, UploadJob] = {}  # execution_log_id -> job
+        self._spool: Optional[UploadSpool] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self, spool: Optional[UploadSpool] = None) -> int:
+        """Start the workers and resume the jobs found in the spool.
+
+        Returns:
+            Number of jobs resumed from the spool
+        """
+        self._spool = spool
+        self._queue = asyncio.Queue()
+        resumed = 0
+        if spool is not None:
+            for job in self.pending.values():
+                self._persist(job)
+            for job in spool.load():
+                if job.execution_log_id not in self.pending:
+                    self.pending[job.execution_log_id] = job
+                    resumed += 1
+        for job in self.pending.values():
+            self._schedule(job)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"log-upload-{i}")
+            for i in range(max(1, self._workers))
+        ]
+        if resumed:
+            logger.info(f"Resuming {resumed} log upload(s) from the spool")
+        return resumed
+
+    def submit(self, job: UploadJob) -> None:
+        """Queue a job (replacing a pending job for the same execution log)."""
+        self.pending[job.execution_log_id] = job
+        self._persist(job)
+        if self._queue is not None:
+            self._schedule(job)
+
+    async def close(self, timeout: float) -> int:
+        """Let the workers finish the ready jobs for up to timeout seconds, then stop.
+
+        Jobs still waiting for a retry or interrupted by the deadline stay
+        in the spool for the next start.
+
+        Returns:
+            Number of jobs left pending
+        """
+        if self._queue is None:
+            return len(self.pending)
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Log uploads did not finish within {timeout}s")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        # Retries scheduled by the last failures of the drain
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        self._tasks = []
+        self._queue = None
+        if self.pending:
+            logger.info(f"{len(self.pending)} log upload(s) left in the spool")
+        return len(self.pending)
+
+    def backoff(self, attempts: int) -> float:
+        """Delay before the next attempt after `attempts` failures (equal jitter)."""
+        delay = min(self._backoff_max, self._backoff_base * (2 ** max(0, attempts - 1)))
+        return delay / 2 + self._jitter() * delay / 2
+
+    def _schedule(self, job: UploadJob) -> None:
+        timer = self._timers.pop(job.execution_log_id, None)
+        if timer is not None:
+            timer.cancel()
+        delay = job.next_attempt_at - self._clock()
+        if delay <= 0:
+            self._queue.put_nowait(job)
+        else:
+            loop = asyncio.get_running_loop()
+            self._timers[job.execution_log_id] = loop.call_later(delay, self._ready, job)
+
+    def _ready(self, job: UploadJob) -> None:
+        self._timers.pop(job.execution_log_id, None)
+        if self._queue is not None:
+            self._queue.put_nowait(job)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                if self.pending.get(job.execution_log_id) is job:
+                    await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: UploadJob) -> None:
+        job.attempts += 1
+        try:
+            done = await self._handler(job)
+        except Exception as e:
+            logger.error(f"Log upload error for {job.execution_log_id}: {e}")
+            done = False
+
+        if done or job.attempts >= self.max_attempts:
+            if not done:
+                logger.error(
+                    f"Giving up log upload for {job.execution_log_id} after {job.attempts} attempts"
+                )
+            self._finish(job)
+            return
+
+        delay = self.backoff(job.attempts)
+        job.next_attempt_at = self._clock() + delay
+        self._persist(job)
+        logger.info(
+            f"Retrying log upload for {job.execution_log_id} in {delay:.1f}s "
+            f"(attempt {job.attempts}/{self.max_attempts})"
+        )
+        self._schedule(job)
+
+    def _finish(self, job: UploadJob) -> None:
+        if self.pending.get(job.execution_log_id) is job:
+            del self.pending[job.execution_log_id]
+        if self._spool is not None:
+            try:
+                self._spool.remove(job.execution_log_id)
+            except OSError as e:
+                logger.warning(f"Failed to remove upload manifest for {job.execution_log_id}: {e}")
+
+    def _persist(self, job: UploadJob) -> None:
+        if self._spool is None:
+            return
+        try:
+            self._spool.save(job)
+        except OSError as e:
+            logger.warning(f"Failed to spool log upload {job.execution_log_id}: {e}")
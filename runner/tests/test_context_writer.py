@@ -0,0 +1,89 @@
+# tests/test_context_writer.py
+# Tests for idempotent context directory writes
+
+import os
+from unittest.mock import patch
+
+from aiagent_runner.context_writer import ContextWriter, atomic_write_text
+
+
+class TestAtomicWriteText:
+    """Tests for atomic_write_text()."""
+
+    def test_replaces_content_without_leftovers(self, tmp_path):
+        """Should replace the file and leave no temporary files behind."""
+        path = tmp_path / "settings.json"
+        path.write_text("old")
+
+        atomic_write_text(path, "new")
+
+        assert path.read_text() == "new"
+        assert os.listdir(tmp_path) == ["settings.json"]
+
+    def test_failed_write_keeps_original(self, tmp_path):
+        """If the rename fails the original file should be untouched."""
+        path = tmp_path / "settings.json"
+        path.write_text("old")
+
+        with patch("os.replace", side_effect=OSError("boom")):
+            try:
+                atomic_write_text(path, "new")
+            except OSError:
+                pass
+
+        assert path.read_text() == "old"
+        assert os.listdir(tmp_path) == ["settings.json"]
+
+
+class TestContextWriter:
+    """Tests for ContextWriter."""
+
+    def test_skips_unchanged_content(self, tmp_path):
+        """Writing the same content twice should only write once."""
+        writer = ContextWriter()
+        path = tmp_path / "CLAUDE.md"
+
+        assert writer.write(path, "# Agent") is True
+        with patch("aiagent_runner.context_writer.atomic_write_text") as write:
+            assert writer.write(path, "# Agent") is False
+        write.assert_not_called()
+
+    def test_existing_identical_file_is_not_rewritten(self, tmp_path):
+        """A file already on disk with the same content should be adopted, not written."""
+        path = tmp_path / "CLAUDE.md"
+        path.write_text("# Agent")
+        writer = ContextWriter()
+
+        assert writer.write(path, "# Agent") is False
+        assert writer.stats.written == 0
+
+    def test_rewrites_changed_or_edited_file(self, tmp_path):
+        """New content, or a file modified behind the writer's back, should be rewritten."""
+        writer = ContextWriter()
+        path = tmp_path / "settings.json"
+        writer.write(path, "v1")
+
+        assert writer.write(path, "v2") is True
+        path.write_text("edited by hand")
+        assert writer.write(path, "v2") is True
+        assert path.read_text() == "v2"
+
+    def test_ensure_lines_appends_missing_entries(self, tmp_path):
+        """Missing entries should be appended and user lines kept."""
+        writer = ContextWriter()
+        path = tmp_path / ".gitignore"
+        path.write_text("custom/\nlogs/")
+
+        assert writer.ensure_lines(path, ["logs/", "agents/"], header="# auto") is True
+
+        assert path.read_text() == "custom/\nlogs/\n# auto\nagents/\n"
+
+    def test_ensure_lines_does_not_reread_unchanged_file(self, tmp_path):
+        """Once verified, the file should not be read again until it changes."""
+        writer = ContextWriter()
+        path = tmp_path / ".gitignore"
+        writer.ensure_lines(path, ["agents/"])
+
+        with patch("pathlib.Path.read_text") as read:
+            assert writer.ensure_lines(path, ["agents/"]) is False
+        read.assert_not_called()
@@ -0,0 +1,97 @@
+# tests/test_control.py
+# Tests for the Coordinator control socket
+
+import asyncio
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from aiagent_runner.control import ControlError, ControlServer, send_control_command
+from aiagent_runner.coordinator import Coordinator
+from aiagent_runner.coordinator_config import CoordinatorConfig
+
+
+@pytest.fixture
+def socket_path():
+    # Keep the path short: Unix socket paths are limited to ~104 bytes
+    directory = tempfile.mkdtemp(prefix="ctl")
+    yield Path(directory) / "coordinator.sock"
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture
+def coordinator():
+    config = CoordinatorConfig(
+        agents={},
+        mcp_socket_path="/tmp/test.sock",
+        polling_interval=5,
+        max_concurrent=2
+    )
+    coordinator = Coordinator(config)
+    coordinator._wake_event = asyncio.Event()
+    return coordinator
+
+
+@pytest.fixture
+async def server(coordinator, socket_path):
+    control = ControlServer(coordinator, socket_path)
+    await control.start()
+    yield control
+    await control.close()
+
+
+class TestControlServer:
+    """Tests for ControlServer and send_control_command."""
+
+    @pytest.mark.asyncio
+    async def test_wake_sets_wake_event(self, server, coordinator, socket_path):
+        """wake should make the polling loop run a tick now."""
+        await send_control_command(socket_path, "wake")
+
+        assert coordinator._wake_event.is_set()
+
+    @pytest.mark.asyncio
+    async def test_drain_and_resume(self, server, coordinator, socket_path):
+        """drain should stop spawning and resume should undo it."""
+        response = await send_control_command(socket_path, "drain")
+        assert response == {"draining": True}
+        assert coordinator._draining is True
+
+        await send_control_command(socket_path, "resume")
+        assert coordinator._draining is False
+
+    @pytest.mark.asyncio
+    async def test_status(self, server, socket_path):
+        """status should report instances, cooldowns and tick timings."""
+        response = await send_control_command(socket_path, "status")
+
+        status = response["status"]
+        assert status["instances"] == []
+        assert status["cooldowns"] == []
+        assert status["max_concurrent"] == 2
+        assert status["last_tick_duration"] is None
+
+    @pytest.mark.asyncio
+    async def test_unknown_command_rejected(self, server, socket_path):
+        """Unknown commands should raise ControlError on the client."""
+        with pytest.raises(ControlError, match="Unknown command"):
+            await send_control_command(socket_path, "reboot")
+
+    @pytest.mark.asyncio
+    async def test_close_removes_socket(self, coordinator, socket_path):
+        """close() should remove the socket file."""
+        control = ControlServer(coordinator, socket_path)
+        await control.start()
+        assert socket_path.exists()
+
+        await control.close()
+
+        assert not socket_path.exists()
+
+    @pytest.mark.asyncio
+    async def test_coordinator_not_running(self, socket_path):
+        """Should raise ControlError when nothing listens on the socket."""
+        with pytest.raises(ControlError, match="not reachable"):
+            await send_control_command(socket_path, "status")
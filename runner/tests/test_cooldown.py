@@ -120,6 +120,18 @@ class TestCooldownManager:
         assert entry.reason == "quota"
         assert 1798 <= (entry.until - datetime.now()).total_seconds() <= 1802
 
+    def test_set_quota_records_rule_and_offset(self):
+        """クォータエラーを検出したルールとバイト位置を記録"""
+        manager = CooldownManager(default_seconds=60)
+        key = AgentInstanceKey("agt_001", "prj_001")
+
+        manager.set_quota(key, cooldown_seconds=300, error_message="RateLimitError",
+                          rule="RateLimitError", offset=1234)
+
+        entry = manager.check(key)
+        assert entry.rule == "RateLimitError"
+        assert entry.offset == 1234
+
     def test_max_cooldown_cap(self):
         """最大クールダウン時間でキャップ"""
         manager = CooldownManager(default_seconds=60, max_seconds=300)
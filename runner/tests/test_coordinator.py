@@ -1,16 +1,35 @@
 # tests/test_coordinator.py
 # Tests for Coordinator log directory functionality
 
+import asyncio
 import base64
 import io
+import json
 import os
+import subprocess
+import sys
+import threading
+import time
 import zipfile
+from datetime import datetime
 from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from aiagent_runner.coordinator import Coordinator
-from aiagent_runner.coordinator_config import CoordinatorConfig
+from aiagent_runner.coordinator import AgentInstanceInfo, AgentInstanceKey, Coordinator
+from aiagent_runner.coordinator_config import AgentConfig, CoordinatorConfig
+from aiagent_runner.events import CoordinatorEvent
+from aiagent_runner.log_analysis import analyze_log
+from aiagent_runner.log_collector import LogCollectorConfig
+from aiagent_runner.log_retention import LogRetentionConfig, LogRetentionPolicy
+from aiagent_runner.mcp_client import (
+    AgentActionResult,
+    HealthCheckResult,
+    MCPError,
+    ProjectWithAgents,
+    SubordinateProfile,
+)
 
 
 def create_test_zip_archive(skill_md_content: str, extra_files: dict[str, str] | None = None) -> str:
@@ -56,6 +75,912 @@ class TestCoordinatorConfig:
         )
         assert config.root_agent_id is None
 
+    def test_config_http_pool_from_yaml(self, tmp_path):
+        """Should parse http_pool settings from YAML."""
+        config_file = tmp_path / "coordinator.yaml"
+        config_file.write_text(
+            "mcp_socket_path: /tmp/test.sock\n"
+            "http_pool:\n"
+            "  limit: 4\n"
+            "  limit_per_host: 2\n"
+            "  keepalive_timeout: 15\n"
+        )
+
+        config = CoordinatorConfig.from_yaml(config_file)
+
+        assert config.http_pool.limit == 4
+        assert config.http_pool.limit_per_host == 2
+        assert config.http_pool.keepalive_timeout == 15
+        assert config.http_pool.dns_cache_ttl == 300
+
+    def test_config_adaptive_polling_from_yaml(self, tmp_path):
+        """Should parse adaptive_polling settings from YAML."""
+        config_file = tmp_path / "coordinator.yaml"
+        config_file.write_text(
+            "mcp_socket_path: /tmp/test.sock\n"
+            "adaptive_polling:\n"
+            "  enabled: true\n"
+            "  min_interval: 1\n"
+            "  max_interval: 120\n"
+        )
+
+        config = CoordinatorConfig.from_yaml(config_file)
+
+        assert config.adaptive_polling.enabled is True
+        assert config.adaptive_polling.min_interval == 1
+        assert config.adaptive_polling.max_interval == 120
+        assert config.adaptive_polling.backoff_factor == 2.0
+
+
+    def test_config_quota_rules_from_yaml(self, tmp_path):
+        """Should parse per-provider quota rules and use them for that provider only."""
+        config_file = tmp_path / "coordinator.yaml"
+        config_file.write_text(
+            "mcp_socket_path: /tmp/test.sock\n"
+            "error_protection:\n"
+            "  quota_rules:\n"
+            "    gemini:\n"
+            "      - pattern: 'capacity resets in (?P<minutes>\\d+)m'\n"
+            "      - pattern: 'Resource exhausted'\n"
+            "        default_seconds: 600\n"
+        )
+
+        config = CoordinatorConfig.from_yaml(config_file)
+        coordinator = Coordinator(config)
+
+        rules = config.error_protection.quota_rules["gemini"]
+        assert [rule.default_seconds for rule in rules] == [300, 600]
+        gemini = coordinator._quota_detector_for("gemini")
+        assert gemini.detect("capacity resets in 10m") == 660
+        assert gemini.detect("RateLimitError") is None
+        assert coordinator._quota_detector_for("claude").detect("RateLimitError") == 330
+
+    def test_config_quota_rule_without_wait_time(self, tmp_path):
+        """A rule without time groups should get a default wait time, and 0 is rejected."""
+        config_file = tmp_path / "coordinator.yaml"
+        config_file.write_text(
+            "mcp_socket_path: /tmp/test.sock\n"
+            "error_protection:\n"
+            "  quota_rules:\n"
+            "    gemini:\n"
+            "      - pattern: 'RESOURCE_EXHAUSTED'\n"
+        )
+
+        config = CoordinatorConfig.from_yaml(config_file)
+        detector = Coordinator(config)._quota_detector_for("gemini")
+        assert detector.detect("RESOURCE_EXHAUSTED") == 330
+
+        config_file.write_text(config_file.read_text() + "        default_seconds: 0\n")
+        with pytest.raises(ValueError, match="default_seconds"):
+            CoordinatorConfig.from_yaml(config_file)
+
+    def test_config_decision_concurrency(self, tmp_path):
+        """Should parse decision_concurrency and reject non-positive values."""
+        config_file = tmp_path / "coordinator.yaml"
+        config_file.write_text(
+            "mcp_socket_path: /tmp/test.sock\n"
+            "decision_concurrency: 8\n"
+        )
+
+        assert CoordinatorConfig.from_yaml(config_file).decision_concurrency == 8
+        with pytest.raises(ValueError, match="decision_concurrency"):
+            CoordinatorConfig(mcp_socket_path="/tmp/test.sock", decision_concurrency=0)
+
+
+class TestCoordinatorSharedHTTPSession:
+    """Tests for the Coordinator-owned shared HTTP session."""
+
+    @pytest.mark.asyncio
+    async def test_stop_closes_shared_session(self):
+        """stop() should close the session shared with MCPClient."""
+        config = CoordinatorConfig(
+            agents={},
+            mcp_socket_path="http://localhost:8080/mcp",
+            polling_interval=5,
+            max_concurrent=1
+        )
+        coordinator = Coordinator(config)
+        assert coordinator.mcp_client._http_session is coordinator._http_session
+
+        session = await coordinator._http_session.get()
+        await coordinator.stop()
+
+        assert session.closed
+
+
+def exited_process(retcode, pid: int = 4321) -> MagicMock:
+    """Create a process mock whose poll() reports the given return code."""
+    process = MagicMock(pid=pid)
+    process.poll.return_value = retcode
+    return process
+
+
+@pytest.fixture
+def make_coordinator():
+    """Create a factory for Coordinators with a mocked MCP client."""
+    def factory(agents: list[str] | None = None, **config_fields) -> Coordinator:
+        config_fields.setdefault("polling_interval", 60)
+        config_fields.setdefault("max_concurrent", 1)
+        config = CoordinatorConfig(
+            agents={agent_id: AgentConfig(passkey="secret") for agent_id in agents or []},
+            mcp_socket_path="/tmp/test.sock",
+            **config_fields
+        )
+        coordinator = Coordinator(config)
+        coordinator.mcp_client = MagicMock()
+        coordinator.mcp_client.report_process_exit = AsyncMock(return_value=True)
+        coordinator.mcp_client.close = AsyncMock()
+        return coordinator
+    return factory
+
+
+@pytest.fixture
+def make_polling_coordinator(make_coordinator):
+    """Create a factory for Coordinators whose tick sees one project with the given agents."""
+    def factory(agents: list[str], max_concurrent: int = 2) -> Coordinator:
+        coordinator = make_coordinator(agents, polling_interval=5, max_concurrent=max_concurrent)
+        coordinator.mcp_client.health_check = AsyncMock(
+            return_value=HealthCheckResult(status="ok")
+        )
+        coordinator.mcp_client.list_active_projects_with_agents = AsyncMock(return_value=[
+            ProjectWithAgents(
+                project_id="p1",
+                project_name="Project",
+                working_directory="/tmp/p1",
+                agents=agents + ["unconfigured"]
+            )
+        ])
+        coordinator._get_app_settings = AsyncMock(return_value=None)
+        coordinator._prepare_agent_context = AsyncMock(return_value="/tmp/ctx")
+        coordinator._spawn_instance = MagicMock()
+        coordinator._register_instance = MagicMock()
+        return coordinator
+    return factory
+
+
+@pytest.fixture
+def add_instance():
+    """Create a helper that registers a running instance with a Coordinator."""
+    def factory(coordinator: Coordinator, process, agent_id: str = "a1", **fields) -> AgentInstanceInfo:
+        key = AgentInstanceKey(agent_id, "p1")
+        info = AgentInstanceInfo(
+            key=key,
+            process=process,
+            working_directory="/tmp",
+            provider="claude",
+            model=None,
+            started_at=datetime.now(),
+            **fields
+        )
+        coordinator._instances.setdefault(key, []).append(info)
+        return info
+    return factory
+
+
+class TestCoordinatorRunOnce:
+    """Tests for action resolution in Coordinator._run_once()."""
+
+    @pytest.mark.asyncio
+    async def test_resolves_all_pairs_in_one_call(self, make_polling_coordinator):
+        """Should request every configured pair at once, capped by free slots."""
+        coordinator = make_polling_coordinator(["a1", "a2", "a3"])
+        coordinator.mcp_client.get_agent_actions = AsyncMock(return_value=[
+            AgentActionResult(action="start", provider="claude"),
+            AgentActionResult(action="hold", reason="no_work"),
+            MCPError("boom"),
+        ])
+
+        await coordinator._run_once()
+
+        coordinator.mcp_client.get_agent_actions.assert_awaited_once_with(
+            [("a1", "p1"), ("a2", "p1"), ("a3", "p1")], max_starts=2, concurrency=4
+        )
+        coordinator._spawn_instance.assert_called_once()
+        assert coordinator._spawn_instance.call_args.kwargs["agent_id"] == "a1"
+
+    @pytest.mark.asyncio
+    async def test_skips_resolution_at_max_concurrent(self, make_polling_coordinator, add_instance):
+        """Should not ask for actions when no slot is free."""
+        coordinator = make_polling_coordinator(["a1"], max_concurrent=1)
+        add_instance(coordinator, MagicMock(), agent_id="a0")
+        coordinator._cleanup_finished = MagicMock(return_value=[])
+        coordinator.mcp_client.get_agent_actions = AsyncMock()
+
+        await coordinator._run_once()
+
+        coordinator.mcp_client.get_agent_actions.assert_not_awaited()
+        assert coordinator._tick_activity is False
+
+    @pytest.mark.asyncio
+    async def test_draining_skips_evaluation(self, make_polling_coordinator):
+        """While draining, no pair should be evaluated."""
+        coordinator = make_polling_coordinator(["a1"])
+        coordinator.mcp_client.get_agent_actions = AsyncMock()
+        coordinator.drain()
+
+        await coordinator._run_once()
+
+        coordinator.mcp_client.get_agent_actions.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_tick_activity(self, make_polling_coordinator):
+        """All-hold ticks should be idle; a start should count as activity."""
+        coordinator = make_polling_coordinator(["a1"])
+        coordinator.mcp_client.get_agent_actions = AsyncMock(return_value=[
+            AgentActionResult(action="hold", reason="no_work")
+        ])
+
+        await coordinator._run_once()
+        assert coordinator._tick_activity is False
+
+        coordinator.mcp_client.get_agent_actions.return_value = [
+            AgentActionResult(action="start")
+        ]
+        await coordinator._run_once()
+        assert coordinator._tick_activity is True
+
+    @pytest.mark.asyncio
+    async def test_starts_are_prepared_concurrently(self, make_polling_coordinator):
+        """Slow context preparation should overlap across pairs."""
+        coordinator = make_polling_coordinator(["a1", "a2", "a3"], max_concurrent=3)
+        coordinator.mcp_client.get_agent_actions = AsyncMock(return_value=[
+            AgentActionResult(action="start") for _ in range(3)
+        ])
+
+        async def slow_prepare(**kwargs):
+            await asyncio.sleep(0.2)
+            return "/tmp/ctx"
+
+        coordinator._prepare_agent_context = slow_prepare
+
+        started = time.monotonic()
+        await coordinator._run_once()
+        elapsed = time.monotonic() - started
+
+        assert coordinator._spawn_instance.call_count == 3
+        assert elapsed < 0.5
+
+    @pytest.mark.asyncio
+    async def test_spawn_runs_on_executor_and_registers_on_loop(self, make_polling_coordinator):
+        """_spawn_instance should run off the loop thread; registration on it."""
+        coordinator = make_polling_coordinator(["a1"])
+        coordinator.mcp_client.get_agent_actions = AsyncMock(return_value=[
+            AgentActionResult(action="start")
+        ])
+        threads = {}
+        info = MagicMock()
+
+        def spawn(**kwargs):
+            threads["spawn"] = threading.current_thread()
+            return info
+
+        coordinator._spawn_instance = MagicMock(side_effect=spawn)
+
+        await coordinator._run_once()
+
+        assert threads["spawn"] is not threading.current_thread()
+        coordinator._register_instance.assert_called_once_with(info)
+        assert coordinator.status()["spawn_stages"]["spawn"]["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_spawn_cancelled_by_shutdown_is_terminated(self, make_polling_coordinator):
+        """A process still spawning when the tick is cancelled should be registered and stopped."""
+        coordinator = make_polling_coordinator(["a1"])
+        coordinator.mcp_client.get_agent_actions = AsyncMock(return_value=[
+            AgentActionResult(action="start")
+        ])
+        spawning = threading.Event()
+        infos = []
+
+        def spawn(**kwargs):
+            spawning.set()
+            time.sleep(0.2)
+            infos.append(AgentInstanceInfo(
+                key=AgentInstanceKey("a1", "p1"),
+                process=subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"]),
+                working_directory="/tmp",
+                provider="claude",
+                model=None,
+                started_at=datetime.now()
+            ))
+            return infos[0]
+
+        coordinator._spawn_instance = MagicMock(side_effect=spawn)
+        coordinator._register_instance = MagicMock(
+            side_effect=lambda info: coordinator._instances.setdefault(info.key, []).append(info)
+        )
+
+        tick = asyncio.create_task(coordinator._run_once())
+        await asyncio.to_thread(spawning.wait, 1)
+        tick.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await tick
+        await coordinator.stop()
+
+        coordinator._register_instance.assert_called_once_with(infos[0])
+        assert infos[0].process.poll() is not None
+
+    @pytest.mark.asyncio
+    async def test_slot_reservation_respects_max_concurrent(self, make_polling_coordinator):
+        """Concurrent starts should never exceed max_concurrent."""
+        coordinator = make_polling_coordinator(["a1", "a2"], max_concurrent=1)
+        coordinator.mcp_client.get_agent_actions = AsyncMock(return_value=[
+            AgentActionResult(action="start"),
+            AgentActionResult(action="start"),
+        ])
+
+        async def slow_prepare(**kwargs):
+            await asyncio.sleep(0.05)
+            return "/tmp/ctx"
+
+        coordinator._prepare_agent_context = slow_prepare
+
+        await coordinator._run_once()
+
+        coordinator._spawn_instance.assert_called_once()
+        assert coordinator._reserved_slots == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_preparation_releases_slot(self, make_polling_coordinator):
+        """A start that fails during preparation should give its slot back."""
+        coordinator = make_polling_coordinator(["a1"], max_concurrent=1)
+        coordinator.mcp_client.get_agent_actions = AsyncMock(return_value=[
+            AgentActionResult(action="start"),
+        ])
+        coordinator._prepare_agent_context = AsyncMock(side_effect=OSError("disk full"))
+
+        await coordinator._run_once()
+
+        coordinator._spawn_instance.assert_not_called()
+        assert coordinator._reserved_slots == 0
+
+
+class TestCoordinatorServerEvents:
+    """Tests for evaluating only the pairs named by server events."""
+
+    @pytest.fixture
+    def coordinator(self, make_polling_coordinator):
+        """Create a Coordinator subscribed to server events."""
+        coordinator = make_polling_coordinator(["a1", "a2"])
+        coordinator._event_subscriber = MagicMock(connected=True)
+        coordinator.mcp_client.get_agent_actions = AsyncMock(
+            side_effect=lambda pairs, **kwargs: [AgentActionResult(action="hold")] * len(pairs)
+        )
+        return coordinator
+
+    @pytest.mark.asyncio
+    async def test_event_tick_evaluates_only_affected_pairs(self, coordinator):
+        """After a full tick, pair_work events should limit evaluation to that pair."""
+        await coordinator._run_once()
+        coordinator.mcp_client.list_active_projects_with_agents.assert_awaited_once()
+
+        coordinator._on_server_event(CoordinatorEvent("pair_work", "a2", "p1"))
+        await coordinator._run_once()
+
+        coordinator.mcp_client.list_active_projects_with_agents.assert_awaited_once()
+        assert coordinator.mcp_client.get_agent_actions.await_args_list[-1].args[0] == [("a2", "p1")]
+
+    @pytest.mark.asyncio
+    async def test_topology_change_forces_full_tick(self, coordinator):
+        """topology_changed should re-fetch the project list."""
+        await coordinator._run_once()
+
+        coordinator._on_server_event(CoordinatorEvent("topology_changed"))
+        await coordinator._run_once()
+
+        assert coordinator.mcp_client.list_active_projects_with_agents.await_count == 2
+
+    def test_profile_change_invalidates_cached_profile(self, coordinator):
+        """profile_changed should drop that agent's cached profile only."""
+        coordinator._profile_cache = MagicMock()
+
+        coordinator._on_server_event(CoordinatorEvent("profile_changed", "a1"))
+
+        coordinator._profile_cache.invalidate.assert_called_once_with("a1")
+        assert not coordinator._event_pairs
+
+    @pytest.mark.asyncio
+    async def test_idle_event_tick_makes_no_server_calls(self, coordinator):
+        """Without events or a due safety poll, a tick should not call the server."""
+        await coordinator._run_once()
+        coordinator.mcp_client.health_check.reset_mock()
+
+        await coordinator._run_once()
+
+        coordinator.mcp_client.health_check.assert_not_awaited()
+        assert coordinator.mcp_client.get_agent_actions.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_event_tick_without_pairs_flushes_exit_reports(self, coordinator, add_instance):
+        """An instance exit should be reported without waiting for a pair event."""
+        await coordinator._run_once()
+        add_instance(coordinator, exited_process(0))
+
+        await coordinator._run_once()
+
+        coordinator.mcp_client.report_process_exit.assert_awaited_once()
+        assert not coordinator._pending_exit_reports
+
+    @pytest.mark.asyncio
+    async def test_event_pairs_kept_while_busy(self, coordinator):
+        """Pairs that arrive while all slots are taken should be evaluated once one frees."""
+        await coordinator._run_once()
+        coordinator._reserved_slots = coordinator.config.max_concurrent
+
+        coordinator._on_server_event(CoordinatorEvent("pair_work", "a2", "p1"))
+        await coordinator._run_once()
+        assert coordinator.mcp_client.get_agent_actions.await_count == 1
+
+        coordinator._reserved_slots = 0
+        await coordinator._run_once()
+        assert coordinator.mcp_client.get_agent_actions.await_args_list[-1].args[0] == [("a2", "p1")]
+
+
+class TestCoordinatorReaping:
+    """Tests for reaping instances independently of the polling loop."""
+
+    @pytest.fixture
+    def coordinator(self, make_coordinator):
+        """Create a Coordinator with a long reap interval."""
+        return make_coordinator(reap_interval=60)
+
+    @pytest.mark.asyncio
+    async def test_reap_runs_without_server(self, coordinator, add_instance):
+        """Reaping should clean up and set cooldown even if the server is down."""
+        key = add_instance(coordinator, exited_process(1)).key
+
+        assert coordinator._reap() == 1
+
+        assert key not in coordinator._instances
+        assert coordinator._cooldown_manager.check(key) is not None
+        assert len(coordinator._pending_exit_reports) == 1
+        coordinator.mcp_client.report_process_exit.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_failed_exit_reads_log_once(self, coordinator, add_instance, tmp_path):
+        """The cooldown decision and the error report should share one log analysis."""
+        coordinator.mcp_client.report_agent_error = AsyncMock(return_value=True)
+        key = add_instance(coordinator, exited_process(1)).key
+        log_file = tmp_path / "agent.log"
+        log_file.write_text("RateLimitError: 429 Too Many Requests\n")
+        info = coordinator._instances[key][0]
+        info.log_file_path = str(log_file)
+
+        with patch("aiagent_runner.coordinator.analyze_log", wraps=analyze_log) as analyze:
+            coordinator._reap()
+            log_file.unlink()  # e.g. uploaded and deleted before the report is sent
+            await coordinator._flush_exit_reports()
+
+        assert analyze.call_count == 1
+        assert coordinator._cooldown_manager.check(key).reason == "quota"
+        coordinator.mcp_client.report_agent_error.assert_awaited_once_with(
+            agent_id="a1", project_id="p1",
+            error_message="RateLimitError: 429 Too Many Requests"
+        )
+
+    @pytest.mark.asyncio
+    async def test_queued_reports_sent_when_server_is_back(self, coordinator, add_instance):
+        """Queued exit reports should be flushed by the next healthy tick."""
+        add_instance(coordinator, exited_process(0))
+        coordinator._reap()
+
+        coordinator.mcp_client.health_check = AsyncMock(
+            return_value=HealthCheckResult(status="ok")
+        )
+        coordinator.mcp_client.list_active_projects_with_agents = AsyncMock(return_value=[])
+        coordinator._get_app_settings = AsyncMock(return_value=None)
+        await coordinator._run_once()
+
+        coordinator.mcp_client.report_process_exit.assert_awaited_once_with(
+            agent_id="a1", project_id="p1", remaining_processes=0
+        )
+        assert not coordinator._pending_exit_reports
+
+    @pytest.mark.asyncio
+    async def test_failed_report_stays_queued(self, coordinator, add_instance, tmp_path):
+        """A report the server could not take should be kept and sent on the next flush."""
+        coordinator.mcp_client.report_agent_error = AsyncMock(return_value=True)
+        key = add_instance(coordinator, exited_process(1)).key
+        log_file = tmp_path / "agent.log"
+        log_file.write_text("Error: boom\n")
+        coordinator._instances[key][0].log_file_path = str(log_file)
+        coordinator._reap()
+        coordinator.mcp_client.report_process_exit = AsyncMock(
+            side_effect=[MCPError("Cannot connect to MCP server"), True]
+        )
+
+        await coordinator._flush_exit_reports()
+        assert len(coordinator._pending_exit_reports) == 1
+
+        await coordinator._flush_exit_reports()
+        assert not coordinator._pending_exit_reports
+        assert coordinator.mcp_client.report_process_exit.await_count == 2
+        coordinator.mcp_client.report_agent_error.assert_awaited_once()
+        assert not coordinator._reported_exit_errors
+
+    @pytest.mark.asyncio
+    async def test_instance_exit_triggers_immediate_tick(self, coordinator, add_instance):
+        """An exit notification should reap and run the next tick without waiting."""
+        ticks = asyncio.Queue()
+
+        async def run_once():
+            ticks.put_nowait(time.monotonic())
+
+        coordinator._run_once = run_once
+        loop_task = asyncio.create_task(coordinator.start())
+        try:
+            await asyncio.wait_for(ticks.get(), timeout=1)
+            add_instance(coordinator, exited_process(0))
+            coordinator._on_instance_exit(4321)
+            await asyncio.wait_for(ticks.get(), timeout=1)
+            assert not coordinator._instances
+        finally:
+            await coordinator.stop()
+            await asyncio.wait_for(loop_task, timeout=1)
+
+
+class TestCoordinatorTermination:
+    """Tests for non-blocking instance termination."""
+
+    IGNORE_SIGTERM = (
+        "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); "
+        "print('ready', flush=True); time.sleep(30)"
+    )
+
+    @pytest.fixture
+    def coordinator(self, make_coordinator):
+        """Create a Coordinator with room for every test instance."""
+        return make_coordinator(max_concurrent=5)
+
+    def _popen(self, code: str) -> subprocess.Popen:
+        process = subprocess.Popen(
+            [sys.executable, "-c", code], stdout=subprocess.PIPE, text=True
+        )
+        if "ready" in code:
+            process.stdout.readline()
+        return process
+
+    @pytest.mark.asyncio
+    async def test_terminates_concurrently_and_kills_stragglers(self, coordinator, add_instance):
+        """SIGTERM goes to all at once; processes ignoring it are killed at the deadline."""
+        polite = [add_instance(coordinator, self._popen("import time; time.sleep(30)"), f"a{i}")
+                  for i in range(3)]
+        stubborn = add_instance(coordinator, self._popen(self.IGNORE_SIGTERM), "stubborn")
+        infos = polite + [stubborn]
+
+        started = time.monotonic()
+        await coordinator._terminate_instances(infos, timeout=0.3)
+        elapsed = time.monotonic() - started
+
+        assert all(info.process.poll() is not None for info in infos)
+        assert elapsed < 1.5
+        for info in infos:
+            info.process.stdout.close()
+
+    @pytest.mark.asyncio
+    async def test_stop_instance_does_not_block_loop(self, coordinator, add_instance, monkeypatch):
+        """Other coroutines should keep running while an instance is stopped."""
+        monkeypatch.setattr("aiagent_runner.coordinator.TERMINATE_TIMEOUT_SECONDS", 0.5)
+        info = add_instance(coordinator, self._popen(self.IGNORE_SIGTERM), "stubborn")
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker_task = asyncio.create_task(ticker())
+        try:
+            await coordinator._stop_instance(info.key)
+        finally:
+            ticker_task.cancel()
+        info.process.stdout.close()
+
+        assert info.process.poll() is not None
+        assert info.key not in coordinator._instances
+        assert ticks > 10
+
+    @pytest.mark.asyncio
+    async def test_stop_instance_releases_resources(self, coordinator, add_instance, tmp_path):
+        """A stopped instance should have its temp files removed and its log queued for upload."""
+        prompt_file = tmp_path / "prompt.txt"
+        prompt_file.write_text("prompt")
+        log_file = tmp_path / "agent.log"
+        log_file.write_text("Working...\n")
+        coordinator._upload_pool = MagicMock()
+        info = add_instance(
+            coordinator, self._popen("import time; time.sleep(30)"),
+            prompt_file=str(prompt_file), log_file_path=str(log_file),
+            task_id="t1", execution_log_id="exec_1"
+        )
+
+        await coordinator._stop_instance(info.key)
+        info.process.stdout.close()
+
+        assert not prompt_file.exists()
+        job = coordinator._upload_pool.submit.call_args.args[0]
+        assert job.execution_log_id == "exec_1"
+
+    @pytest.mark.asyncio
+    async def test_stopping_instance_is_not_reaped(self, coordinator, add_instance):
+        """_cleanup_finished should leave instances being stopped to their stopper."""
+        info = add_instance(coordinator, self._popen("pass"))
+        info.process.wait()
+        info.stopping = True
+
+        assert coordinator._cleanup_finished() == []
+        assert coordinator._instances[info.key] == [info]
+        info.process.stdout.close()
+
+    @pytest.mark.asyncio
+    async def test_stop_terminates_all_instances(self, coordinator, add_instance):
+        """stop() should terminate every instance and report each pair."""
+        infos = [add_instance(coordinator, self._popen("import time; time.sleep(30)"), f"a{i}")
+                 for i in range(3)]
+
+        await coordinator.stop()
+
+        assert all(info.process.poll() is not None for info in infos)
+        assert coordinator.mcp_client.report_process_exit.await_count == 3
+        for info in infos:
+            info.process.stdout.close()
+
+
+class TestCoordinatorQuotaAbort:
+    """Tests for terminating running instances on quota errors."""
+
+    def _sleeper(self) -> subprocess.Popen:
+        return subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+
+    @pytest.mark.asyncio
+    async def test_quota_error_aborts_running_instance(self, make_coordinator, add_instance, tmp_path):
+        """A quota error in a running log should free the slot, set the cooldown and terminate."""
+        coordinator = make_coordinator()
+        log_file = tmp_path / "agent.log"
+        log_file.write_text("Working...\n")
+        info = add_instance(coordinator, self._sleeper(), log_file_path=str(log_file))
+
+        assert await coordinator._check_quota_logs() == 0
+        with open(log_file, "a") as f:
+            f.write("TerminalQuotaError: Your quota will reset after 10m0s.\n")
+
+        assert await coordinator._check_quota_logs() == 1
+
+        assert info.key not in coordinator._instances
+        assert coordinator._reserve_slot()
+        entry = coordinator._cooldown_manager.check(info.key)
+        assert entry is not None and entry.reason == "quota"
+        await asyncio.gather(*coordinator._quota_aborts)
+        assert info.process.poll() is not None
+        assert [report[1] for report in coordinator._pending_exit_reports] == [info]
+
+    @pytest.mark.asyncio
+    async def test_normal_output_keeps_instance_running(self, make_coordinator, add_instance, tmp_path):
+        """Logs without a confirmed quota error should leave the instance alone."""
+        coordinator = make_coordinator()
+        log_file = tmp_path / "agent.log"
+        log_file.write_text("Adding rate limit handling to the client\n")
+        info = add_instance(coordinator, self._sleeper(), log_file_path=str(log_file))
+        try:
+            assert await coordinator._check_quota_logs() == 0
+            assert coordinator._instances[info.key] == [info]
+        finally:
+            info.process.kill()
+            info.process.wait()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX only")
+class TestCoordinatorSpawner:
+    """Tests for spawning through the spawner helper."""
+
+    @pytest.mark.asyncio
+    async def test_spawn_instance_uses_helper(self, tmp_path):
+        """With use_spawner, instances should be started by the helper process."""
+        config = CoordinatorConfig(
+            agents={},
+            mcp_socket_path="/tmp/test.sock",
+            polling_interval=5,
+            max_concurrent=1,
+            use_spawner=True
+        )
+        coordinator = Coordinator(config)
+        coordinator._start_spawner()
+        try:
+            info = coordinator._spawn_instance(
+                agent_id="a1",
+                project_id="p1",
+                passkey="secret",
+                working_dir=str(tmp_path),
+                context_dir=str(tmp_path),
+                provider="other",
+                kick_command=f"{sys.executable} -c pass"
+            )
+
+            assert info.process.pid != coordinator._spawner.helper_pid
+            assert await asyncio.to_thread(info.process.wait, 10) == 0
+        finally:
+            info.log_file_handle.close()
+            os.unlink(info.mcp_config_file)
+            coordinator._spawner.close()
+
+    def test_use_spawner_from_yaml(self, tmp_path):
+        """use_spawner should be read from YAML (default off)."""
+        config_file = tmp_path / "coordinator.yaml"
+        config_file.write_text("use_spawner: true\n")
+
+        assert CoordinatorConfig.from_yaml(config_file).use_spawner is True
+        assert CoordinatorConfig().use_spawner is False
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX only")
+class TestCoordinatorLogCollector:
+    """Tests for collecting instance output through pipes."""
+
+    @pytest.fixture
+    async def coordinator(self, make_coordinator):
+        """Create a Coordinator collecting output through pipes."""
+        coordinator = make_coordinator(
+            log_collector=LogCollectorConfig(enabled=True, flush_interval=0.01)
+        )
+        coordinator._start_log_collector()
+        return coordinator
+
+    def _spawn(self, coordinator: Coordinator, tmp_path: Path, script: str) -> AgentInstanceInfo:
+        script_file = tmp_path / "agent.py"
+        script_file.write_text(script)
+        info = coordinator._spawn_instance(
+            agent_id="a1",
+            project_id="p1",
+            passkey="secret",
+            working_dir=str(tmp_path),
+            context_dir=str(tmp_path),
+            provider="other",
+            kick_command=f"{sys.executable} {script_file}"
+        )
+        os.unlink(info.mcp_config_file)
+        coordinator._register_instance(info)
+        return info
+
+    @pytest.mark.asyncio
+    async def test_output_is_collected_and_analyzed(self, coordinator, tmp_path):
+        """Both streams should reach the log tagged, and the exit analysis should not read it."""
+        info = self._spawn(
+            coordinator, tmp_path,
+            "import sys\nprint('hello', flush=True)\nprint('Error: boom', file=sys.stderr)\nsys.exit(1)\n"
+        )
+        assert info.log_file_handle is None
+
+        assert await asyncio.to_thread(info.process.wait, 10) == 1
+        finished = coordinator._cleanup_finished()
+
+        assert [entry[1] for entry in finished] == [info]
+        assert info.log_sink.closed
+        content = Path(info.log_file_path).read_text()
+        assert "[out] hello\n" in content
+        assert "[err] Error: boom\n" in content
+        assert coordinator._analyze_log(info).error_message == "Error: boom"
+        entry = coordinator._cooldown_manager.check(info.key)
+        assert entry is not None and entry.reason == "error"
+
+    @pytest.mark.asyncio
+    async def test_quota_error_in_output_aborts_instance(self, coordinator, tmp_path):
+        """A quota error should abort the instance as soon as the collector reads it."""
+        info = self._spawn(
+            coordinator, tmp_path,
+            "import sys, time\n"
+            "print('TerminalQuotaError: Your quota will reset after 10m0s.', file=sys.stderr, flush=True)\n"
+            "time.sleep(30)\n"
+        )
+
+        for _ in range(500):
+            if info.key not in coordinator._instances:
+                break
+            await asyncio.sleep(0.01)
+        assert info.key not in coordinator._instances
+        await asyncio.gather(*coordinator._quota_aborts)
+
+        assert info.process.poll() is not None
+        assert info.log_sink.closed
+        entry = coordinator._cooldown_manager.check(info.key)
+        assert entry is not None and entry.reason == "quota"
+
+    @pytest.mark.asyncio
+    async def test_pending_quota_verdict_settled_by_check(self, coordinator, tmp_path):
+        """An error without reset time should abort once no further output arrives."""
+        info = self._spawn(
+            coordinator, tmp_path,
+            "import sys, time\n"
+            "print('RateLimitError: 429', file=sys.stderr, flush=True)\n"
+            "time.sleep(30)\n"
+        )
+
+        for _ in range(500):
+            if info.quota_stream.pending:
+                break
+            await asyncio.sleep(0.01)
+        assert info.key in coordinator._instances
+
+        assert await coordinator._check_quota_logs() == 1
+        await asyncio.gather(*coordinator._quota_aborts)
+        assert info.process.poll() is not None
+        assert coordinator._cooldown_manager.check(info.key).reason == "quota"
+
+
+class TestCoordinatorLogRetention:
+    """Tests for feeding closed logs to the retention engine."""
+
+    def test_closed_logs_are_retained_and_running_ones_protected(self, tmp_path):
+        """Closed logs (and their debug logs) should be tracked; running ones never touched."""
+        config = CoordinatorConfig(
+            agents={},
+            mcp_socket_path="/tmp/test.sock",
+            log_retention=LogRetentionConfig(
+                enabled=True,
+                default=LogRetentionPolicy(max_age_days=0, max_files=2, compress=False)
+            )
+        )
+        coordinator = Coordinator(config)
+        log_dir = tmp_path / "agt_1"
+        log_dir.mkdir()
+        infos = []
+        for i, name in enumerate(["20260101_000000", "20260102_000000", "20260103_000000"]):
+            (log_dir / f"{name}.log").write_text("output\n")
+            os.utime(log_dir / f"{name}.log", (1000 + i, 1000 + i))
+            info = AgentInstanceInfo(
+                key=AgentInstanceKey("agt_1", "p1"),
+                process=MagicMock(),
+                working_directory=str(tmp_path),
+                provider="claude",
+                model=None,
+                started_at=datetime.now(),
+                log_file_path=str(log_dir / f"{name}.log")
+            )
+            infos.append(info)
+        (log_dir / "20260101_000000.debug.log").write_text("debug\n")
+        os.utime(log_dir / "20260101_000000.debug.log", (1000, 1000))
+        # The running instance's log is the oldest, but must survive
+        running = infos[2]
+        os.utime(running.log_file_path, (900, 900))
+        coordinator._instances[running.key] = [running]
+
+        for info in infos[:2]:
+            coordinator._close_instance_log(info)
+        stats = coordinator._log_retention.sweep(coordinator._logs_in_use())
+
+        assert stats.deleted == 2
+        assert sorted(p.name for p in log_dir.glob("*.log")) == [
+            "20260102_000000.log", "20260103_000000.log"
+        ]
+
+    def test_existing_log_directories_are_watched(self, tmp_path):
+        """Log directories of configured agents should be swept without a closed log."""
+        config = CoordinatorConfig(
+            agents={"agt_1": AgentConfig(passkey="secret")},
+            mcp_socket_path="/tmp/test.sock",
+            log_retention=LogRetentionConfig(
+                enabled=True,
+                default=LogRetentionPolicy(max_age_days=0, max_files=1, compress=False)
+            )
+        )
+        coordinator = Coordinator(config)
+        coordinator._projects_cache = [
+            ProjectWithAgents(project_id="p1", project_name="Project",
+                              working_directory=str(tmp_path), agents=["agt_1", "agt_2"])
+        ]
+        log_dir = tmp_path / ".aiagent" / "logs" / "agt_1"
+        log_dir.mkdir(parents=True)
+        for i in range(3):
+            (log_dir / f"2026010{i}_000000.log").write_text("output\n")
+            os.utime(log_dir / f"2026010{i}_000000.log", (1000 + i, 1000 + i))
+
+        with patch("aiagent_runner.coordinator.get_data_directory", return_value=tmp_path / "data"):
+            coordinator._watch_log_directories()
+        stats = coordinator._log_retention.sweep(coordinator._logs_in_use())
+
+        assert stats.deleted == 2
+        assert [p.name for p in log_dir.glob("*.log")] == ["20260102_000000.log"]
+
 
 class TestCoordinatorGetLogDirectory:
     """Tests for Coordinator._get_log_directory()."""
@@ -342,3 +1267,64 @@ class TestCoordinatorWriteSkills:
 
         assert (skill_dir / "templates" / "report.md").exists()
         assert "Report Template" in (skill_dir / "templates" / "report.md").read_text()
+
+
+class TestCoordinatorPrepareAgentContext:
+    """Tests for Coordinator._prepare_agent_context() file writes."""
+
+    @pytest.fixture
+    def coordinator(self):
+        config = CoordinatorConfig(
+            agents={},
+            mcp_socket_path="/tmp/test.sock",
+            polling_interval=5,
+            max_concurrent=1
+        )
+        coordinator = Coordinator(config)
+        coordinator._profile_cache = MagicMock()
+        coordinator._profile_cache.get = AsyncMock(return_value=SubordinateProfile(
+            agent_id="a1", name="A1", role="worker", system_prompt="Be helpful."
+        ))
+        return coordinator
+
+    @pytest.mark.asyncio
+    async def test_claude_settings_include_mcp_server(self, coordinator, tmp_path):
+        """settings.json should be written once, already containing mcpServers."""
+        context_dir = await coordinator._prepare_agent_context("a1", str(tmp_path), "claude")
+
+        settings = json.loads((Path(context_dir) / ".claude" / "settings.json").read_text())
+        assert settings["permissions"]["additionalDirectories"] == [str(tmp_path)]
+        assert settings["mcpServers"]["agent-pm"] == {"command": "nc", "args": ["-U", "/tmp/test.sock"]}
+        assert "Be helpful." in (Path(context_dir) / ".claude" / "CLAUDE.md").read_text()
+        assert "agents/" in (tmp_path / ".aiagent" / ".gitignore").read_text()
+
+    @pytest.mark.asyncio
+    async def test_repeated_prepare_writes_nothing(self, coordinator, tmp_path):
+        """A second spawn with unchanged inputs should not rewrite any file."""
+        await coordinator._prepare_agent_context("a1", str(tmp_path), "claude")
+        written = coordinator._context_writer.stats.written
+
+        with patch("aiagent_runner.context_writer.atomic_write_text") as write:
+            await coordinator._prepare_agent_context("a1", str(tmp_path), "claude")
+
+        write.assert_not_called()
+        assert coordinator._context_writer.stats.written == written
+
+    @pytest.mark.asyncio
+    async def test_mcp_proxy_endpoint_replaces_nc(self, coordinator, tmp_path):
+        """With the MCP proxy running, settings should point at the instance's proxy URL."""
+        pytest.importorskip("aiohttp")
+        coordinator.config.mcp_proxy.enabled = True
+        await coordinator._start_mcp_proxy()
+        try:
+            context_dir = await coordinator._prepare_agent_context(
+                "a1", str(tmp_path), "claude", project_id="p1"
+            )
+            settings = json.loads((Path(context_dir) / ".claude" / "settings.json").read_text())
+        finally:
+            await coordinator._mcp_proxy.close()
+
+        server = settings["mcpServers"]["agent-pm"]
+        assert server["url"] == coordinator._mcp_proxy.endpoint_for("a1", "p1")
+        assert server["headers"]["Authorization"] == f"Bearer {coordinator._mcp_proxy.token}"
+        assert "command" not in server
@@ -4,11 +4,13 @@
 
 import pytest
 import asyncio
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, create_autospec, patch
 from pathlib import Path
 from datetime import datetime
 
 from aiagent_runner.coordinator import Coordinator, AgentInstanceKey, AgentInstanceInfo
+from aiagent_runner.mcp_client import MCPClient
+from aiagent_runner.upload_spool import UploadJob
 
 
 class TestCoordinatorAsyncLogUpload:
@@ -30,6 +32,7 @@ class TestCoordinatorAsyncLogUpload:
         config.log_upload.max_file_size_mb = 10
         config.log_upload.retry_count = 3
         config.log_upload.retry_delay_seconds = 1
+        config.log_upload.max_attempts = 5
         return config
 
     @pytest.fixture
@@ -134,7 +137,8 @@ class TestCoordinatorAsyncLogUpload:
 
         # ローカルパスがMCP経由で登録された
         coordinator.mcp_client.register_execution_log_file.assert_called_once_with(
-            execution_log_id="exec_001",
+            agent_id="agt_123",
+            task_id="task_789",
             log_file_path=str(log_file)
         )
 
@@ -221,3 +225,136 @@ class TestCoordinatorAsyncLogUpload:
 
             # LogUploaderが作成されていない
             assert coord.log_uploader is None
+
+    # TEST 8: 再試行中のローカルパス登録は初回失敗時と最終試行時のみ
+    @pytest.mark.asyncio
+    async def test_upload_job_registers_fallback_once(self, coordinator, tmp_path):
+        """スプールの再試行ではローカルパス登録を繰り返さない"""
+        # 実際のシグネチャで呼び出しを検証する
+        coordinator.mcp_client = create_autospec(MCPClient, instance=True)
+        coordinator.log_uploader = MagicMock()
+        coordinator.log_uploader.upload = AsyncMock(return_value=None)
+        log_file = tmp_path / "test.log"
+        log_file.write_text("test content")
+        job = UploadJob(str(log_file), "exec_001", "agt_123", "task_789", "proj_456")
+
+        for attempt in range(1, coordinator._upload_pool.max_attempts + 1):
+            job.attempts = attempt
+            assert await coordinator._run_upload_job(job) is False
+
+        assert coordinator.log_uploader.upload.await_count == 5
+        assert coordinator.mcp_client.register_execution_log_file.await_count == 2
+        coordinator.mcp_client.register_execution_log_file.assert_awaited_with(
+            agent_id="agt_123", task_id="task_789", log_file_path=str(log_file)
+        )
+
+    # TEST 9: ログファイルが無くなったジョブは破棄される
+    @pytest.mark.asyncio
+    async def test_upload_job_for_missing_log_is_done(self, coordinator, tmp_path):
+        """再起動後にログが既に無い場合はアップロードせず完了扱い"""
+        coordinator.log_uploader = MagicMock()
+        coordinator.log_uploader.upload = AsyncMock()
+        job = UploadJob(str(tmp_path / "gone.log"), "exec_001", "agt_123", "task_789", "proj_456", attempts=1)
+
+        assert await coordinator._run_upload_job(job) is True
+        coordinator.log_uploader.upload.assert_not_awaited()
+
+    # TEST 10: 実行中に送信したログは終了後に残りだけアップロードされる
+    @pytest.mark.asyncio
+    async def test_live_shipped_log_resumes_at_acked_offset(self, coordinator, tmp_path):
+        """逐次送信で判明した実行ログIDと送信済み位置を終了後のアップロードに引き継ぐ"""
+        log_file = tmp_path / "test.log"
+        log_file.write_text("line 1\n")
+        coordinator._log_shipper = MagicMock()
+        coordinator._log_shipper.flush = AsyncMock(return_value=7)
+
+        mock_process = MagicMock()
+        mock_process.poll.return_value = None
+        key = AgentInstanceKey("agt_123", "proj_456")
+        info = AgentInstanceInfo(
+            key=key,
+            process=mock_process,
+            working_directory="/tmp",
+            provider="claude",
+            model="opus",
+            started_at=datetime.now(),
+            log_file_handle=MagicMock(),
+            task_id="task_789",
+            log_file_path=str(log_file),
+            mcp_config_file=None
+        )
+        coordinator._instances[key] = [info]
+
+        assert await coordinator._ship_running_logs() == 7
+        state = info.log_ship
+        assert state.task_id == "task_789"
+        assert state.execution_log_id is None
+        assert state.started_after < info.started_at.timestamp()
+        coordinator._log_shipper.flush.assert_awaited_once_with(state)
+
+        # サーバーが実行ログを特定し、7バイト受信済み
+        state.execution_log_id = "exec_live"
+        state.acked = 7
+        mock_process.poll.return_value = 0
+        coordinator._cleanup_finished()
+
+        job = coordinator._pending_uploads["exec_live"]
+        assert job.uploaded_offset == 7
+
+    # TEST 11: 送信中の逐次チャンクの完了を待ってから終了後のアップロードを開始
+    @pytest.mark.asyncio
+    async def test_exit_upload_waits_for_flush_in_flight(self, coordinator, tmp_path):
+        """終了時に送信中のチャンクがあれば、その受信位置からアップロードする"""
+        log_file = tmp_path / "test.log"
+        log_file.write_text("line 1\n")
+        release = asyncio.Event()
+
+        async def flush(state):
+            await release.wait()
+            state.execution_log_id = "exec_live"
+            state.acked = 7
+            return 7
+
+        coordinator._log_shipper = MagicMock()
+        coordinator._log_shipper.flush = flush
+        mock_process = MagicMock()
+        mock_process.poll.return_value = None
+        key = AgentInstanceKey("agt_123", "proj_456")
+        info = AgentInstanceInfo(
+            key=key,
+            process=mock_process,
+            working_directory="/tmp",
+            provider="claude",
+            model="opus",
+            started_at=datetime.now(),
+            log_file_handle=MagicMock(),
+            task_id="task_789",
+            log_file_path=str(log_file),
+            mcp_config_file=None,
+            execution_log_id="exec_live"
+        )
+        coordinator._instances[key] = [info]
+        ship_task = asyncio.create_task(coordinator._ship_running_logs())
+        await asyncio.sleep(0)
+
+        mock_process.poll.return_value = 0
+        coordinator._cleanup_finished()
+        assert "exec_live" not in coordinator._pending_uploads
+
+        release.set()
+        assert await ship_task == 7
+        await asyncio.sleep(0)
+        assert coordinator._pending_uploads["exec_live"].uploaded_offset == 7
+
+    def test_default_spool_is_per_configuration(self, mock_config, tmp_path):
+        """設定ファイルごとに別のスプールディレクトリを使う"""
+        directories = []
+        for name in ("a.yaml", "b.yaml"):
+            mock_config.config_path = str(tmp_path / name)
+            mock_config.log_upload.spool_directory = None
+            with patch("aiagent_runner.coordinator.MCPClient"), \
+                    patch("aiagent_runner.coordinator.get_data_directory", return_value=tmp_path):
+                directories.append(Coordinator(mock_config)._upload_spool_directory())
+
+        assert directories[0] != directories[1]
+        assert all(directory.parent == tmp_path / "upload_spool" for directory in directories)
@@ -0,0 +1,115 @@
+# tests/test_events.py
+# Tests for the server-push event subscription
+
+import asyncio
+from typing import Optional
+
+import pytest
+from aiohttp import web
+
+from aiagent_runner.events import CoordinatorEvent, EventSubscriber
+from aiagent_runner.http_session import SharedHTTPSession
+
+
+class FakeEventServer:
+    """Local SSE server pushing a fixed list of raw event blocks."""
+
+    def __init__(self, blocks: list[str], status: int = 200):
+        self.blocks = blocks
+        self.status = status
+        self.auth_headers: list[str] = []
+        self._runner: Optional[web.AppRunner] = None
+        self._closing = asyncio.Event()
+        self.url = ""
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/api/v1/coordinator/events", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}/api/v1/coordinator/events"
+
+    async def stop(self) -> None:
+        self._closing.set()
+        await self._runner.cleanup()
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        self.auth_headers.append(request.headers.get("Authorization", ""))
+        if self.status != 200:
+            return web.Response(status=self.status)
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for block in self.blocks:
+            await response.write(block.encode())
+        await self._closing.wait()  # Keep the stream open until stop()
+        return response
+
+
+async def _collect(server: FakeEventServer, count: int) -> tuple[list[CoordinatorEvent], list[bool]]:
+    events: list[CoordinatorEvent] = []
+    states: list[bool] = []
+    received = asyncio.Event()
+
+    def on_event(event):
+        events.append(event)
+        if len(events) >= count:
+            received.set()
+
+    session = SharedHTTPSession()
+    subscriber = EventSubscriber(server.url, "tok", session, on_event, states.append)
+    task = asyncio.create_task(subscriber.run())
+    try:
+        await asyncio.wait_for(received.wait(), timeout=5)
+        assert subscriber.connected
+    finally:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        await session.close()
+    return events, states
+
+
+class TestEventSubscriber:
+    """Tests for EventSubscriber against a local SSE server."""
+
+    @pytest.mark.asyncio
+    async def test_parses_events(self):
+        """Should parse event names, JSON data and skip keep-alive comments."""
+        server = FakeEventServer([
+            ": keep-alive\n\n",
+            'event: pair_work\ndata: {"agent_id": "a1", "project_id": "p1"}\n\n',
+            "event: topology_changed\ndata: {}\n\n",
+        ])
+        await server.start()
+        try:
+            events, states = await _collect(server, 2)
+        finally:
+            await server.stop()
+
+        assert events == [
+            CoordinatorEvent(type="pair_work", agent_id="a1", project_id="p1"),
+            CoordinatorEvent(type="topology_changed"),
+        ]
+        assert states == [True, False]
+        assert server.auth_headers == ["Bearer tok"]
+
+    @pytest.mark.asyncio
+    async def test_unsupported_endpoint_stops_subscriber(self):
+        """A 404 should mark the endpoint unsupported and end run()."""
+        server = FakeEventServer([], status=404)
+        await server.start()
+        session = SharedHTTPSession()
+        subscriber = EventSubscriber(server.url, None, session, lambda event: None)
+        try:
+            await asyncio.wait_for(subscriber.run(), timeout=5)
+        finally:
+            await session.close()
+            await server.stop()
+
+        assert subscriber.unsupported
+        assert not subscriber.connected
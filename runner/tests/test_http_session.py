@@ -0,0 +1,48 @@
+# tests/test_http_session.py
+# Tests for the shared, pooled aiohttp session
+
+import pytest
+
+from aiagent_runner.http_session import HTTPPoolConfig, SharedHTTPSession
+
+
+class TestSharedHTTPSession:
+    """Tests for SharedHTTPSession."""
+
+    @pytest.mark.asyncio
+    async def test_session_created_once_and_reused(self):
+        """get() should return the same session until it is closed."""
+        shared = SharedHTTPSession()
+        assert shared.closed
+
+        first = await shared.get()
+        second = await shared.get()
+
+        assert first is second
+        assert not shared.closed
+        await shared.close()
+
+    @pytest.mark.asyncio
+    async def test_connector_uses_pool_config(self):
+        """Connection limits should come from HTTPPoolConfig."""
+        shared = SharedHTTPSession(HTTPPoolConfig(limit=5, limit_per_host=2))
+        session = await shared.get()
+
+        assert session.connector.limit == 5
+        assert session.connector.limit_per_host == 2
+        await shared.close()
+
+    @pytest.mark.asyncio
+    async def test_close_is_idempotent_and_reopens_on_demand(self):
+        """close() can be called twice; get() afterwards opens a new session."""
+        shared = SharedHTTPSession()
+        first = await shared.get()
+
+        await shared.close()
+        await shared.close()
+        assert first.closed
+        assert shared.closed
+
+        second = await shared.get()
+        assert second is not first
+        await shared.close()
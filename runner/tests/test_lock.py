@@ -72,6 +72,13 @@ class TestCoordinatorLock:
         lock2 = CoordinatorLock("/path/to/config2.yaml")
         assert lock1.lock_file_path != lock2.lock_file_path
 
+    def test_control_socket_path_shares_lock_hash(self):
+        """Control socket should sit next to the lock file with the same hash."""
+        lock = CoordinatorLock("/path/to/config.yaml")
+        assert lock.control_socket_path.parent == lock.lock_file_path.parent
+        assert lock.control_socket_path.stem == lock.lock_file_path.stem
+        assert lock.control_socket_path.suffix == ".sock"
+
     def test_acquire_and_release(self):
         """Test basic acquire and release."""
         with tempfile.TemporaryDirectory() as tmpdir:
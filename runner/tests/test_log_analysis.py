@@ -0,0 +1,89 @@
+# tests/test_log_analysis.py
+# Tests for single-pass log analysis
+
+from aiagent_runner.log_analysis import analyze_log, read_tail
+from aiagent_runner.quota_detector import QuotaErrorDetector
+
+
+class TestReadTail:
+    """Tests for read_tail."""
+
+    def test_small_file_is_read_whole(self, tmp_path):
+        log = tmp_path / "agent.log"
+        log.write_text("line 1\nline 2\n")
+
+        assert read_tail(str(log), 1024) == ("line 1\nline 2\n", 14, 0)
+
+    def test_large_file_drops_partial_first_line(self, tmp_path):
+        log = tmp_path / "agent.log"
+        log.write_text("x" * 100 + "\nlast line\n")
+
+        text, size, start = read_tail(str(log), 20)
+
+        assert text == "last line\n"
+        assert size == 111
+        assert start == 101
+
+
+class TestAnalyzeLog:
+    """Tests for analyze_log."""
+
+    def test_error_line_and_quota_verdict_in_one_pass(self, tmp_path):
+        log = tmp_path / "agent.log"
+        log.write_text(
+            "Starting\n"
+            "TerminalQuotaError: You have exhausted your capacity.\n"
+            "Your quota will reset after 1m0s.\n"
+            "Shutting down\n"
+        )
+
+        analysis = analyze_log(str(log), QuotaErrorDetector())
+
+        assert analysis.error_message == "Your quota will reset after 1m0s."
+        assert analysis.quota_cooldown_seconds == 66
+        assert analysis.lines == 4
+        assert not analysis.truncated
+
+    def test_only_tail_is_searched(self, tmp_path):
+        log = tmp_path / "agent.log"
+        log.write_text("RateLimitError early on\n" + "ok\n" * 1000 + "Error: build failed\n")
+
+        analysis = analyze_log(str(log), QuotaErrorDetector(), tail_bytes=200)
+
+        assert analysis.error_message == "Error: build failed"
+        assert analysis.quota_cooldown_seconds is None
+        assert analysis.truncated
+
+    def test_echoed_prompt_is_ignored(self, tmp_path):
+        log = tmp_path / "agent.log"
+        log.write_text(
+            "=== PROMPT ===\n"
+            "Error: handle RateLimitError from the API\n"
+            "\n"
+            "=== OUTPUT ===\n"
+            "Done\n"
+        )
+
+        analysis = analyze_log(str(log), QuotaErrorDetector())
+
+        assert analysis.error_message is None
+        assert analysis.quota is None
+
+    def test_quota_records_rule_and_byte_offset(self, tmp_path):
+        log = tmp_path / "agent.log"
+        content = "ログ開始\nWorking\nAPI Error: 429 RateLimitError\n"
+        log.write_text(content)
+
+        quota = analyze_log(str(log), QuotaErrorDetector()).quota
+
+        assert quota.rule == "RateLimitError"
+        assert quota.offset == content.encode("utf-8").index(b"RateLimitError")
+
+    def test_without_detector_skips_quota(self, tmp_path):
+        log = tmp_path / "agent.log"
+        log.write_text("RateLimitError\n")
+
+        assert analyze_log(str(log)).quota_cooldown_seconds is None
+
+    def test_missing_file(self, tmp_path):
+        assert analyze_log(str(tmp_path / "missing.log")) is None
@@ -0,0 +1,155 @@
+# tests/test_log_collector.py
+# Tests for pipe-based collection of instance output
+
+import asyncio
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+from aiagent_runner.log_collector import LogCollector, LogCollectorConfig
+from aiagent_runner.quota_detector import QuotaErrorDetector
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="POSIX only")
+
+
+def _plain(**kwargs) -> LogCollectorConfig:
+    return LogCollectorConfig(enabled=True, timestamps=False, stream_tags=False, **kwargs)
+
+
+class TestCollectedLog:
+    """Tests for CollectedLog (fed directly, no event loop)."""
+
+    def test_head_and_tail_are_kept(self, tmp_path):
+        path = tmp_path / "agent.log"
+        log = LogCollector(_plain(head_kb=1, tail_kb=1), loop=None).open(str(path))
+        stdout_fd = log.read_fds()[0]
+        lines = [f"line {i:04d} ".encode() + b"x" * 89 + b"\n" for i in range(100)]  # 100 bytes each
+        for line in lines:
+            log.feed(stdout_fd, line)
+        log.close()
+
+        content = path.read_bytes()
+        assert content.startswith(b"".join(lines[:10]))
+        assert content.endswith(b"".join(lines[-10:]))
+        assert b"... 8000 bytes omitted ...\n" in content
+        assert log.received == 10000
+
+    def test_partial_lines(self, tmp_path):
+        path = tmp_path / "agent.log"
+        log = LogCollector(_plain(), loop=None).open(str(path))
+        stdout_fd, stderr_fd = log.read_fds()
+        seen = []
+        log.on_output = lambda text, offset: seen.append((text, offset))
+
+        assert not log.feed(stdout_fd, b"hel")
+        log.feed(stderr_fd, b"error: boom\n")
+        log.feed(stdout_fd, "lo ク".encode()[:-1])
+        log.feed(stdout_fd, "ク".encode()[-1:] + b"\nunterminated")
+        log.close()
+
+        assert seen == [("error: boom\n", 0), ("hello ク\n", 12), ("unterminated\n", 22)]
+        assert path.read_text() == "error: boom\nhello ク\nunterminated\n"
+
+    def test_annotations(self, tmp_path):
+        path = tmp_path / "agent.log"
+        config = LogCollectorConfig(enabled=True)
+        log = LogCollector(config, loop=None).open(str(path))
+        stdout_fd, stderr_fd = log.read_fds()
+        seen = []
+        log.on_output = lambda text, offset: seen.append((text, offset))
+
+        log.feed(stdout_fd, b"a\nb\n")
+        log.feed(stderr_fd, b"c\n")
+        log.close()
+
+        # Detection sees the raw output, with offsets into the annotated file
+        assert seen == [("a\nb\n", 0), ("c\n", 2 * (log.prefix_bytes + 2))]
+        stamp = r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}"
+        assert re.fullmatch(
+            rf"{stamp} \[out\] a\n{stamp} \[out\] b\n{stamp} \[err\] c\n", path.read_text()
+        )
+
+    def test_analysis_from_memory(self, tmp_path):
+        path = tmp_path / "agent.log"
+        log = LogCollector(_plain(), loop=None).open(str(path), analysis_bytes=32)
+        stdout_fd = log.read_fds()[0]
+        for i in range(10):
+            log.feed(stdout_fd, f"step {i}\n".encode())
+        log.feed(stdout_fd, b"Error: out of credits\n")
+        log.close()
+        os.unlink(path)  # The analysis does not read the file
+
+        analysis = log.analyze()
+        assert analysis.error_message == "Error: out of credits"
+        assert analysis.size == log.received
+        assert analysis.truncated
+
+    def test_quota_offset_points_into_file(self, tmp_path):
+        """The quota offset should account for the line annotations."""
+        path = tmp_path / "agent.log"
+        log = LogCollector(LogCollectorConfig(enabled=True), loop=None).open(str(path))
+        stdout_fd, stderr_fd = log.read_fds()
+        log.feed(stdout_fd, b"working\nstill working\n")
+        log.feed(stderr_fd, b"API Error: RateLimitError (429)\n")
+        log.close()
+
+        detection = log.analyze(QuotaErrorDetector()).quota
+        assert path.read_bytes()[detection.offset:].startswith(b"RateLimitError")
+
+    def test_quota_offset_unknown_in_tail(self, tmp_path):
+        """Output held for the tail has no file offset until the log is finished."""
+        path = tmp_path / "agent.log"
+        log = LogCollector(_plain(head_kb=1, tail_kb=1), loop=None).open(str(path))
+        stdout_fd = log.read_fds()[0]
+        seen = []
+        log.on_output = lambda text, offset: seen.append(offset)
+        log.feed(stdout_fd, b"x" * 99 + b"\n" + b"y" * 999 + b"\n")
+        log.feed(stdout_fd, b"RateLimitError\n")
+        log.close()
+
+        assert seen == [0, None, None]
+        assert log.analyze(QuotaErrorDetector()).quota.offset is None
+
+
+class TestLogCollector:
+    """Tests for LogCollector with a real process."""
+
+    @pytest.mark.asyncio
+    async def test_collects_process_output(self, tmp_path):
+        path = tmp_path / "agent.log"
+        collector = LogCollector(_plain(flush_interval=0.01), asyncio.get_running_loop())
+        log = collector.open(str(path))
+        stdout_fd, stderr_fd = log.write_fds()
+        script = "import sys; print('out'); sys.stdout.flush(); print('err', file=sys.stderr)"
+        process = subprocess.Popen([sys.executable, "-c", script], stdout=stdout_fd, stderr=stderr_fd)
+        collector.attach(log)
+        seen = []
+        log.on_output = lambda text, offset: seen.append(text)
+
+        for _ in range(200):
+            if len(seen) == 2 and process.poll() is not None:
+                break
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)  # Flushed by the timer while the log is still open
+        assert sorted(path.read_text().splitlines()) == ["err", "out"]
+
+        collector.close(log)
+        assert sorted(seen) == ["err\n", "out\n"]
+        assert log.closed
+
+    @pytest.mark.asyncio
+    async def test_close_drains_unread_output(self, tmp_path):
+        path = tmp_path / "agent.log"
+        collector = LogCollector(_plain(), asyncio.get_running_loop())
+        log = collector.open(str(path))
+        stdout_fd, _stderr_fd = log.write_fds()
+        os.write(stdout_fd, b"written before exit\n")
+        collector.attach(log)
+
+        # Closed before the loop had a chance to read the pipe
+        collector.close(log)
+
+        assert path.read_text() == "written before exit\n"
@@ -0,0 +1,58 @@
+# tests/test_log_follower.py
+# Tests for offset-tracked log tailing
+
+from aiagent_runner.log_follower import LogFollower
+
+
+class TestLogFollower:
+    """Tests for LogFollower."""
+
+    def test_returns_only_appended_text(self, tmp_path):
+        log = tmp_path / "agent.log"
+        log.write_text("first\n")
+        follower = LogFollower(str(log))
+
+        assert follower.read_new() == "first\n"
+        assert follower.read_new() == ""
+
+        with open(log, "a") as f:
+            f.write("second\n")
+        assert follower.read_new() == "second\n"
+        assert follower.offset == len("first\nsecond\n")
+
+    def test_missing_file_returns_empty(self, tmp_path):
+        follower = LogFollower(str(tmp_path / "missing.log"))
+
+        assert follower.read_new() == ""
+        assert follower.offset == 0
+
+    def test_multibyte_character_split_across_reads(self, tmp_path):
+        log = tmp_path / "agent.log"
+        data = "クォータ".encode("utf-8")
+        log.write_bytes(data[:4])
+        follower = LogFollower(str(log))
+
+        first = follower.read_new()
+        with open(log, "ab") as f:
+            f.write(data[4:])
+
+        assert first + follower.read_new() == "クォータ"
+
+    def test_limits_bytes_per_read(self, tmp_path):
+        log = tmp_path / "agent.log"
+        log.write_text("abcdefghij")
+        follower = LogFollower(str(log), max_read_bytes=4)
+
+        assert follower.read_new() == "abcd"
+        assert follower.read_new() == "efgh"
+        assert follower.read_new() == "ij"
+
+    def test_truncated_file_is_read_from_start(self, tmp_path):
+        log = tmp_path / "agent.log"
+        log.write_text("old content\n")
+        follower = LogFollower(str(log))
+        follower.read_new()
+
+        log.write_text("new\n")
+
+        assert follower.read_new() == "new\n"
@@ -0,0 +1,176 @@
+# tests/test_log_retention.py
+# Tests for retention, compression and indexing of instance log directories
+
+import gzip
+import json
+import os
+from unittest.mock import patch
+
+from aiagent_runner.coordinator_config import CoordinatorConfig
+from aiagent_runner.log_retention import (
+    INDEX_FILE,
+    LogIndex,
+    LogRetention,
+    LogRetentionConfig,
+    LogRetentionPolicy,
+)
+
+NOW = 1_800_000_000.0
+HOUR = 3600
+DAY = 86400
+
+
+def _log(directory, name, age, size=100):
+    path = directory / name
+    path.write_bytes(b"x" * size)
+    os.utime(path, (NOW - age, NOW - age))
+    return path
+
+
+def _retention(**policy) -> LogRetention:
+    defaults = dict(max_age_days=0, max_files=0, max_total_mb=0, compress=False)
+    config = LogRetentionConfig(enabled=True, default=LogRetentionPolicy(**{**defaults, **policy}))
+    return LogRetention(config, clock=lambda: NOW)
+
+
+def _names(directory):
+    return sorted(p.name for p in directory.iterdir() if p.name != INDEX_FILE)
+
+
+class TestLogRetention:
+
+    def test_deletes_by_age_and_count_oldest_first(self, tmp_path):
+        for i, age in enumerate([40 * DAY, 10 * DAY, 5 * DAY, 3 * DAY, 2 * DAY, 1 * DAY]):
+            _log(tmp_path, f"2026010{i}_000000.log", age)
+        retention = _retention(max_age_days=30, max_files=4)
+        retention.track(str(tmp_path / "20260105_000000.log"), "agt_1")
+
+        stats = retention.sweep()
+
+        assert stats.deleted == 2
+        assert _names(tmp_path) == [f"2026010{i}_000000.log" for i in range(2, 6)]
+
+    def test_size_limit(self, tmp_path):
+        for i in range(4):
+            _log(tmp_path, f"{i}.log", (10 - i) * HOUR, size=300 * 1024)
+        retention = _retention(max_total_mb=1)
+        retention.track(str(tmp_path / "3.log"), "agt_1")
+
+        retention.sweep()
+
+        assert _names(tmp_path) == ["1.log", "2.log", "3.log"]
+
+    def test_logs_in_use_are_kept(self, tmp_path):
+        old = _log(tmp_path, "old.log", 60 * DAY)
+        retention = _retention(max_age_days=30, compress=True, compress_after_hours=1)
+        retention.track(str(old), "agt_1")
+
+        stats = retention.sweep(in_use=[str(old)])
+
+        assert stats.deleted == 0 and stats.compressed == 0
+        assert old.exists()
+
+    def test_compresses_closed_logs(self, tmp_path):
+        old = _log(tmp_path, "old.log", 2 * DAY)
+        recent = _log(tmp_path, "recent.log", HOUR)
+        retention = _retention(compress=True, compress_after_hours=24)
+        retention.track(str(recent), "agt_1")
+
+        stats = retention.sweep()
+
+        assert stats.compressed == 1
+        assert _names(tmp_path) == ["old.log.gz", "recent.log"]
+        with gzip.open(tmp_path / "old.log.gz") as f:
+            assert f.read() == b"x" * 100
+        assert os.stat(tmp_path / "old.log.gz").st_mtime == NOW - 2 * DAY
+        entries = {entry.name: entry for entry in LogIndex.load(tmp_path).entries}
+        assert entries["old.log.gz"].compressed
+        assert entries["old.log.gz"].size == os.stat(tmp_path / "old.log.gz").st_size
+
+    def test_index_replaces_directory_scans(self, tmp_path):
+        for i in range(3):
+            _log(tmp_path, f"{i}.log", (10 - i) * HOUR)
+        retention = _retention(max_files=3)
+        retention.track(str(tmp_path / "2.log"), "agt_1")
+        retention.sweep()
+        assert [e["name"] for e in json.loads((tmp_path / INDEX_FILE).read_text())["entries"]] == [
+            "0.log", "1.log", "2.log"
+        ]
+
+        # New logs arrive through track(); the directory is not listed again
+        _log(tmp_path, "3.log", HOUR)
+        retention.track(str(tmp_path / "3.log"), "agt_1")
+        with patch.object(LogIndex, "scan", side_effect=AssertionError("scanned")):
+            retention.sweep()
+        assert _names(tmp_path) == ["1.log", "2.log", "3.log"]
+
+        # Uploaded (deleted) logs are forgotten
+        os.unlink(tmp_path / "3.log")
+        retention.forget(str(tmp_path / "3.log"), "agt_1")
+        retention.sweep()
+        assert [entry.name for entry in LogIndex.load(tmp_path).entries] == ["1.log", "2.log"]
+
+    def test_logs_closed_while_stopped_are_indexed(self, tmp_path):
+        """After a restart, logs written since the index was saved should be picked up."""
+        for i in range(2):
+            _log(tmp_path, f"{i}.log", (10 - i) * HOUR)
+        retention = _retention(max_files=3)
+        retention.watch(str(tmp_path), "agt_1")
+        retention.sweep()
+
+        # Closed while no Coordinator was running, so never tracked
+        for i in range(2, 5):
+            _log(tmp_path, f"{i}.log", (10 - i) * HOUR)
+        restarted = _retention(max_files=3)
+        restarted.watch(str(tmp_path), "agt_1")
+
+        assert restarted.sweep().deleted == 2
+        assert _names(tmp_path) == ["2.log", "3.log", "4.log"]
+
+    def test_per_agent_policy(self, tmp_path):
+        strict, default = tmp_path / "agt_strict", tmp_path / "agt_other"
+        for directory in (strict, default):
+            directory.mkdir()
+            for i in range(3):
+                _log(directory, f"{i}.log", (10 - i) * HOUR)
+        retention = _retention(max_files=10)
+        retention.config.agents["agt_strict"] = LogRetentionPolicy(max_files=1, compress=False)
+        retention.track(str(strict / "2.log"), "agt_strict")
+        retention.track(str(default / "2.log"), "agt_other")
+
+        assert retention.sweep().directories == 2
+        assert _names(strict) == ["2.log"]
+        assert _names(default) == ["0.log", "1.log", "2.log"]
+
+    def test_watched_directory_without_tracked_logs(self, tmp_path):
+        """Logs from before a restart should be swept once their directory is watched."""
+        for i in range(3):
+            _log(tmp_path, f"{i}.log", (10 - i) * HOUR)
+        retention = _retention(max_files=1)
+        retention.watch(str(tmp_path), "agt_1")
+        retention.watch(str(tmp_path / "missing"), "agt_1")
+
+        stats = retention.sweep()
+
+        assert stats.deleted == 2
+        assert _names(tmp_path) == ["2.log"]
+        assert retention.sweep().directories == 1  # The missing directory was dropped
+
+    def test_config_from_yaml(self, tmp_path):
+        config_file = tmp_path / "coordinator.yaml"
+        config_file.write_text(
+            "log_retention:\n"
+            "  enabled: true\n"
+            "  max_files: 100\n"
+            "  agents:\n"
+            "    agt_1:\n"
+            "      max_age_days: 7\n"
+        )
+        config = CoordinatorConfig.from_yaml(config_file).log_retention
+
+        assert config.enabled
+        assert config.default.max_files == 100
+        assert config.policy_for("agt_1").max_age_days == 7
+        assert config.policy_for("agt_1").max_files == 100
+        assert config.policy_for("agt_2") is config.default
+        assert CoordinatorConfig().log_retention.enabled is False
@@ -0,0 +1,102 @@
+# tests/test_log_shipper.py
+# Tests for live shipping of running instance logs
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from aiagent_runner.log_shipper import MAX_SHIP_FAILURES, LogShipper, LogShipState
+from aiagent_runner.log_uploader import LogUploadConfig, ShipResult
+
+
+def _shipper(**config):
+    uploader = MagicMock()
+    uploader.config = LogUploadConfig(enabled=True, **config)
+    uploader.ship = AsyncMock()
+    return LogShipper(uploader), uploader
+
+
+def _state(path) -> LogShipState:
+    return LogShipState(str(path), "agt_1", "tsk_1", "prj_1", started_after=1700000000.0)
+
+
+@pytest.mark.asyncio
+async def test_flush_sends_complete_lines_and_advances(tmp_path):
+    log = tmp_path / "agent.log"
+    log.write_bytes(b"line 1\nline 2\npartial")
+    shipper, uploader = _shipper()
+    uploader.ship.return_value = ShipResult(14, "/srv/agent.log", "exec_1")
+    state = _state(log)
+
+    assert await shipper.flush(state) == 14
+    kwargs = uploader.ship.await_args.kwargs
+    assert (kwargs["offset"], kwargs["end"]) == (0, 14)
+    assert kwargs["execution_log_id"] is None
+    assert kwargs["started_after"] == 1700000000.0
+    assert state.acked == 14
+    assert state.execution_log_id == "exec_1"
+
+    # Nothing new but the partial line: no request
+    uploader.ship.reset_mock()
+    assert await shipper.flush(state) == 0
+    uploader.ship.assert_not_awaited()
+
+    with open(log, "ab") as f:
+        f.write(b" done\n")
+    uploader.ship.return_value = ShipResult(27, "/srv/agent.log", "exec_1")
+    assert await shipper.flush(state) == 13
+    kwargs = uploader.ship.await_args.kwargs
+    assert (kwargs["offset"], kwargs["end"], kwargs["execution_log_id"]) == (14, 27, "exec_1")
+
+
+@pytest.mark.asyncio
+async def test_waiting_for_execution_log_is_not_a_failure(tmp_path):
+    log = tmp_path / "agent.log"
+    log.write_bytes(b"line\n")
+    shipper, uploader = _shipper()
+    uploader.ship.return_value = ShipResult(0, waiting=True)
+    state = _state(log)
+
+    for _ in range(MAX_SHIP_FAILURES + 1):
+        await shipper.flush(state)
+    assert not state.stopped
+    assert state.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_repeated_failures_stop_shipping(tmp_path):
+    log = tmp_path / "agent.log"
+    log.write_bytes(b"line\n")
+    shipper, uploader = _shipper()
+    uploader.ship.return_value = ShipResult(0)
+    state = _state(log)
+
+    for _ in range(MAX_SHIP_FAILURES):
+        await shipper.flush(state)
+    assert state.stopped
+    uploader.ship.reset_mock()
+    assert await shipper.flush(state) == 0
+    uploader.ship.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_log_over_upload_limit_is_left_to_exit_upload(tmp_path):
+    log = tmp_path / "agent.log"
+    log.write_bytes(b"x" * (1024 * 1024) + b"\n")
+    shipper, uploader = _shipper(max_file_size_mb=1)
+    state = _state(log)
+
+    assert await shipper.flush(state) == 0
+    assert state.stopped
+    uploader.ship.assert_not_awaited()
+
+
+def test_line_end(tmp_path):
+    log = tmp_path / "agent.log"
+    log.write_bytes(b"a\nbb\nccc")
+    assert LogShipper._line_end(str(log), 0) == 5
+    assert LogShipper._line_end(str(log), 5) == 5
+    assert LogShipper._line_end(str(tmp_path / "missing.log"), 0) is None
+    # A line longer than the search window is sent as is
+    log.write_bytes(b"y" * (128 * 1024))
+    assert LogShipper._line_end(str(log), 0) == 128 * 1024
@@ -4,11 +4,74 @@
 
 import pytest
 import asyncio
+import zlib
 from pathlib import Path
 from unittest.mock import AsyncMock, patch, MagicMock, PropertyMock
+
+import aiohttp
 from aiagent_runner.log_uploader import LogUploader, LogUploadConfig
 
 
+class FakeUploadServer:
+    """chunk_offset / content_encoding に対応したアップロードエンドポイントのモック"""
+
+    def __init__(self, supports_chunks: bool = True):
+        self.supports_chunks = supports_chunks
+        self.stored = bytearray()
+        self.requests: list[dict] = []
+        self.lose_response_at: set[int] = set()  # 書き込み後に応答を失う chunk_offset
+
+    def post(self, url, data, headers):
+        fields = {options["name"]: value for options, _, value in data._fields}
+        self.requests.append(fields)
+        body = fields["log_file"]
+        offset = int(fields.get("chunk_offset", 0))
+        response = MagicMock()
+
+        if not self.supports_chunks:
+            # 旧サーバー: 追加フィールドを無視して上書き保存
+            self.stored = bytearray(body)
+            response.status = 200
+            response.json = AsyncMock(return_value={
+                "success": True, "log_file_path": "/old/path.log", "file_size": len(body)
+            })
+        elif offset != 0 and offset != len(self.stored):
+            response.status = 409
+            response.json = AsyncMock(return_value={
+                "message": "Offset mismatch", "file_size": len(self.stored)
+            })
+        else:
+            if fields["content_encoding"] == "deflate":
+                body = zlib.decompress(body, -15)
+            assert len(body) == int(fields["raw_size"])
+            if offset == 0:
+                self.stored = bytearray()
+            self.stored += body
+            if offset in self.lose_response_at:
+                self.lose_response_at.discard(offset)
+                raise aiohttp.ClientConnectionError("connection reset")
+            response.status = 200
+            response.json = AsyncMock(return_value={
+                "success": True,
+                "log_file_path": f"/project/.ai-pm/logs/agt_456/{fields['original_filename']}",
+                "execution_log_id": fields.get("execution_log_id", "exec_resolved"),
+                "file_size": len(self.stored)
+            })
+
+        response_cm = MagicMock()
+        response_cm.__aenter__ = AsyncMock(return_value=response)
+        response_cm.__aexit__ = AsyncMock(return_value=None)
+        return response_cm
+
+    def session_cm(self):
+        session = MagicMock()
+        session.post = MagicMock(side_effect=self.post)
+        session_cm = MagicMock()
+        session_cm.__aenter__ = AsyncMock(return_value=session)
+        session_cm.__aexit__ = AsyncMock(return_value=None)
+        return session_cm
+
+
 class TestLogUploader:
     """LogUploaderクラスのテスト"""
 
@@ -77,23 +140,41 @@ class TestLogUploader:
 
         assert result is None
 
-    # TEST 3: ファイルサイズ超過時はNoneを返す
+    # TEST 3: 上限超過時は末尾のみをアップロードする
     @pytest.mark.asyncio
-    async def test_upload_file_too_large_returns_none(self, uploader, tmp_path):
-        """ファイルサイズが制限を超えている場合はNoneを返す"""
-        # 11MB のファイルを作成
+    async def test_upload_file_too_large_uploads_tail(self, tmp_path):
+        """ファイルサイズが制限を超えている場合は切り詰めた旨の行+末尾を送る"""
+        config = LogUploadConfig(
+            enabled=True,
+            endpoint="http://localhost:8080/api/v1/execution-logs/upload",
+            max_file_size_mb=1,
+            retry_delay_seconds=0.01,
+            chunk_size_kb=256
+        )
+        uploader = LogUploader(config, coordinator_token="test-token")
         large_file = tmp_path / "large.log"
-        large_file.write_bytes(b"x" * (11 * 1024 * 1024))
+        content = b"".join(b"line %07d\n" % i for i in range(200_000))  # 約2.4MB
+        large_file.write_bytes(content)
+        server = FakeUploadServer()
 
-        result = await uploader.upload(
-            log_file_path=str(large_file),
-            execution_log_id="exec_123",
-            agent_id="agt_456",
-            task_id="task_789",
-            project_id="proj_123"
-        )
+        with patch("aiagent_runner.log_uploader.aiohttp.ClientSession", return_value=server.session_cm()):
+            result = await uploader.upload(
+                log_file_path=str(large_file),
+                execution_log_id="exec_123",
+                agent_id="agt_456",
+                task_id="task_789",
+                project_id="proj_123"
+            )
 
-        assert result is None
+        assert result == "/project/.ai-pm/logs/agt_456/large.log"
+        marker, _, tail = bytes(server.stored).partition(b"\n")
+        assert marker.startswith(b"[... ") and b"truncated" in marker
+        assert tail.startswith(b"line ")
+        assert content.endswith(tail)
+        assert 1024 * 1024 - 16 <= len(tail) <= 1024 * 1024
+        # チャンク単位で送信される（1リクエストはchunk_size_kb以下）
+        assert len(server.requests) > 4
+        assert all(int(fields["raw_size"]) <= 256 * 1024 for fields in server.requests)
 
     # TEST 4: 正常なアップロード
     @pytest.mark.asyncio
@@ -245,3 +326,167 @@ class TestLogUploader:
 
         assert "Authorization" in captured_headers
         assert captured_headers["Authorization"] == "Bearer test-token"
+
+    # TEST 8: 共有HTTPセッションが再利用される
+    @pytest.mark.asyncio
+    async def test_upload_uses_shared_http_session(self, config, tmp_path):
+        """共有セッション指定時は新しいClientSessionを作らない"""
+        log_file = tmp_path / "test.log"
+        log_file.write_text("test log content")
+
+        mock_response = MagicMock()
+        mock_response.status = 200
+        mock_response.json = AsyncMock(return_value={
+            "success": True,
+            "log_file_path": "/shared/path.log",
+        })
+        _, mock_session = self._create_mock_session(mock_response)
+
+        shared = MagicMock()
+        shared.get = AsyncMock(return_value=mock_session)
+        uploader = LogUploader(config, coordinator_token="test-token", http_session=shared)
+
+        with patch("aiagent_runner.log_uploader.aiohttp.ClientSession") as session_class:
+            for _ in range(2):
+                result = await uploader.upload(
+                    log_file_path=str(log_file),
+                    execution_log_id="exec_123",
+                    agent_id="agt_456",
+                    task_id="task_789",
+                    project_id="proj_123"
+                )
+                assert result == "/shared/path.log"
+
+        session_class.assert_not_called()
+        assert mock_session.post.call_count == 2
+
+    # TEST 9: チャンクごとに圧縮して送信する
+    @pytest.mark.asyncio
+    async def test_upload_compresses_chunks(self, tmp_path):
+        """deflate圧縮したチャンクをchunk_offset付きで送る"""
+        config = LogUploadConfig(
+            enabled=True, endpoint="http://test/upload", chunk_size_kb=16, retry_delay_seconds=0.01
+        )
+        uploader = LogUploader(config, coordinator_token="test-token")
+        log_file = tmp_path / "test.log"
+        content = b"INFO: repeated log line\n" * 4000  # 約96KB
+        log_file.write_bytes(content)
+        server = FakeUploadServer()
+
+        with patch("aiagent_runner.log_uploader.aiohttp.ClientSession", return_value=server.session_cm()):
+            result = await uploader.upload(str(log_file), "exec_123", "agt_456", "task_789", "proj_123")
+
+        assert result == "/project/.ai-pm/logs/agt_456/test.log"
+        assert bytes(server.stored) == content
+        assert [int(f["chunk_offset"]) for f in server.requests] == list(range(0, len(content), 16 * 1024))
+        assert all(f["content_encoding"] == "deflate" for f in server.requests)
+        assert all(len(f["log_file"]) < int(f["raw_size"]) for f in server.requests)
+
+    # TEST 10: 応答を失ったチャンクはサーバー側のサイズから再開する
+    @pytest.mark.asyncio
+    async def test_upload_resumes_after_lost_response(self, tmp_path):
+        """書き込み済みのチャンクを二重に追記しない"""
+        config = LogUploadConfig(
+            enabled=True, endpoint="http://test/upload", chunk_size_kb=1,
+            compression="none", retry_delay_seconds=0.01
+        )
+        uploader = LogUploader(config, coordinator_token="test-token")
+        log_file = tmp_path / "test.log"
+        content = bytes(range(256)) * 12  # 3KB
+        log_file.write_bytes(content)
+        server = FakeUploadServer()
+        server.lose_response_at = {1024, 2048}
+
+        with patch("aiagent_runner.log_uploader.aiohttp.ClientSession", return_value=server.session_cm()):
+            result = await uploader.upload(str(log_file), "exec_123", "agt_456", "task_789", "proj_123")
+
+        assert result == "/project/.ai-pm/logs/agt_456/test.log"
+        assert bytes(server.stored) == content
+
+    # TEST 11: 旧サーバーには非圧縮で送り直す
+    @pytest.mark.asyncio
+    async def test_upload_falls_back_to_uncompressed(self, tmp_path):
+        """圧縮データがそのまま保存された場合は非圧縮で再送する"""
+        config = LogUploadConfig(enabled=True, endpoint="http://test/upload", retry_delay_seconds=0.01)
+        uploader = LogUploader(config, coordinator_token="test-token")
+        log_file = tmp_path / "test.log"
+        content = b"same line\n" * 100
+        log_file.write_bytes(content)
+        server = FakeUploadServer(supports_chunks=False)
+
+        with patch("aiagent_runner.log_uploader.aiohttp.ClientSession", return_value=server.session_cm()):
+            result = await uploader.upload(str(log_file), "exec_123", "agt_456", "task_789", "proj_123")
+            assert result == "/old/path.log"
+            assert bytes(server.stored) == content
+
+            # 以降のアップロードは最初から非圧縮
+            server.requests.clear()
+            await uploader.upload(str(log_file), "exec_124", "agt_456", "task_789", "proj_123")
+
+        assert [f["content_encoding"] for f in server.requests] == ["identity"]
+
+    # TEST 12: 空ファイルもアップロードされる
+    @pytest.mark.asyncio
+    async def test_upload_empty_file(self, uploader, tmp_path):
+        """空のログでもサーバー側にファイルを作る"""
+        log_file = tmp_path / "empty.log"
+        log_file.write_bytes(b"")
+        server = FakeUploadServer()
+
+        with patch("aiagent_runner.log_uploader.aiohttp.ClientSession", return_value=server.session_cm()):
+            result = await uploader.upload(str(log_file), "exec_123", "agt_456", "task_789", "proj_123")
+
+        assert result == "/project/.ai-pm/logs/agt_456/empty.log"
+        assert len(server.requests) == 1
+        assert server.requests[0]["raw_size"] == "0"
+
+    # TEST 13: 実行中に送った分は終了後のアップロードで再送しない
+    @pytest.mark.asyncio
+    async def test_ship_then_upload_sends_only_rest(self, uploader, tmp_path):
+        """ship()で受け取り済みの位置からupload()を再開する"""
+        log_file = tmp_path / "live.log"
+        log_file.write_bytes(b"first line\n")
+        server = FakeUploadServer()
+
+        with patch("aiagent_runner.log_uploader.aiohttp.ClientSession", return_value=server.session_cm()):
+            shipped = await uploader.ship(
+                str(log_file), "agt_456", "task_789", "proj_123",
+                offset=0, end=11, started_after=1700000000.0
+            )
+            assert shipped.offset == 11
+            assert shipped.execution_log_id == "exec_resolved"
+            assert "execution_log_id" not in server.requests[0]
+            assert server.requests[0]["started_after"] == "1700000000.000"
+
+            with open(log_file, "ab") as f:
+                f.write(b"second line\n")
+            server.requests.clear()
+            result = await uploader.upload(
+                str(log_file), shipped.execution_log_id, "agt_456", "task_789", "proj_123",
+                offset=shipped.offset
+            )
+
+        assert result == "/project/.ai-pm/logs/agt_456/live.log"
+        assert bytes(server.stored) == b"first line\nsecond line\n"
+        assert [f["chunk_offset"] for f in server.requests] == ["11"]
+        assert server.requests[0]["execution_log_id"] == "exec_resolved"
+
+    # TEST 14: 実行ログ未作成(404)はリトライせず待機中として返す
+    @pytest.mark.asyncio
+    async def test_ship_waits_for_execution_log(self, uploader, tmp_path):
+        """実行ログがまだ無い場合は送信済み位置を進めない"""
+        log_file = tmp_path / "live.log"
+        log_file.write_bytes(b"line\n")
+        mock_response = MagicMock()
+        mock_response.status = 404
+        session_cm, mock_session = self._create_mock_session(mock_response)
+
+        with patch("aiagent_runner.log_uploader.aiohttp.ClientSession", return_value=session_cm):
+            shipped = await uploader.ship(
+                str(log_file), "agt_456", "task_789", "proj_123", offset=0, end=5, started_after=0.0
+            )
+
+        assert shipped.offset == 0
+        assert shipped.waiting
+        assert shipped.log_file_path is None
+        assert mock_session.post.call_count == 1
@@ -1,6 +1,7 @@
 # tests/test_mcp_client.py
 # Tests for MCPClient
 
+import asyncio
 import base64
 import io
 import json
@@ -550,6 +551,33 @@ class TestSubordinateProfileWithSkills:
             assert profile.agent_id == "worker-03"
             assert profile.skills == []  # Default to empty list
 
+    @pytest.mark.asyncio
+    async def test_get_subordinate_profile_not_modified(self):
+        """Should send known_version and return None when the server reports no change."""
+        client = MCPClient("/tmp/test.sock", coordinator_token="coord-token")
+
+        with patch.object(client, "_call_tool", new_callable=AsyncMock) as mock_call:
+            mock_call.return_value = {"success": True, "not_modified": True}
+
+            profile = await client.get_subordinate_profile("worker-04", known_version="7")
+
+            assert profile is None
+            args = mock_call.call_args[0][1]
+            assert args["known_version"] == "7"
+
+    @pytest.mark.asyncio
+    async def test_get_subordinate_profile_parses_version(self):
+        """Should expose the server-provided version when present."""
+        client = MCPClient("/tmp/test.sock", coordinator_token="coord-token")
+
+        with patch.object(client, "_call_tool", new_callable=AsyncMock) as mock_call:
+            mock_call.return_value = {"success": True, "id": "worker-05", "version": 3}
+
+            profile = await client.get_subordinate_profile("worker-05")
+
+            assert profile.version == "3"
+            assert "known_version" not in mock_call.call_args[0][1]
+
 
 class TestSkillDefinitionDataclass:
     """Tests for SkillDefinition dataclass - Phase 7 archive format."""
@@ -597,3 +625,163 @@ class TestSkillDefinitionDataclass:
 
         assert skill1 == skill2
         assert skill1 != skill3
+
+
+class TestMCPClientHTTPSharedSession:
+    """Tests for MCPClient HTTP transport with a shared session."""
+
+    @pytest.mark.asyncio
+    async def test_http_call_reuses_shared_session(self):
+        """Should post on the shared session instead of creating one per call."""
+        response = MagicMock()
+        response.status = 200
+        response.json = AsyncMock(return_value={
+            "jsonrpc": "2.0",
+            "id": 1,
+            "result": {"content": [{"type": "text", "text": '{"status": "ok"}'}]}
+        })
+        response_cm = MagicMock()
+        response_cm.__aenter__ = AsyncMock(return_value=response)
+        response_cm.__aexit__ = AsyncMock(return_value=None)
+        session = MagicMock()
+        session.post = MagicMock(return_value=response_cm)
+
+        shared = MagicMock()
+        shared.get = AsyncMock(return_value=session)
+
+        client = MCPClient("http://localhost:8080/mcp", http_session=shared)
+
+        with patch("aiagent_runner.mcp_client.aiohttp.ClientSession") as session_class:
+            first = await client.health_check()
+            second = await client.health_check()
+
+        assert first.status == "ok"
+        assert second.status == "ok"
+        session_class.assert_not_called()
+        assert session.post.call_count == 2
+
+
+class TestMCPClientGetAgentActions:
+    """Tests for bulk MCPClient.get_agent_actions()."""
+
+    @pytest.mark.asyncio
+    async def test_bulk_tool_resolves_all_pairs_in_one_call(self):
+        """Should resolve every pair with a single get_agent_actions call."""
+        client = MCPClient("/tmp/test.sock", coordinator_token="coord")
+
+        mock_response = {
+            "success": True,
+            "results": [
+                {"agent_id": "a1", "project_id": "p1", "action": "start", "provider": "claude"},
+                {"agent_id": "a2", "project_id": "p1", "action": "hold", "reason": "no_work"},
+                {"agent_id": "a3", "project_id": "p2", "error": "Agent 'a3' not found"},
+            ]
+        }
+
+        with patch.object(client, "_call_tool", new_callable=AsyncMock) as mock_call:
+            mock_call.return_value = mock_response
+
+            results = await client.get_agent_actions(
+                [("a1", "p1"), ("a2", "p1"), ("a3", "p2")], max_starts=2
+            )
+
+            mock_call.assert_called_once_with("get_agent_actions", {
+                "pairs": [
+                    {"agent_id": "a1", "project_id": "p1"},
+                    {"agent_id": "a2", "project_id": "p1"},
+                    {"agent_id": "a3", "project_id": "p2"},
+                ],
+                "max_starts": 2,
+                "coordinator_token": "coord"
+            })
+
+        assert results[0].action == "start"
+        assert results[0].provider == "claude"
+        assert results[1].action == "hold"
+        assert isinstance(results[2], MCPError)
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_per_pair_when_tool_unknown(self):
+        """Should use get_agent_action per pair and stop probing the bulk tool."""
+        client = MCPClient("/tmp/test.sock")
+        client._coordinator_token = None
+
+        async def call_tool(name, args):
+            if name == "get_agent_actions":
+                raise MCPError("Unknown tool: get_agent_actions")
+            return {"action": "hold", "reason": f"{args['agent_id']}/{args['project_id']}"}
+
+        with patch.object(client, "_call_tool", side_effect=call_tool) as mock_call:
+            first = await client.get_agent_actions([("a1", "p1"), ("a2", "p1")])
+            second = await client.get_agent_actions([("a1", "p1")])
+
+            tool_names = [c.args[0] for c in mock_call.call_args_list]
+
+        assert [r.reason for r in first] == ["a1/p1", "a2/p1"]
+        assert second[0].reason == "a1/p1"
+        assert tool_names.count("get_agent_actions") == 1
+        assert tool_names.count("get_agent_action") == 3
+
+    @pytest.mark.asyncio
+    async def test_fallback_never_hands_out_more_starts_than_allowed(self):
+        """Per-pair fallback should stop once max_starts starts were returned."""
+        client = MCPClient("/tmp/test.sock")
+        client._bulk_actions_supported = False
+        client._coordinator_token = None
+
+        async def call_tool(name, args):
+            return {"action": "start"}
+
+        with patch.object(client, "_call_tool", side_effect=call_tool) as mock_call:
+            results = await client.get_agent_actions(
+                [("a1", "p1"), ("a2", "p1"), ("a3", "p1")], max_starts=1
+            )
+
+            assert mock_call.call_count == 1
+
+        assert results[0].action == "start"
+        assert results[1] is None
+        assert results[2] is None
+
+    @pytest.mark.asyncio
+    async def test_per_pair_errors_are_returned(self):
+        """A failing pair should not hide the results of the others."""
+        client = MCPClient("/tmp/test.sock")
+        client._bulk_actions_supported = False
+        client._coordinator_token = None
+
+        async def call_tool(name, args):
+            if args["agent_id"] == "bad":
+                raise MCPError("boom")
+            return {"action": "hold"}
+
+        with patch.object(client, "_call_tool", side_effect=call_tool):
+            results = await client.get_agent_actions([("bad", "p1"), ("good", "p1")])
+
+        assert isinstance(results[0], MCPError)
+        assert results[1].action == "hold"
+
+    @pytest.mark.asyncio
+    async def test_fallback_limits_calls_in_flight(self):
+        """Per-pair fallback should keep at most `concurrency` calls in flight."""
+        client = MCPClient("/tmp/test.sock")
+        client._bulk_actions_supported = False
+        client._coordinator_token = None
+        in_flight = 0
+        peak = 0
+
+        async def call_tool(name, args):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"action": "hold"}
+
+        with patch.object(client, "_call_tool", side_effect=call_tool):
+            results = await client.get_agent_actions(
+                [(f"a{i}", "p1") for i in range(6)], concurrency=2
+            )
+
+        assert all(r.action == "hold" for r in results)
+        assert peak == 2
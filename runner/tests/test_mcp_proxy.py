@@ -0,0 +1,214 @@
+# tests/test_mcp_proxy.py
+# Tests for the local MCP proxy
+
+import asyncio
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+
+from aiagent_runner.mcp_proxy import MCPProxy, MCPProxyConfig  # noqa: E402
+
+
+class EchoMCPServer:
+    """Unix socket JSON-RPC server answering every request with its method and params."""
+
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        self.connections = 0
+        self.requests: list[dict] = []
+        self._server = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer) -> None:
+        self.connections += 1
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            request = json.loads(line)
+            self.requests.append(request)
+            if "id" not in request:
+                continue
+            params = request.get("params", {})
+            result = {"method": request["method"], "params": params, "seq": len(self.requests)}
+            if params.get("name") == "failing_tool":
+                result["isError"] = True
+            if params.get("name") == "notified_tool":
+                result["notification"] = "通知はありません"
+            writer.write(json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": result}).encode() + b"\n")
+            await writer.drain()
+        writer.close()
+
+
+@pytest.fixture
+async def proxy_env():
+    # Short directory: Unix socket paths are limited to ~104 bytes on macOS
+    tmp = tempfile.mkdtemp(prefix="mcpp")
+    server = EchoMCPServer(str(Path(tmp) / "mcp.sock"))
+    await server.start()
+    proxy = MCPProxy(server.socket_path, MCPProxyConfig(
+        enabled=True, max_upstream_connections=2, cacheable_tools=["get_my_profile"]
+    ))
+    await proxy.start()
+    session = aiohttp.ClientSession()
+    yield server, proxy, session
+    await session.close()
+    await proxy.close()
+    await server.stop()
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+async def post(session, proxy, message, instance=("agt_1", "prj_1"), token=None):
+    url = proxy.endpoint_for(*instance)
+    headers = {"Authorization": f"Bearer {token or proxy.token}"}
+    async with session.post(url, json=message, headers=headers) as response:
+        return response.status, await response.json()
+
+
+def tool_call(request_id, name, **arguments):
+    return {"jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+            "params": {"name": name, "arguments": arguments}}
+
+
+class TestMCPProxy:
+    """Tests for MCPProxy."""
+
+    @pytest.mark.asyncio
+    async def test_forwards_with_client_id(self, proxy_env):
+        """Responses should carry the client's id, not the upstream one."""
+        server, proxy, session = proxy_env
+
+        status, body = await post(session, proxy, tool_call("client-7", "get_my_task", session_token="s1"))
+
+        assert status == 200
+        assert body["id"] == "client-7"
+        assert body["result"]["params"]["arguments"] == {"session_token": "s1"}
+        assert server.requests[0]["id"] != "client-7"
+
+    @pytest.mark.asyncio
+    async def test_rejects_wrong_token(self, proxy_env):
+        """Requests without the proxy token should be refused."""
+        server, proxy, session = proxy_env
+
+        status, _ = await post(session, proxy, tool_call(1, "get_my_task"), token="wrong")
+
+        assert status == 401
+        assert server.requests == []
+
+    @pytest.mark.asyncio
+    async def test_instances_share_upstream_connections(self, proxy_env):
+        """Many instances should be served over the bounded upstream pool."""
+        server, proxy, session = proxy_env
+
+        await asyncio.gather(*[
+            post(session, proxy, tool_call(i, "get_my_task"), instance=(f"agt_{i}", "prj_1"))
+            for i in range(10)
+        ])
+
+        assert len(server.requests) == 10
+        assert server.connections <= 2
+
+    @pytest.mark.asyncio
+    async def test_caches_protocol_and_read_only_tools(self, proxy_env):
+        """tools/list and configured read-only tools should be answered from cache."""
+        server, proxy, session = proxy_env
+        tools_list = {"jsonrpc": "2.0", "id": 1, "method": "tools/list", "params": {}}
+
+        await post(session, proxy, tools_list)
+        _, second = await post(session, proxy, {**tools_list, "id": 2})
+        await post(session, proxy, tool_call(3, "get_my_profile", agent_id="a1"))
+        await post(session, proxy, tool_call(4, "get_my_profile", agent_id="a1"))
+        await post(session, proxy, tool_call(5, "get_my_profile", agent_id="a2"))
+        await post(session, proxy, tool_call(6, "get_my_task", agent_id="a1"))
+        await post(session, proxy, tool_call(7, "get_my_task", agent_id="a1"))
+
+        assert second["id"] == 2
+        methods = [(r["method"], r["params"].get("name")) for r in server.requests]
+        assert methods == [
+            ("tools/list", None),
+            ("tools/call", "get_my_profile"),
+            ("tools/call", "get_my_profile"),
+            ("tools/call", "get_my_task"),
+            ("tools/call", "get_my_task"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_authenticated_and_notified_results_are_not_cached(self, proxy_env):
+        """Results the server may decorate with notifications should always be fetched again."""
+        server, proxy, session = proxy_env
+        proxy.config.cacheable_tools.append("notified_tool")
+
+        await post(session, proxy, tool_call(1, "get_my_profile", session_token="s1"))
+        await post(session, proxy, tool_call(2, "get_my_profile", session_token="s1"))
+        await post(session, proxy, tool_call(3, "notified_tool"))
+        await post(session, proxy, tool_call(4, "notified_tool"))
+
+        assert len(server.requests) == 4
+
+    def test_no_tools_cached_by_default(self):
+        """Only protocol methods should be cached unless tools are configured."""
+        assert MCPProxyConfig().cacheable_tools == []
+
+    @pytest.mark.asyncio
+    async def test_tool_errors_are_not_cached(self, proxy_env):
+        """isError results should always be fetched again."""
+        server, proxy, session = proxy_env
+        proxy.config.cacheable_tools.append("failing_tool")
+
+        await post(session, proxy, tool_call(1, "failing_tool"))
+        await post(session, proxy, tool_call(2, "failing_tool"))
+
+        assert len(server.requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_notifications_are_acknowledged(self, proxy_env):
+        """Notifications should be forwarded and acknowledged like POST /mcp."""
+        server, proxy, session = proxy_env
+
+        status, body = await post(session, proxy, {"jsonrpc": "2.0", "method": "initialized"})
+        await asyncio.sleep(0.05)
+
+        assert status == 200
+        assert body["result"] == {"acknowledged": True}
+        assert server.requests[0]["method"] == "initialized"
+
+    @pytest.mark.asyncio
+    async def test_per_instance_stats(self, proxy_env):
+        """Calls, cache hits and errors should be counted per instance."""
+        server, proxy, session = proxy_env
+
+        await post(session, proxy, tool_call(1, "get_my_profile", agent_id="a1"))
+        await post(session, proxy, tool_call(2, "get_my_profile", agent_id="a1"))
+        await post(session, proxy, tool_call(3, "failing_tool"), instance=("agt_2", "prj_1"))
+
+        stats = proxy.stats()
+        assert stats["agt_1/prj_1"]["calls"] == 2
+        assert stats["agt_1/prj_1"]["cache_hits"] == 1
+        assert stats["agt_1/prj_1"]["tools"] == {"get_my_profile": 2}
+        assert stats["agt_2/prj_1"]["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_upstream_down_returns_jsonrpc_error(self):
+        """An unreachable MCP server should yield a JSON-RPC error, not an HTTP failure."""
+        proxy = MCPProxy("/nonexistent/mcp.sock")
+        await proxy.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                status, body = await post(session, proxy, tool_call(9, "get_my_task"))
+        finally:
+            await proxy.close()
+
+        assert status == 200
+        assert body["id"] == 9
+        assert body["error"]["code"] == -32603
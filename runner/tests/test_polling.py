@@ -0,0 +1,63 @@
+# tests/test_polling.py
+# Tests for the adaptive polling scheduler
+
+import pytest
+
+from aiagent_runner.polling import AdaptivePollingConfig, AdaptivePollingScheduler
+
+
+def enabled_config(**overrides) -> AdaptivePollingConfig:
+    values = dict(enabled=True, min_interval=2.0, max_interval=16.0, backoff_factor=2.0, jitter=0.0)
+    values.update(overrides)
+    return AdaptivePollingConfig(**values)
+
+
+class TestAdaptivePollingScheduler:
+    """Tests for AdaptivePollingScheduler."""
+
+    def test_disabled_keeps_fixed_interval(self):
+        """Disabled scheduler should always return polling_interval."""
+        scheduler = AdaptivePollingScheduler(10)
+
+        scheduler.record_tick(active=False)
+        scheduler.record_tick(active=True)
+
+        assert scheduler.next_delay() == 10
+        assert scheduler.stats.ticks == 2
+
+    def test_idle_ticks_back_off_to_max(self):
+        """Idle ticks should grow the interval exponentially up to max_interval."""
+        scheduler = AdaptivePollingScheduler(2, enabled_config())
+
+        intervals = [scheduler.record_tick(active=False) for _ in range(5)]
+
+        assert intervals == [4.0, 8.0, 16.0, 16.0, 16.0]
+        assert scheduler.stats.idle_streak == 5
+
+    def test_activity_snaps_to_min(self):
+        """Activity should reset the interval to min_interval."""
+        scheduler = AdaptivePollingScheduler(10, enabled_config())
+        scheduler.record_tick(active=False)
+
+        assert scheduler.record_tick(active=True) == 2.0
+        assert scheduler.stats.idle_streak == 0
+
+    def test_base_interval_is_clamped(self):
+        """Starting interval should respect the configured bounds."""
+        scheduler = AdaptivePollingScheduler(100, enabled_config())
+
+        assert scheduler.interval == 16.0
+
+    def test_jitter_spreads_delay(self):
+        """Jitter should spread the delay within ±jitter of the interval."""
+        low = AdaptivePollingScheduler(10, enabled_config(jitter=0.2), rng=lambda: 0.0)
+        high = AdaptivePollingScheduler(10, enabled_config(jitter=0.2), rng=lambda: 0.999)
+
+        assert low.next_delay() == pytest.approx(8.0)
+        assert high.next_delay() == pytest.approx(11.996)
+        assert low.stats.last_delay == pytest.approx(8.0)
+
+    def test_invalid_bounds_rejected(self):
+        """max_interval below min_interval should be rejected."""
+        with pytest.raises(ValueError, match="max_interval"):
+            AdaptivePollingConfig(min_interval=10, max_interval=5)
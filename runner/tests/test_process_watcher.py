@@ -0,0 +1,68 @@
+# tests/test_process_watcher.py
+# Tests for event-driven process exit notification
+
+import asyncio
+import subprocess
+import sys
+
+import pytest
+
+from aiagent_runner.process_watcher import ProcessExitWatcher, pidfd_supported
+
+requires_pidfd = pytest.mark.skipif(not pidfd_supported(), reason="pidfd not available")
+
+
+def _spawn(seconds: float) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-c", f"import time; time.sleep({seconds})"])
+
+
+class TestProcessExitWatcher:
+    """Tests for ProcessExitWatcher."""
+
+    @requires_pidfd
+    @pytest.mark.asyncio
+    async def test_calls_back_on_exit(self):
+        """Should call back promptly once the child exits."""
+        watcher = ProcessExitWatcher()
+        process = _spawn(0.1)
+        exited = asyncio.Event()
+        pids: list[int] = []
+
+        def on_exit(pid):
+            pids.append(pid)
+            exited.set()
+
+        try:
+            assert watcher.watch(process.pid, on_exit)
+            await asyncio.wait_for(exited.wait(), timeout=5)
+        finally:
+            watcher.close()
+            process.wait()
+
+        assert pids == [process.pid]
+        assert watcher.watched_pids == []
+
+    @requires_pidfd
+    @pytest.mark.asyncio
+    async def test_unwatch_stops_notifications(self):
+        """An unwatched process should not trigger the callback."""
+        watcher = ProcessExitWatcher()
+        process = _spawn(0.05)
+        calls: list[int] = []
+
+        watcher.watch(process.pid, calls.append)
+        watcher.unwatch(process.pid)
+        process.wait()
+        await asyncio.sleep(0.05)
+
+        assert calls == []
+        assert watcher.watched_pids == []
+
+    @pytest.mark.asyncio
+    async def test_unsupported_platform_returns_false(self):
+        """Should decline to watch when pidfd is unavailable."""
+        watcher = ProcessExitWatcher()
+        watcher._supported = False
+
+        assert watcher.watch(12345, lambda pid: None) is False
+        assert watcher.watched_pids == []
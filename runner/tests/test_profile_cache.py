@@ -0,0 +1,170 @@
+# tests/test_profile_cache.py
+# Tests for the agent profile cache
+
+import asyncio
+
+import pytest
+
+from aiagent_runner.mcp_client import MCPError, SubordinateProfile
+from aiagent_runner.profile_cache import ProfileCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_profile(agent_id: str, prompt: str = "prompt", version=None) -> SubordinateProfile:
+    return SubordinateProfile(agent_id=agent_id, name=agent_id, role="worker",
+                              system_prompt=prompt, version=version)
+
+
+class FakeFetcher:
+    """Records calls and answers from a queue of results."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls: list[tuple[str, object]] = []
+        self.gate: asyncio.Event = None
+
+    async def __call__(self, agent_id, known_version):
+        self.calls.append((agent_id, known_version))
+        if self.gate is not None:
+            await self.gate.wait()
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+class TestProfileCache:
+    """Tests for ProfileCache.get() and invalidate()."""
+
+    @pytest.mark.asyncio
+    async def test_serves_fresh_entry_without_fetching(self):
+        """Within the TTL the cached profile should be returned."""
+        clock = FakeClock()
+        fetch = FakeFetcher(make_profile("a1"))
+        cache = ProfileCache(fetch, ttl=60, clock=clock)
+
+        first = await cache.get("a1")
+        clock.now += 30
+        second = await cache.get("a1")
+
+        assert first is second
+        assert len(fetch.calls) == 1
+        assert cache.stats.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_refetches_after_ttl(self):
+        """An expired entry should be fetched again."""
+        clock = FakeClock()
+        fetch = FakeFetcher(make_profile("a1", "old"), make_profile("a1", "new"))
+        cache = ProfileCache(fetch, ttl=60, clock=clock)
+
+        await cache.get("a1")
+        clock.now += 61
+        profile = await cache.get("a1")
+
+        assert profile.system_prompt == "new"
+        assert len(fetch.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_zero_ttl_fetches_every_time(self):
+        """ttl=0 should disable caching."""
+        fetch = FakeFetcher(make_profile("a1"), make_profile("a1"))
+        cache = ProfileCache(fetch, ttl=0, clock=FakeClock())
+
+        await cache.get("a1")
+        await cache.get("a1")
+
+        assert len(fetch.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_revalidates_with_known_version(self):
+        """Expired versioned entries should be revalidated, and None keeps the copy."""
+        clock = FakeClock()
+        cached = make_profile("a1", version="5")
+        fetch = FakeFetcher(cached, None)
+        cache = ProfileCache(fetch, ttl=60, clock=clock)
+
+        await cache.get("a1")
+        clock.now += 61
+        profile = await cache.get("a1")
+        clock.now += 30
+        await cache.get("a1")
+
+        assert profile is cached
+        assert fetch.calls == [("a1", None), ("a1", "5")]
+        assert cache.stats.not_modified == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_request(self):
+        """Spawns of the same agent in one tick should trigger one fetch."""
+        fetch = FakeFetcher(make_profile("a1"))
+        fetch.gate = asyncio.Event()
+        cache = ProfileCache(fetch, ttl=60, clock=FakeClock())
+
+        waiters = [asyncio.create_task(cache.get("a1")) for _ in range(3)]
+        await asyncio.sleep(0)
+        fetch.gate.set()
+        profiles = await asyncio.gather(*waiters)
+
+        assert len(fetch.calls) == 1
+        assert profiles[0] is profiles[1] is profiles[2]
+        assert cache.stats.shared == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidate_forces_fetch(self):
+        """invalidate() should drop one agent or every agent."""
+        fetch = FakeFetcher(make_profile("a1"), make_profile("a2"),
+                            make_profile("a1", "changed"), make_profile("a2", "changed"))
+        cache = ProfileCache(fetch, ttl=60, clock=FakeClock())
+        await cache.get("a1")
+        await cache.get("a2")
+
+        cache.invalidate("a1")
+        assert (await cache.get("a1")).system_prompt == "changed"
+        assert (await cache.get("a2")).system_prompt == "prompt"
+
+        cache.invalidate()
+        assert (await cache.get("a2")).system_prompt == "changed"
+
+    @pytest.mark.asyncio
+    async def test_invalidate_during_fetch_discards_result(self):
+        """A result fetched before an invalidation should not be cached."""
+        fetch = FakeFetcher(make_profile("a1", "before"), make_profile("a1", "after"))
+        fetch.gate = asyncio.Event()
+        cache = ProfileCache(fetch, ttl=60, clock=FakeClock())
+
+        pending = asyncio.create_task(cache.get("a1"))
+        await asyncio.sleep(0)
+        cache.invalidate("a1")
+        fetch.gate.set()
+        assert (await pending).system_prompt == "before"
+
+        assert (await cache.get("a1")).system_prompt == "after"
+
+    @pytest.mark.asyncio
+    async def test_serves_stale_entry_when_refresh_fails(self):
+        """A failed refresh should fall back to the expired entry."""
+        clock = FakeClock()
+        fetch = FakeFetcher(make_profile("a1"), MCPError("down"))
+        cache = ProfileCache(fetch, ttl=60, clock=clock)
+
+        first = await cache.get("a1")
+        clock.now += 61
+
+        assert await cache.get("a1") is first
+        assert cache.stats.stale_served == 1
+
+    @pytest.mark.asyncio
+    async def test_error_without_cached_entry_propagates(self):
+        """With nothing cached the fetch error should reach the caller."""
+        cache = ProfileCache(FakeFetcher(MCPError("not found")), ttl=60, clock=FakeClock())
+
+        with pytest.raises(MCPError):
+            await cache.get("a1")
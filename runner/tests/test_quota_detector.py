@@ -2,9 +2,17 @@
 # Quota error detector unit tests (TDD - RED phase)
 # Reference: docs/design/SPAWN_ERROR_PROTECTION.md
 
+import re
+
 import pytest
 
-from aiagent_runner.quota_detector import QuotaErrorDetector
+from aiagent_runner.quota_detector import (
+    QUOTA_RULES,
+    QuotaErrorDetector,
+    QuotaMatcher,
+    QuotaRule,
+    StreamingQuotaDetector,
+)
 
 
 class TestQuotaErrorDetector:
@@ -249,3 +257,152 @@ class TestQuotaPatterns:
             seconds = detector.detect(log_content)
             assert seconds is not None, f"Failed for: {log_content}"
             assert abs(seconds - expected_approx) <= 2, f"Expected ~{expected_approx}, got {seconds}"
+
+
+class TestQuotaMatcher:
+    """複数ルール照合のテスト"""
+
+    def test_priority_matches_per_rule_search(self):
+        """ルールごとに検索した場合と同じルールを選ぶ"""
+        matcher = QuotaMatcher(QUOTA_RULES)
+        texts = [
+            "rate limit hit\nRateLimitError\n",
+            "quota almost exhausted; quota will reset after 2m0s\n",
+            "TERMINALQUOTAERROR then retry after 30 seconds\n",
+            "nothing to see here\n",
+            "İstanbul rate limit\n",  # 小文字化で長さが変わる文字
+        ]
+        for text in texts:
+            expected = next(
+                (rule for rule in QUOTA_RULES if re.search(rule.pattern, text, re.IGNORECASE)),
+                None
+            )
+            found = matcher.search(text)
+            assert (found[0] if found else None) is expected, text
+
+    def test_rule_without_leading_literal(self):
+        """先頭リテラルのないルールも検出"""
+        matcher = QuotaMatcher([QuotaRule(r"(?:429|503) Too Many Requests", 60)])
+
+        rule, match = matcher.search("HTTP 429 too many requests")
+
+        assert rule.default_seconds == 60
+        assert match.group(0) == "429 too many requests"
+
+    def test_time_from_named_groups(self):
+        """名前付きグループから待機時間を算出"""
+        detector = QuotaErrorDetector(
+            margin_percent=0,
+            rules=[QuotaRule(r"wait (?P<hours>\d+)h(?P<minutes>\d+)m", 60)]
+        )
+
+        assert detector.detect("please wait 1h30m") == 5400
+
+    def test_invalid_pattern_rejected(self):
+        """不正なパターンはValueError"""
+        with pytest.raises(ValueError, match="Invalid quota rule pattern"):
+            QuotaRule(r"quota (unclosed")
+
+
+class TestDetectInOutput:
+    """エラー出力に限定した検出のテスト"""
+
+    def test_echoed_prompt_is_skipped(self):
+        """プロンプト内の記述では検出しない"""
+        log = (
+            "=== PROMPT ===\n"
+            "Error: RateLimitError when the quota is exhausted\n"
+            "=== OUTPUT ===\n"
+            "All tasks completed\n"
+        )
+
+        assert QuotaErrorDetector().detect_in_output(log) is None
+
+    def test_normal_output_is_skipped(self):
+        """通常出力（タスク本文等）の言及では検出しない"""
+        log = (
+            "Implemented retries so we stay under the rate limit.\n"
+            '{"type":"assistant","message":{"content":[{"type":"text","text":"Error: quota exhausted?"}]}}\n'
+        )
+
+        assert QuotaErrorDetector().detect_in_output(log) is None
+
+    def test_error_block_with_reset_time(self):
+        """エラー行と続く行から検出し、ルールとバイト位置を返す"""
+        log = (
+            "Working on the task\n"
+            "Error when talking to Gemini API\n"
+            "Your quota will reset after 1m0s.\n"
+        )
+
+        detection = QuotaErrorDetector().detect_in_output(log, start_offset=100)
+
+        assert detection.seconds == 66
+        assert detection.rule.startswith("quota will reset after")
+        assert detection.offset == 100 + log.index("quota will reset")
+        assert detection.line == "Your quota will reset after 1m0s."
+
+    def test_structured_error_event(self):
+        """構造化出力のエラーイベントから検出"""
+        log = '{"type":"result","is_error":true,"result":"API rate limit reached"}\n'
+
+        detection = QuotaErrorDetector().detect_in_output(log)
+
+        assert detection is not None
+        assert detection.seconds == 330
+
+
+class TestStreamingQuotaDetector:
+    """実行中ログの逐次検出のテスト"""
+
+    def test_detects_in_appended_chunk(self):
+        """追記されたチャンクでクォータエラーを検出"""
+        stream = StreamingQuotaDetector(QuotaErrorDetector())
+
+        assert stream.feed("Working on task...\n") is None
+        seconds = stream.feed("TerminalQuotaError: capacity exhausted. Your quota will reset after 1m0s.\n")
+
+        assert seconds == 66
+        assert stream.detected
+
+    def test_detects_match_split_across_chunks(self):
+        """チャンク境界をまたぐパターンも検出"""
+        stream = StreamingQuotaDetector(QuotaErrorDetector())
+
+        assert stream.feed("API error: RateLim") is None
+        assert stream.feed("itError (429)\n") is None  # リセット時刻の行を待つ
+        assert stream.feed("") == 330  # 300秒 + 10%
+
+    def test_ignores_loose_patterns(self):
+        """緩いパターン（rate limit等）では早期中断しない"""
+        stream = StreamingQuotaDetector(QuotaErrorDetector())
+
+        assert stream.feed("Implementing a rate limit middleware for the API\n") is None
+        assert not stream.detected
+
+    def test_reports_only_first_detection(self):
+        """検出は一度だけ返す"""
+        stream = StreamingQuotaDetector(QuotaErrorDetector())
+
+        assert stream.feed("RateLimitError\n") is None
+        assert stream.feed("") is not None
+        assert stream.feed("RateLimitError\n") is None
+        assert stream.feed("") is None
+        assert stream.detection.seconds == 330
+
+    def test_reset_time_in_later_chunk(self):
+        """リセット時刻の行が後の読み込みで届いても、その時間を使う"""
+        stream = StreamingQuotaDetector(QuotaErrorDetector())
+
+        assert stream.feed("TerminalQuotaError: capacity exhausted.\n") is None
+        assert stream.pending
+        assert stream.feed("Your quota will reset after 2m0s.\n") == 132
+
+    def test_verdict_after_error_context(self):
+        """エラー行に続く行が揃ったら、リセット時刻がなくても確定する"""
+        stream = StreamingQuotaDetector(QuotaErrorDetector())
+
+        assert stream.feed("API Error: RateLimitError\n") is None
+        text = "".join(f"  detail {i}\n" for i in range(5)) + "Retrying...\n"
+        assert stream.feed(text) == 330
+        assert not stream.pending
@@ -0,0 +1,123 @@
+# tests/test_skill_cache.py
+# Tests for the content-addressed skill cache
+
+import base64
+import io
+import os
+import time
+import zipfile
+from unittest.mock import patch
+
+from aiagent_runner.mcp_client import SkillDefinition
+from aiagent_runner.skill_cache import MANIFEST_NAME, SkillCache, skill_digest
+
+
+def make_skill(directory_name: str, content: str) -> SkillDefinition:
+    """Create a skill whose archive contains its root directory."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(f"{directory_name}/SKILL.md", content)
+    return SkillDefinition(
+        id=f"skill_{directory_name}",
+        name=directory_name,
+        directory_name=directory_name,
+        archive_base64=base64.b64encode(buffer.getvalue()).decode('utf-8')
+    )
+
+
+class TestSkillCache:
+    """Tests for SkillCache.install()."""
+
+    def test_extracts_once_and_shares_between_agents(self, tmp_path):
+        """The same archive should be extracted once for all agents."""
+        cache = SkillCache(tmp_path / "cache")
+        skill = make_skill("code-review", "# Review")
+
+        cache.install(tmp_path / "a1" / "skills", [skill])
+        cache.install(tmp_path / "a2" / "skills", [skill])
+
+        entries = [p for p in (tmp_path / "cache").iterdir() if not p.name.startswith(".")]
+        assert [p.name for p in entries] == [skill_digest(skill)]
+        for agent in ("a1", "a2"):
+            skill_md = tmp_path / agent / "skills" / "code-review" / "SKILL.md"
+            assert skill_md.read_text() == "# Review"
+
+    def test_unchanged_skill_is_not_touched(self, tmp_path):
+        """A second install with the same archive should only compare hashes."""
+        cache = SkillCache(tmp_path / "cache")
+        skills_dir = tmp_path / "skills"
+        skill = make_skill("testing", "# Testing")
+        cache.install(skills_dir, [skill])
+
+        with patch.object(cache, "_ensure_extracted") as extract:
+            cache.install(skills_dir, [skill])
+
+        extract.assert_not_called()
+        assert (skills_dir / "testing" / "SKILL.md").exists()
+
+    def test_changed_archive_is_replaced(self, tmp_path):
+        """A new archive for the same skill should replace the installed one."""
+        cache = SkillCache(tmp_path / "cache")
+        skills_dir = tmp_path / "skills"
+        cache.install(skills_dir, [make_skill("docs", "v1")])
+
+        cache.install(skills_dir, [make_skill("docs", "v2")])
+
+        assert (skills_dir / "docs" / "SKILL.md").read_text() == "v2"
+
+    def test_removed_skills_are_unlinked(self, tmp_path):
+        """Skills no longer assigned should disappear; the cache keeps them."""
+        cache = SkillCache(tmp_path / "cache")
+        skills_dir = tmp_path / "skills"
+        keep, drop = make_skill("keep", "k"), make_skill("drop", "d")
+        cache.install(skills_dir, [keep, drop])
+
+        cache.install(skills_dir, [keep])
+
+        assert sorted(p.name for p in skills_dir.iterdir()) == [MANIFEST_NAME, "keep"]
+        assert (tmp_path / "cache" / skill_digest(drop)).is_dir()
+
+    def test_invalid_archive_writes_error_file(self, tmp_path):
+        """A broken archive should leave an error note and be retried next time."""
+        cache = SkillCache(tmp_path / "cache")
+        skills_dir = tmp_path / "skills"
+        broken = SkillDefinition(id="s", name="broken", directory_name="broken",
+                                 archive_base64=base64.b64encode(b"not a zip").decode())
+
+        cache.install(skills_dir, [broken])
+
+        assert (skills_dir / "broken" / "EXTRACTION_ERROR.txt").exists()
+        with patch.object(cache, "_ensure_extracted", side_effect=ValueError("again")) as extract:
+            cache.install(skills_dir, [broken])
+        extract.assert_called_once()
+
+    def test_prune_removes_unused_entries(self, tmp_path):
+        """Entries unused for longer than max_age should be deleted."""
+        cache = SkillCache(tmp_path / "cache")
+        old, fresh = make_skill("old", "o"), make_skill("fresh", "f")
+        cache.install(tmp_path / "skills", [old, fresh])
+        old_entry = tmp_path / "cache" / skill_digest(old)
+        past = time.time() - 3600
+        os.utime(old_entry, (past, past))
+
+        assert cache.prune(max_age_seconds=60) == 1
+        assert not old_entry.exists()
+        assert (tmp_path / "cache" / skill_digest(fresh)).exists()
+
+    def test_cache_hits_keep_entries_alive(self, tmp_path):
+        """Installing an unchanged skill should refresh its entry and repair pruned links."""
+        cache = SkillCache(tmp_path / "cache")
+        skills_dir = tmp_path / "skills"
+        skill = make_skill("daily", "# Daily")
+        cache.install(skills_dir, [skill])
+        entry = tmp_path / "cache" / skill_digest(skill)
+        past = time.time() - 3600
+        os.utime(entry, (past, past))
+
+        cache.install(skills_dir, [skill])
+        assert cache.prune(max_age_seconds=60) == 0
+
+        os.utime(entry, (past, past))
+        cache.prune(max_age_seconds=60)
+        cache.install(skills_dir, [skill])
+        assert (skills_dir / "daily" / "SKILL.md").read_text() == "# Daily"
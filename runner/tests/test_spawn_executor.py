@@ -0,0 +1,68 @@
+# tests/test_spawn_executor.py
+# Tests for the spawn stage executor
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from aiagent_runner.spawn_executor import SpawnExecutor
+
+
+class TestSpawnExecutor:
+    """Tests for SpawnExecutor."""
+
+    @pytest.mark.asyncio
+    async def test_runs_off_the_event_loop_thread(self):
+        """Stages should run on worker threads and return their result."""
+        executor = SpawnExecutor(max_workers=2)
+        try:
+            thread_name = await executor.run("context", lambda: threading.current_thread().name)
+        finally:
+            executor.shutdown()
+
+        assert thread_name.startswith("spawn")
+        assert thread_name != threading.current_thread().name
+
+    @pytest.mark.asyncio
+    async def test_blocking_stage_does_not_stall_loop(self):
+        """The loop should keep running while a stage blocks."""
+        executor = SpawnExecutor(max_workers=1)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        try:
+            await executor.run("spawn", time.sleep, 0.2)
+        finally:
+            task.cancel()
+            executor.shutdown()
+
+        assert ticks >= 5
+
+    @pytest.mark.asyncio
+    async def test_records_timings_including_failures(self):
+        """Every run should be timed, whether it succeeds or raises."""
+        executor = SpawnExecutor(max_workers=1)
+
+        def fail():
+            raise OSError("disk full")
+
+        try:
+            await executor.run("spawn", time.sleep, 0.01)
+            with pytest.raises(OSError):
+                await executor.run("spawn", fail)
+        finally:
+            executor.shutdown()
+        executor.record("profile", 0.5)
+
+        timings = executor.timings()
+        assert timings["spawn"]["count"] == 2
+        assert timings["spawn"]["max"] >= 0.01
+        assert timings["profile"] == {"count": 1, "avg": 0.5, "max": 0.5, "last": 0.5}
@@ -0,0 +1,113 @@
+# tests/test_spawner.py
+# Tests for the spawner helper process
+
+import os
+import shutil
+import signal
+import sys
+import threading
+
+import pytest
+
+from aiagent_runner.spawner import SpawnerClient, SpawnerError
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="POSIX only")
+
+
+@pytest.fixture
+def spawner():
+    exits = []
+    exited = threading.Event()
+
+    def on_exit(pid):
+        exits.append(pid)
+        exited.set()
+
+    client = SpawnerClient(on_exit=on_exit)
+    client.start()
+    client.exits = exits
+    client.exited = exited
+    yield client
+    client.close()
+
+
+class TestSpawnerClient:
+    """Tests for SpawnerClient and RemoteProcess."""
+
+    def test_spawn_passes_env_cwd_and_log_fd(self, spawner, tmp_path):
+        """The child should see the overrides, the cwd and write to the given fd."""
+        log_file = tmp_path / "out.log"
+        script = "import os, sys; print(os.environ['AGENT_ID'], os.getcwd()); sys.exit(3)"
+        with open(log_file, "w") as log_f:
+            process = spawner.spawn([sys.executable, "-c", script], str(tmp_path),
+                                    {"AGENT_ID": "agt_1"}, log_f.fileno())
+
+        assert process.wait(timeout=10) == 3
+        assert process.poll() == 3
+        assert spawner.exited.wait(5)
+        assert spawner.exits == [process.pid]
+        assert log_file.read_text().split() == ["agt_1", os.path.realpath(tmp_path)]
+        assert "PATH" in os.environ  # helper environment is inherited
+
+    def test_separate_stderr_fd(self, spawner, tmp_path):
+        """With stderr_fd the child's stderr should not go to the stdout fd."""
+        script = "import sys; print('out'); print('err', file=sys.stderr)"
+        with open(tmp_path / "out.log", "w") as out_f, open(tmp_path / "err.log", "w") as err_f:
+            process = spawner.spawn([sys.executable, "-c", script], str(tmp_path), {},
+                                    out_f.fileno(), stderr_fd=err_f.fileno())
+
+        assert process.wait(timeout=10) == 0
+        assert (tmp_path / "out.log").read_text() == "out\n"
+        assert (tmp_path / "err.log").read_text() == "err\n"
+
+    @pytest.mark.skipif(shutil.which("true") is None, reason="needs true(1)")
+    def test_short_lived_processes(self, spawner, tmp_path):
+        """Processes exiting before spawn() returns should still be handed out."""
+        true = shutil.which("true")
+        with open(tmp_path / "out.log", "w") as log_f:
+            processes = [spawner.spawn([true], str(tmp_path), {}, log_f.fileno()) for _ in range(300)]
+
+        assert [process.wait(timeout=10) for process in processes] == [0] * 300
+
+    def test_terminate(self, spawner, tmp_path):
+        """terminate() should stop the child and report the signal."""
+        with open(tmp_path / "out.log", "w") as log_f:
+            process = spawner.spawn([sys.executable, "-c", "import time; time.sleep(30)"],
+                                    str(tmp_path), {}, log_f.fileno())
+
+        process.terminate()
+
+        assert process.wait(timeout=10) == -signal.SIGTERM
+
+    def test_missing_command_raises_oserror(self, spawner, tmp_path):
+        """Spawn failures in the helper should surface as OSError."""
+        with open(tmp_path / "out.log", "w") as log_f:
+            with pytest.raises(FileNotFoundError):
+                spawner.spawn(["/nonexistent/agent-cli"], str(tmp_path), {}, log_f.fileno())
+
+        assert spawner.alive
+
+    def test_closed_helper_is_reported(self, spawner, tmp_path):
+        """After close(), spawn() should raise SpawnerError and the helper should exit."""
+        helper_pid = spawner.helper_pid
+
+        spawner.close()
+
+        assert not spawner.alive
+        with pytest.raises(SpawnerError):
+            spawner.spawn([sys.executable, "-c", "pass"], str(tmp_path), {}, 1)
+        with pytest.raises(ProcessLookupError):
+            os.kill(helper_pid, 0)
+
+    def test_poll_falls_back_when_helper_dies(self, spawner, tmp_path):
+        """If the helper dies, exit of its children is detected by probing."""
+        with open(tmp_path / "out.log", "w") as log_f:
+            process = spawner.spawn([sys.executable, "-c", "import time; time.sleep(30)"],
+                                    str(tmp_path), {}, log_f.fileno())
+        os.kill(spawner.helper_pid, signal.SIGKILL)
+        spawner._reader.join(5)
+
+        assert not spawner.alive
+        assert process.poll() is None
+        process.kill()
+        assert process.wait(timeout=10) == -1
@@ -0,0 +1,212 @@
+# tests/test_unix_transport.py
+# Tests for the persistent, multiplexed Unix socket transport
+
+import asyncio
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from aiagent_runner.mcp_client import MCPClient, MCPError
+from aiagent_runner.unix_transport import UnixSocketTransport
+
+
+class FakeMCPServer:
+    """Minimal line-oriented JSON-RPC server mimicking MCPServer daemon mode."""
+
+    def __init__(self, socket_path: str, delays: Optional[dict[str, float]] = None):
+        self.socket_path = socket_path
+        self.delays = delays or {}
+        self.connections = 0
+        self.requests: list[dict] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: list[asyncio.StreamWriter] = []
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+
+    async def stop(self) -> None:
+        self.drop_connections()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def drop_connections(self) -> None:
+        for writer in self._writers:
+            writer.close()
+        self._writers.clear()
+
+    async def _handle(self, reader, writer) -> None:
+        self.connections += 1
+        self._writers.append(writer)
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            request = json.loads(line)
+            self.requests.append(request)
+            if "id" not in request:
+                continue
+            asyncio.ensure_future(self._respond(writer, request))
+
+    async def _respond(self, writer, request: dict) -> None:
+        name = request["params"]["name"]
+        await asyncio.sleep(self.delays.get(name, 0))
+        payload = {"tool": name, "arguments": request["params"]["arguments"]}
+        response = {
+            "jsonrpc": "2.0",
+            "id": request["id"],
+            "result": {"content": [{"type": "text", "text": json.dumps(payload)}]},
+        }
+        try:
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+
+@pytest.fixture
+def socket_path():
+    # Keep the path short: Unix socket paths are limited to ~104 bytes
+    directory = tempfile.mkdtemp(prefix="mcp")
+    yield str(Path(directory) / "mcp.sock")
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture
+async def server(socket_path):
+    fake = FakeMCPServer(socket_path, delays={"slow": 0.3})
+    await fake.start()
+    yield fake
+    await fake.stop()
+
+
+class TestUnixSocketTransport:
+    """Tests for UnixSocketTransport."""
+
+    @pytest.mark.asyncio
+    async def test_reuses_single_connection(self, server, socket_path):
+        """Sequential requests should share one connection with unique ids."""
+        transport = UnixSocketTransport(socket_path)
+        try:
+            for _ in range(5):
+                await transport.request("tools/call", {"name": "fast", "arguments": {}})
+        finally:
+            await transport.close()
+
+        assert server.connections == 1
+        ids = [r["id"] for r in server.requests]
+        assert len(set(ids)) == 5
+
+    @pytest.mark.asyncio
+    async def test_responses_matched_by_id(self, server, socket_path):
+        """Out-of-order responses should be delivered to the right caller."""
+        transport = UnixSocketTransport(socket_path, max_connections=1)
+        try:
+            slow, fast = await asyncio.gather(
+                transport.request("tools/call", {"name": "slow", "arguments": {"n": 1}}),
+                transport.request("tools/call", {"name": "fast", "arguments": {"n": 2}}),
+            )
+        finally:
+            await transport.close()
+
+        assert json.loads(slow["result"]["content"][0]["text"])["tool"] == "slow"
+        assert json.loads(fast["result"]["content"][0]["text"])["tool"] == "fast"
+        assert server.connections == 1
+
+    @pytest.mark.asyncio
+    async def test_pool_grows_up_to_limit_when_busy(self, server, socket_path):
+        """Concurrent requests should open extra connections up to the limit."""
+        transport = UnixSocketTransport(socket_path, max_connections=2)
+        try:
+            await asyncio.gather(*[
+                transport.request("tools/call", {"name": "slow", "arguments": {}})
+                for _ in range(6)
+            ])
+            assert transport.connection_count <= 2
+        finally:
+            await transport.close()
+
+        assert server.connections == 2
+
+    @pytest.mark.asyncio
+    async def test_reconnects_after_server_drops_connection(self, server, socket_path):
+        """A connection closed by the server should be replaced on the next call."""
+        transport = UnixSocketTransport(socket_path)
+        try:
+            await transport.request("tools/call", {"name": "fast", "arguments": {}})
+            server.drop_connections()
+            await asyncio.sleep(0.05)
+            await transport.request("tools/call", {"name": "fast", "arguments": {}})
+        finally:
+            await transport.close()
+
+        assert server.connections == 2
+
+    @pytest.mark.asyncio
+    async def test_in_flight_requests_fail_when_connection_lost(self, server, socket_path):
+        """Requests awaiting a response should fail if the socket dies."""
+        transport = UnixSocketTransport(socket_path)
+        try:
+            pending = asyncio.ensure_future(
+                transport.request("tools/call", {"name": "slow", "arguments": {}})
+            )
+            await asyncio.sleep(0.05)
+            server.drop_connections()
+            with pytest.raises(ConnectionError):
+                await pending
+        finally:
+            await transport.close()
+
+    @pytest.mark.asyncio
+    async def test_timeout(self, server, socket_path):
+        """Should raise TimeoutError when the response is too slow."""
+        transport = UnixSocketTransport(socket_path, request_timeout=0.05)
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await transport.request("tools/call", {"name": "slow", "arguments": {}})
+        finally:
+            await transport.close()
+
+    @pytest.mark.asyncio
+    async def test_notification_has_no_id(self, server, socket_path):
+        """Notifications should be sent without an id."""
+        transport = UnixSocketTransport(socket_path)
+        try:
+            await transport.notify("notifications/initialized", {})
+            await asyncio.sleep(0.05)
+        finally:
+            await transport.close()
+
+        assert server.requests == [
+            {"jsonrpc": "2.0", "method": "notifications/initialized", "params": {}}
+        ]
+
+
+class TestMCPClientUnixTransport:
+    """Tests for MCPClient over the persistent Unix socket transport."""
+
+    @pytest.mark.asyncio
+    async def test_call_tool_over_persistent_connection(self, server, socket_path):
+        """Tool calls should be parsed and share one connection."""
+        client = MCPClient(socket_path, coordinator_token="tok")
+        try:
+            first = await client._call_tool("health_check", {"a": 1})
+            second = await client._call_tool("health_check", {"a": 2})
+        finally:
+            await client.close()
+
+        assert first == {"tool": "health_check", "arguments": {"a": 1}}
+        assert second["arguments"] == {"a": 2}
+        assert server.connections == 1
+
+    @pytest.mark.asyncio
+    async def test_server_unavailable_raises_mcp_error(self, socket_path):
+        """Should raise MCPError when nothing listens on the socket."""
+        client = MCPClient(socket_path)
+        with pytest.raises(MCPError, match="Cannot connect"):
+            await client._call_tool("health_check", {})
+        await client.close()
@@ -0,0 +1,175 @@
+# tests/test_upload_spool.py
+# Tests for the durable log upload spool and worker pool
+
+import asyncio
+
+import pytest
+
+from aiagent_runner.upload_spool import UploadJob, UploadSpool, UploadWorkerPool
+
+
+def _job(execution_log_id: str = "exec_1", **kwargs) -> UploadJob:
+    return UploadJob(
+        log_file_path=f"/tmp/{execution_log_id}.log",
+        execution_log_id=execution_log_id,
+        agent_id="agt_1",
+        task_id="tsk_1",
+        project_id="prj_1",
+        **kwargs
+    )
+
+
+class TestUploadSpool:
+
+    def test_save_load_remove(self, tmp_path):
+        spool = UploadSpool(tmp_path / "spool")
+        assert spool.load() == []
+
+        spool.save(_job("exec_1", attempts=2, next_attempt_at=123.0))
+        spool.save(_job("exec_2"))
+        jobs = spool.load()
+        assert [job.execution_log_id for job in jobs] == ["exec_1", "exec_2"]
+        assert jobs[0].attempts == 2
+        assert jobs[0].next_attempt_at == 123.0
+
+        spool.remove("exec_1")
+        spool.remove("exec_missing")
+        assert [job.execution_log_id for job in spool.load()] == ["exec_2"]
+
+    def test_unreadable_manifest_is_dropped(self, tmp_path):
+        spool = UploadSpool(tmp_path)
+        (tmp_path / "broken.json").write_text("{not json")
+        (tmp_path / "stale.json").write_text('{"unknown_field": 1}')
+        spool.save(_job("exec_1"))
+
+        assert [job.execution_log_id for job in spool.load()] == ["exec_1"]
+        assert not (tmp_path / "broken.json").exists()
+        assert not (tmp_path / "stale.json").exists()
+
+    def test_ids_stay_inside_directory(self, tmp_path):
+        spool = UploadSpool(tmp_path / "spool")
+        spool.save(_job("../escape"))
+        assert not (tmp_path / "escape.json").exists()
+        assert len(list((tmp_path / "spool").iterdir())) == 1
+
+
+class TestUploadWorkerPool:
+
+    def test_backoff_doubles_with_jitter_and_cap(self):
+        pool = UploadWorkerPool(None, backoff_base=5.0, backoff_max=30.0, jitter=lambda: 0.0)
+        assert [pool.backoff(n) for n in (1, 2, 3, 4, 5)] == [2.5, 5.0, 10.0, 15.0, 15.0]
+        pool = UploadWorkerPool(None, backoff_base=5.0, backoff_max=30.0, jitter=lambda: 0.999999)
+        assert pool.backoff(1) == pytest.approx(5.0)
+
+    @pytest.mark.asyncio
+    async def test_retries_until_success(self, tmp_path):
+        results = [False, False, True]
+        calls = []
+
+        async def handler(job):
+            calls.append(job.attempts)
+            return results.pop(0)
+
+        spool = UploadSpool(tmp_path)
+        pool = UploadWorkerPool(handler, backoff_base=0.01, jitter=lambda: 0.0)
+        pool.start(spool)
+        pool.submit(_job())
+        assert [job.execution_log_id for job in spool.load()] == ["exec_1"]
+
+        for _ in range(100):
+            if not pool.pending:
+                break
+            await asyncio.sleep(0.01)
+        await pool.close(timeout=1)
+
+        assert calls == [1, 2, 3]
+        assert spool.load() == []
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self, tmp_path):
+        calls = []
+
+        async def handler(job):
+            calls.append(job.attempts)
+            raise RuntimeError("server down")
+
+        spool = UploadSpool(tmp_path)
+        pool = UploadWorkerPool(handler, max_attempts=2, backoff_base=0.01, jitter=lambda: 0.0)
+        pool.start(spool)
+        pool.submit(_job())
+
+        for _ in range(100):
+            if not pool.pending:
+                break
+            await asyncio.sleep(0.01)
+        await pool.close(timeout=1)
+
+        assert calls == [1, 2]
+        assert spool.load() == []
+
+    @pytest.mark.asyncio
+    async def test_worker_count_bounds_concurrency(self):
+        running = 0
+        peak = 0
+
+        async def handler(job):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return True
+
+        pool = UploadWorkerPool(handler, workers=2)
+        pool.start()
+        for i in range(6):
+            pool.submit(_job(f"exec_{i}"))
+        assert await pool.close(timeout=1) == 0
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_close_deadline_leaves_jobs_for_next_start(self, tmp_path):
+        async def hang(job):
+            await asyncio.sleep(10)
+            return True
+
+        spool = UploadSpool(tmp_path)
+        pool = UploadWorkerPool(hang, backoff_base=60.0)
+        pool.submit(_job("exec_early"))  # Submitted before start: persisted by start()
+        pool.start(spool)
+        pool.submit(_job("exec_late"))
+        await asyncio.sleep(0)
+
+        assert await pool.close(timeout=0.05) == 2
+        assert sorted(job.execution_log_id for job in spool.load()) == ["exec_early", "exec_late"]
+
+        uploaded = []
+
+        async def handler(job):
+            uploaded.append(job.execution_log_id)
+            return True
+
+        resumed = UploadWorkerPool(handler)
+        assert resumed.start(spool) == 2
+        assert await resumed.close(timeout=1) == 0
+        assert sorted(uploaded) == ["exec_early", "exec_late"]
+        assert spool.load() == []
+
+    @pytest.mark.asyncio
+    async def test_resumed_job_waits_for_its_retry_time(self, tmp_path):
+        now = [1000.0]
+        spool = UploadSpool(tmp_path)
+        spool.save(_job("exec_1", attempts=1, next_attempt_at=1060.0))
+        calls = []
+
+        async def handler(job):
+            calls.append(job.attempts)
+            return True
+
+        pool = UploadWorkerPool(handler, clock=lambda: now[0])
+        assert pool.start(spool) == 1
+        await asyncio.sleep(0.01)
+        assert calls == []
+        # Waiting jobs are not drained on close; they stay spooled
+        assert await pool.close(timeout=1) == 1
+        assert [job.execution_log_id for job in spool.load()] == ["exec_1"]